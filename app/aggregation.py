@@ -0,0 +1,434 @@
+"""Columnar aggregation of expenses for reports.
+
+Expenses are loaded once into parallel typed columns (`array.array`):
+cost as integer cents (parsed once by :mod:`app.money`), an interned category code, the expense date as
+days since the Unix epoch, the group id and the paying member.  Each
+member's paid and owed shares go into a second set of columns linked to
+their expense row.  Cost strings and category shapes are resolved once
+on load; rollups (totals, per-category sums, per-month, per-group and
+per-member totals) are then single passes over the integer columns, and
+`ExpenseColumns.select` filters every column with `itertools.compress`.
+`ExpenseColumns.converted` restates every amount in one reporting
+currency, one batch per column (see :mod:`app.currency`).
+Multi-month and multi-group reports load one set of columns and slice
+it rather than re-walking the expense dicts.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date
+from itertools import compress
+from typing import TYPE_CHECKING, Any
+
+from .money import expense_money, to_cents
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .currency import RateTable
+
+UNKNOWN_CATEGORY = "Unknown"
+# Sentinel stored for expenses without a usable date, group or payer
+MISSING = -1
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def is_spending(expense: dict[str, Any]) -> bool:
+    """Return whether an expense counts towards spending reports.
+
+    Deleted expenses and payments between members (settling up) are not
+    spending; every report leaves them out so their totals agree.
+    """
+    return not (expense.get("deleted_at") or expense.get("payment"))
+
+
+def epoch_day(value: Any) -> int:
+    """Return days since 1970-01-01 for an ISO date string, or `MISSING`."""
+    if not isinstance(value, str) or len(value) < 10:
+        return MISSING
+    try:
+        return date.fromisoformat(value[:10]).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return MISSING
+
+
+def day_date(day: int) -> date:
+    """Return the calendar date for a day number from `epoch_day`."""
+    return date.fromordinal(day + _EPOCH_ORDINAL)
+
+
+def bucket_label(day: int, granularity: str) -> str:
+    """Return the report bucket label for a day.
+
+    Labels look like ``2025-10-15``, ``2025-W42`` (ISO week), ``2025-10``
+    and ``2025-Q4`` for day, week, month and quarter granularity.
+    """
+    when = day_date(day)
+    if granularity == "day":
+        return when.isoformat()
+    if granularity == "week":
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return f"{when.year}-{when.month:02d}"
+    if granularity == "quarter":
+        return f"{when.year}-Q{(when.month - 1) // 3 + 1}"
+    raise ValueError(f"Unsupported granularity '{granularity}'")
+
+
+def category_label(expense: dict[str, Any]) -> str:
+    """Return an expense's category name, its id, or "Unknown"."""
+    category = expense.get("category") or expense.get("category_id")
+    if isinstance(category, dict):
+        label = category.get("name") or category.get("name_en")
+    elif isinstance(category, str):
+        label = category
+    elif category is not None:
+        label = str(category)
+    else:
+        label = None
+    return label or UNKNOWN_CATEGORY
+
+
+def _int_or_missing(value: Any) -> int:
+    try:
+        return int(value) if value is not None else MISSING
+    except (TypeError, ValueError):
+        return MISSING
+
+
+class ExpenseColumns:
+    """Parallel typed columns over a set of expenses.
+
+    Row ``i`` of ``cents``, ``category``, ``currency``, ``day``, ``group``
+    and ``payer`` describes one expense; ``category`` holds codes into
+    ``category_labels`` and ``currency`` codes into ``currency_labels``
+    (None for expenses without a currency code).  Share row ``j`` of ``share_row``, ``share_user``,
+    ``share_paid`` and ``share_owed`` is one member's part of expense
+    ``share_row[j]``.
+    """
+
+    def __init__(self) -> None:
+        self.cents = array("q")
+        self.category = array("l")
+        self.currency = array("l")
+        self.day = array("l")
+        self.group = array("q")
+        self.payer = array("q")
+        self.share_row = array("l")
+        self.share_user = array("q")
+        self.share_paid = array("q")
+        self.share_owed = array("q")
+        self.category_labels: list[str] = []
+        self._category_codes: dict[str, int] = {}
+        self.currency_labels: list[str | None] = []
+        self._currency_codes: dict[str | None, int] = {}
+        self.member_names: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    @classmethod
+    def from_expenses(cls, expenses: Iterable[dict[str, Any]]) -> ExpenseColumns:
+        """Build columns from converted expense dicts."""
+        columns = cls()
+        for expense in expenses:
+            columns.append(expense)
+        return columns
+
+    def append(self, expense: dict[str, Any]) -> None:
+        """Add one converted expense dict."""
+        row = len(self.cents)
+        money = expense_money(expense)
+        self.cents.append(money.cents)
+        self.category.append(self._category_code(category_label(expense)))
+        self.currency.append(self._currency_code(money.currency))
+        self.day.append(
+            epoch_day(
+                expense.get("date")
+                or expense.get("created_at")
+                or expense.get("created_at_object")
+            )
+        )
+        self.group.append(_int_or_missing(expense.get("group_id")))
+
+        payer, top_paid = MISSING, 0
+        for share in expense.get("users") or ():
+            if not isinstance(share, dict):
+                continue
+            user_id = _int_or_missing(share.get("user_id", share.get("id")))
+            if user_id not in self.member_names:
+                user = (
+                    share.get("user") if isinstance(share.get("user"), dict) else share
+                )
+                name = f"{user.get('first_name') or ''} {user.get('last_name') or ''}"
+                if name.strip():
+                    self.member_names[user_id] = name.strip()
+            paid = to_cents(share.get("paid_share"), money.currency)
+            self.share_row.append(row)
+            self.share_user.append(user_id)
+            self.share_paid.append(paid)
+            self.share_owed.append(to_cents(share.get("owed_share"), money.currency))
+            if paid > top_paid:
+                payer, top_paid = user_id, paid
+        self.payer.append(payer)
+
+    def _category_code(self, label: str) -> int:
+        code = self._category_codes.get(label)
+        if code is None:
+            code = self._category_codes[label] = len(self.category_labels)
+            self.category_labels.append(label)
+        return code
+
+    def _currency_code(self, label: str | None) -> int:
+        code = self._currency_codes.get(label)
+        if code is None:
+            code = self._currency_codes[label] = len(self.currency_labels)
+            self.currency_labels.append(label)
+        return code
+
+    def currencies(self) -> list[str]:
+        """Return the currency codes present, in first-seen order."""
+        return [label for label in self.currency_labels if label is not None]
+
+    def converted(self, rates: RateTable, target: str) -> ExpenseColumns:
+        """Return a copy with every amount converted to ``target``.
+
+        Expense and share amounts are converted column by column with
+        `RateTable.convert_column`; rows without a currency code are
+        taken to be in ``target`` already.
+        """
+        target = target.strip().upper()
+        result = ExpenseColumns()
+        result.category_labels = list(self.category_labels)
+        result._category_codes = dict(self._category_codes)
+        result.member_names = dict(self.member_names)
+        result.currency_labels = [target]
+        result._currency_codes = {target: 0}
+        result.currency = array("l", [0]) * len(self.cents)
+        for name in ("category", "day", "group", "payer", "share_row", "share_user"):
+            column = getattr(self, name)
+            setattr(result, name, array(column.typecode, column))
+        result.cents = rates.convert_column(
+            self.cents, self.currency, self.currency_labels, target
+        )
+        share_currency = [self.currency[row] for row in self.share_row]
+        for name in ("share_paid", "share_owed"):
+            setattr(
+                result,
+                name,
+                rates.convert_column(
+                    getattr(self, name), share_currency, self.currency_labels, target
+                ),
+            )
+        return result
+
+    # Selection
+
+    def select(
+        self,
+        start_day: int | None = None,
+        end_day: int | None = None,
+        group_ids: Iterable[int] | None = None,
+    ) -> ExpenseColumns:
+        """Return the rows dated in ``[start_day, end_day)`` and in ``group_ids``.
+
+        Category codes are preserved so results of different selections
+        can be compared directly.
+        """
+        keep = [True] * len(self.cents)
+        if start_day is not None or end_day is not None:
+            low = MISSING + 1 if start_day is None else start_day
+            high = end_day
+            keep = [
+                flag and low <= day and (high is None or day < high)
+                for flag, day in zip(keep, self.day, strict=True)
+            ]
+        if group_ids is not None:
+            wanted = set(group_ids)
+            keep = [
+                flag and group in wanted
+                for flag, group in zip(keep, self.group, strict=True)
+            ]
+
+        selected = ExpenseColumns()
+        selected.category_labels = list(self.category_labels)
+        selected._category_codes = dict(self._category_codes)
+        selected.currency_labels = list(self.currency_labels)
+        selected._currency_codes = dict(self._currency_codes)
+        selected.member_names = dict(self.member_names)
+        for name in ("cents", "category", "currency", "day", "group", "payer"):
+            column = getattr(self, name)
+            setattr(selected, name, array(column.typecode, compress(column, keep)))
+
+        # Renumber the kept expense rows and carry their shares along
+        renumber = array("l", [MISSING]) * len(keep)
+        for new_row, row in enumerate(compress(range(len(keep)), keep)):
+            renumber[row] = new_row
+        share_keep = [keep[row] for row in self.share_row]
+        selected.share_row = array(
+            "l", [renumber[row] for row in compress(self.share_row, share_keep)]
+        )
+        for name in ("share_user", "share_paid", "share_owed"):
+            column = getattr(self, name)
+            setattr(
+                selected, name, array(column.typecode, compress(column, share_keep))
+            )
+        return selected
+
+    # Rollups (all amounts in cents)
+
+    def total(self) -> int:
+        """Return the summed cost."""
+        return sum(self.cents)
+
+    def category_totals(self) -> dict[str, int]:
+        """Return summed cost per category label, in first-seen order."""
+        totals = [0] * len(self.category_labels)
+        seen = [False] * len(self.category_labels)
+        for code, cents in zip(self.category, self.cents, strict=True):
+            totals[code] += cents
+            seen[code] = True
+        return {
+            label: totals[code]
+            for code, label in enumerate(self.category_labels)
+            if seen[code]
+        }
+
+    def category_counts(self) -> dict[str, int]:
+        """Return the number of expenses per category label."""
+        counts = [0] * len(self.category_labels)
+        for code in self.category:
+            counts[code] += 1
+        return {
+            label: counts[code]
+            for code, label in enumerate(self.category_labels)
+            if counts[code]
+        }
+
+    def category_shares(self) -> dict[str, float]:
+        """Return each category's fraction of the total cost."""
+        total = self.total()
+        return {
+            label: (cents / total if total else 0.0)
+            for label, cents in self.category_totals().items()
+        }
+
+    def month_totals(self) -> dict[str, int]:
+        """Return summed cost per ``YYYY-MM`` month, in date order."""
+        months: dict[int, str] = {}
+        totals: dict[str, int] = {}
+        for day, cents in zip(self.day, self.cents, strict=True):
+            if day == MISSING:
+                continue
+            month = months.get(day)
+            if month is None:
+                month = months[day] = date.fromordinal(day + _EPOCH_ORDINAL).strftime(
+                    "%Y-%m"
+                )
+            totals[month] = totals.get(month, 0) + cents
+        return dict(sorted(totals.items()))
+
+    def group_totals(self) -> dict[int, int]:
+        """Return summed cost per group id."""
+        totals: dict[int, int] = {}
+        for group, cents in zip(self.group, self.cents, strict=True):
+            totals[group] = totals.get(group, 0) + cents
+        return totals
+
+    def member_totals(self) -> dict[int, dict[str, int]]:
+        """Return ``paid``, ``owed`` and ``net`` cents per member id."""
+        paid: dict[int, int] = {}
+        owed: dict[int, int] = {}
+        for user, cents in zip(self.share_user, self.share_paid, strict=True):
+            paid[user] = paid.get(user, 0) + cents
+        for user, cents in zip(self.share_user, self.share_owed, strict=True):
+            owed[user] = owed.get(user, 0) + cents
+        return {
+            user: {
+                "paid": paid.get(user, 0),
+                "owed": owed.get(user, 0),
+                "net": paid.get(user, 0) - owed.get(user, 0),
+            }
+            for user in dict.fromkeys([*paid, *owed])
+            if user != MISSING
+        }
+
+    def payer_totals(self) -> dict[int, int]:
+        """Return summed cost per paying member id."""
+        totals: dict[int, int] = {}
+        for payer, cents in zip(self.payer, self.cents, strict=True):
+            if payer != MISSING:
+                totals[payer] = totals.get(payer, 0) + cents
+        return totals
+
+    def timeseries(
+        self, start_day: int, end_day: int, granularity: str
+    ) -> dict[str, Any]:
+        """Bucket the rows dated in ``[start_day, end_day)`` in one pass.
+
+        Returns ``buckets`` (labels from `bucket_label`, in order and
+        including empty ones) plus series aligned with it, in cents:
+        ``totals`` and ``counts``; ``categories`` mapping each category
+        label to its totals; and ``members`` mapping each member id to
+        ``paid`` and ``owed`` series.
+        """
+        buckets: list[str] = []
+        day_bucket = array("l")
+        for day in range(start_day, end_day):
+            label = bucket_label(day, granularity)
+            if not buckets or buckets[-1] != label:
+                buckets.append(label)
+            day_bucket.append(len(buckets) - 1)
+        width = len(buckets)
+
+        totals = [0] * width
+        counts = [0] * width
+        categories: dict[int, list[int]] = {}
+        row_bucket = array("l")
+        for day, code, cents in zip(self.day, self.category, self.cents, strict=True):
+            offset = day - start_day
+            if day == MISSING or not 0 <= offset < len(day_bucket):
+                row_bucket.append(MISSING)
+                continue
+            bucket = day_bucket[offset]
+            row_bucket.append(bucket)
+            totals[bucket] += cents
+            counts[bucket] += 1
+            series = categories.get(code)
+            if series is None:
+                series = categories[code] = [0] * width
+            series[bucket] += cents
+
+        members: dict[int, dict[str, list[int]]] = {}
+        for row, user, paid, owed in zip(
+            self.share_row,
+            self.share_user,
+            self.share_paid,
+            self.share_owed,
+            strict=True,
+        ):
+            bucket = row_bucket[row]
+            if bucket == MISSING or user == MISSING:
+                continue
+            series_by_kind = members.get(user)
+            if series_by_kind is None:
+                series_by_kind = members[user] = {
+                    "paid": [0] * width,
+                    "owed": [0] * width,
+                }
+            series_by_kind["paid"][bucket] += paid
+            series_by_kind["owed"][bucket] += owed
+
+        return {
+            "buckets": buckets,
+            "totals": totals,
+            "counts": counts,
+            "categories": {
+                self.category_labels[code]: series
+                for code, series in sorted(categories.items())
+            },
+            "members": members,
+        }
@@ -0,0 +1,215 @@
+"""Native async transport for Splitwise read endpoints.
+
+The `splitwise` SDK is synchronous and opens a fresh `requests` session
+(and therefore a fresh TLS connection) for every call.  This module talks
+to the REST API directly through a shared, pooled ``httpx.AsyncClient``
+with keep-alive connections and HTTP/2 when the optional ``h2`` package
+is installed.  Responses are parsed into the SDK's own model classes so
+that `object_to_dict` output is identical to the SDK code path.
+
+Only personal API key (bearer token) authentication is supported; write
+methods keep going through the SDK.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, ClassVar
+
+import httpx
+from splitwise.category import Category
+from splitwise.comment import Comment
+from splitwise.currency import Currency
+from splitwise.exception import (
+    SplitwiseBadRequestException,
+    SplitwiseException,
+    SplitwiseNotAllowedException,
+    SplitwiseNotFoundException,
+    SplitwiseUnauthorizedException,
+)
+from splitwise.expense import Expense
+from splitwise.group import Group
+from splitwise.notification import Notification
+from splitwise.user import CurrentUser, Friend
+
+from . import constants as const
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@dataclass(frozen=True, slots=True)
+class _Endpoint:
+    """Description of a Splitwise GET endpoint."""
+
+    path: str
+    response_key: str
+    model: Callable[[dict[str, Any]], Any]
+    many: bool = False
+    # Name of the kwarg appended to the path (e.g. ``/get_group/{id}``)
+    path_param: str | None = None
+
+
+def http2_available() -> bool:
+    """Return True when the optional ``h2`` package is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class AsyncSplitwiseHTTP:
+    """Pooled async HTTP transport for Splitwise read methods.
+
+    Parameters
+    ----------
+    api_key: str
+        Splitwise personal API key sent as a bearer token.
+    base_url: str
+        API root, overridable to point at a local fake server.
+    max_connections: int
+        Maximum number of concurrent connections.  The transport only talks
+        to one host, so this is also the per-host connection limit.
+    max_keepalive_connections: int
+        Number of idle connections kept open for reuse.
+    http2: bool | None
+        Force HTTP/2 on or off; ``None`` enables it when ``h2`` is installed.
+    transport: httpx.AsyncBaseTransport | None
+        Custom transport, mainly for tests.
+    """
+
+    ENDPOINTS: ClassVar[dict[str, _Endpoint]] = {
+        const.METHOD_GET_CURRENT_USER: _Endpoint(
+            "get_current_user", "user", CurrentUser
+        ),
+        const.METHOD_LIST_GROUPS: _Endpoint("get_groups", "groups", Group, many=True),
+        const.METHOD_GET_GROUP: _Endpoint("get_group", "group", Group, path_param="id"),
+        const.METHOD_LIST_EXPENSES: _Endpoint(
+            "get_expenses", "expenses", Expense, many=True
+        ),
+        const.METHOD_GET_EXPENSE: _Endpoint(
+            "get_expense", "expense", Expense, path_param="id"
+        ),
+        const.METHOD_LIST_FRIENDS: _Endpoint(
+            "get_friends", "friends", Friend, many=True
+        ),
+        const.METHOD_GET_FRIEND: _Endpoint(
+            "get_friend", "friend", Friend, path_param="id"
+        ),
+        const.METHOD_LIST_CATEGORIES: _Endpoint(
+            "get_categories", "categories", Category, many=True
+        ),
+        const.METHOD_LIST_CURRENCIES: _Endpoint(
+            "get_currencies", "currencies", Currency, many=True
+        ),
+        const.METHOD_LIST_NOTIFICATIONS: _Endpoint(
+            "get_notifications", "notifications", Notification, many=True
+        ),
+        const.METHOD_GET_COMMENTS: _Endpoint(
+            "get_comments", "comments", Comment, many=True
+        ),
+    }
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = const.DEFAULT_SPLITWISE_BASE_URL,
+        max_connections: int = const.DEFAULT_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = const.DEFAULT_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        http2: bool | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._api_key = api_key
+        self._base_url = base_url.rstrip("/") + "/"
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = timeout
+        self._http2 = http2_available() if http2 is None else http2
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def http2(self) -> bool:
+        return self._http2
+
+    def supports(self, method_name: str) -> bool:
+        """Return True if the method is served natively by this transport."""
+        return method_name in self.ENDPOINTS
+
+    async def call(self, method_name: str, **kwargs: Any) -> Any:
+        """Perform a read call and return SDK model objects."""
+        endpoint = self.ENDPOINTS.get(method_name)
+        if endpoint is None:
+            raise AttributeError(f"Unsupported async method '{method_name}'")
+
+        params = dict(kwargs)
+        path = endpoint.path
+        if endpoint.path_param is not None:
+            path = f"{path}/{params.pop(endpoint.path_param, 0)}"
+        query = {
+            key: str(value).lower() if isinstance(value, bool) else value
+            for key, value in params.items()
+            if value is not None
+        }
+
+        response = await self._get_client().get(path, params=query)
+        text = self._handle_response(response)
+        if len(text) >= const.OFFLOAD_MIN_BYTES:
+            # Large listings take milliseconds to parse; keep the loop free
+            return await asyncio.to_thread(self._decode, endpoint, text)
+        return self._decode(endpoint, text)
+
+    @staticmethod
+    def _decode(endpoint: _Endpoint, text: str) -> Any:
+        """Parse a response body into SDK model objects."""
+        data = json.loads(text).get(endpoint.response_key)
+        if endpoint.many:
+            return [endpoint.model(item) for item in data or []]
+        return endpoint.model(data) if data else None
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool is bound to the running event loop.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={"Authorization": f"Bearer {self._api_key}"},
+                limits=self._limits,
+                timeout=self._timeout,
+                http2=self._http2,
+                transport=self._transport,
+            )
+        return self._client
+
+    @staticmethod
+    def _handle_response(response: httpx.Response) -> str:
+        """Mirror the SDK's status code handling."""
+        if response.status_code == 200:
+            return response.text
+        if response.status_code == 401:
+            raise SplitwiseUnauthorizedException(
+                "Please check your token or consumer id and secret", response=response
+            )
+        if response.status_code == 403:
+            raise SplitwiseNotAllowedException(
+                "You are not allowed to perform this operation", response=response
+            )
+        if response.status_code == 400:
+            raise SplitwiseBadRequestException(
+                "Please check your request", response=response
+            )
+        if response.status_code == 404:
+            raise SplitwiseNotFoundException(
+                "Required resource is not found", response=response
+            )
+        raise SplitwiseException("Unknown error happened", response=response)
@@ -0,0 +1,392 @@
+"""Bulk expense creation with local validation and idempotent retries.
+
+`create_expenses` takes a list of expense specs, validates every one
+locally (amounts, shares adding up to the cost, participant names
+resolved against the group's members) and then submits the valid ones
+through a bounded pool of workers.  Rate-limited calls (HTTP 429) are
+retried after the server's ``Retry-After`` hint or an exponential
+backoff.  Each item carries an idempotency key; `IdempotencyStore`
+remembers the outcome per key, so resubmitting a batch (or one item)
+returns the earlier expense instead of creating a duplicate.  Derived
+keys depend on an item's content, not its position, and outcomes live
+in the shared store when ``SPLITWISE_SHARED_STATE_URL`` is set, so a
+retry reaching another worker is recognised as well.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from splitwise.category import Category
+from splitwise.expense import Expense
+from splitwise.user import ExpenseUser
+
+from . import constants as const
+from .money import Money, format_cents
+from .rate_limit import retry_after_seconds
+from .utils import written_objects
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from .shared_state import SharedCache
+    from .splitwise_client import SplitwiseClient
+
+logger = logging.getLogger("splitwise_mcp")
+
+# Optional expense fields passed through to create_expense unchanged
+_PASSTHROUGH_FIELDS = ("date", "details", "category_id", "repeat_interval")
+
+# Shared-store namespace of remembered batch outcomes
+_SHARED_METHOD = "batch_idempotency"
+
+
+class IdempotencyStore:
+    """Remember write outcomes by idempotency key.
+
+    A key seen before returns the stored result without running the
+    write again; concurrent calls with the same key share one write.
+    Failed writes are not remembered, so they can be retried.  With a
+    shared cache, results are also kept there, and a key written by
+    another process (or before a restart) is replayed too.
+
+    Parameters
+    ----------
+    ttl: float
+        Seconds a result is remembered.
+    max_keys: int
+        Maximum number of keys remembered in process; the oldest are
+        dropped first.
+    clock: callable
+        Monotonic time source, injectable for tests.
+    shared: SharedCache, optional
+        Store shared by all server processes of the tenant.
+    """
+
+    def __init__(
+        self,
+        ttl: float = const.DEFAULT_IDEMPOTENCY_TTL,
+        max_keys: int = const.MAX_IDEMPOTENCY_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+        shared: SharedCache | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._clock = clock
+        self.shared = shared
+        self._results: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._replays = 0
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Return ``(hit, result)`` for a remembered key."""
+        entry = self._results.get(key)
+        if entry is None:
+            return False, None
+        if self._clock() - entry[0] >= self.ttl:
+            del self._results[key]
+            return False, None
+        return True, entry[1]
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Run ``fn`` once per key and return ``(result, replayed)``."""
+        hit, result = self.get(key)
+        if hit:
+            self._replays += 1
+            return result, True
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._replays += 1
+            return await asyncio.shield(pending), True
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self.shared is None:
+                result, replayed = await fn(), False
+            else:
+                result, replayed = await self._run_shared(key, fn)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Followers re-raise it; nobody else has to retrieve it
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        self._results[key] = (self._clock(), result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_keys:
+            self._results.popitem(last=False)
+        self._replays += replayed
+        return result, replayed
+
+    async def _run_shared(
+        self, key: str, fn: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        # The shared cache's read lock makes other processes wait for
+        # this write instead of running it a second time
+        ran = False
+
+        async def write() -> str:
+            nonlocal ran
+            ran = True
+            return json.dumps(await fn(), default=str)
+
+        payload = await self.shared.fetch_json(
+            _SHARED_METHOD, {"key": key}, self.ttl, write
+        )
+        return json.loads(payload), not ran
+
+    def stats(self) -> dict[str, int]:
+        """Return remembered key count and replay counter."""
+        return {"keys": len(self._results), "replays": self._replays}
+
+
+def idempotency_key(spec: dict[str, Any], occurrence: int = 0) -> str:
+    """Derive a key from an item's content and its occurrence number.
+
+    ``occurrence`` counts the earlier items of the batch with the same
+    content, so identical lines (two equal card charges) stay distinct,
+    while resubmitting the batch, a reordered batch or a single item
+    yields the keys of the original submission.
+    """
+    content = {k: v for k, v in spec.items() if k != "idempotency_key"}
+    digest = hashlib.sha256(
+        json.dumps([occurrence, content], sort_keys=True, default=str).encode()
+    )
+    return digest.hexdigest()[:32]
+
+
+def _positive_money(value: Any, name: str, currency: str) -> Money:
+    money = Money.parse(value, currency)
+    if value is None or isinstance(value, bool) or money.cents <= 0:
+        raise ValueError(f"{name} must be a positive amount")
+    return money
+
+
+async def validate_expense_spec(client: SplitwiseClient, spec: Any) -> dict[str, Any]:
+    """Return ``create_expense`` params for one spec, or raise `ValueError`.
+
+    ``users`` entries name a participant by ``user_id`` or ``name``
+    (resolved within ``group_id``) with ``paid_share`` and
+    ``owed_share``; both sets of shares must add up to the cost.
+    Without ``users`` the cost is split equally among the group.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Expense spec must be an object")
+    currency_code = spec.get("currency_code") or "USD"
+    if not isinstance(currency_code, str) or not currency_code.strip().isalpha():
+        raise ValueError(f"Invalid currency_code {currency_code!r}")
+    currency_code = currency_code.strip().upper()
+    cost = _positive_money(spec.get("cost"), "cost", currency_code)
+    description = spec.get("description")
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError("description is required")
+
+    params: dict[str, Any] = {
+        "cost": str(cost),
+        "description": description.strip(),
+        "currency_code": currency_code,
+    }
+    group_id = spec.get("group_id")
+    if group_id is not None:
+        try:
+            params["group_id"] = int(group_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid group_id {group_id!r}") from None
+    for field in _PASSTHROUGH_FIELDS:
+        if spec.get(field) is not None:
+            params[field] = spec[field]
+
+    users = spec.get("users")
+    if not users:
+        if group_id is None:
+            raise ValueError("group_id or users is required")
+        params["split_equally"] = True
+        return params
+    if not isinstance(users, list):
+        raise ValueError("users must be a list")
+
+    paid_total = owed_total = 0
+    for position, share in enumerate(users):
+        if not isinstance(share, dict):
+            raise ValueError(f"users[{position}] must be an object")
+        user_id = share.get("user_id")
+        if user_id is None:
+            name = share.get("name")
+            if not name:
+                raise ValueError(f"users[{position}] needs user_id or name")
+            if group_id is None:
+                raise ValueError("group_id is required to resolve participant names")
+            member = await client.afind_group_member(
+                params["group_id"], str(name), fuzzy=False
+            )
+            if member is None:
+                raise ValueError(f"Participant '{name}' is not in the group")
+            user_id = member.get("id")
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid user_id {user_id!r}") from None
+        paid = Money.parse(share.get("paid_share"), currency_code)
+        owed = Money.parse(share.get("owed_share"), currency_code)
+        if paid.cents < 0 or owed.cents < 0:
+            raise ValueError(f"users[{position}] shares must not be negative")
+        paid_total += paid.cents
+        owed_total += owed.cents
+        prefix = f"users__{position}__"
+        params[f"{prefix}user_id"] = user_id
+        params[f"{prefix}paid_share"] = str(paid)
+        params[f"{prefix}owed_share"] = str(owed)
+    for label, total in (("paid", paid_total), ("owed", owed_total)):
+        if total != cost.cents:
+            raise ValueError(
+                f"{label} shares add up to {format_cents(total, currency_code)}, "
+                f"not {cost}"
+            )
+    return params
+
+
+def expense_from_params(params: dict[str, Any]) -> Expense:
+    """Build the SDK `Expense` that ``createExpense`` takes from validated params.
+
+    ``users__<n>__*`` entries become `ExpenseUser` shares in order.  The
+    SDK consumes the object while sending it, so build one per request.
+    """
+    expense = Expense()
+    expense.setCost(params["cost"])
+    expense.setDescription(params["description"])
+    expense.setCurrencyCode(params["currency_code"])
+    for field, setter in (
+        ("group_id", expense.setGroupId),
+        ("date", expense.setDate),
+        ("details", expense.setDetails),
+        ("repeat_interval", expense.setRepeatInterval),
+        ("split_equally", expense.setSplitEqually),
+    ):
+        if params.get(field) is not None:
+            setter(params[field])
+    category = None
+    if params.get("category_id") is not None:
+        category = Category()
+        category.setId(params["category_id"])
+    expense.setCategory(category)
+    expense.setReceipt(None)
+
+    users = []
+    position = 0
+    while f"users__{position}__user_id" in params:
+        prefix = f"users__{position}__"
+        user = ExpenseUser()
+        user.setId(params[f"{prefix}user_id"])
+        user.setPaidShare(params[f"{prefix}paid_share"])
+        user.setOwedShare(params[f"{prefix}owed_share"])
+        users.append(user)
+        position += 1
+    expense.setUsers(users or None)
+    return expense
+
+
+async def _submit(client: SplitwiseClient, params: dict[str, Any]) -> Any:
+    """Create one expense and return its id.
+
+    Rate-limited calls are retried; a response without a created expense
+    raises `RuntimeError` carrying the errors Splitwise reported.
+    """
+    attempt = 0
+    while True:
+        try:
+            result = await client.acall_mapped_method(
+                const.METHOD_CREATE_EXPENSE, expense=expense_from_params(params)
+            )
+            break
+        except Exception as exc:
+            wait = retry_after_seconds(exc)
+            if wait is None or attempt >= const.BATCH_MAX_RETRIES:
+                raise
+            wait = max(wait, const.BATCH_RETRY_BASE_DELAY * 2**attempt)
+            attempt += 1
+            logger.info(f"Rate limited creating expense; retrying in {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    created = written_objects(result)
+    if created:
+        return created[0].get("id")
+    errors = result[1] if isinstance(result, list) and len(result) > 1 else None
+    raise RuntimeError(
+        json.dumps(errors, default=str) if errors else "No expense created"
+    )
+
+
+async def create_expenses(
+    client: SplitwiseClient,
+    expenses: list[dict[str, Any]],
+    concurrency: int = const.DEFAULT_BATCH_CONCURRENCY,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """Validate and create a batch of expenses.
+
+    Every item is validated before anything is submitted; invalid items
+    are reported and skipped.  Valid items are created by at most
+    ``concurrency`` workers.  Results keep the input order and give
+    each item's ``status`` (created, duplicate, invalid, failed or, for
+    ``dry_run``, valid), its expense ``id`` and any ``error``.
+    """
+    if len(expenses) > const.MAX_BATCH_EXPENSES:
+        raise ValueError(
+            f"At most {const.MAX_BATCH_EXPENSES} expenses can be created per batch"
+        )
+
+    results: list[dict[str, Any]] = []
+    pending: list[tuple[dict[str, Any], dict[str, Any]]] = []
+    occurrences: dict[str, int] = {}
+    for index, spec in enumerate(expenses):
+        key = None
+        if isinstance(spec, dict):
+            key = spec.get("idempotency_key")
+            if not key:
+                first = idempotency_key(spec)
+                occurrence = occurrences[first] = occurrences.get(first, -1) + 1
+                key = idempotency_key(spec, occurrence)
+        entry: dict[str, Any] = {"index": index, "idempotency_key": key}
+        results.append(entry)
+        try:
+            params = await validate_expense_spec(client, spec)
+        except ValueError as exc:
+            entry.update(status="invalid", error=str(exc))
+            continue
+        if dry_run:
+            entry.update(status="valid", params=params)
+        else:
+            pending.append((entry, params))
+
+    store: IdempotencyStore = client.idempotency
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def worker(entry: dict[str, Any], params: dict[str, Any]) -> None:
+        async with semaphore:
+            try:
+                expense_id, replayed = await store.run(
+                    entry["idempotency_key"], lambda: _submit(client, params)
+                )
+            except Exception as exc:
+                entry.update(status="failed", error=str(exc))
+                return
+        entry.update(status="duplicate" if replayed else "created", id=expense_id)
+
+    await asyncio.gather(*(worker(entry, params) for entry, params in pending))
+
+    counts: dict[str, int] = {}
+    for entry in results:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    return {"total": len(results), "counts": counts, "results": results}
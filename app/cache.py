@@ -0,0 +1,210 @@
+"""In-process response cache for read-only Splitwise calls.
+
+The cache is keyed by ``(method name, normalized kwargs)`` and bounded
+both by entry count and by total payload size.  Entries expire after a
+per-method TTL and the least recently used entries are evicted first
+once either bound is exceeded.  Values are stored as JSON strings so a
+cached response can never be mutated by a caller and its size is known
+exactly.
+
+Every method has a generation number that invalidation bumps.  A caller
+reads it with `ResponseCache.generation` before fetching and passes it
+to `ResponseCache.set`, so a response fetched before a write cannot be
+cached after the write dropped that method's entries.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    payload: str
+    size: int
+    expires_at: float
+
+
+def _encoded_size(payload: str) -> int:
+    # Size of the payload as UTF-8 bytes; ASCII text needs no encoding
+    return len(payload) if payload.isascii() else len(payload.encode())
+
+
+def normalize_kwargs(kwargs: dict[str, Any]) -> str:
+    """Return a stable string representation of call arguments."""
+    if not kwargs:
+        return ""
+    return json.dumps(kwargs, sort_keys=True, default=str, separators=(",", ":"))
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache for converted Splitwise responses.
+
+    Parameters
+    ----------
+    max_entries: int
+        Maximum number of cached responses.
+    max_bytes: int
+        Maximum combined size of all cached JSON payloads, in UTF-8 bytes.
+    clock: Callable[[], float]
+        Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits: dict[str, int] = defaultdict(int)
+        self._misses: dict[str, int] = defaultdict(int)
+        self._evictions = 0
+        self._invalidations = 0
+        self._generations: dict[str, int] = defaultdict(int)
+        self._stale_writes = 0
+
+    def get(self, method_name: str, kwargs: dict[str, Any]) -> tuple[bool, Any]:
+        """Look up a cached response.
+
+        Returns a ``(hit, value)`` tuple; ``value`` is a fresh copy of the
+        cached data and is ``None`` on a miss.
+        """
+        hit, payload = self.get_json(method_name, kwargs)
+        return hit, json.loads(payload) if hit else None
+
+    def get_json(
+        self, method_name: str, kwargs: dict[str, Any]
+    ) -> tuple[bool, str | None]:
+        """Look up a cached response as its stored JSON string."""
+        key = (method_name, normalize_kwargs(kwargs))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses[method_name] += 1
+                return False, None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self._misses[method_name] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits[method_name] += 1
+            return True, entry.payload
+
+    def generation(self, method_name: str) -> int:
+        """Return the invalidation generation of a method.
+
+        Read it before fetching a response and pass it to `set`.
+        """
+        with self._lock:
+            return self._generations[method_name]
+
+    def set(
+        self,
+        method_name: str,
+        kwargs: dict[str, Any],
+        value: Any,
+        ttl: float,
+        generation: int | None = None,
+    ) -> None:
+        """Store a response for ``ttl`` seconds.
+
+        With ``generation`` the response is dropped when the method was
+        invalidated since that generation was read.
+        """
+        if ttl > 0:
+            self.set_json(
+                method_name, kwargs, json.dumps(value, default=str), ttl, generation
+            )
+
+    def set_json(
+        self,
+        method_name: str,
+        kwargs: dict[str, Any],
+        payload: str,
+        ttl: float,
+        generation: int | None = None,
+    ) -> None:
+        """Store an already encoded JSON response for ``ttl`` seconds."""
+        if ttl <= 0:
+            return
+        size = _encoded_size(payload)
+        if size > self.max_bytes:
+            return
+        key = (method_name, normalize_kwargs(kwargs))
+        with self._lock:
+            if generation is not None and generation != self._generations[method_name]:
+                # Fetched before a write invalidated the method
+                self._stale_writes += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(payload, size, self._clock() + ttl)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate(self, *method_names: str) -> int:
+        """Drop every cached response for the given methods.
+
+        Returns the number of entries removed.
+        """
+        targets = set(method_names)
+        with self._lock:
+            for name in targets:
+                self._generations[name] += 1
+            keys = [key for key in self._entries if key[0] in targets]
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all cached responses (counters are preserved)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            methods = sorted(set(self._hits) | set(self._misses))
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "stale_writes": self._stale_writes,
+                "by_method": {
+                    name: {"hits": self._hits[name], "misses": self._misses[name]}
+                    for name in methods
+                },
+            }
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,330 @@
+"""Process-wide pool of Splitwise clients, one per tenant credential.
+
+FastMCP enters the server lifespan once per MCP session, so a client
+built there lives and dies with one session.  `ClientPool` keeps clients
+for the whole process instead, keyed by a hash of their credentials:
+sessions of the same account share one client (and with it the response
+cache, indexes, replica and rate budget), while different accounts never
+share anything.  The pool also owns the process-wide single-flight
+group, so identical reads from different sessions are coalesced.
+Clients are kept in LRU order; the least recently used is retired when
+the pool is full, and clients idle for longer than the idle TTL are
+retired by a background sweep.  Every request task that resolves a
+client holds a lease on it until the task finishes, and a retired
+client is closed only once its last lease is released.
+
+With multi-tenancy enabled (``SPLITWISE_MULTI_TENANT``) the credential
+comes from the ``X-Splitwise-Api-Key`` request header on streamable-http
+and is remembered for the rest of the MCP session.  Sessions without one
+are rejected, unless ``SPLITWISE_TENANT_ENV_FALLBACK`` lets them act for
+the account configured in the environment.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .shared_state import shared_cache_for
+from .singleflight import SingleFlight
+from .splitwise_client import SplitwiseClient
+from .utils import env_bool, env_float, env_int
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger("splitwise_mcp")
+
+Credentials = dict[str, str]
+
+
+def env_credentials() -> Credentials | None:
+    """Return the credentials configured in the environment, if any."""
+    api_key = os.environ.get(const.ENV_SPLITWISE_API_KEY)
+    if api_key:
+        return {"api_key": api_key}
+    consumer_key = os.environ.get(const.ENV_SPLITWISE_CONSUMER_KEY)
+    consumer_secret = os.environ.get(const.ENV_SPLITWISE_CONSUMER_SECRET)
+    if consumer_key and consumer_secret:
+        return {"consumer_key": consumer_key, "consumer_secret": consumer_secret}
+    return None
+
+
+def tenant_key(credentials: Credentials) -> str:
+    """Return a stable, non-reversible identifier for a credential."""
+    material = "\0".join(f"{k}={v}" for k, v in sorted(credentials.items()))
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+def _tenant_sync_path(tenant: str) -> str | None:
+    """Give each tenant its own replica file when replicas are files."""
+    path = os.environ.get(const.ENV_EXPENSE_SYNC_PATH, const.DEFAULT_EXPENSE_SYNC_PATH)
+    if path == const.DEFAULT_EXPENSE_SYNC_PATH:
+        return None
+    base = Path(path)
+    return str(base.with_name(f"{base.stem}-{tenant}{base.suffix}"))
+
+
+def build_client(credentials: Credentials, tenant: str) -> SplitwiseClient:
+    """Create a tenant's client and start its background maintenance."""
+    client = SplitwiseClient(
+        **credentials,
+        expense_sync_path=_tenant_sync_path(tenant),
+        shared=shared_cache_for(tenant),
+    )
+    # Build the group name index in the background
+    client.group_index.schedule_refresh(client)
+    if client.expense_sync is not None:
+        # Pull the expense history in the background and keep polling deltas
+        client.expense_sync.start()
+    return client
+
+
+class ClientPool:
+    """LRU of live clients keyed by tenant credential.
+
+    Parameters
+    ----------
+    default_credentials: dict
+        Credentials used by sessions that do not present their own.
+    allow_headers: bool
+        Accept per-session credentials from the request header.
+    env_fallback: bool
+        With ``allow_headers``, let sessions without a header use
+        ``default_credentials``; otherwise they are rejected.
+    max_clients: int
+        Live clients kept; the least recently used is closed beyond this.
+    idle_ttl: float
+        Seconds a client may go unused before it is closed.
+    factory: callable
+        ``factory(credentials, tenant)`` creating a client, for tests.
+    clock: callable
+        Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        default_credentials: Credentials | None = None,
+        allow_headers: bool = False,
+        env_fallback: bool = False,
+        max_clients: int = const.DEFAULT_MAX_TENANTS,
+        idle_ttl: float = const.DEFAULT_TENANT_IDLE_TTL,
+        factory: Callable[[Credentials, str], Any] = build_client,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.default_credentials = default_credentials
+        self.allow_headers = allow_headers
+        self.env_fallback = env_fallback
+        self.max_clients = max(1, max_clients)
+        self.idle_ttl = idle_ttl
+        self._factory = factory
+        self._clock = clock
+        self._clients: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._sessions: weakref.WeakKeyDictionary[Any, Credentials] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._closing: set[asyncio.Task[None]] = set()
+        # Request tasks holding each client, and the clients each task holds
+        self._leases: dict[Any, int] = {}
+        self._task_leases: weakref.WeakKeyDictionary[asyncio.Task[Any], set[int]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._released: dict[Any, asyncio.Event] = {}
+        # Shared by every session; keys include the client, so tenants
+        # never share results
+        self.singleflight = SingleFlight()
+        self._sweeper: asyncio.Task[None] | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._created = 0
+        self._hits = 0
+        self._evicted = 0
+
+    @classmethod
+    def from_env(cls) -> ClientPool:
+        """Build a pool from the environment configuration."""
+        return cls(
+            default_credentials=env_credentials(),
+            allow_headers=env_bool(const.ENV_MULTI_TENANT, False),
+            env_fallback=env_bool(const.ENV_TENANT_ENV_FALLBACK, False),
+            max_clients=env_int(const.ENV_MAX_TENANTS, const.DEFAULT_MAX_TENANTS),
+            idle_ttl=env_float(
+                const.ENV_TENANT_IDLE_TTL, const.DEFAULT_TENANT_IDLE_TTL
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @property
+    def fallback_credentials(self) -> Credentials | None:
+        """Credentials of sessions without their own, if they may have any."""
+        if self.allow_headers and not self.env_fallback:
+            return None
+        return self.default_credentials
+
+    # Lookup
+
+    def get(self, credentials: Credentials) -> Any:
+        """Return the live client for ``credentials``, creating it if needed."""
+        key = tenant_key(credentials)
+        entry = self._clients.get(key)
+        if entry is not None:
+            self._hits += 1
+            client = entry[0]
+        else:
+            client = self._factory(credentials, key)
+            self._created += 1
+            logger.info(f"CLIENT POOL: started client for tenant {key}")
+        self._clients[key] = (client, self._clock())
+        self._clients.move_to_end(key)
+        while len(self._clients) > self.max_clients:
+            old_key, (old, _) = self._clients.popitem(last=False)
+            self._retire(old_key, old, "pool full")
+        self.start()
+        return client
+
+    def client_for(self, session: Any, header_key: str | None = None) -> Any:
+        """Resolve the client of an MCP session and lease it to the request.
+
+        A credential in the request header wins and is remembered for the
+        session; later requests of that session may omit it.  Otherwise the
+        `fallback_credentials` are used.  The client stays leased until the
+        calling task finishes.
+        """
+        credentials: Credentials | None = None
+        if header_key and header_key.strip() and self.allow_headers:
+            credentials = {"api_key": header_key.strip()}
+            with suppress(TypeError):
+                self._sessions[session] = credentials
+        elif session is not None:
+            with suppress(TypeError):
+                credentials = self._sessions.get(session)
+        credentials = credentials or self.fallback_credentials
+        if credentials is None:
+            if self.allow_headers:
+                raise ValueError(
+                    f"No Splitwise credentials for this session: send your "
+                    f"API key in the {const.HEADER_SPLITWISE_API_KEY} header"
+                )
+            raise ValueError(
+                f"No Splitwise credentials for this session: set "
+                f"{const.ENV_SPLITWISE_API_KEY}"
+            )
+        client = self.get(credentials)
+        self._lease(client)
+        return client
+
+    # Leases
+
+    def _lease(self, client: Any) -> None:
+        task = asyncio.current_task()
+        if task is None:
+            return
+        held = self._task_leases.setdefault(task, set())
+        if id(client) in held:
+            return
+        held.add(id(client))
+        self._leases[client] = self._leases.get(client, 0) + 1
+        task.add_done_callback(lambda _task: self._release(client))
+
+    def _release(self, client: Any) -> None:
+        count = self._leases.get(client, 0) - 1
+        if count > 0:
+            self._leases[client] = count
+            return
+        self._leases.pop(client, None)
+        released = self._released.pop(client, None)
+        if released is not None:
+            released.set()
+
+    # Eviction
+
+    def _retire(self, key: str, client: Any, reason: str) -> None:
+        self._evicted += 1
+        logger.info(f"CLIENT POOL: closing client for tenant {key} ({reason})")
+        task = asyncio.get_running_loop().create_task(self._close_later(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_later(self, client: Any) -> None:
+        # Let requests already holding the client finish first
+        if self._leases.get(client):
+            released = self._released.setdefault(client, asyncio.Event())
+            await released.wait()
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.error(f"CLIENT POOL: closing client failed: {exc}")
+
+    def sweep(self) -> int:
+        """Close clients idle for longer than ``idle_ttl``; return the count."""
+        cutoff = self._clock() - self.idle_ttl
+        idle = [key for key, (_, used) in self._clients.items() if used < cutoff]
+        for key in idle:
+            client, _ = self._clients.pop(key)
+            self._retire(key, client, "idle")
+        return len(idle)
+
+    def start(self) -> None:
+        """Start the idle sweep on the running loop unless it is running."""
+        if self._sweeper is None or self._sweeper.done():
+            self.loop = asyncio.get_running_loop()
+            self._sweeper = self.loop.create_task(self._sweep_forever())
+
+    async def _sweep_forever(self) -> None:
+        interval = max(self.idle_ttl / 4, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    async def aclose(self) -> None:
+        """Stop sweeping and close every client now."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+        for task in list(self._closing):
+            task.cancel()
+        clients = [client for client, _ in self._clients.values()]
+        self._clients.clear()
+        for client in clients:
+            with suppress(Exception):
+                await client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        """Return tenant counts and pool counters."""
+        return {
+            "tenants": len(self._clients),
+            "max_tenants": self.max_clients,
+            "created": self._created,
+            "hits": self._hits,
+            "evicted": self._evicted,
+            "closing": len(self._closing),
+            "leases": sum(self._leases.values()),
+        }
+
+
+_shared: ClientPool | None = None
+
+
+def shared_pool() -> ClientPool:
+    """Return the process-wide pool, creating it on first use.
+
+    A pool is bound to the event loop that started it; a new loop (as in
+    tests) gets a fresh pool.
+    """
+    global _shared
+    loop = asyncio.get_running_loop()
+    if _shared is None or _shared.loop not in (None, loop):
+        _shared = ClientPool.from_env()
+    return _shared
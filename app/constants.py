@@ -19,6 +19,69 @@ ENV_SPLITWISE_CONSUMER_SECRET = "SPLITWISE_CONSUMER_SECRET"
 ENV_MCP_TRANSPORT = "MCP_TRANSPORT"
 ENV_MCP_HOST = "MCP_HOST"
 ENV_MCP_PORT = "MCP_PORT"
+# Multi-worker mode (streamable-http): worker i listens on MCP_PORT + i
+ENV_MCP_WORKERS = "MCP_WORKERS"
+ENV_MCP_WORKER_OFFSET = "MCP_WORKER_OFFSET"
+# Header carrying the streamable-http session ID
+HEADER_MCP_SESSION_ID = "mcp-session-id"
+
+# Response Cache Configuration
+ENV_CACHE_ENABLED = "SPLITWISE_CACHE_ENABLED"
+ENV_CACHE_MAX_ENTRIES = "SPLITWISE_CACHE_MAX_ENTRIES"
+ENV_CACHE_MAX_BYTES = "SPLITWISE_CACHE_MAX_BYTES"
+# Cache shared by server processes, e.g. redis://localhost:6379/0
+ENV_SHARED_STATE_URL = "SPLITWISE_SHARED_STATE_URL"
+
+# Async HTTP Transport Configuration
+ENV_ASYNC_HTTP_ENABLED = "SPLITWISE_ASYNC_HTTP"
+ENV_SPLITWISE_BASE_URL = "SPLITWISE_BASE_URL"
+ENV_HTTP_MAX_CONNECTIONS = "SPLITWISE_HTTP_MAX_CONNECTIONS"
+ENV_HTTP_MAX_KEEPALIVE = "SPLITWISE_HTTP_MAX_KEEPALIVE"
+ENV_HTTP2_ENABLED = "SPLITWISE_HTTP2"
+
+# Multi-Tenant Configuration
+ENV_MULTI_TENANT = "SPLITWISE_MULTI_TENANT"
+ENV_MAX_TENANTS = "SPLITWISE_MAX_TENANTS"
+ENV_TENANT_IDLE_TTL = "SPLITWISE_TENANT_IDLE_TTL"
+# Let multi-tenant sessions without the header act for the env account
+ENV_TENANT_ENV_FALLBACK = "SPLITWISE_TENANT_ENV_FALLBACK"
+# Request header carrying a session's Splitwise API key (streamable-http)
+HEADER_SPLITWISE_API_KEY = "X-Splitwise-Api-Key"
+
+# Upstream Rate Limit Configuration
+ENV_RATE_LIMIT = "SPLITWISE_RATE_LIMIT"
+ENV_RATE_LIMIT_BURST = "SPLITWISE_RATE_LIMIT_BURST"
+
+# SDK Executor Configuration
+ENV_SDK_MAX_WORKERS = "SPLITWISE_SDK_MAX_WORKERS"
+ENV_SDK_MAX_QUEUE = "SPLITWISE_SDK_MAX_QUEUE"
+
+# Search Configuration
+ENV_SEARCH_SOURCE_TIMEOUT = "SPLITWISE_SEARCH_SOURCE_TIMEOUT"
+ENV_SEARCH_INDEX_ENABLED = "SPLITWISE_SEARCH_INDEX"
+ENV_SEARCH_INDEX_MAX_AGE = "SPLITWISE_SEARCH_INDEX_MAX_AGE"
+
+# Expense Replica Configuration
+ENV_EXPENSE_SYNC_ENABLED = "SPLITWISE_EXPENSE_SYNC"
+ENV_EXPENSE_SYNC_PATH = "SPLITWISE_EXPENSE_SYNC_PATH"
+ENV_EXPENSE_SYNC_MAX_STALENESS = "SPLITWISE_EXPENSE_SYNC_MAX_STALENESS"
+
+# Group Name Index Configuration
+ENV_GROUP_INDEX_MAX_AGE = "SPLITWISE_GROUP_INDEX_MAX_AGE"
+
+# Currency Conversion Configuration
+ENV_EXCHANGE_RATE_TTL = "SPLITWISE_EXCHANGE_RATE_TTL"
+ENV_EXCHANGE_RATES = "SPLITWISE_EXCHANGE_RATES"
+ENV_EXCHANGE_RATES_URL = "SPLITWISE_EXCHANGE_RATES_URL"
+
+# Batch Write Configuration
+ENV_BATCH_CONCURRENCY = "SPLITWISE_BATCH_CONCURRENCY"
+# Directory the import_statement tool may read statement files from
+ENV_IMPORT_DIR = "SPLITWISE_IMPORT_DIR"
+
+# Event Loop Monitor Configuration (debug and benchmark runs)
+ENV_LOOP_MONITOR = "SPLITWISE_LOOP_MONITOR"
+ENV_LOOP_BLOCK_THRESHOLD = "SPLITWISE_LOOP_BLOCK_THRESHOLD"
 
 # =============================================================================
 # API Method Names (snake_case - used in MCP layer)
@@ -54,6 +117,24 @@ METHOD_UPDATE_USER = "update_user"
 METHOD_CREATE_COMMENT = "create_comment"
 METHOD_DELETE_COMMENT = "delete_comment"
 
+# Methods without side effects (safe to cache, coalesce and retry)
+READ_METHODS = frozenset(
+    {
+        METHOD_GET_CURRENT_USER,
+        METHOD_LIST_GROUPS,
+        METHOD_GET_GROUP,
+        METHOD_LIST_EXPENSES,
+        METHOD_GET_EXPENSE,
+        METHOD_LIST_FRIENDS,
+        METHOD_GET_FRIEND,
+        METHOD_LIST_CATEGORIES,
+        METHOD_LIST_CURRENCIES,
+        METHOD_GET_EXCHANGE_RATES,
+        METHOD_LIST_NOTIFICATIONS,
+        METHOD_GET_COMMENTS,
+    }
+)
+
 # =============================================================================
 # Log Operation Types
 # =============================================================================
@@ -79,6 +160,7 @@ RESOURCE_CATEGORIES = f"{URI_SCHEME_SPLITWISE}://categories"
 RESOURCE_CURRENCIES = f"{URI_SCHEME_SPLITWISE}://currencies"
 RESOURCE_NOTIFICATIONS = f"{URI_SCHEME_SPLITWISE}://notifications"
 RESOURCE_COMMENTS_BY_EXPENSE = f"{URI_SCHEME_SPLITWISE}://comments/{{expense_id}}"
+RESOURCE_STATS = f"{URI_SCHEME_SPLITWISE}://stats"
 
 # =============================================================================
 # Default Values
@@ -88,3 +170,109 @@ RESOURCE_COMMENTS_BY_EXPENSE = f"{URI_SCHEME_SPLITWISE}://comments/{{expense_id}
 DEFAULT_MCP_TRANSPORT = "stdio"
 DEFAULT_MCP_HOST = "0.0.0.0"
 DEFAULT_MCP_PORT = 8000
+DEFAULT_MCP_WORKERS = 1
+
+# Response cache defaults
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Async HTTP transport defaults
+DEFAULT_SPLITWISE_BASE_URL = "https://secure.splitwise.com/api/v3.0/"
+DEFAULT_HTTP_MAX_CONNECTIONS = 20
+DEFAULT_HTTP_MAX_KEEPALIVE = 10
+# Responses at least this large (bytes) or long (items) are parsed and
+# converted in a worker thread instead of on the event loop
+OFFLOAD_MIN_BYTES = 64 * 1024
+OFFLOAD_MIN_ITEMS = 50
+
+# Shared state defaults (cache and coalescing across server processes)
+SHARED_STATE_PREFIX = "splitwise-mcp"
+# A process fetching a read for everyone holds its lock at most this long
+# (seconds); other processes poll for the result at this interval
+SHARED_LOCK_TTL = 30.0
+SHARED_LOCK_POLL_INTERVAL = 0.05
+
+# Client pool defaults (one client per tenant credential)
+DEFAULT_MAX_TENANTS = 256
+DEFAULT_TENANT_IDLE_TTL = 900.0
+
+# Upstream rate limit defaults (requests per second per credential)
+DEFAULT_RATE_LIMIT = 10.0
+DEFAULT_RATE_LIMIT_BURST = 20
+# Retries of idempotent reads after a 429 or a transient server error,
+# with jittered exponential backoff between these bounds (seconds)
+RATE_LIMIT_MAX_RETRIES = 4
+RATE_LIMIT_BACKOFF_BASE = 0.5
+RATE_LIMIT_BACKOFF_MAX = 30.0
+
+# SDK executor defaults (blocking Splitwise SDK calls)
+DEFAULT_SDK_MAX_WORKERS = 8
+DEFAULT_SDK_MAX_QUEUE = 64
+# Recent queue waits kept for the p50/p99 stats
+EXECUTOR_WAIT_SAMPLES = 1024
+# Assumed call duration before any call has completed, and the smallest
+# retry-after hint given to rejected callers (seconds)
+EXECUTOR_DEFAULT_SERVICE_TIME = 0.5
+EXECUTOR_MIN_RETRY_AFTER = 0.1
+
+# Expense pagination defaults (SplitwiseClient.iter_expenses)
+DEFAULT_EXPENSE_PAGE_SIZE = 100
+MIN_EXPENSE_PAGE_SIZE = 20
+MAX_EXPENSE_PAGE_SIZE = 1000
+# Page size is tuned so one page takes about this long to fetch
+EXPENSE_PAGE_TARGET_SECONDS = 1.0
+
+# Search defaults
+SEARCH_MAX_RESULTS = 10
+DEFAULT_SEARCH_SOURCE_TIMEOUT = 5.0
+DEFAULT_SEARCH_INDEX_MAX_AGE = 300.0
+DEFAULT_SEARCH_INDEX_PAGE_SIZE = 500
+
+# Expense replica defaults
+DEFAULT_EXPENSE_SYNC_PATH = ":memory:"
+DEFAULT_EXPENSE_SYNC_MAX_STALENESS = 60.0
+DEFAULT_EXPENSE_SYNC_PAGE_SIZE = 500
+
+# Group name index defaults
+DEFAULT_GROUP_INDEX_MAX_AGE = 300.0
+# A name that misses triggers an immediate refresh at most this often
+GROUP_INDEX_MISS_REFRESH_SECONDS = 10.0
+# Minimum difflib similarity ratio for a fuzzy group name match
+GROUP_NAME_FUZZY_CUTOFF = 0.8
+
+# Period report defaults (generate_period_report)
+REPORT_GRANULARITIES = ("day", "week", "month", "quarter")
+DEFAULT_REPORT_GRANULARITY = "month"
+MAX_REPORT_BUCKETS = 400
+
+# Settle-up plans: groups with at most this many non-zero balances per
+# currency are solved exactly, larger ones greedily
+EXACT_SETTLEMENT_MAX_MEMBERS = 12
+
+# Currency conversion defaults
+DEFAULT_EXCHANGE_RATE_TTL = 3600.0
+# Base assumed for rate tables that do not name one
+DEFAULT_EXCHANGE_RATE_BASE = "USD"
+# Seconds allowed for fetching SPLITWISE_EXCHANGE_RATES_URL
+EXCHANGE_RATES_TIMEOUT = 10.0
+
+# Batch expense creation (create_expenses_batch)
+MAX_BATCH_EXPENSES = 1000
+DEFAULT_BATCH_CONCURRENCY = 4
+BATCH_MAX_RETRIES = 3
+BATCH_RETRY_BASE_DELAY = 1.0
+# Outcomes of idempotent writes are remembered this long
+DEFAULT_IDEMPOTENCY_TTL = 86400.0
+MAX_IDEMPOTENCY_KEYS = 10000
+
+# Statement import (import_statement)
+DEFAULT_IMPORT_BATCH_SIZE = 50
+MAX_IMPORT_ERRORS = 50
+IMPORT_READ_CHUNK = 64 * 1024
+
+# Event loop monitor: stalls longer than this many seconds are reported
+DEFAULT_LOOP_BLOCK_THRESHOLD = 0.1
+
+# Group member lookup defaults
+MEMBER_NAME_FUZZY_CUTOFF = 0.75
+MAX_MEMBER_INDEXES = 256
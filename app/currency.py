@@ -0,0 +1,293 @@
+"""Exchange rate tables and conversion to a reporting currency.
+
+A `RateTable` holds the units of each currency per unit of a base
+currency, as exact `Decimal` values.  Amounts are converted in integer
+cents with exact rational arithmetic and rounded half away from zero,
+so a report converts every row once without float drift.
+`RateTable.convert_column` converts a whole column of amounts in one
+pass, computing each currency's factor once per batch rather than per
+row.  `CurrencyEngine` caches the parsed table for a TTL and coalesces
+concurrent refreshes, so repeated reports in one session reuse the same
+rates.
+
+Splitwise has no exchange-rate API, so rates come either from a fixed
+table (``SPLITWISE_EXCHANGE_RATES``) or from a JSON endpoint such as
+``https://open.er-api.com/v6/latest/USD`` (``SPLITWISE_EXCHANGE_RATES_URL``).
+Converting without either configured raises `ExchangeRatesUnavailableError`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from array import array
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from . import constants as const
+from .money import Money, minor_exponent, rescale_cents
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+logger = logging.getLogger("splitwise_mcp")
+
+
+class ExchangeRatesUnavailableError(RuntimeError):
+    """Raised when a conversion needs rates but no rate source is configured."""
+
+
+def normalize_code(code: Any) -> str:
+    """Return an upper-case currency code, rejecting empty values."""
+    if not isinstance(code, str) or not code.strip():
+        raise ValueError(f"Invalid currency code {code!r}")
+    return code.strip().upper()
+
+
+def _rate(value: Any) -> Decimal:
+    try:
+        rate = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError) as exc:
+        raise ValueError(f"Invalid exchange rate {value!r}") from exc
+    if not rate.is_finite() or rate <= 0:
+        raise ValueError(f"Invalid exchange rate {value!r}")
+    return rate
+
+
+def _scale(cents: int, factor: Fraction) -> int:
+    """Multiply cents by an exact factor, rounding half away from zero."""
+    scaled = abs(cents) * factor.numerator
+    rounded = (2 * scaled + factor.denominator) // (2 * factor.denominator)
+    return -rounded if cents < 0 else rounded
+
+
+class RateTable:
+    """Exchange rates relative to one base currency.
+
+    Parameters
+    ----------
+    base: str
+        The currency the rates are quoted against; its rate is 1.
+    rates: dict
+        Units of each currency per unit of ``base``.
+    fetched_at: float
+        Clock reading when the rates were loaded.
+    """
+
+    def __init__(
+        self, base: str, rates: dict[str, Decimal], fetched_at: float = 0.0
+    ) -> None:
+        self.base = normalize_code(base)
+        self.rates = {normalize_code(code): _rate(rate) for code, rate in rates.items()}
+        self.rates[self.base] = Decimal(1)
+        self.fetched_at = fetched_at
+
+    def __contains__(self, code: object) -> bool:
+        return isinstance(code, str) and code.strip().upper() in self.rates
+
+    def factor(self, source: str, target: str) -> Fraction:
+        """Return the exact multiplier taking ``source`` minor units to ``target``'s.
+
+        The factor includes the difference in minor-unit digits (JPY has
+        none, KWD three; see `app.money.minor_exponent`).
+        """
+        source, target = normalize_code(source), normalize_code(target)
+        if source == target:
+            return Fraction(1)
+        for code in (source, target):
+            if code not in self.rates:
+                raise ValueError(f"No exchange rate for {code}")
+        digits = minor_exponent(target) - minor_exponent(source)
+        return (
+            Fraction(self.rates[target])
+            / Fraction(self.rates[source])
+            * Fraction(10) ** digits
+        )
+
+    def convert_cents(self, cents: int, source: str, target: str) -> int:
+        """Convert one amount in cents from ``source`` to ``target``."""
+        return _scale(cents, self.factor(source, target))
+
+    def convert(self, money: Money, target: str) -> Money:
+        """Convert a `Money` amount to ``target``; amounts without a currency keep their value."""
+        target = normalize_code(target)
+        if money.currency is None:
+            return Money(rescale_cents(money.cents, None, target), target)
+        return Money(self.convert_cents(money.cents, money.currency, target), target)
+
+    def convert_column(
+        self,
+        cents: Iterable[int],
+        codes: Iterable[int],
+        labels: list[str | None],
+        target: str,
+    ) -> array:
+        """Convert a column of cents to ``target`` in one pass.
+
+        ``codes`` gives each row's index into ``labels``, the currency
+        codes of the batch; rows whose label is None are taken to be in
+        ``target`` already.  Each currency's factor is computed once.
+        """
+        factors = [
+            Fraction(1) if label is None else self.factor(label, target)
+            for label in labels
+        ]
+        if all(factor == 1 for factor in factors):
+            return array("q", cents)
+        return array(
+            "q",
+            (
+                cents_value
+                if factors[code] == 1
+                else _scale(cents_value, factors[code])
+                for cents_value, code in zip(cents, codes, strict=True)
+            ),
+        )
+
+
+def parse_rates(
+    payload: Any, default_base: str = const.DEFAULT_EXCHANGE_RATE_BASE
+) -> tuple[str, dict[str, Decimal]]:
+    """Return ``(base, rates)`` from an exchange-rate response.
+
+    Accepts ``{"base": ..., "rates": {...}}`` (``base_code`` and
+    ``base_currency`` also name the base), a plain ``{code: rate}``
+    mapping, or a list of ``{"currency_code", "rate"}`` records (also
+    under ``"rates"``).  Invalid entries raise `ValueError`.
+    """
+    base = default_base
+    if isinstance(payload, dict) and "rates" in payload:
+        base = (
+            payload.get("base")
+            or payload.get("base_code")
+            or payload.get("base_currency")
+            or base
+        )
+        payload = payload["rates"]
+    rates: dict[str, Decimal] = {}
+    if isinstance(payload, dict):
+        for code, rate in payload.items():
+            rates[normalize_code(code)] = _rate(rate)
+    elif isinstance(payload, list):
+        for record in payload:
+            if not isinstance(record, dict):
+                raise ValueError(f"Invalid exchange rate record {record!r}")
+            code = record.get("currency_code") or record.get("code")
+            rates[normalize_code(code)] = _rate(record.get("rate"))
+    else:
+        raise ValueError("Exchange rates must be a mapping or a list of records")
+    return normalize_code(base), rates
+
+
+def parse_static_rates(value: str | None) -> RateTable | None:
+    """Parse a JSON rate table from configuration, or return None.
+
+    Invalid tables are logged and ignored so rates are fetched instead.
+    """
+    if not value:
+        return None
+    try:
+        base, rates = parse_rates(json.loads(value))
+    except (ValueError, TypeError) as exc:
+        logger.error(f"Ignoring invalid {const.ENV_EXCHANGE_RATES}: {exc}")
+        return None
+    return RateTable(base, rates)
+
+
+class CurrencyEngine:
+    """TTL cache of the exchange rate table.
+
+    Parameters
+    ----------
+    ttl: float
+        Seconds a fetched table is reused before it is fetched again.
+    static_rates: RateTable
+        A fixed table to use instead of fetching; it never expires.
+    url: str
+        JSON endpoint the table is fetched from (see `parse_rates` for
+        the accepted formats).
+    clock: callable
+        Monotonic time source, injectable for tests.
+    transport: httpx.AsyncBaseTransport
+        Transport for the rate requests, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        ttl: float = const.DEFAULT_EXCHANGE_RATE_TTL,
+        static_rates: RateTable | None = None,
+        url: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.url = url
+        self._clock = clock
+        self._transport = transport
+        self._static = static_rates
+        self._table: RateTable | None = None
+        self._lock = asyncio.Lock()
+        self._hits = 0
+        self._fetches = 0
+
+    def fresh(self) -> RateTable | None:
+        """Return the cached table if it has not expired."""
+        if self._static is not None:
+            return self._static
+        table = self._table
+        if table is not None and self._clock() - table.fetched_at < self.ttl:
+            return table
+        return None
+
+    async def rates(self) -> RateTable:
+        """Return the rate table, fetching it from ``url`` if expired.
+
+        Concurrent callers share a single fetch.  Raises
+        `ExchangeRatesUnavailableError` when there is neither a static table
+        nor a URL.
+        """
+        table = self.fresh()
+        if table is not None:
+            self._hits += 1
+            return table
+        async with self._lock:
+            table = self.fresh()
+            if table is not None:
+                self._hits += 1
+                return table
+            if not self.url:
+                raise ExchangeRatesUnavailableError(
+                    f"Splitwise does not provide exchange rates; set "
+                    f"{const.ENV_EXCHANGE_RATES} to a fixed table or "
+                    f"{const.ENV_EXCHANGE_RATES_URL} to a rates endpoint to "
+                    f"convert between currencies"
+                )
+            async with httpx.AsyncClient(
+                timeout=const.EXCHANGE_RATES_TIMEOUT, transport=self._transport
+            ) as http:
+                response = await http.get(self.url)
+                response.raise_for_status()
+            base, rates = parse_rates(response.json())
+            self._table = RateTable(base, rates, fetched_at=self._clock())
+            self._fetches += 1
+            logger.info(f"Loaded {len(rates)} exchange rates against {base}")
+            return self._table
+
+    def invalidate(self) -> None:
+        """Drop the cached table so the next call fetches again."""
+        self._table = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return table size and hit/fetch counters."""
+        table = self._static or self._table
+        return {
+            "static": self._static is not None,
+            "currencies": len(table.rates) if table else 0,
+            "hits": self._hits,
+            "fetches": self._fetches,
+        }
@@ -8,31 +8,34 @@ methods on the provided client to interact with the Splitwise API directly.
 
 from __future__ import annotations
 
-from collections import defaultdict
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any
 
-from dateutil import parser as date_parser  # type: ignore
-
-from .utils import month_range
+from . import constants as const
+from .aggregation import ExpenseColumns, bucket_label, epoch_day, is_spending
+from .money import from_cents
+from .utils import month_range, parse_timestamp, period_range
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from .splitwise_client import SplitwiseClient
 
 
-async def expenses_by_month(
+async def iter_expenses_by_month(
     client: SplitwiseClient, group_name: str, month: str
-) -> list[dict[str, Any]]:
-    """Return expenses from a group for the specified month (YYYY-MM).
-
-    This helper does not call the Splitwise API directly - it reads
-    from the cached `list_expenses` collection.  It attempts to
-    normalise dates using `dateutil.parser.parse`.  Expenses whose
-    date falls within the month and whose group matches the given
-    name are returned.
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield expenses from a group for the specified month (YYYY-MM).
+
+    Expenses are streamed page by page through `SplitwiseClient.iter_expenses`
+    so whole months are covered without holding the listing in memory.
+    Dates are normalised to naive UTC with `utils.parse_timestamp`;
+    expenses whose date falls within the month and whose group matches
+    the given name are yielded.
     """
     start, end = month_range(month)
-    # Determine group ID by name via Splitwise
-    group = client.get_group_by_name(group_name)
+    # Determine group ID by name via the group index
+    group = await client.aget_group_by_name(group_name)
     if not group:
         raise ValueError(f"Group '{group_name}' not found")
 
@@ -47,20 +50,12 @@ async def expenses_by_month(
     if group_id is None:
         raise ValueError(f"Group '{group_name}' does not have an ID")
 
-    # Fetch expenses from Splitwise API for the specified group and date range
-    expenses = client.call_mapped_method(
-        "list_expenses",
+    # Stream expenses from Splitwise API for the specified group and date range
+    async for exp in client.iter_expenses(
         group_id=group_id,
         dated_after=start.isoformat(),
         dated_before=end.isoformat(),
-    )
-
-    # Convert SDK objects to dictionaries
-    expenses_data = client.convert(expenses)
-
-    # Filter and validate expenses
-    results: list[dict[str, Any]] = []
-    for exp in expenses_data:
+    ):
         try:
             if exp.get("group_id") != group_id:
                 continue
@@ -70,65 +65,167 @@ async def expenses_by_month(
             )
             if not date_str:
                 continue
-            date_obj = date_parser.parse(date_str)
-            # Convert to naive datetime for comparison if timezone-aware
-            if date_obj.tzinfo is not None:
-                date_obj = date_obj.replace(tzinfo=None)
-            if start <= date_obj < end:
-                results.append(exp)
+            date_obj = parse_timestamp(date_str)
+            if date_obj is not None and start <= date_obj < end:
+                yield exp
         except Exception:
             continue
-    return results
 
 
-async def monthly_report(
+async def expenses_by_month(
     client: SplitwiseClient, group_name: str, month: str
+) -> list[dict[str, Any]]:
+    """Return expenses from a group for the specified month (YYYY-MM)."""
+    return [exp async for exp in iter_expenses_by_month(client, group_name, month)]
+
+
+async def _in_currency(
+    client: SplitwiseClient, columns: ExpenseColumns, currency: str | None
+) -> tuple[ExpenseColumns, str | None]:
+    """Convert columns to ``currency`` and return them with their currency.
+
+    Without a target the columns are returned as they are, labelled with
+    their currency when every expense shares one.  Rates come from the
+    client's cached rate table and are only loaded when a conversion is
+    actually needed.
+    """
+    present = columns.currencies()
+    if currency is None:
+        return columns, present[0] if len(present) == 1 else None
+    target = currency.strip().upper()
+    if any(code != target for code in present):
+        rates = await client.aexchange_rates()
+        columns = columns.converted(rates, target)
+    return columns, target
+
+
+async def monthly_report(
+    client: SplitwiseClient,
+    group_name: str,
+    month: str,
+    currency: str | None = None,
 ) -> dict[str, Any]:
     """Generate a simple report of expenses by category for a month.
 
-    This report fetches expenses from the Splitwise API, groups them
-    by their `category_id` (and optionally `category_name`), sums
-    their costs and returns a summary. It also emits rudimentary
+    This report streams expenses from the Splitwise API into columnar
+    arrays (see :mod:`app.aggregation`), groups them by category name
+    (falling back to `category_id`), sums their costs in fixed-point cents
+    and returns a summary.  Deleted expenses and payments between members
+    are left out, as in `period_report`. It also emits rudimentary
     recommendations, for example highlighting categories with
-    unusually high spend.
+    unusually high spend.  Given a ``currency`` code, amounts in other
+    currencies are converted to it first (see `SplitwiseClient.aexchange_rates`).
     """
-    expenses = await expenses_by_month(client, group_name, month)
-    if not expenses:
+    columns = ExpenseColumns()
+    async for exp in iter_expenses_by_month(client, group_name, month):
+        if is_spending(exp):
+            columns.append(exp)
+    if not len(columns):
         return {
             "summary": {},
             "total": 0,
+            "currency": currency.strip().upper() if currency else None,
             "recommendations": ["No expenses found for the given group and month."],
         }
-    category_totals: dict[str, float] = defaultdict(float)
-    total_cost = 0.0
-    for exp in expenses:
-        # Cost may be string; convert to float if possible
-        cost_str = exp.get("cost") or exp.get("amount")
-        try:
-            cost = float(cost_str) if cost_str is not None else 0.0
-        except Exception:
-            cost = 0.0
-        total_cost += cost
-        # Category: prefer nested object names but fall back to id
-        cat_name = None
-        cat = exp.get("category") or exp.get("category_id")
-        if isinstance(cat, dict):
-            cat_name = cat.get("name") or cat.get("name_en")
-        elif isinstance(cat, str):
-            cat_name = cat
-        elif cat is not None:
-            cat_name = str(cat)
-        cat_name = cat_name or "Unknown"
-        category_totals[cat_name] += cost
+    columns, currency = await _in_currency(client, columns, currency)
     # Build recommendations: mark categories exceeding 50% of total
     recommendations: list[str] = []
-    for cat_name, cost in category_totals.items():
-        if total_cost > 0 and cost / total_cost > 0.5:
+    for cat_name, share in columns.category_shares().items():
+        if share > 0.5:
             recommendations.append(
                 f"Expenses in category '{cat_name}' exceed 50% of total amount. Consider reducing spending in this area."
             )
     return {
-        "summary": category_totals,
-        "total": total_cost,
+        "summary": {
+            cat_name: from_cents(cents, currency)
+            for cat_name, cents in columns.category_totals().items()
+        },
+        "total": from_cents(columns.total(), currency),
+        "currency": currency,
         "recommendations": recommendations,
     }
+
+
+async def period_report(
+    client: SplitwiseClient,
+    start: str,
+    end: str,
+    granularity: str = const.DEFAULT_REPORT_GRANULARITY,
+    group_name: str | None = None,
+    currency: str | None = None,
+) -> dict[str, Any]:
+    """Generate a time-series expense report over a date range.
+
+    ``start`` and ``end`` are inclusive ``YYYY-MM-DD`` dates (or ``YYYY-MM``
+    months).  The range is fetched once, streamed through
+    `SplitwiseClient.iter_expenses` into columnar arrays (see
+    :mod:`app.aggregation`) and bucketed by ``granularity`` (day, week,
+    month or quarter) in a single pass.  Deleted expenses and payments
+    between members are left out.  Series are aligned with ``buckets`` and
+    given per category and per member.  Given a ``currency`` code, every
+    amount is converted to it with one batch conversion per column.
+    """
+    if granularity not in const.REPORT_GRANULARITIES:
+        raise ValueError(
+            f"Granularity must be one of {', '.join(const.REPORT_GRANULARITIES)}"
+        )
+    first, last = period_range(start, end)
+    start_day = epoch_day(first.isoformat())
+    end_day = epoch_day(last.isoformat()) + 1
+    buckets = len({bucket_label(day, granularity) for day in range(start_day, end_day)})
+    if buckets > const.MAX_REPORT_BUCKETS:
+        raise ValueError(
+            f"Range spans {buckets} {granularity} buckets; the maximum is "
+            f"{const.MAX_REPORT_BUCKETS}. Use a coarser granularity."
+        )
+
+    filters: dict[str, Any] = {
+        "dated_after": first.isoformat(),
+        "dated_before": (last + timedelta(days=1)).isoformat(),
+    }
+    if group_name is not None:
+        group = await client.aget_group_by_name(group_name)
+        if not group:
+            raise ValueError(f"Group '{group_name}' not found")
+        filters["group_id"] = group["id"]
+
+    columns = ExpenseColumns()
+    async for exp in client.iter_expenses(**filters):
+        if not is_spending(exp):
+            continue
+        if "group_id" in filters and exp.get("group_id") != filters["group_id"]:
+            continue
+        columns.append(exp)
+
+    columns, currency = await _in_currency(client, columns, currency)
+    series = columns.timeseries(start_day, end_day, granularity)
+    totals = series["totals"]
+
+    def amounts(values: list[int]) -> list[float]:
+        return [from_cents(value, currency) for value in values]
+
+    return {
+        "group": group_name,
+        "start": first.isoformat(),
+        "end": last.isoformat(),
+        "granularity": granularity,
+        "currency": currency,
+        "buckets": series["buckets"],
+        "total": from_cents(sum(totals), currency),
+        "count": sum(series["counts"]),
+        "totals": amounts(totals),
+        "counts": series["counts"],
+        "categories": {
+            label: amounts(values) for label, values in series["categories"].items()
+        },
+        "members": {
+            str(user_id): {
+                "name": columns.member_names.get(user_id),
+                "paid": amounts(kinds["paid"]),
+                "owed": amounts(kinds["owed"]),
+                "paid_total": from_cents(sum(kinds["paid"]), currency),
+                "owed_total": from_cents(sum(kinds["owed"]), currency),
+            }
+            for user_id, kinds in series["members"].items()
+        },
+    }
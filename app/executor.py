@@ -0,0 +1,186 @@
+"""Bounded worker pool for blocking Splitwise SDK calls.
+
+The SDK is synchronous, so its calls run in threads.  `asyncio.to_thread`
+would queue them on the loop's shared default executor without limit: a
+burst of slow calls piles up and every caller waits, eventually timing
+out deep inside the SDK.  `BoundedExecutor` gives SDK calls their own
+pool with a fixed number of workers and a maximum queue depth.  When
+both are full a call is rejected at once with `ExecutorSaturatedError`,
+whose ``retry_after`` estimates when a slot frees up, instead of joining
+the queue.  Each call's queue wait and run time are measured.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from . import constants as const
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+T = TypeVar("T")
+
+logger = logging.getLogger("splitwise_mcp")
+
+# Weight of the newest call in the moving average of run times
+_SERVICE_TIME_SMOOTHING = 0.2
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when every worker is busy and the queue is full.
+
+    Carries ``http_status`` 429 and a ``Retry-After`` header like a
+    rate-limited Splitwise response, so retry logic treats both alike.
+    """
+
+    http_status = 429
+
+    def __init__(self, queued: int, retry_after: float) -> None:
+        super().__init__(
+            f"Splitwise call queue is full ({queued} calls waiting); "
+            f"retry after {retry_after:.1f}s"
+        )
+        self.retry_after = retry_after
+        self.http_headers = {"Retry-After": f"{retry_after:.1f}"}
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded queue and fail-fast admission.
+
+    Parameters
+    ----------
+    max_workers: int
+        Number of calls running at the same time.
+    max_queue: int
+        Number of admitted calls allowed to wait for a worker; further
+        calls raise `ExecutorSaturatedError`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = const.DEFAULT_SDK_MAX_WORKERS,
+        max_queue: int = const.DEFAULT_SDK_MAX_QUEUE,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="splitwise-sdk"
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._service_time: float | None = None
+        self._waits: deque[float] = deque(maxlen=const.EXECUTOR_WAIT_SAMPLES)
+
+    @property
+    def queued(self) -> int:
+        """Number of admitted calls still waiting for a worker."""
+        return self._admitted - self._running
+
+    def retry_after(self) -> float:
+        """Estimate the seconds until a queue slot frees up."""
+        service = self._service_time or const.EXECUTOR_DEFAULT_SERVICE_TIME
+        # The queue drains max_workers calls per service time
+        waves = self.queued // self.max_workers + 1
+        return max(const.EXECUTOR_MIN_RETRY_AFTER, round(service * waves, 1))
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(self.queued, self.retry_after())
+            self._admitted += 1
+
+    def _release(self, future: Future[Any]) -> None:
+        # Calls that ran release their slot themselves
+        if future.cancelled():
+            with self._lock:
+                self._admitted -= 1
+
+    async def run(self, fn: Callable[[], T], label: str = "call") -> T:
+        """Run ``fn`` in a worker thread, or raise `ExecutorSaturatedError`.
+
+        Context variables are propagated like `asyncio.to_thread`.
+        Cancelling the caller cancels a call that has not started yet.
+        """
+        self._admit()
+        submitted = time.perf_counter()
+        context = contextvars.copy_context()
+
+        def work() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return context.run(fn)
+            finally:
+                elapsed = time.perf_counter() - started
+                wait = started - submitted
+                with self._lock:
+                    self._running -= 1
+                    self._admitted -= 1
+                    self._completed += 1
+                    self._waits.append(wait)
+                    self._service_time = (
+                        elapsed
+                        if self._service_time is None
+                        else self._service_time
+                        + _SERVICE_TIME_SMOOTHING * (elapsed - self._service_time)
+                    )
+                logger.debug(
+                    f"SDK EXECUTOR: {label} waited {wait * 1000:.1f} ms, "
+                    f"ran {elapsed * 1000:.1f} ms"
+                )
+
+        try:
+            future = self._pool.submit(work)
+        except RuntimeError:
+            # Pool already shut down
+            with self._lock:
+                self._admitted -= 1
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stop accepting calls and drop those not yet started."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool occupancy, counters and queue wait percentiles (ms)."""
+        with self._lock:
+            waits = sorted(self._waits)
+            running = self._running
+            queued = self._admitted - self._running
+            completed = self._completed
+            rejected = self._rejected
+            service = self._service_time
+
+        def pct(p: float) -> float | None:
+            if not waits:
+                return None
+            index = min(len(waits) - 1, round(p * (len(waits) - 1)))
+            return round(waits[index] * 1000, 1)
+
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queued": queued,
+            "completed": completed,
+            "rejected": rejected,
+            "queue_wait_p50_ms": pct(0.5),
+            "queue_wait_p99_ms": pct(0.99),
+            "queue_wait_max_ms": pct(1.0),
+            "avg_run_ms": round(service * 1000, 1) if service is not None else None,
+        }
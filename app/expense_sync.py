@@ -0,0 +1,513 @@
+"""Local replica of the expense history kept current with delta syncs.
+
+`ExpenseStore` keeps converted expense dicts in SQLite (in memory by
+default, or in a file so the replica survives restarts).  `ExpenseSync`
+pulls the whole history once and then polls ``list_expenses`` with
+``updated_after`` set to the newest ``updated_at`` it has seen, which
+returns new, edited and deleted expenses alike.  Watermarks are kept per
+scope: the account-wide scope (``"all"``) and one per group, so a stale
+group can be caught up without syncing the whole account.  Change
+listeners receive every applied page, so derived views such as the
+search index follow the same deltas.
+
+`SplitwiseClient` answers ``list_expenses`` and ``get_expense`` from the
+replica while it is fresher than ``max_staleness`` seconds; anything the
+replica cannot answer falls through to Splitwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .rate_limit import background_lane
+from .utils import parse_timestamp, written_objects
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .splitwise_client import SplitwiseClient
+
+logger = logging.getLogger("splitwise_mcp")
+
+SCOPE_ALL = "all"
+
+# Watermarks never advance past "sync start minus this overlap", so
+# expenses updated while a sync is paging (or under moderate clock skew)
+# are fetched again on the next poll instead of being skipped.
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+# list_expenses filters the replica can evaluate itself
+_QUERY_FILTERS = frozenset(
+    {
+        "group_id",
+        "friend_id",
+        "dated_after",
+        "dated_before",
+        "updated_after",
+        "updated_before",
+        "visible",
+        "limit",
+        "offset",
+    }
+)
+
+# Writes whose responses do not carry the affected expenses
+_EXPIRING_WRITES = frozenset(
+    {
+        const.METHOD_DELETE_EXPENSE,
+        const.METHOD_UNDELETE_EXPENSE,
+        const.METHOD_DELETE_GROUP,
+        const.METHOD_UNDELETE_GROUP,
+        const.METHOD_DELETE_FRIEND,
+    }
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    group_id INTEGER,
+    date TEXT,
+    updated_at TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expenses_group_date ON expenses (group_id, date);
+CREATE INDEX IF NOT EXISTS expenses_date ON expenses (date);
+CREATE TABLE IF NOT EXISTS expense_users (
+    expense_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (expense_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS expense_users_user ON expense_users (user_id);
+CREATE TABLE IF NOT EXISTS watermarks (
+    scope TEXT PRIMARY KEY,
+    updated_at TEXT,
+    synced_at REAL
+);
+"""
+
+
+def normalize_timestamp(value: Any) -> str | None:
+    """Return a sortable naive-UTC ``YYYY-MM-DDTHH:MM:SS`` key, or None.
+
+    Naive inputs (such as the month bounds used by `expenses_by_month`)
+    are taken to be UTC.
+    """
+    parsed = parse_timestamp(value)
+    return parsed.isoformat(timespec="seconds") if parsed else None
+
+
+def _user_ids(expense: dict[str, Any]) -> set[int]:
+    ids = set()
+    for user in expense.get("users") or []:
+        if isinstance(user, dict):
+            user_id = user.get("id", user.get("user_id"))
+            if user_id is not None:
+                ids.add(int(user_id))
+    return ids
+
+
+class ExpenseStore:
+    """SQLite-backed expense replica with per-scope sync watermarks.
+
+    Parameters
+    ----------
+    path: str
+        SQLite database path; ``":memory:"`` keeps the replica in process.
+    """
+
+    def __init__(self, path: str = const.DEFAULT_EXPENSE_SYNC_PATH) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def upsert(self, expenses: Iterable[dict[str, Any]]) -> int:
+        """Insert or replace expenses; deleted expenses are kept flagged."""
+        rows = []
+        members = []
+        for expense in expenses:
+            if expense.get("id") is None:
+                continue
+            expense_id = int(expense["id"])
+            rows.append(
+                (
+                    expense_id,
+                    expense.get("group_id"),
+                    normalize_timestamp(expense.get("date")),
+                    normalize_timestamp(expense.get("updated_at")),
+                    1 if expense.get("deleted_at") else 0,
+                    json.dumps(expense, separators=(",", ":")),
+                )
+            )
+            members.extend((expense_id, user_id) for user_id in _user_ids(expense))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM expense_users WHERE expense_id = ?",
+                [(row[0],) for row in rows],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO expenses VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO expense_users VALUES (?, ?)", members
+            )
+        return len(rows)
+
+    def get(self, expense_id: int) -> dict[str, Any] | None:
+        """Return one expense by id, or None when it is not replicated."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM expenses WHERE id = ?", (int(expense_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(
+        self,
+        group_id: int | None = None,
+        friend_id: int | None = None,
+        dated_after: str | None = None,
+        dated_before: str | None = None,
+        updated_after: str | None = None,
+        updated_before: str | None = None,
+        visible: bool | None = None,
+        limit: int | None = 20,
+        offset: int | None = 0,
+    ) -> list[dict[str, Any]]:
+        """Evaluate ``list_expenses`` filters against the replica.
+
+        Results are ordered newest first like the Splitwise API; a ``limit``
+        of 0 returns every match.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        if group_id is not None:
+            clauses.append("group_id = ?")
+            params.append(int(group_id))
+        if friend_id is not None:
+            clauses.append(
+                "id IN (SELECT expense_id FROM expense_users WHERE user_id = ?)"
+            )
+            params.append(int(friend_id))
+        for value, clause in (
+            (dated_after, "date >= ?"),
+            (dated_before, "date < ?"),
+            (updated_after, "updated_at > ?"),
+            (updated_before, "updated_at < ?"),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(normalize_timestamp(value))
+        if visible:
+            clauses.append("deleted = 0")
+
+        sql = "SELECT data FROM expenses"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date DESC, id DESC"
+        if limit:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend((int(limit), int(offset or 0)))
+        elif offset:
+            sql += " LIMIT -1 OFFSET ?"
+            params.append(int(offset))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def watermark(self, scope: str) -> tuple[str | None, float | None]:
+        """Return ``(updated_at watermark, synced_at)`` for a scope."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated_at, synced_at FROM watermarks WHERE scope = ?",
+                (scope,),
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def set_watermark(self, scope: str, updated_at: str | None, synced_at: float):
+        """Record a completed sync of a scope."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)",
+                (scope, updated_at, synced_at),
+            )
+
+    def expire(self) -> None:
+        """Mark every scope stale while keeping their watermarks."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE watermarks SET synced_at = 0")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total, deleted = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM expenses"
+            ).fetchone()
+            scopes = self._conn.execute("SELECT COUNT(*) FROM watermarks").fetchone()
+        return {"expenses": total, "deleted": deleted, "scopes": scopes[0]}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ExpenseSync:
+    """Keeps an `ExpenseStore` in step with Splitwise and serves reads from it.
+
+    Parameters
+    ----------
+    client: SplitwiseClient
+        Client used for upstream ``list_expenses`` calls.
+    store: ExpenseStore
+        Replica to fill and query.
+    max_staleness: float
+        Seconds after a sync during which the replica answers reads.  The
+        background poller runs at half this interval.
+    page_size: int
+        ``limit`` used while paging through deltas.
+    clock: Callable[[], float]
+        Wall-clock source (``time.time``); sync times are persisted.
+    """
+
+    def __init__(
+        self,
+        client: SplitwiseClient,
+        store: ExpenseStore,
+        max_staleness: float = const.DEFAULT_EXPENSE_SYNC_MAX_STALENESS,
+        page_size: int = const.DEFAULT_EXPENSE_SYNC_PAGE_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._client = client
+        self.store = store
+        self.max_staleness = max_staleness
+        self.page_size = page_size
+        self._clock = clock
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._listeners: list[Callable[[list[dict[str, Any]]], None]] = []
+        self._served = 0
+        self._fallbacks = 0
+        self._syncs = 0
+        self._fetched = 0
+        self._last_sync_ms: float | None = None
+
+    # Freshness
+
+    @staticmethod
+    def scope(group_id: int | None = None) -> str:
+        return SCOPE_ALL if group_id is None else f"group:{int(group_id)}"
+
+    def _scopes(self, group_id: int | None) -> list[str]:
+        # An account-wide sync also covers every group.
+        scopes = [SCOPE_ALL]
+        if group_id is not None:
+            scopes.append(self.scope(group_id))
+        return scopes
+
+    def has_baseline(self, group_id: int | None = None) -> bool:
+        """True once the scope (or the whole account) has been pulled once."""
+        return any(
+            self.store.watermark(scope)[1] is not None
+            for scope in self._scopes(group_id)
+        )
+
+    def is_fresh(self, group_id: int | None = None) -> bool:
+        """True when the scope was synced within ``max_staleness`` seconds."""
+        synced = [
+            self.store.watermark(scope)[1] or 0 for scope in self._scopes(group_id)
+        ]
+        newest = max(synced)
+        return newest > 0 and self._clock() - newest <= self.max_staleness
+
+    def _effective_watermark(self, group_id: int | None) -> str | None:
+        marks = [self.store.watermark(scope)[0] for scope in self._scopes(group_id)]
+        marks = [mark for mark in marks if mark]
+        return max(marks) if marks else None
+
+    # Syncing
+
+    async def refresh(self, group_id: int | None = None, force: bool = False) -> int:
+        """Pull changes since the scope's watermark and apply them.
+
+        Concurrent refreshes of one scope share a lock; unless ``force`` is
+        set, a refresh that finds the scope already fresh does nothing.
+        Returns the number of expenses applied.
+        """
+        scope = self.scope(group_id)
+        lock = self._locks.setdefault(scope, asyncio.Lock())
+        async with lock:
+            if not force and self.is_fresh(group_id):
+                return 0
+            started = time.perf_counter()
+            synced_at = self._clock()
+            watermark = self._effective_watermark(group_id)
+
+            kwargs: dict[str, Any] = {"limit": self.page_size}
+            if group_id is not None:
+                kwargs["group_id"] = group_id
+            if watermark:
+                kwargs["updated_after"] = f"{watermark}Z"
+
+            newest = watermark
+            applied = 0
+            offset = 0
+            while True:
+                page = await self._client.afetch(
+                    const.METHOD_LIST_EXPENSES, offset=offset, **kwargs
+                )
+                page = page or []
+                # SQLite writes run off the event loop
+                applied += await asyncio.to_thread(self.store.upsert, page)
+                self._notify(page)
+                for expense in page:
+                    updated = normalize_timestamp(expense.get("updated_at"))
+                    if updated and (newest is None or updated > newest):
+                        newest = updated
+                if len(page) < self.page_size:
+                    break
+                offset += self.page_size
+
+            cutoff = normalize_timestamp(
+                datetime.fromtimestamp(synced_at, UTC) - WATERMARK_OVERLAP
+            )
+            if newest is not None and cutoff is not None and newest > cutoff:
+                newest = max(cutoff, watermark) if watermark else cutoff
+            self.store.set_watermark(scope, newest, synced_at)
+
+            self._syncs += 1
+            self._fetched += applied
+            self._last_sync_ms = (time.perf_counter() - started) * 1000
+            logger.info(
+                f"EXPENSE SYNC: {scope} applied {applied} changes in "
+                f"{self._last_sync_ms:.0f} ms"
+            )
+            return applied
+
+    def add_change_listener(
+        self, listener: Callable[[list[dict[str, Any]]], None]
+    ) -> None:
+        """Register a callback receiving every page of synced changes.
+
+        Pages include edited and deleted expenses (with ``deleted_at``).
+        Exceptions raised by listeners are logged and ignored.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, expenses: list[dict[str, Any]]) -> None:
+        if not expenses:
+            return
+        for listener in self._listeners:
+            try:
+                listener(expenses)
+            except Exception as exc:
+                logger.error(f"EXPENSE SYNC: change listener failed: {exc}")
+
+    def start(self) -> None:
+        """Start the background poller unless it is already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        interval = max(self.max_staleness / 2, 1.0)
+        while True:
+            # Skip a pass when a read-triggered refresh ran recently
+            synced_at = self.store.watermark(self.scope())[1] or 0
+            wait = synced_at + interval - self._clock()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                with background_lane():
+                    await self.refresh(force=True)
+            except Exception as exc:
+                logger.error(f"EXPENSE SYNC: poll failed: {exc}")
+                await asyncio.sleep(interval)
+
+    async def aclose(self) -> None:
+        """Stop the poller and close the store."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.store.close()
+
+    def apply_write(
+        self, method_name: str, kwargs: dict[str, Any], result: Any
+    ) -> None:
+        """Write listener keeping the replica consistent with local writes."""
+        if method_name in (const.METHOD_CREATE_EXPENSE, const.METHOD_UPDATE_EXPENSE):
+            self.store.upsert(written_objects(result))
+        elif method_name in _EXPIRING_WRITES:
+            self.store.expire()
+
+    # Serving reads
+
+    @staticmethod
+    def can_serve(method_name: str, kwargs: dict[str, Any]) -> bool:
+        if method_name == const.METHOD_GET_EXPENSE:
+            return set(kwargs) == {"id"}
+        if method_name == const.METHOD_LIST_EXPENSES:
+            return set(kwargs) <= _QUERY_FILTERS
+        return False
+
+    def serve(self, method_name: str, kwargs: dict[str, Any]) -> tuple[bool, Any]:
+        """Answer a read from the replica if it is fresh enough.
+
+        Returns ``(hit, result)``; on a miss the caller goes upstream.
+        """
+        if not self.can_serve(method_name, kwargs):
+            return False, None
+        if method_name == const.METHOD_GET_EXPENSE:
+            if self.is_fresh():
+                expense = self.store.get(kwargs["id"])
+                if expense is not None:
+                    self._served += 1
+                    return True, expense
+        elif self.is_fresh(kwargs.get("group_id")):
+            self._served += 1
+            return True, self.store.query(**kwargs)
+        self._fallbacks += 1
+        return False, None
+
+    async def aserve(
+        self, method_name: str, kwargs: dict[str, Any]
+    ) -> tuple[bool, Any]:
+        """Like `serve`, catching up a stale scope with a delta sync first.
+
+        Reads never wait for an initial full pull: until the background
+        poller has one, they go upstream.
+        """
+        if not self.can_serve(method_name, kwargs):
+            return False, None
+        self.start()
+        group_id = (
+            kwargs.get("group_id")
+            if method_name == const.METHOD_LIST_EXPENSES
+            else None
+        )
+        if self.has_baseline(group_id) and not self.is_fresh(group_id):
+            await self.refresh(group_id)
+        return await asyncio.to_thread(self.serve, method_name, kwargs)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self.store.stats(),
+            "served": self._served,
+            "fallbacks": self._fallbacks,
+            "syncs": self._syncs,
+            "fetched": self._fetched,
+            "last_sync_ms": self._last_sync_ms,
+            "fresh": self.is_fresh(),
+        }
@@ -0,0 +1,198 @@
+"""Name-to-group index backing group name resolution.
+
+Group names are resolved through an in-memory index instead of listing
+every group on each call.  Names are matched exactly first, then by a
+key normalized with NFKC, case folding and whitespace collapsing, and
+finally by fuzzy similarity (`difflib`).  The index is refreshed in the
+background once it is older than its maximum age and kept current
+between refreshes by applying the results of ``create_group`` and
+``delete_group``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import difflib
+import logging
+import threading
+import time
+import unicodedata
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .utils import written_objects
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .splitwise_client import SplitwiseClient
+
+logger = logging.getLogger("splitwise_mcp")
+
+
+def normalize_name(name: str) -> str:
+    """Return the lookup key for a group name."""
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+class GroupIndex:
+    """Thread-safe index of groups by exact and normalized name.
+
+    Parameters
+    ----------
+    fuzzy_cutoff: float
+        Minimum `difflib` similarity ratio for a fuzzy match; names below
+        it do not resolve.
+    clock: Callable[[], float]
+        Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        fuzzy_cutoff: float = const.GROUP_NAME_FUZZY_CUTOFF,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._groups: dict[Any, dict[str, Any]] = {}
+        self._by_name: dict[str, Any] = {}
+        self._by_key: dict[str, Any] = {}
+        self.built_at: float | None = None
+        self._stale = False
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._lookups = 0
+        self._fuzzy_hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    @property
+    def ready(self) -> bool:
+        """True once the index has been built at least once."""
+        return self.built_at is not None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last rebuild (infinite before the first)."""
+        if self.built_at is None:
+            return float("inf")
+        return self._clock() - self.built_at
+
+    def needs_refresh(self, max_age: float) -> bool:
+        """Return True when the index was never built or is older than ``max_age``."""
+        return self._stale or self.age > max_age
+
+    # Maintenance
+
+    def rebuild(self, groups: list[dict[str, Any]]) -> None:
+        """Replace the index contents with a full group listing."""
+        with self._lock:
+            self._groups = {
+                group["id"]: group for group in groups if group.get("id") is not None
+            }
+            self._reindex_locked()
+            self.built_at = self._clock()
+            self._stale = False
+
+    def add(self, group: dict[str, Any]) -> None:
+        """Add or replace a single group."""
+        if group.get("id") is None:
+            return
+        with self._lock:
+            self._groups[group["id"]] = group
+            self._reindex_locked()
+
+    def remove(self, group_id: Any) -> None:
+        """Drop a group by id."""
+        with self._lock:
+            if self._groups.pop(group_id, None) is not None:
+                self._reindex_locked()
+
+    def apply_write(
+        self, method_name: str, kwargs: dict[str, Any], result: Any
+    ) -> None:
+        """Keep the index current after a successful write method."""
+        if method_name == const.METHOD_CREATE_GROUP:
+            for group in written_objects(result):
+                self.add(group)
+        elif method_name == const.METHOD_DELETE_GROUP:
+            self.remove(kwargs.get("id"))
+        elif method_name == const.METHOD_UNDELETE_GROUP:
+            # The response does not carry the restored group; refresh soon.
+            self._stale = True
+
+    def _reindex_locked(self) -> None:
+        # Earlier groups win when names collide, matching a linear scan.
+        by_name: dict[str, Any] = {}
+        by_key: dict[str, Any] = {}
+        for group_id, group in self._groups.items():
+            name = group.get("name")
+            if not isinstance(name, str):
+                continue
+            by_name.setdefault(name, group_id)
+            by_key.setdefault(normalize_name(name), group_id)
+        self._by_name = by_name
+        self._by_key = by_key
+
+    # Querying
+
+    def lookup(self, name: str, fuzzy: bool = True) -> dict[str, Any] | None:
+        """Return the group matching ``name``, or None.
+
+        An exact name wins over a normalized match, which wins over the
+        most similar name at or above ``fuzzy_cutoff``.
+        """
+        with self._lock:
+            self._lookups += 1
+            group_id = self._by_name.get(name)
+            if group_id is None:
+                key = normalize_name(name)
+                group_id = self._by_key.get(key)
+                if group_id is None and fuzzy and key:
+                    close = difflib.get_close_matches(
+                        key, list(self._by_key), n=1, cutoff=self.fuzzy_cutoff
+                    )
+                    if close:
+                        self._fuzzy_hits += 1
+                        group_id = self._by_key[close[0]]
+            if group_id is None:
+                self._misses += 1
+                return None
+            return self._groups[group_id]
+
+    def stats(self) -> dict[str, Any]:
+        """Return index size, age and lookup counters."""
+        with self._lock:
+            return {
+                "groups": len(self._groups),
+                "age": None if self.built_at is None else round(self.age, 3),
+                "lookups": self._lookups,
+                "fuzzy_hits": self._fuzzy_hits,
+                "misses": self._misses,
+            }
+
+    # Background maintenance
+
+    def schedule_refresh(self, client: SplitwiseClient) -> asyncio.Task[None]:
+        """Rebuild the index in the background unless a rebuild is running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(client))
+        return self._refresh_task
+
+    async def refresh(self, client: SplitwiseClient) -> None:
+        """Rebuild the index now, joining a rebuild already in progress."""
+        await asyncio.shield(self.schedule_refresh(client))
+
+    async def _refresh(self, client: SplitwiseClient) -> None:
+        started = time.perf_counter()
+        try:
+            groups = await client.afetch(const.METHOD_LIST_GROUPS)
+            self.rebuild(groups or [])
+            logger.info(
+                f"GROUP INDEX: rebuilt with {len(self)} groups in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+        except Exception as exc:
+            logger.error(f"GROUP INDEX: rebuild failed: {exc}")
@@ -0,0 +1,246 @@
+"""Multi-worker mode for the streamable-http transport.
+
+One server process is limited to one core and keeps MCP sessions in
+memory, so a request must reach the process that created its session.
+With ``MCP_WORKERS=N`` `run_workers` starts N worker processes, each a
+uvicorn server on its own port (``MCP_PORT + i``), and the reverse proxy
+in front of them routes on the ``Mcp-Session-Id`` header:
+
+* every session ID a worker hands out is prefixed with its worker ID
+  (``"2.4f0c..."``), and the prefix is stripped again from requests
+  before the MCP session manager sees them;
+* new sessions (no header yet) may go to any worker, and later requests
+  are sent to the worker named by the prefix (see ``nginx.conf``).
+
+The proxy's upstreams and routing map depend on the worker count, ports
+and ID offset of every node, so they are generated by `nginx_routing`
+(``python -m app.http_workers``) into ``mcp_routing.conf`` rather than
+written by hand.
+
+Workers share cached reads and coalesce upstream calls through
+``SPLITWISE_SHARED_STATE_URL``; the upstream rate budget is split evenly
+between them unless ``SPLITWISE_RATE_LIMIT`` is set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+from multiprocessing.connection import wait
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .utils import env_int
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, MutableMapping
+
+    Scope = MutableMapping[str, Any]
+    Message = MutableMapping[str, Any]
+    Receive = Callable[[], Awaitable[Message]]
+    Send = Callable[[Message], Awaitable[None]]
+    ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+logger = logging.getLogger("splitwise_mcp")
+
+_SESSION_HEADER = const.HEADER_MCP_SESSION_ID.encode()
+
+# Backend host of the bundled docker-compose setup
+DEFAULT_NGINX_HOST = "splitwise-mcp"
+
+
+class SessionAffinityMiddleware:
+    """Tag the session IDs of one worker so the proxy can route on them.
+
+    Parameters
+    ----------
+    app: ASGI application
+        The MCP streamable-http application.
+    worker_id: int
+        Identifier prefixed to every session ID this worker creates.
+    """
+
+    def __init__(self, app: ASGIApp, worker_id: int) -> None:
+        self.app = app
+        self.prefix = f"{worker_id}.".encode()
+
+    def _strip(self, value: bytes) -> bytes:
+        worker, dot, session = value.partition(b".")
+        # IDs of other workers are unknown here either way
+        return session if dot and worker.isdigit() else value
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        scope = dict(scope)
+        scope["headers"] = [
+            (name, self._strip(value) if name == _SESSION_HEADER else value)
+            for name, value in scope["headers"]
+        ]
+
+        async def tagged_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = [
+                    (name, self.prefix + value if name == _SESSION_HEADER else value)
+                    for name, value in message.get("headers", ())
+                ]
+            await send(message)
+
+        await self.app(scope, receive, tagged_send)
+
+
+def _split_rate_limit(workers: int) -> None:
+    # Every worker has its own bucket per credential; together they must
+    # stay within one credential's budget
+    if const.ENV_RATE_LIMIT not in os.environ:
+        os.environ[const.ENV_RATE_LIMIT] = str(const.DEFAULT_RATE_LIMIT / workers)
+    if const.ENV_RATE_LIMIT_BURST not in os.environ:
+        os.environ[const.ENV_RATE_LIMIT_BURST] = str(
+            max(1, const.DEFAULT_RATE_LIMIT_BURST // workers)
+        )
+
+
+def serve_worker(worker_id: int, host: str, port: int, workers: int) -> None:
+    """Run one worker: the MCP app with session affinity on ``port``."""
+    import uvicorn
+
+    from .main import mcp
+
+    _split_rate_limit(workers)
+    mcp.settings.host = host
+    mcp.settings.port = port
+    app = SessionAffinityMiddleware(mcp.streamable_http_app(), worker_id)
+    uvicorn.run(app, host=host, port=port, log_level=mcp.settings.log_level.lower())
+
+
+def parse_node(spec: str) -> tuple[str, int, int, int]:
+    """Parse a ``HOST:PORT:WORKERS[:OFFSET]`` node description."""
+    parts = spec.split(":")
+    if len(parts) not in (3, 4):
+        raise ValueError(f"Expected HOST:PORT:WORKERS[:OFFSET], got {spec!r}")
+    host, *numbers = parts
+    port, workers, offset = (int(n) for n in [*numbers, "0"][:3])
+    if workers < 1 or offset < 0:
+        raise ValueError(f"Invalid worker count or offset in {spec!r}")
+    return host, port, workers, offset
+
+
+def nginx_routing(nodes: list[tuple[str, int, int, int]]) -> str:
+    """Render the nginx upstreams and session map for the given nodes.
+
+    Every node is ``(host, port, workers, offset)`` as run by `run_workers`:
+    worker ``offset + i`` listens on ``host:port + i``.  Worker IDs must
+    be distinct across nodes, otherwise sessions could not be routed.
+    """
+    workers: dict[int, str] = {}
+    for host, port, count, offset in nodes:
+        for i in range(count):
+            if offset + i in workers:
+                raise ValueError(
+                    f"Worker ID {offset + i} is used by more than one node; "
+                    "give each node its own MCP_WORKER_OFFSET"
+                )
+            workers[offset + i] = f"{host}:{port + i}"
+
+    lines = [
+        "# Generated by `python -m app.http_workers`; do not edit by hand.",
+        "",
+        "# New sessions may go to any worker",
+        "upstream mcp_backend {",
+        *(f"    server {address};" for address in workers.values()),
+        "}",
+        "",
+        "# One upstream per worker, for requests of an existing session",
+        *(
+            f"upstream mcp_worker_{worker_id} {{ server {address}; }}"
+            for worker_id, address in workers.items()
+        ),
+        "",
+        '# Session IDs are prefixed with the worker ID ("2.4f0c...")',
+        "map $http_mcp_session_id $mcp_upstream {",
+        "    default mcp_backend;",
+        *(f'    "~^{worker_id}\\." mcp_worker_{worker_id};' for worker_id in workers),
+        "}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point: print the nginx routing for the workers."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.http_workers",
+        description="Print the nginx upstreams and session map for MCP workers.",
+    )
+    parser.add_argument(
+        "--node",
+        action="append",
+        type=parse_node,
+        help="HOST:PORT:WORKERS[:OFFSET] of one node (repeatable); defaults "
+        "to this node's MCP_PORT, MCP_WORKERS and MCP_WORKER_OFFSET",
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_NGINX_HOST,
+        help="host of the default node, as seen by nginx",
+    )
+    args = parser.parse_args(argv)
+
+    nodes = args.node or [
+        (
+            args.host,
+            env_int(const.ENV_MCP_PORT, const.DEFAULT_MCP_PORT),
+            max(1, env_int(const.ENV_MCP_WORKERS, const.DEFAULT_MCP_WORKERS)),
+            env_int(const.ENV_MCP_WORKER_OFFSET, 0),
+        )
+    ]
+    try:
+        sys.stdout.write(nginx_routing(nodes))
+    except ValueError as exc:
+        parser.error(str(exc))
+    return 0
+
+
+def run_workers(workers: int, host: str, port: int, offset: int = 0) -> int:
+    """Run ``workers`` worker processes until one exits or a signal arrives.
+
+    Worker ``i`` gets ID ``offset + i`` and listens on ``port + i``.
+    Returns the exit code of the first worker to stop.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=serve_worker,
+            args=(offset + i, host, port + i, workers),
+            name=f"splitwise-mcp-worker-{offset + i}",
+        )
+        for i in range(workers)
+    ]
+
+    def stop(signum: int, _frame: Any) -> None:
+        sys.exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    for process in processes:
+        process.start()
+        logger.info(f"WORKERS: started {process.name} (pid {process.pid})")
+    try:
+        wait([process.sentinel for process in processes])
+        stopped = next(p for p in processes if not p.is_alive())
+        logger.error(f"WORKERS: {stopped.name} exited with {stopped.exitcode}")
+        return stopped.exitcode or 1
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=10)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
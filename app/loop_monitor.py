@@ -0,0 +1,142 @@
+"""Detect and report event-loop blocking.
+
+Every MCP session on the streamable-http server shares one event loop,
+so a synchronous call inside an async handler stalls all of them.
+`LoopMonitor` runs a heartbeat task on the loop and a watchdog thread
+beside it: when the heartbeat has not run for longer than the threshold
+the watchdog captures the loop thread's current stack, which names the
+blocking code, and logs it once per stall.  Stall durations are also
+measured from the heartbeat itself so the counters are exact even when
+the watchdog misses a short stall.  The monitor is meant for debug and
+benchmark runs (``SPLITWISE_LOOP_MONITOR``).  Unlike asyncio's debug
+mode, which records a traceback for every future, it costs one timer
+per interval, so measured latencies stay representative.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextlib import suppress
+from typing import Any
+
+from . import constants as const
+
+logger = logging.getLogger("splitwise_mcp")
+
+
+class LoopMonitor:
+    """Heartbeat and watchdog measuring how long the event loop stalls.
+
+    Parameters
+    ----------
+    threshold: float
+        Seconds the loop may go without running the heartbeat before the
+        stall is reported.
+    interval: float
+        Seconds between heartbeats; defaults to a quarter of ``threshold``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = const.DEFAULT_LOOP_BLOCK_THRESHOLD,
+        interval: float | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval if interval is not None else threshold / 4
+        self._beat = time.monotonic()
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._reported_beat: float | None = None
+        self._lock = threading.Lock()
+        self._blocks = 0
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+        self._last_stack: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running loop."""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            f"LOOP MONITOR: reporting stalls over {self.threshold * 1000:.0f} ms"
+        )
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and the watchdog thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, self.threshold * 2)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = now - expected
+            if lag >= self.threshold:
+                self._record(lag)
+
+    def _record(self, lag: float) -> None:
+        with self._lock:
+            self._blocks += 1
+            self._total_lag += lag
+            self._max_lag = max(self._max_lag, lag)
+        logger.warning(f"LOOP MONITOR: event loop blocked for {lag * 1000:.0f} ms")
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or self._reported_beat == beat:
+                continue
+            # Report each stall once, while it is still in progress
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread or 0)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=12))
+            with self._lock:
+                self._last_stack = stack
+            logger.warning(
+                f"LOOP MONITOR: event loop stalled for {stalled * 1000:.0f} ms "
+                f"in:\n{stack}"
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """Return stall counters (milliseconds) and the last blocking stack."""
+        with self._lock:
+            return {
+                "running": self.running,
+                "threshold_ms": self.threshold * 1000,
+                "blocks": self._blocks,
+                "max_block_ms": round(self._max_lag * 1000, 1),
+                "total_block_ms": round(self._total_lag * 1000, 1),
+                "last_stack": self._last_stack,
+            }
@@ -7,11 +7,15 @@ categorizing Splitwise API methods as resources (GET) or tools (POST).
 from __future__ import annotations
 
 import asyncio
+import io
 import json
 import logging
 import os
+import sys
+import time
 from contextlib import asynccontextmanager, suppress
-from typing import Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 from urllib.parse import unquote
 
 from mcp.server.fastmcp import Context, FastMCP
@@ -19,53 +23,139 @@ from mcp.types import ToolAnnotations
 
 from . import constants as const
 from . import custom_methods
+from .batch import create_expenses
+from .cache import normalize_kwargs
+from .client_pool import shared_pool
+from .http_workers import run_workers
 from .logging_utils import log_operation
-from .splitwise_client import SplitwiseClient
+from .loop_monitor import LoopMonitor
+from .search_index import (
+    expense_result,
+    friend_name,
+    friend_result,
+    group_result,
+    tokenize,
+)
+from .serialization import parse_fields, to_json
+from .settlement import balance_currencies, settlement_plan
+from .statement_import import detect_format, import_statement, open_statement
+from .utils import env_bool, env_float, env_int
+
+if TYPE_CHECKING:
+    from .splitwise_client import SplitwiseClient
+
+_loop_monitor: LoopMonitor | None = None
+
+
+def _shared_loop_monitor() -> LoopMonitor | None:
+    """Start the process-wide loop monitor once, when enabled."""
+    global _loop_monitor
+    if not env_bool(const.ENV_LOOP_MONITOR, False):
+        return None
+    if _loop_monitor is None or not _loop_monitor.running:
+        # Report handlers that block the shared event loop
+        _loop_monitor = LoopMonitor(
+            env_float(
+                const.ENV_LOOP_BLOCK_THRESHOLD, const.DEFAULT_LOOP_BLOCK_THRESHOLD
+            )
+        )
+        _loop_monitor.start()
+    return _loop_monitor
 
 
 @asynccontextmanager
 async def mcp_lifespan(_server: FastMCP):
-    """Manage MCP server startup and shutdown lifecycle."""
+    """Manage MCP session startup and shutdown.
+
+    FastMCP enters the lifespan once per session; clients and the
+    single-flight group live in the process-wide pool so that sessions
+    share them.
+    """
     logger = logging.getLogger("splitwise_mcp")
     logger.info("=" * 60)
     logger.info("SPLITWISE MCP SERVER STARTING UP")
     logger.info("=" * 60)
 
-    # Initialize Splitwise client on startup
-    api_key = os.environ.get(const.ENV_SPLITWISE_API_KEY)
-    consumer_key = os.environ.get(const.ENV_SPLITWISE_CONSUMER_KEY)
-    consumer_secret = os.environ.get(const.ENV_SPLITWISE_CONSUMER_SECRET)
-
-    if api_key:
-        logging.info("Initializing Splitwise client with API key")
-        client = SplitwiseClient(api_key=api_key)
-    elif consumer_key and consumer_secret:
-        logging.info("Initializing Splitwise client with OAuth credentials")
-        client = SplitwiseClient(
-            consumer_key=consumer_key, consumer_secret=consumer_secret
+    pool = shared_pool()
+    if pool.fallback_credentials is not None:
+        # Start the default tenant's client (group index, replica sync)
+        pool.get(pool.fallback_credentials)
+        logger.info("Splitwise client initialized successfully")
+    elif pool.allow_headers:
+        logger.info(
+            f"Multi-tenant mode: sessions send their API key in the "
+            f"{const.HEADER_SPLITWISE_API_KEY} header"
         )
     else:
         logger.error("No Splitwise credentials found in environment")
         raise ValueError(
             f"Either {const.ENV_SPLITWISE_API_KEY} or {const.ENV_SPLITWISE_CONSUMER_KEY}/{const.ENV_SPLITWISE_CONSUMER_SECRET} must be set"
         )
-
-    logger.info("Splitwise client initialized successfully")
+    monitor = _shared_loop_monitor()
     logger.info("MCP server ready to accept requests")
     logger.info("=" * 60)
 
     try:
-        yield {"client": client}
+        yield {
+            "pool": pool,
+            "singleflight": pool.singleflight,
+            "loop_monitor": monitor,
+        }
     finally:
-        logger.info("MCP server shutting down")
-        # Cleanup if needed
-        pass
+        # Pooled clients outlive the session; idle ones are closed by the pool
+        logger.info("MCP session shutting down")
 
 
 # Create MCP server with lifespan management
 mcp = FastMCP("Splitwise MCP Server", lifespan=mcp_lifespan)
 
 
+def _client(ctx: Context) -> SplitwiseClient:
+    """Return the Splitwise client of the calling session's tenant."""
+    request_context = ctx.request_context
+    pool = request_context.lifespan_context.get("pool")
+    if pool is None:
+        return request_context.lifespan_context["client"]
+    headers = getattr(request_context.request, "headers", None)
+    header_key = (
+        headers.get(const.HEADER_SPLITWISE_API_KEY) if headers is not None else None
+    )
+    return pool.client_for(request_context.session, header_key)
+
+
+async def _call_client(ctx: Context, method_name: str, **kwargs: Any) -> Any:
+    """Run a mapped Splitwise method without blocking the event loop.
+
+    Concurrent identical read calls are coalesced into a single upstream
+    call when a single-flight group is available in the lifespan context.
+    """
+    client = _client(ctx)
+    flight = ctx.request_context.lifespan_context.get("singleflight")
+
+    def run() -> Any:
+        return client.acall_mapped_method(method_name, **kwargs)
+
+    if flight is None or method_name not in const.READ_METHODS:
+        return await run()
+    # Keyed by client so that tenants never share results
+    return await flight.do((id(client), method_name, normalize_kwargs(kwargs)), run)
+
+
+async def _call_client_json(ctx: Context, method_name: str, **kwargs: Any) -> str:
+    """Like `_call_client` but return the response encoded as JSON text."""
+    client = _client(ctx)
+    flight = ctx.request_context.lifespan_context.get("singleflight")
+
+    def run() -> Any:
+        return client.acall_mapped_method_json(method_name, **kwargs)
+
+    if flight is None or method_name not in const.READ_METHODS:
+        return await run()
+    return await flight.do(
+        (id(client), method_name, normalize_kwargs(kwargs), "json"), run
+    )
+
+
 async def _call_splitwise_resource(
     ctx: Context, method_name: str, **kwargs: Any
 ) -> str:
@@ -73,18 +163,12 @@ async def _call_splitwise_resource(
     logger = logging.getLogger("splitwise_mcp")
     logger.info(f"RESOURCE CALL: {method_name} with params: {kwargs}")
 
-    client = ctx.request_context.lifespan_context["client"]
-
     try:
-        # call_mapped_method now returns already-converted dicts (not SDK objects)
-        response_data = await asyncio.to_thread(
-            client.call_mapped_method, method_name, **kwargs
-        )
+        # Encoded straight from SDK objects (or served from the cache as JSON)
+        payload = await _call_client_json(ctx, method_name, **kwargs)
 
-        logger.info(
-            f"RESOURCE SUCCESS: {method_name} returned {type(response_data).__name__}"
-        )
-        return json.dumps(response_data)
+        logger.info(f"RESOURCE SUCCESS: {method_name} returned {len(payload)} bytes")
+        return payload
     except Exception as exc:
         logger.error(f"RESOURCE ERROR: {method_name} failed: {exc}")
         with suppress(Exception):
@@ -94,7 +178,7 @@ async def _call_splitwise_resource(
 
 
 async def _call_splitwise_tool(
-    ctx: Context, method_name: str, **kwargs: Any
+    ctx: Context, method_name: str, fields: str | None = None, **kwargs: Any
 ) -> dict[str, Any]:
     """Helper function for MCP tools - returns structured data.
 
@@ -103,17 +187,19 @@ async def _call_splitwise_tool(
     - list_expenses -> {"expenses": [...]}
     - list_friends -> {"friends": [...]}
     - etc.
+
+    ``fields`` is a comma-separated selection such as ``"id,users.first_name"``
+    restricting the response to those attributes.
     """
     logger = logging.getLogger("splitwise_mcp")
     logger.info(f"TOOL CALL: {method_name} with params: {kwargs}")
 
-    client = ctx.request_context.lifespan_context["client"]
-
     try:
+        spec = parse_fields(fields)
+        if spec is not None:
+            kwargs["fields"] = spec
         # call_mapped_method now returns already-converted dicts (not SDK objects)
-        response_data = await asyncio.to_thread(
-            client.call_mapped_method, method_name, **kwargs
-        )
+        response_data = await _call_client(ctx, method_name, **kwargs)
 
         # Ensure response is always a dictionary for MCP tool compatibility
         if not isinstance(response_data, dict):
@@ -166,18 +252,9 @@ async def group_resource(group_id: str, ctx: Context) -> str:
             ctx, const.METHOD_GET_GROUP, id=int(group_id)
         )
     except ValueError:
-        # If not an integer, treat as group name
-        client = ctx.request_context.lifespan_context["client"]
-        # URL decode the name in case it contains special characters
-        decoded_name = unquote(group_id)
-        # get_group_by_name calls SDK directly, returns raw SDK object (not cached)
-        group = client.get_group_by_name(decoded_name)
-        if group is None:
-            raise ValueError(f"Group not found: {decoded_name}") from None
-        # Convert the SDK object to dict since get_group_by_name bypasses cache
-        response_data = client.convert(group)
-
-        return json.dumps(response_data)
+        # If not an integer, treat as group name (URL decoded in case it
+        # contains special characters)
+        return await _group_by_name_json(ctx, unquote(group_id))
 
 
 @mcp.resource("splitwise://expenses")
@@ -232,9 +309,55 @@ async def notifications_resource(ctx: Context) -> str:
     return await _call_splitwise_resource(ctx, const.METHOD_LIST_NOTIFICATIONS)
 
 
+@mcp.resource("splitwise://comments/{expense_id}")
+async def comments_resource(expense_id: str, ctx: Context) -> str:
+    """List the comments on an expense as a resource."""
+    return await _call_splitwise_resource(
+        ctx, const.METHOD_GET_COMMENTS, expense_id=int(expense_id)
+    )
+
+
 # MCP Tools for ChatGPT Connector Compatibility (REQUIRED)
 
 
+def _match_groups(needle: str, groups: Any) -> list[dict[str, str]]:
+    if not isinstance(groups, list):
+        return []
+    return [
+        group_result(group)
+        for group in groups
+        if needle in str(group.get("name", "")).lower()
+    ]
+
+
+def _match_expenses(needle: str, expenses: Any) -> list[dict[str, str]]:
+    if not isinstance(expenses, list):
+        return []
+    return [
+        expense_result(expense)
+        for expense in expenses
+        if needle in str(expense.get("description", "")).lower()
+    ]
+
+
+def _match_friends(needle: str, friends: Any) -> list[dict[str, str]]:
+    if not isinstance(friends, list):
+        return []
+    return [
+        friend_result(friend)
+        for friend in friends
+        if needle in friend_name(friend).lower()
+    ]
+
+
+# Search sources in result order: (name, method, kwargs, matcher)
+_SEARCH_SOURCES = (
+    ("groups", const.METHOD_LIST_GROUPS, {}, _match_groups),
+    ("expenses", const.METHOD_LIST_EXPENSES, {"limit": 100}, _match_expenses),
+    ("friends", const.METHOD_LIST_FRIENDS, {}, _match_friends),
+)
+
+
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def search(query: str, ctx: Context) -> dict[str, Any]:
     """Search across Splitwise data (expenses, groups, friends) based on query.
@@ -242,70 +365,85 @@ async def search(query: str, ctx: Context) -> dict[str, Any]:
     This tool is REQUIRED for ChatGPT connectors.
     Returns a list of search results with id, title, and url for each match.
     """
-    client = ctx.request_context.lifespan_context["client"]
-    results = []
+    logger = logging.getLogger("splitwise_mcp")
 
-    try:
-        # Search in groups (call_mapped_method now returns dicts)
-        groups = await asyncio.to_thread(
-            client.call_mapped_method, const.METHOD_LIST_GROUPS
-        )
-        if isinstance(groups, list):
-            for group in groups:
-                if query.lower() in str(group.get("name", "")).lower():
-                    results.append(
-                        {
-                            "id": f"group_{group.get('id')}",
-                            "title": f"Group: {group.get('name')}",
-                            "url": f"splitwise://group/{group.get('id')}",
-                        }
-                    )
-
-        # Search in expenses (call_mapped_method now returns dicts)
-        expenses = await asyncio.to_thread(
-            client.call_mapped_method, const.METHOD_LIST_EXPENSES, limit=100
-        )
-        if isinstance(expenses, list):
-            for expense in expenses:
-                desc = str(expense.get("description", ""))
-                if query.lower() in desc.lower():
-                    results.append(
-                        {
-                            "id": f"expense_{expense.get('id')}",
-                            "title": f"Expense: {desc} - ${expense.get('cost', 0)}",
-                            "url": f"splitwise://expense/{expense.get('id')}",
-                        }
-                    )
-
-        # Search in friends (call_mapped_method now returns dicts)
-        friends = await asyncio.to_thread(
-            client.call_mapped_method, const.METHOD_LIST_FRIENDS
+    # Serve from the local full-text index once it has been built; the
+    # first call (and every call after max age) triggers a background
+    # rebuild while falling back to scanning live listings.
+    client = _client(ctx)
+    index = getattr(client, "search_index", None)
+    if index is not None and tokenize(query):
+        max_age = env_float(
+            const.ENV_SEARCH_INDEX_MAX_AGE, const.DEFAULT_SEARCH_INDEX_MAX_AGE
         )
-        if isinstance(friends, list):
-            for friend in friends:
-                name = f"{friend.get('first_name', '')} {friend.get('last_name', '')}".strip()
-                if query.lower() in name.lower():
-                    results.append(
-                        {
-                            "id": f"friend_{friend.get('id')}",
-                            "title": f"Friend: {name}",
-                            "url": f"splitwise://friend/{friend.get('id')}",
-                        }
-                    )
-
-        # Limit to top 10 results
-        results = results[:10]
-
-        # Return in the exact format ChatGPT expects
-        return {"results": results}
+        if index.needs_refresh(max_age):
+            index.schedule_refresh(client)
+        if index.ready:
+            return {"results": index.search(query, limit=const.SEARCH_MAX_RESULTS)}
+
+    needle = query.lower()
+    timeout = env_float(
+        const.ENV_SEARCH_SOURCE_TIMEOUT, const.DEFAULT_SEARCH_SOURCE_TIMEOUT
+    )
 
-    except Exception as exc:
+    # Fetch all sources concurrently; each one has its own timeout so a
+    # slow listing only drops its own matches.
+    started = time.perf_counter()
+    tasks = {
+        asyncio.create_task(
+            asyncio.wait_for(_call_client(ctx, method, **kwargs), timeout)
+        ): name
+        for name, method, kwargs, _ in _SEARCH_SOURCES
+    }
+    matchers = {name: matcher for name, _, _, matcher in _SEARCH_SOURCES}
+    matches: dict[str, list[dict[str, str]]] = {}
+    timings: dict[str, float | str] = {}
+    errors: dict[str, Exception] = {}
+
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                name = tasks[task]
+                timings[name] = round((time.perf_counter() - started) * 1000, 1)
+                try:
+                    matches[name] = matchers[name](needle, task.result())
+                except Exception as exc:
+                    errors[name] = exc
+            # Stop as soon as enough matches are found
+            if (
+                sum(len(found) for found in matches.values())
+                >= const.SEARCH_MAX_RESULTS
+            ):
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+            timings[tasks[task]] = "cancelled"
+
+    logger.info(
+        f"SEARCH TIMINGS (ms): {timings}"
+        + (f" | partial, failed: {sorted(errors)}" if errors else "")
+    )
+
+    if errors and not matches:
+        exc = next(iter(errors.values()))
         logging.error(f"Search failed: {exc}")
         with suppress(Exception):
             log_operation(
                 "search", const.LOG_OP_API_ERROR, {"query": query}, {"error": str(exc)}
             )
-        raise
+        raise exc
+
+    results = [
+        match for name, _, _, _ in _SEARCH_SOURCES for match in matches.get(name, [])
+    ]
+
+    # Return in the exact format ChatGPT expects
+    return {"results": results[: const.SEARCH_MAX_RESULTS]}
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
@@ -315,21 +453,17 @@ async def fetch(id: str, ctx: Context) -> dict[str, Any]:
     This tool is REQUIRED for ChatGPT connectors.
     Returns complete information about a group, expense, or friend.
     """
-    client = ctx.request_context.lifespan_context["client"]
-
     try:
         # Parse the ID to determine type and actual ID
         if id.startswith("group_"):
             actual_id = int(id.replace("group_", ""))
             # call_mapped_method now returns dicts
-            result_data = await asyncio.to_thread(
-                client.call_mapped_method, const.METHOD_GET_GROUP, id=actual_id
-            )
+            result_data = await _call_client(ctx, const.METHOD_GET_GROUP, id=actual_id)
 
             result = {
                 "id": id,
                 "title": f"Group: {result_data.get('name')}",
-                "text": json.dumps(result_data, indent=2),
+                "text": to_json(result_data, indent=2),
                 "url": f"splitwise://group/{actual_id}",
                 "metadata": {
                     "type": "group",
@@ -340,14 +474,14 @@ async def fetch(id: str, ctx: Context) -> dict[str, Any]:
         elif id.startswith("expense_"):
             actual_id = int(id.replace("expense_", ""))
             # call_mapped_method now returns dicts
-            result_data = await asyncio.to_thread(
-                client.call_mapped_method, const.METHOD_GET_EXPENSE, id=actual_id
+            result_data = await _call_client(
+                ctx, const.METHOD_GET_EXPENSE, id=actual_id
             )
 
             result = {
                 "id": id,
                 "title": f"Expense: {result_data.get('description')}",
-                "text": json.dumps(result_data, indent=2),
+                "text": to_json(result_data, indent=2),
                 "url": f"splitwise://expense/{actual_id}",
                 "metadata": {
                     "type": "expense",
@@ -359,15 +493,13 @@ async def fetch(id: str, ctx: Context) -> dict[str, Any]:
         elif id.startswith("friend_"):
             actual_id = int(id.replace("friend_", ""))
             # call_mapped_method now returns dicts
-            result_data = await asyncio.to_thread(
-                client.call_mapped_method, const.METHOD_GET_FRIEND, id=actual_id
-            )
+            result_data = await _call_client(ctx, const.METHOD_GET_FRIEND, id=actual_id)
 
             name = f"{result_data.get('first_name', '')} {result_data.get('last_name', '')}".strip()
             result = {
                 "id": id,
                 "title": f"Friend: {name}",
-                "text": json.dumps(result_data, indent=2),
+                "text": to_json(result_data, indent=2),
                 "url": f"splitwise://friend/{actual_id}",
                 "metadata": {"type": "friend", "email": result_data.get("email")},
             }
@@ -415,6 +547,115 @@ async def create_expense(
     return await _call_splitwise_tool(ctx, const.METHOD_CREATE_EXPENSE, **params)
 
 
+@mcp.tool()
+async def create_expenses_batch(
+    expenses: list[dict[str, Any]],
+    ctx: Context,
+    concurrency: int | None = None,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """Create many expenses in one call.
+
+    Each item takes cost, description, currency_code (default USD) and
+    group_id, plus optional date, details and category_id.  Give users as
+    [{"user_id" or "name", "paid_share", "owed_share"}] to split
+    unevenly; otherwise the cost is split equally in the group.  All items
+    are validated before any is created.  Items may carry an
+    idempotency_key; resubmitting a batch does not create duplicates.
+    Set dry_run to only validate.  Returns per-item status, id and error.
+    """
+    client = _client(ctx)
+    limit = env_int(const.ENV_BATCH_CONCURRENCY, const.DEFAULT_BATCH_CONCURRENCY)
+    try:
+        return await create_expenses(
+            client, expenses, min(concurrency or limit, limit), dry_run
+        )
+    except Exception as exc:
+        with suppress(Exception):
+            log_operation(
+                "create_expenses_batch",
+                const.LOG_OP_API_ERROR,
+                {"count": len(expenses), "dry_run": dry_run},
+                {"error": str(exc)},
+            )
+        raise
+
+
+def _statement_path(path: str) -> str:
+    """Resolve a statement path inside the configured import directory."""
+    root = os.environ.get(const.ENV_IMPORT_DIR)
+    if not root:
+        raise ValueError(
+            f"Reading statement files requires {const.ENV_IMPORT_DIR}; "
+            "pass the statement as content instead"
+        )
+    base = Path(root).resolve()
+    resolved = (base / path).resolve()
+    if not resolved.is_relative_to(base):
+        raise ValueError(f"Statement path must be inside {const.ENV_IMPORT_DIR}")
+    return str(resolved)
+
+
+@mcp.tool()
+async def import_bank_statement(
+    group_name: str,
+    ctx: Context,
+    content: str | None = None,
+    path: str | None = None,
+    format: str | None = None,
+    paid_by: str | None = None,
+    split_with: list[str] | None = None,
+    currency_code: str | None = None,
+    charges: str = "negative",
+    date_format: str | None = None,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """Import the charges of a CSV or OFX bank statement as group expenses.
+
+    Pass the statement text as content, or a file name under the server's
+    import directory as path.  Charges already recorded in the group (same
+    date, amount and description) are skipped.  charges says whether money
+    spent is negative (default) or positive in the statement.  Without
+    paid_by the current user pays and the group splits equally; otherwise
+    paid_by pays and split_with members share evenly.  Set dry_run to
+    validate without creating expenses.  Returns counts per outcome and
+    the first errors by line.
+    """
+    client = _client(ctx)
+    try:
+        if (content is None) == (path is None):
+            raise ValueError("Pass exactly one of content or path")
+        if path is not None:
+            resolved = _statement_path(path)
+            stream = await asyncio.to_thread(open_statement, resolved)
+            fmt = format or detect_format(resolved)
+        else:
+            stream = io.StringIO(content)
+            fmt = format or detect_format(head=content[:512])
+        with stream:
+            return await import_statement(
+                client,
+                stream,
+                group_name,
+                fmt,
+                paid_by=paid_by,
+                split_with=split_with,
+                currency_code=currency_code,
+                charges=charges,
+                date_format=date_format,
+                dry_run=dry_run,
+            )
+    except Exception as exc:
+        with suppress(Exception):
+            log_operation(
+                "import_bank_statement",
+                const.LOG_OP_API_ERROR,
+                {"group_name": group_name, "path": path, "dry_run": dry_run},
+                {"error": str(exc)},
+            )
+        raise
+
+
 @mcp.tool()
 async def create_group(
     name: str, ctx: Context, group_type: str = "other", **kwargs: Any
@@ -495,7 +736,7 @@ async def get_monthly_expenses(
     group_name: str, month: str, ctx: Context
 ) -> dict[str, Any]:
     """Get all expenses for a specific group and month."""
-    client = ctx.request_context.lifespan_context["client"]
+    client = _client(ctx)
     try:
         expenses = await custom_methods.expenses_by_month(client, group_name, month)
 
@@ -513,12 +754,17 @@ async def get_monthly_expenses(
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def generate_monthly_report(
-    group_name: str, month: str, ctx: Context
+    group_name: str, month: str, ctx: Context, currency: str | None = None
 ) -> dict[str, Any]:
-    """Generate a detailed monthly expense report for a group."""
-    client = ctx.request_context.lifespan_context["client"]
+    """Generate a detailed monthly expense report for a group.
+
+    Pass a currency code (e.g. EUR) to convert every amount to it.
+    """
+    client = _client(ctx)
     try:
-        report = await custom_methods.monthly_report(client, group_name, month)
+        report = await custom_methods.monthly_report(
+            client, group_name, month, currency
+        )
 
         return report
     except Exception as exc:
@@ -532,6 +778,83 @@ async def generate_monthly_report(
         raise
 
 
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def generate_period_report(
+    start_date: str,
+    end_date: str,
+    ctx: Context,
+    granularity: str = const.DEFAULT_REPORT_GRANULARITY,
+    group_name: str | None = None,
+    currency: str | None = None,
+) -> dict[str, Any]:
+    """Generate an expense time series over a date range in one call.
+
+    Dates are inclusive (YYYY-MM-DD, or YYYY-MM for whole months);
+    granularity is day, week, month or quarter.  Omit group_name to cover
+    all groups.  Returns totals, counts and per-category and per-member
+    series aligned with the returned buckets.  Pass a currency code to
+    convert every amount to it.
+    """
+    client = _client(ctx)
+    try:
+        return await custom_methods.period_report(
+            client, start_date, end_date, granularity, group_name, currency
+        )
+    except Exception as exc:
+        with suppress(Exception):
+            log_operation(
+                "generate_period_report",
+                const.LOG_OP_API_ERROR,
+                {
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "granularity": granularity,
+                    "group_name": group_name,
+                },
+                {"error": str(exc)},
+            )
+        raise
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def compute_settlement_plan(
+    ctx: Context,
+    group_id: int | None = None,
+    group_name: str | None = None,
+    currency: str | None = None,
+) -> dict[str, Any]:
+    """Compute the fewest payments that settle a group's balances.
+
+    Pass group_id or group_name.  Returns ordered payments (who pays whom
+    and how much) per currency, computed from the current group balances.
+    Pass a currency code to convert all balances and settle in that
+    currency alone.
+    """
+    client = _client(ctx)
+    try:
+        if group_id is None:
+            if not group_name:
+                raise ValueError("Either group_id or group_name is required")
+            group_ref = await client.aget_group_by_name(group_name, fuzzy=False)
+            if not group_ref:
+                raise ValueError(f"Group '{group_name}' not found")
+            group_id = group_ref["id"]
+        group = await _call_client(ctx, const.METHOD_GET_GROUP, id=group_id) or {}
+        rates = None
+        if currency and balance_currencies(group) - {currency.strip().upper()}:
+            rates = await client.aexchange_rates()
+        return settlement_plan(group, currency=currency, rates=rates)
+    except Exception as exc:
+        with suppress(Exception):
+            log_operation(
+                "compute_settlement_plan",
+                const.LOG_OP_API_ERROR,
+                {"group_id": group_id, "group_name": group_name, "currency": currency},
+                {"error": str(exc)},
+            )
+        raise
+
+
 # MCP Tools for GET methods (read operations for testing compatibility)
 
 
@@ -542,15 +865,27 @@ async def get_current_user(ctx: Context) -> dict[str, Any]:
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
-async def list_groups(ctx: Context) -> dict[str, Any]:
-    """List all groups for the current user."""
-    return await _call_splitwise_tool(ctx, const.METHOD_LIST_GROUPS)
+async def list_groups(ctx: Context, fields: str | None = None) -> dict[str, Any]:
+    """List all groups for the current user.
+
+    Pass ``fields`` (e.g. "id,name,members.first_name") to return only
+    those attributes of each group.
+    """
+    return await _call_splitwise_tool(ctx, const.METHOD_LIST_GROUPS, fields=fields)
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
-async def get_group(group_id: int, ctx: Context) -> dict[str, Any]:
-    """Get information about a specific group."""
-    return await _call_splitwise_tool(ctx, const.METHOD_GET_GROUP, id=group_id)
+async def get_group(
+    group_id: int, ctx: Context, fields: str | None = None
+) -> dict[str, Any]:
+    """Get information about a specific group.
+
+    Pass ``fields`` (e.g. "name,members.id,simplified_debts") to return
+    only those attributes.
+    """
+    return await _call_splitwise_tool(
+        ctx, const.METHOD_GET_GROUP, fields=fields, id=group_id
+    )
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
@@ -562,8 +897,13 @@ async def list_expenses(
     dated_before: str | None = None,
     limit: int = 20,
     offset: int = 0,
+    fields: str | None = None,
 ) -> dict[str, Any]:
-    """List expenses with optional filters."""
+    """List expenses with optional filters.
+
+    Pass ``fields`` (e.g. "id,description,cost,date,users.user_id") to
+    return only those attributes of each expense.
+    """
     params: dict[str, Any] = {"limit": limit, "offset": offset}
     if group_id is not None:
         params["group_id"] = group_id
@@ -574,7 +914,9 @@ async def list_expenses(
     if dated_before is not None:
         params["dated_before"] = dated_before
 
-    return await _call_splitwise_tool(ctx, const.METHOD_LIST_EXPENSES, **params)
+    return await _call_splitwise_tool(
+        ctx, const.METHOD_LIST_EXPENSES, fields=fields, **params
+    )
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
@@ -616,18 +958,34 @@ async def get_exchange_rates(ctx: Context) -> dict[str, Any]:
 # Additional helper resources
 
 
+async def _group_by_name_json(ctx: Context, name: str) -> str:
+    """Resolve a group name through the group index and return its details."""
+    client = _client(ctx)
+    group = await client.aget_group_by_name(name)
+    if not group:
+        raise ValueError(f"Group '{name}' not found")
+    return await _call_splitwise_resource(ctx, const.METHOD_GET_GROUP, id=group["id"])
+
+
 @mcp.resource("splitwise://group/by_name/{name}")
 async def group_by_name_resource(name: str, ctx: Context) -> str:
     """Get group information by name as a resource."""
-    client = ctx.request_context.lifespan_context["client"]
     # URL decode the name in case it contains special characters
-    decoded_name = unquote(name)
-    group = client.get_group_by_name(decoded_name)
-    if not group:
-        raise ValueError(f"Group '{decoded_name}' not found")
+    return await _group_by_name_json(ctx, unquote(name))
+
 
-    converted = client.convert(group)
-    return json.dumps(converted)
+@mcp.resource("splitwise://stats")
+async def stats_resource(ctx: Context) -> str:
+    """Get server runtime counters (cache and coalescing) as a resource."""
+    lifespan_context = ctx.request_context.lifespan_context
+    stats = _client(ctx).stats()
+    pool = lifespan_context.get("pool")
+    stats["client_pool"] = pool.stats() if pool else None
+    flight = lifespan_context.get("singleflight")
+    stats["singleflight"] = flight.stats() if flight else None
+    monitor = lifespan_context.get("loop_monitor")
+    stats["loop_monitor"] = monitor.stats() if monitor else None
+    return json.dumps(stats)
 
 
 @mcp.resource("splitwise://group/{group_id}/expenses")
@@ -679,7 +1037,7 @@ def group_balance_prompt(group_name: str = "My Group") -> str:
 1. Get the group information using the group resource
 2. Show current balances for all members
 3. Calculate who owes money and who is owed money
-4. Suggest the minimum number of transactions to settle all debts
+4. Use the compute_settlement_plan tool to get the minimum number of transactions to settle all debts
 5. Provide clear payment instructions
 
 Focus on practical next steps for settling up the group expenses."""
@@ -710,6 +1068,18 @@ def run_mcp_server():
     port = int(os.environ.get("MCP_PORT", "8000"))
 
     if transport == "streamable-http":
+        workers = env_int(const.ENV_MCP_WORKERS, const.DEFAULT_MCP_WORKERS)
+        if workers > 1:
+            # One process per core, routed by session ID (see nginx.conf)
+            print(
+                f"Starting {workers} Splitwise MCP workers with Streamable HTTP "
+                f"transport on {host}:{port}-{port + workers - 1}"
+            )
+            sys.exit(
+                run_workers(
+                    workers, host, port, env_int(const.ENV_MCP_WORKER_OFFSET, 0)
+                )
+            )
         # Configure server settings for HTTP transport
         mcp.settings.host = host
         mcp.settings.port = port
@@ -0,0 +1,201 @@
+"""Per-group member lookup for resolving participant names.
+
+A `MemberIndex` is built once from a group's members and answers
+lookups by exact first or full name, id, email, normalized (case- and
+accent-insensitive) first or full name and finally by ranked fuzzy
+similarity.  `MemberIndexCache`
+keeps one index per group version so repeated resolutions against the
+same group reuse it.  Members may be SDK objects or converted dicts.
+"""
+
+from __future__ import annotations
+
+import difflib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+from . import constants as const
+from .group_index import normalize_name
+
+# Member fields the lookup tables are built from
+_VERSION_FIELDS = ("id", "first_name", "last_name", "email")
+
+
+def _field(obj: Any, name: str) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def name_key(name: str) -> str:
+    """Return a normalized, accent-insensitive lookup key for a person's name."""
+    decomposed = unicodedata.normalize("NFKD", normalize_name(name))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def group_members(group: Any) -> list[Any]:
+    """Return a group's members from either SDK objects or converted dicts."""
+    return list(_field(group, "members") or _field(group, "members_list") or [])
+
+
+def member_full_name(member: Any) -> str:
+    """Return a member's "first last" display name."""
+    return f"{_field(member, 'first_name') or ''} {_field(member, 'last_name') or ''}".strip()
+
+
+class MemberIndex:
+    """Lookup tables over one group's members.
+
+    Parameters
+    ----------
+    members: list
+        The group's members, in the group's order; earlier members win
+        when several match equally well.
+    fuzzy_cutoff: float
+        Minimum `difflib` similarity ratio for a fuzzy match.
+    """
+
+    def __init__(
+        self, members: list[Any], fuzzy_cutoff: float = const.MEMBER_NAME_FUZZY_CUTOFF
+    ) -> None:
+        self.members = members
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._exact: dict[str, Any] = {}
+        self._by_id: dict[str, Any] = {}
+        self._by_email: dict[str, Any] = {}
+        self._by_full: dict[str, Any] = {}
+        self._by_first: dict[str, Any] = {}
+        # (position, normalized full name, normalized first name)
+        self._names: list[tuple[int, str, str]] = []
+        for position, member in enumerate(members):
+            first = _field(member, "first_name")
+            full = member_full_name(member)
+            if isinstance(first, str):
+                self._exact.setdefault(first, member)
+            self._exact.setdefault(full, member)
+            member_id = _field(member, "id")
+            if member_id is not None:
+                self._by_id.setdefault(str(member_id), member)
+            email = _field(member, "email")
+            if isinstance(email, str) and email:
+                self._by_email.setdefault(email.casefold(), member)
+            full_key = name_key(full)
+            first_key = name_key(first) if isinstance(first, str) else ""
+            if full_key:
+                self._by_full.setdefault(full_key, member)
+            if first_key:
+                self._by_first.setdefault(first_key, member)
+            self._names.append((position, full_key, first_key))
+
+    def find(self, query: str, fuzzy: bool = True) -> Any:
+        """Return the best matching member, or None.
+
+        Exact first or full names win, then an id, an email address, a
+        normalized full name, a normalized first name and finally the
+        closest fuzzy match (see `rank`).
+        """
+        member = self._exact.get(query)
+        if member is not None:
+            return member
+        stripped = query.strip()
+        key = name_key(query)
+        for table, lookup in (
+            (self._by_id, stripped),
+            (self._by_email, stripped.casefold()),
+            (self._by_full, key),
+            (self._by_first, key),
+        ):
+            member = table.get(lookup)
+            if member is not None:
+                return member
+        if fuzzy:
+            ranked = self.rank(query, limit=1)
+            if ranked:
+                return ranked[0][0]
+        return None
+
+    def rank(self, query: str, limit: int = 5) -> list[tuple[Any, float]]:
+        """Return up to ``limit`` ``(member, score)`` pairs, best first.
+
+        Each member scores the higher `difflib` similarity of the query
+        against its full name and its first name; members below
+        ``fuzzy_cutoff`` are dropped.
+        """
+        key = name_key(query)
+        if not key:
+            return []
+        matcher = difflib.SequenceMatcher(b=key)
+        scored: list[tuple[float, int]] = []
+        for position, full_key, first_key in self._names:
+            best = 0.0
+            for candidate in (full_key, first_key):
+                if not candidate:
+                    continue
+                matcher.set_seq1(candidate)
+                if matcher.real_quick_ratio() < self.fuzzy_cutoff:
+                    continue
+                if matcher.quick_ratio() < self.fuzzy_cutoff:
+                    continue
+                best = max(best, matcher.ratio())
+            if best >= self.fuzzy_cutoff:
+                scored.append((best, position))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.members[position], score) for score, position in scored[:limit]]
+
+
+class MemberIndexCache:
+    """Bounded LRU of member indexes, one per group.
+
+    An index is reused while the group's version (``updated_at`` and
+    every member's id, names and email) is unchanged and rebuilt when it
+    changes, so a renamed or swapped member is never served from a stale
+    index.  Groups without an id are indexed on every call.
+    """
+
+    def __init__(self, max_groups: int = const.MAX_MEMBER_INDEXES) -> None:
+        self.max_groups = max_groups
+        self._lock = threading.Lock()
+        self._indexes: OrderedDict[Any, tuple[tuple[Any, ...], MemberIndex]] = (
+            OrderedDict()
+        )
+        self._hits = 0
+        self._builds = 0
+
+    def for_group(self, group: Any) -> MemberIndex:
+        """Return the member index for ``group``, building it if needed."""
+        members = group_members(group)
+        group_id = _field(group, "id")
+        if group_id is None:
+            return MemberIndex(members)
+        version = (
+            str(_field(group, "updated_at")),
+            *(
+                tuple(_field(member, name) for name in _VERSION_FIELDS)
+                for member in members
+            ),
+        )
+        with self._lock:
+            cached = self._indexes.get(group_id)
+            if cached is not None and cached[0] == version:
+                self._indexes.move_to_end(group_id)
+                self._hits += 1
+                return cached[1]
+        index = MemberIndex(members)
+        with self._lock:
+            self._builds += 1
+            self._indexes[group_id] = (version, index)
+            self._indexes.move_to_end(group_id)
+            while len(self._indexes) > self.max_groups:
+                self._indexes.popitem(last=False)
+        return index
+
+    def stats(self) -> dict[str, int]:
+        """Return cache size and hit/build counters."""
+        with self._lock:
+            return {
+                "groups": len(self._indexes),
+                "hits": self._hits,
+                "builds": self._builds,
+            }
@@ -0,0 +1,196 @@
+"""Exact money amounts in integer minor units.
+
+Splitwise sends amounts as decimal strings ("12.50").  `Money` keeps an
+amount as integer minor units plus its currency code, so sums are exact
+integer additions and totals do not depend on summation order.  The
+number of minor-unit digits follows ISO 4217 (`minor_exponent`): two for
+most currencies, none for JPY or KRW, three for BHD or KWD.  The helpers
+still say "cents" for the minor unit of any currency.  Amount
+strings are parsed with `Decimal` and memoized: the same few thousand
+distinct amounts recur across expense listings, so later parses are
+dictionary lookups.  `expense_money` reads an expense's cost and
+currency in one step.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any
+
+# Minor-unit digits of currencies that do not use two (ISO 4217)
+CURRENCY_EXPONENTS = {
+    **dict.fromkeys(
+        [
+            "BIF",
+            "CLP",
+            "DJF",
+            "GNF",
+            "ISK",
+            "JPY",
+            "KMF",
+            "KRW",
+            "PYG",
+            "RWF",
+            "UGX",
+            "UYI",
+            "VND",
+            "VUV",
+            "XAF",
+            "XOF",
+            "XPF",
+        ],
+        0,
+    ),
+    **dict.fromkeys(["BHD", "IQD", "JOD", "KWD", "LYD", "OMR", "TND"], 3),
+    **dict.fromkeys(["CLF", "UYW"], 4),
+}
+
+DEFAULT_EXPONENT = 2
+
+_ONE_CENT = Decimal(1)
+
+
+def normalize_currency(value: Any) -> str | None:
+    """Return an upper-case currency code, or None when missing."""
+    if isinstance(value, str) and value.strip():
+        return value.strip().upper()
+    return None
+
+
+def minor_exponent(currency: Any) -> int:
+    """Return the number of minor-unit digits of a currency (default 2)."""
+    code = normalize_currency(currency)
+    return CURRENCY_EXPONENTS.get(code, DEFAULT_EXPONENT) if code else DEFAULT_EXPONENT
+
+
+@lru_cache(maxsize=8192)
+def _parse_minor(text: str, exponent: int) -> int:
+    try:
+        amount = Decimal(text.strip()).scaleb(exponent)
+        return int(amount.quantize(_ONE_CENT, rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, OverflowError):
+        return 0
+
+
+def to_cents(value: Any, currency: Any = None) -> int:
+    """Convert a cost (string, int or float) to integer minor units.
+
+    Amounts are rounded half-up to the currency's minor unit (see
+    `minor_exponent`); missing or unparseable values count as zero.
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    exponent = minor_exponent(currency)
+    if isinstance(value, int):
+        return value * 10**exponent
+    return _parse_minor(str(value), exponent)
+
+
+def from_cents(cents: int, currency: Any = None) -> float:
+    """Convert integer minor units back to a float amount."""
+    return cents / 10 ** minor_exponent(currency)
+
+
+def format_cents(cents: int, currency: Any = None) -> str:
+    """Format minor units with the currency's decimals ("-12.05", "1200")."""
+    exponent = minor_exponent(currency)
+    sign = "-" if cents < 0 else ""
+    whole, part = divmod(abs(cents), 10**exponent)
+    if not exponent:
+        return f"{sign}{whole}"
+    return f"{sign}{whole}.{part:0{exponent}d}"
+
+
+def rescale_cents(cents: int, source: Any, target: Any) -> int:
+    """Re-express minor units of ``source``'s precision in ``target``'s.
+
+    Dropped digits are rounded half away from zero.
+    """
+    shift = minor_exponent(target) - minor_exponent(source)
+    if shift >= 0:
+        return cents * 10**shift
+    whole, part = divmod(abs(cents), 10**-shift)
+    rounded = whole + (2 * part >= 10**-shift)
+    return -rounded if cents < 0 else rounded
+
+
+@dataclass(frozen=True, slots=True)
+class Money:
+    """An amount of one currency in integer minor units.
+
+    Parameters
+    ----------
+    cents: int
+        The amount in minor units of the currency (hundredths for most,
+        see `minor_exponent`).
+    currency: str
+        Upper-case currency code, or None when unknown.  Amounts without
+        a currency have two decimals and combine with amounts of any
+        currency, rescaled to its minor unit.
+    """
+
+    cents: int
+    currency: str | None = None
+
+    @classmethod
+    def parse(cls, amount: Any, currency: Any = None) -> Money:
+        """Build from an amount string or number and a currency code."""
+        currency = normalize_currency(currency)
+        return cls(to_cents(amount, currency), currency)
+
+    def _combined(self, other: Money) -> tuple[str | None, int, int]:
+        if self.currency and other.currency and self.currency != other.currency:
+            raise ValueError(
+                f"Cannot combine {self.currency} and {other.currency} amounts"
+            )
+        currency = self.currency or other.currency
+        return (
+            currency,
+            rescale_cents(self.cents, self.currency, currency),
+            rescale_cents(other.cents, other.currency, currency),
+        )
+
+    def __add__(self, other: Money) -> Money:
+        if not isinstance(other, Money):
+            return NotImplemented
+        currency, left, right = self._combined(other)
+        return Money(left + right, currency)
+
+    def __radd__(self, other: Any) -> Money:
+        # Lets the built-in sum() start from 0
+        if other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other: Money) -> Money:
+        if not isinstance(other, Money):
+            return NotImplemented
+        currency, left, right = self._combined(other)
+        return Money(left - right, currency)
+
+    def __neg__(self) -> Money:
+        return Money(-self.cents, self.currency)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __str__(self) -> str:
+        return format_cents(self.cents, self.currency)
+
+    @property
+    def amount(self) -> Decimal:
+        """Return the exact decimal amount."""
+        return Decimal(self.cents).scaleb(-minor_exponent(self.currency))
+
+    def to_float(self) -> float:
+        """Return the amount as a float, for JSON reports."""
+        return from_cents(self.cents, self.currency)
+
+
+def expense_money(expense: dict[str, Any]) -> Money:
+    """Return an expense's cost (or ``amount``) with its currency."""
+    return Money.parse(
+        expense.get("cost") or expense.get("amount"), expense.get("currency_code")
+    )
@@ -0,0 +1,280 @@
+"""Client-side rate limiting and 429 handling for Splitwise calls.
+
+Every upstream call of a `SplitwiseClient` passes through its
+`RateLimitScheduler`: a token bucket sized for one credential's request
+budget, drained by priority lane.  Interactive reads are served first,
+then writes, then background work (replica sync, index rebuilds), so a
+long sync cannot starve a user's request.  When Splitwise answers 429
+the scheduler pauses the whole bucket for the ``Retry-After`` time, so
+concurrent callers wait instead of producing a storm of further 429s.
+Idempotent reads are retried after rate limits and transient server
+errors with jittered exponential backoff; writes are not retried here
+and surface the error (callers such as the batch writer retry them
+under their own idempotency keys).
+
+Background tasks mark their calls with ``with background_lane():``;
+other calls are interactive reads or writes by method.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from . import constants as const
+from .executor import ExecutorSaturatedError
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator
+
+T = TypeVar("T")
+
+logger = logging.getLogger("splitwise_mcp")
+
+LANE_INTERACTIVE = 0
+LANE_WRITE = 1
+LANE_BACKGROUND = 2
+LANE_NAMES = ("interactive", "write", "background")
+
+# Server errors worth retrying for idempotent reads
+_TRANSIENT_STATUSES = frozenset({500, 502, 503, 504})
+
+_lane: contextvars.ContextVar[int | None] = contextvars.ContextVar(
+    "splitwise_lane", default=None
+)
+
+
+@contextmanager
+def background_lane() -> Iterator[None]:
+    """Schedule the calls made inside the block in the background lane."""
+    token = _lane.set(LANE_BACKGROUND)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def _status(exc: BaseException) -> int | None:
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is None:
+        status = getattr(exc, "http_status", None)
+        # SplitwiseException stores ``(status,)`` (a stray trailing comma)
+        if isinstance(status, tuple):
+            status = status[0] if status else None
+    return status if isinstance(status, int) else None
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Return the wait a rate-limited (429) error asks for, or None.
+
+    The ``Retry-After`` header is read from the exception's response or
+    the SDK's copy of its headers; a 429 without a usable header gives 0.
+    """
+    if _status(exc) != 429:
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or getattr(
+        exc, "http_headers", None
+    )
+    try:
+        return max(0.0, float((headers or {}).get("Retry-After")))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return a jittered exponential delay for retry number ``attempt``."""
+    ceiling = min(
+        const.RATE_LIMIT_BACKOFF_MAX, const.RATE_LIMIT_BACKOFF_BASE * 2**attempt
+    )
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class RateLimitScheduler:
+    """Token bucket with priority lanes for one credential.
+
+    Parameters
+    ----------
+    rate: float
+        Tokens (requests) added per second; 0 disables limiting.
+    burst: int
+        Bucket capacity, i.e. requests allowed back to back after a pause.
+    clock: callable
+        Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        rate: float = const.DEFAULT_RATE_LIMIT,
+        burst: int = const.DEFAULT_RATE_LIMIT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+        self._granted = [0, 0, 0]
+        self._throttled = 0
+        self._retries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def lane_for(self, method_name: str) -> int:
+        """Return the lane of a call made in the current context."""
+        lane = _lane.get()
+        if lane is not None:
+            return lane
+        return LANE_INTERACTIVE if method_name in const.READ_METHODS else LANE_WRITE
+
+    # Token bucket
+
+    def _refill(self, now: float) -> None:
+        # Nothing accrues during a 429 pause, so calls resume gradually
+        elapsed = max(0.0, now - max(self._updated, self._paused_until))
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _try_take(self) -> bool:
+        now = self._clock()
+        if now < self._paused_until:
+            return False
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _delay(self) -> float:
+        now = self._clock()
+        self._refill(now)
+        refill = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+        return max(self._paused_until - now, refill, 0.0)
+
+    def _schedule(self) -> None:
+        if self._waiters and self._wakeup is None:
+            loop = asyncio.get_running_loop()
+            self._wakeup = loop.call_later(self._delay(), self._dispatch)
+
+    def _dispatch(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._waiters:
+            lane, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take():
+                break
+            heapq.heappop(self._waiters)
+            self._granted[lane] += 1
+            future.set_result(None)
+        if self._waiters:
+            self._schedule()
+
+    async def acquire(self, lane: int = LANE_INTERACTIVE) -> None:
+        """Wait for a token; lower lanes are served first, FIFO within one."""
+        if not self.enabled:
+            return
+        if not self._waiters and self._try_take():
+            self._granted[lane] += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), future))
+        self._throttled += 1
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before cancellation: hand the token back
+                self._tokens = min(self.capacity, self._tokens + 1)
+                self._dispatch()
+            raise
+
+    def penalize(self, seconds: float) -> None:
+        """Pause the bucket after a 429 and drop the remaining budget."""
+        now = self._clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._refill(now)
+        self._tokens = 0.0
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._schedule()
+
+    # Calls
+
+    async def call(self, method_name: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run one upstream call under the budget, retrying idempotent reads."""
+        lane = self.lane_for(method_name)
+        idempotent = method_name in const.READ_METHODS
+        attempt = 0
+        while True:
+            await self.acquire(lane)
+            try:
+                return await fn()
+            except ExecutorSaturatedError:
+                # A full local executor is not the upstream's rate limit;
+                # fail fast instead of queueing more work behind it
+                raise
+            except Exception as exc:
+                limited = retry_after_seconds(exc)
+                if limited is not None:
+                    self.penalize(max(limited, backoff_delay(attempt)))
+                    logger.warning(
+                        f"RATE LIMIT: {method_name} got 429; pausing calls "
+                        f"for {self._delay():.1f}s"
+                    )
+                retryable = limited is not None or _status(exc) in _TRANSIENT_STATUSES
+                if (
+                    not idempotent
+                    or not retryable
+                    or attempt >= const.RATE_LIMIT_MAX_RETRIES
+                ):
+                    raise
+                attempt += 1
+                self._retries += 1
+                if limited is None:
+                    # The bucket pause already delays retries after a 429
+                    wait = max(limited or 0.0, backoff_delay(attempt - 1))
+                    logger.info(
+                        f"RATE LIMIT: retrying {method_name} in {wait:.1f}s "
+                        f"(attempt {attempt})"
+                    )
+                    await asyncio.sleep(wait)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the current budget and per-lane counters."""
+        if not self.enabled:
+            return {"enabled": False}
+        now = self._clock()
+        self._refill(now)
+        waiting = [0, 0, 0]
+        for lane, _, future in self._waiters:
+            if not future.done():
+                waiting[lane] += 1
+        return {
+            "enabled": True,
+            "rate": self.rate,
+            "burst": self.capacity,
+            "tokens": round(self._tokens, 2),
+            "paused_for": round(max(0.0, self._paused_until - now), 2),
+            "waiting": dict(zip(LANE_NAMES, waiting, strict=True)),
+            "granted": dict(zip(LANE_NAMES, self._granted, strict=True)),
+            "throttled": self._throttled,
+            "retries": self._retries,
+        }
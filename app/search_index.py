@@ -0,0 +1,441 @@
+"""Local full-text index backing the `search` tool.
+
+The index covers group names, friend names and expense descriptions and
+notes across the whole expense history.  Terms are tokenized after
+Unicode normalization and case folding; a query token matches a term
+exactly, as a prefix, or as a substring (found through a trigram index),
+and documents are ranked with BM25.  The index is built once in the
+background and then maintained incrementally:
+
+* with the expense replica enabled (:mod:`app.expense_sync`), the first
+  build reads the replica and every page the replica syncs afterwards is
+  applied to the index as it arrives;
+* without it, the first build pages through the expense history once and
+  later refreshes fetch only expenses updated since the previous one
+  (including deletions);
+* groups and friends are small listings and are re-read on refresh, and
+  the results of write methods are applied as they happen.
+
+The index lives in process memory only.  Every server process, and every
+tenant client in it, builds its own copy when it starts; with a
+file-backed replica that first build reads the local replica rather
+than Splitwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .expense_sync import WATERMARK_OVERLAP
+from .rate_limit import background_lane
+from .utils import written_objects
+
+if TYPE_CHECKING:
+    from .splitwise_client import SplitwiseClient
+
+logger = logging.getLogger("splitwise_mcp")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Score multipliers for the different ways a query token can match a term
+_EXACT_WEIGHT = 1.0
+_PREFIX_WEIGHT = 0.75
+_INFIX_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into normalized, case-folded word tokens."""
+    return _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def _trigrams(term: str) -> set[str]:
+    return {term[i : i + 3] for i in range(len(term) - 2)}
+
+
+def group_result(group: dict[str, Any]) -> dict[str, str]:
+    """Format a group as a search result."""
+    return {
+        "id": f"group_{group.get('id')}",
+        "title": f"Group: {group.get('name')}",
+        "url": f"splitwise://group/{group.get('id')}",
+    }
+
+
+def expense_result(expense: dict[str, Any]) -> dict[str, str]:
+    """Format an expense as a search result."""
+    desc = str(expense.get("description", ""))
+    return {
+        "id": f"expense_{expense.get('id')}",
+        "title": f"Expense: {desc} - ${expense.get('cost', 0)}",
+        "url": f"splitwise://expense/{expense.get('id')}",
+    }
+
+
+def friend_name(friend: dict[str, Any]) -> str:
+    """Return a friend's display name."""
+    return f"{friend.get('first_name', '')} {friend.get('last_name', '')}".strip()
+
+
+def friend_result(friend: dict[str, Any]) -> dict[str, str]:
+    """Format a friend as a search result."""
+    return {
+        "id": f"friend_{friend.get('id')}",
+        "title": f"Friend: {friend_name(friend)}",
+        "url": f"splitwise://friend/{friend.get('id')}",
+    }
+
+
+class SearchIndex:
+    """Thread-safe inverted index with prefix/substring matching and BM25."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self._doc_terms: dict[str, Counter[str]] = {}
+        self._doc_len: dict[str, int] = {}
+        self._results: dict[str, dict[str, str]] = {}
+        self._order: dict[str, int] = {}
+        self._prefixes: dict[str, set[str]] = defaultdict(set)
+        self._trigrams: dict[str, set[str]] = defaultdict(set)
+        self._total_len = 0
+        self._seq = 0
+        self.built_at: float | None = None
+        self._stale = False
+        self._refresh_task: asyncio.Task[None] | None = None
+        # Upstream ``updated_after`` of the next delta refresh (no replica)
+        self._watermark: str | None = None
+        # Replica changes arriving while the initial build is running
+        self._pending: list[dict[str, Any]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    @property
+    def ready(self) -> bool:
+        """True once the index has been built at least once."""
+        return self.built_at is not None
+
+    def needs_refresh(self, max_age: float) -> bool:
+        """Return True when the index was never built or is older than ``max_age``."""
+        if self.built_at is None or self._stale:
+            return True
+        return time.monotonic() - self.built_at > max_age
+
+    # Document maintenance
+
+    def upsert(self, doc_id: str, text: str, result: dict[str, str]) -> None:
+        """Add or replace a document."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, tf in terms.items():
+                if term not in self._postings:
+                    self._register_term(term)
+                self._postings[term][doc_id] = tf
+            length = sum(terms.values())
+            self._doc_terms[doc_id] = terms
+            self._doc_len[doc_id] = length
+            self._total_len += length
+            self._results[doc_id] = result
+            self._order[doc_id] = self._seq
+            self._seq += 1
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document if present."""
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def add_group(self, group: dict[str, Any]) -> None:
+        self.upsert(
+            f"group_{group.get('id')}", str(group.get("name", "")), group_result(group)
+        )
+
+    def add_expense(self, expense: dict[str, Any]) -> None:
+        if expense.get("deleted_at"):
+            self.remove(f"expense_{expense.get('id')}")
+            return
+        text = f"{expense.get('description') or ''} {expense.get('details') or ''}"
+        self.upsert(f"expense_{expense.get('id')}", text, expense_result(expense))
+
+    def add_friend(self, friend: dict[str, Any]) -> None:
+        self.upsert(
+            f"friend_{friend.get('id')}", friend_name(friend), friend_result(friend)
+        )
+
+    def rebuild(
+        self,
+        groups: list[dict[str, Any]],
+        expenses: list[dict[str, Any]],
+        friends: list[dict[str, Any]],
+    ) -> None:
+        """Replace the whole index contents."""
+        fresh = SearchIndex(self.k1, self.b)
+        for group in groups:
+            fresh.add_group(group)
+        for expense in expenses:
+            fresh.add_expense(expense)
+        for friend in friends:
+            fresh.add_friend(friend)
+        with self._lock:
+            for name in (
+                "_postings",
+                "_doc_terms",
+                "_doc_len",
+                "_results",
+                "_order",
+                "_prefixes",
+                "_trigrams",
+                "_total_len",
+                "_seq",
+            ):
+                setattr(self, name, getattr(fresh, name))
+            self.built_at = time.monotonic()
+            self._stale = False
+
+    def replace_entities(
+        self, groups: list[dict[str, Any]], friends: list[dict[str, Any]]
+    ) -> None:
+        """Replace the indexed groups and friends, keeping the expenses."""
+        current = {f"group_{group.get('id')}" for group in groups}
+        current.update(f"friend_{friend.get('id')}" for friend in friends)
+        with self._lock:
+            for doc_id in list(self._doc_terms):
+                if doc_id.startswith(("group_", "friend_")) and doc_id not in current:
+                    self._remove_locked(doc_id)
+            for group in groups:
+                self.add_group(group)
+            for friend in friends:
+                self.add_friend(friend)
+            self.built_at = time.monotonic()
+            self._stale = False
+
+    def apply_expenses(self, expenses: list[dict[str, Any]]) -> None:
+        """Apply changed expenses, e.g. a page synced by the replica.
+
+        Before the first build has finished the changes are held back and
+        applied on top of it, so they are not lost in the swap.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.extend(expenses)
+                return
+            if not self.ready:
+                return
+            for expense in expenses:
+                self.add_expense(expense)
+
+    def apply_write(
+        self, method_name: str, kwargs: dict[str, Any], result: Any
+    ) -> None:
+        """Keep the index current after a successful write method."""
+        if method_name in (const.METHOD_CREATE_EXPENSE, const.METHOD_UPDATE_EXPENSE):
+            for expense in written_objects(result):
+                self.add_expense(expense)
+        elif method_name == const.METHOD_DELETE_EXPENSE:
+            self.remove(f"expense_{kwargs.get('id')}")
+        elif method_name == const.METHOD_CREATE_GROUP:
+            for group in written_objects(result):
+                self.add_group(group)
+        elif method_name == const.METHOD_DELETE_GROUP:
+            self.remove(f"group_{kwargs.get('id')}")
+        elif method_name in (const.METHOD_CREATE_FRIEND, const.METHOD_CREATE_FRIENDS):
+            for friend in written_objects(result):
+                self.add_friend(friend)
+        elif method_name == const.METHOD_DELETE_FRIEND:
+            self.remove(f"friend_{kwargs.get('id')}")
+        elif method_name in (
+            const.METHOD_UNDELETE_EXPENSE,
+            const.METHOD_UNDELETE_GROUP,
+            const.METHOD_UPDATE_USER,
+        ):
+            # The response does not carry the restored object; rebuild soon.
+            self._stale = True
+
+    # Querying
+
+    def search(
+        self, query: str, limit: int = const.SEARCH_MAX_RESULTS
+    ) -> list[dict[str, str]]:
+        """Return the best matching results for ``query``.
+
+        Every query token has to match (exactly, as a prefix or as a
+        substring) for a document to be returned.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            scores: dict[str, float] | None = None
+            for token in dict.fromkeys(tokens):
+                token_scores = self._score_token(token)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        doc_id: score + token_scores[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in token_scores
+                    }
+                if not scores:
+                    return []
+            ranked = sorted(
+                scores.items(), key=lambda item: (-item[1], self._order[item[0]])
+            )
+            return [dict(self._results[doc_id]) for doc_id, _ in ranked[:limit]]
+
+    def _score_token(self, token: str) -> dict[str, float]:
+        candidates: dict[str, float] = {}
+        for term in (
+            self._prefixes.get(token[:2], ()) if len(token) >= 2 else self._postings
+        ):
+            if term == token:
+                candidates[term] = _EXACT_WEIGHT
+            elif term.startswith(token):
+                candidates[term] = _PREFIX_WEIGHT
+        if len(token) >= 3:
+            grams = [self._trigrams.get(gram, set()) for gram in _trigrams(token)]
+            for term in set.intersection(*grams) if grams else ():
+                if term not in candidates and token in term:
+                    candidates[term] = _INFIX_WEIGHT
+
+        n_docs = len(self._doc_terms)
+        avg_len = self._total_len / n_docs if n_docs else 0.0
+        scores: dict[str, float] = defaultdict(float)
+        for term, weight in candidates.items():
+            postings = self._postings[term]
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = 1 - self.b + self.b * self._doc_len[doc_id] / (avg_len or 1.0)
+                score = weight * idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+                # Keep the best variant per document rather than summing them
+                scores[doc_id] = max(scores[doc_id], score)
+        return scores
+
+    def _register_term(self, term: str) -> None:
+        if len(term) >= 2:
+            self._prefixes[term[:2]].add(term)
+        for gram in _trigrams(term):
+            self._trigrams[gram].add(term)
+
+    def _unregister_term(self, term: str) -> None:
+        del self._postings[term]
+        if len(term) >= 2:
+            self._prefixes[term[:2]].discard(term)
+        for gram in _trigrams(term):
+            self._trigrams[gram].discard(term)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                self._unregister_term(term)
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._results[doc_id]
+        del self._order[doc_id]
+
+    # Background maintenance
+
+    def schedule_refresh(self, client: SplitwiseClient) -> None:
+        """Refresh the index in the background unless a refresh is running."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh(client))
+
+    async def _refresh(self, client: SplitwiseClient) -> None:
+        started = time.perf_counter()
+        initial = not self.ready
+        try:
+            with background_lane():
+                groups, friends = await asyncio.gather(
+                    client.acall_mapped_method(const.METHOD_LIST_GROUPS),
+                    client.acall_mapped_method(const.METHOD_LIST_FRIENDS),
+                )
+                if client.expense_sync is not None:
+                    changed = await self._refresh_from_replica(
+                        client, groups or [], friends or []
+                    )
+                else:
+                    changed = await self._refresh_from_upstream(
+                        client, groups or [], friends or []
+                    )
+            action = "built" if initial else "refreshed"
+            logger.info(
+                f"SEARCH INDEX: {action} with {len(self)} documents "
+                f"({changed} expenses applied) in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+        except Exception as exc:
+            logger.error(f"SEARCH INDEX: refresh failed: {exc}")
+
+    async def _refresh_from_replica(
+        self,
+        client: SplitwiseClient,
+        groups: list[dict[str, Any]],
+        friends: list[dict[str, Any]],
+    ) -> int:
+        # Later changes reach the index through the replica's listener
+        sync = client.expense_sync
+        assert sync is not None
+        if self.ready:
+            changed = await sync.refresh()
+            self.replace_entities(groups, friends)
+            return changed
+        if not sync.has_baseline():
+            await sync.refresh(force=True)
+        with self._lock:
+            self._pending = []
+        try:
+            expenses = await asyncio.to_thread(sync.store.query, visible=True, limit=0)
+            # Tokenizing every document is CPU work; the swap is brief
+            await asyncio.to_thread(self.rebuild, groups, expenses, friends)
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending or [], None
+        self.apply_expenses(pending)
+        return len(expenses) + len(pending)
+
+    async def _refresh_from_upstream(
+        self,
+        client: SplitwiseClient,
+        groups: list[dict[str, Any]],
+        friends: list[dict[str, Any]],
+    ) -> int:
+        # Overlap the previous refresh so edits made while it ran are kept
+        since = datetime.now(UTC) - WATERMARK_OVERLAP
+        if self._watermark is None:
+            expenses = await _fetch_expenses(client, visible=True)
+            await asyncio.to_thread(self.rebuild, groups, expenses, friends)
+        else:
+            # Without ``visible`` deleted expenses arrive with ``deleted_at``
+            expenses = await _fetch_expenses(client, updated_after=self._watermark)
+            await asyncio.to_thread(self.apply_expenses, expenses)
+            self.replace_entities(groups, friends)
+        self._watermark = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return len(expenses)
+
+
+async def _fetch_expenses(
+    client: SplitwiseClient, **filters: Any
+) -> list[dict[str, Any]]:
+    return [
+        expense
+        async for expense in client.iter_expenses(
+            page_size=const.DEFAULT_SEARCH_INDEX_PAGE_SIZE, **filters
+        )
+    ]
@@ -0,0 +1,140 @@
+"""JSON encoding of Splitwise SDK objects without an intermediate dict tree.
+
+`to_json` serializes SDK model objects directly: the encoder asks
+`_default` for each object it cannot encode natively and gets back a
+shallow mapping of that object's public attributes, so children are
+encoded as they are reached and a fully converted copy of a large listing
+is never built.  ``orjson`` is used when it is installed; otherwise the
+standard library's C encoder is used.  Output matches
+``json.dumps(object_to_dict(obj))`` apart from whitespace and escaping:
+non-ASCII text is emitted as UTF-8 by both backends, and output is
+compact unless ``indent=2`` is requested (as the `fetch` tool does to
+keep its original indented text).  Resources are served compact, which
+is what lets a cached response be returned as stored.
+
+`parse_fields` and `project` implement field projection: only the
+selected attributes are visited and converted.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from .utils import object_to_dict, public_attributes
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# Parsed field selection: each key maps to a nested selection, or to None
+# to keep the whole subtree.
+FieldSpec = dict[str, "FieldSpec | None"]
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def orjson_available() -> bool:
+    """Return True when the optional ``orjson`` backend is installed."""
+    return orjson is not None
+
+
+def _default(obj: Any) -> Any:
+    """Encoder hook for values JSON has no native representation for."""
+    if isinstance(obj, (set, tuple)):
+        return list(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "__dict__"):
+        return public_attributes(obj)
+    return str(obj)
+
+
+def to_json(
+    obj: Any,
+    fields: FieldSpec | None = None,
+    use_orjson: bool | None = None,
+    indent: int | None = None,
+) -> str:
+    """Serialize SDK objects (or converted data) to a JSON string.
+
+    Parameters
+    ----------
+    obj: Any
+        SDK model objects, or lists/dicts of them.
+    fields: FieldSpec | None
+        Optional projection from `parse_fields`; only selected attributes
+        are converted.
+    use_orjson: bool | None
+        Force the backend on or off; ``None`` uses orjson when installed.
+    indent: int | None
+        Indent nested levels by this many spaces; compact when ``None``.
+        orjson only supports an indent of 2.
+    """
+    if fields is not None:
+        obj = project(obj, fields)
+    if orjson is not None and use_orjson is not False and indent in (None, 2):
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=option).decode()
+    if indent is not None:
+        return json.dumps(obj, default=_default, indent=indent, ensure_ascii=False)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def parse_fields(fields: str | Iterable[str] | None) -> FieldSpec | None:
+    """Parse a field selection such as ``"id,cost,users.first_name"``.
+
+    Paths are dot-separated; selecting a parent (``"users"``) keeps its
+    whole subtree.  Returns None when nothing is selected.
+    """
+    if fields is None:
+        return None
+    paths = fields.split(",") if isinstance(fields, str) else list(fields)
+    spec: FieldSpec = {}
+    for path in paths:
+        parts = [part.strip() for part in path.strip().split(".")]
+        if not all(parts):
+            continue
+        node: FieldSpec = spec
+        for depth, part in enumerate(parts):
+            leaf = depth == len(parts) - 1
+            if part in node and node[part] is None:
+                # The parent is already selected in full
+                break
+            if leaf:
+                node[part] = None
+            else:
+                child = node.get(part)
+                if child is None:
+                    child = node[part] = {}
+                node = child
+    return spec or None
+
+
+def project(obj: Any, fields: FieldSpec) -> Any:
+    """Convert ``obj`` keeping only the selected fields.
+
+    Lists are projected item by item; objects and dicts keep the selected
+    keys that exist, in selection order.  Unselected attributes are never
+    converted.
+    """
+    if isinstance(obj, (list, tuple, set)):
+        return [project(item, fields) for item in obj]
+    if isinstance(obj, dict):
+        source = obj
+    elif hasattr(obj, "__dict__") and not isinstance(obj, datetime):
+        source = public_attributes(obj)
+    else:
+        return object_to_dict(obj)
+    result: dict[str, Any] = {}
+    for name, child in fields.items():
+        if name not in source:
+            continue
+        value = source[name]
+        result[name] = object_to_dict(value) if child is None else project(value, child)
+    return result
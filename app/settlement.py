@@ -0,0 +1,203 @@
+"""Minimal settle-up plans from group balances.
+
+`settle` turns per-member net balances (in integer cents, positive when
+the member is owed money) into a list of transfers that clears them.
+Small groups are solved exactly: the number of transfers needed is the
+member count minus the largest number of disjoint zero-sum subsets,
+found with a subset dynamic program.  Larger groups use greedy
+heap-based matching of the largest debtor with the largest creditor,
+which needs at most ``members - 1`` transfers.  Ties are broken by
+member id so plans are deterministic.  Balances in several currencies
+can be restated in one currency first, using a `RateTable` from
+:mod:`app.currency`, so a group settles with a single set of payments.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .member_index import group_members, member_full_name
+from .money import Money, format_cents
+
+if TYPE_CHECKING:
+    from .currency import RateTable
+
+Transfer = tuple[int, int, int]  # (payer id, payee id, cents)
+
+
+def _greedy(balances: list[tuple[int, int]]) -> list[Transfer]:
+    """Match largest debtor with largest creditor until all are settled."""
+    creditors = [(-cents, member) for member, cents in balances if cents > 0]
+    debtors = [(cents, member) for member, cents in balances if cents < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+    transfers: list[Transfer] = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((debtor, creditor, amount))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+    return transfers
+
+
+def _zero_sum_groups(balances: list[tuple[int, int]]) -> list[list[tuple[int, int]]]:
+    """Split balances into the most disjoint zero-sum groups (exact)."""
+    count = len(balances)
+    full = (1 << count) - 1
+    sums = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + balances[low.bit_length() - 1][1]
+    best = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        value = 0
+        bits = mask
+        while bits:
+            low = bits & -bits
+            value = max(value, best[mask ^ low])
+            bits ^= low
+        best[mask] = value + (sums[mask] == 0)
+
+    # Walk back from the full set; each zero-sum mask closes a group
+    groups: list[list[tuple[int, int]]] = []
+    current: list[tuple[int, int]] = []
+    mask = full
+    while mask:
+        target = best[mask] - (sums[mask] == 0)
+        bits = mask
+        while bits:
+            low = bits & -bits
+            if best[mask ^ low] == target:
+                break
+            bits ^= low
+        current.append(balances[low.bit_length() - 1])
+        mask ^= low
+        if sums[mask] == 0:
+            groups.append(current)
+            current = []
+    return groups
+
+
+def settle(
+    balances: dict[int, int],
+    exact_max_members: int = const.EXACT_SETTLEMENT_MAX_MEMBERS,
+) -> tuple[list[Transfer], str]:
+    """Return ``(transfers, method)`` clearing the given balances.
+
+    ``balances`` maps member id to cents and must sum to zero.
+    ``method`` is ``"exact"`` when the subset solver was used (at most
+    ``exact_max_members`` non-zero balances) and ``"greedy"`` otherwise.
+    """
+    if sum(balances.values()) != 0:
+        raise ValueError("Balances must sum to zero")
+    nonzero = sorted(
+        (member, cents) for member, cents in balances.items() if cents != 0
+    )
+    if len(nonzero) > exact_max_members:
+        return _greedy(nonzero), "greedy"
+    transfers: list[Transfer] = []
+    for group in _zero_sum_groups(nonzero):
+        transfers.extend(_greedy(sorted(group)))
+    return transfers, "exact"
+
+
+def _member_balances(member: Any) -> list[Any]:
+    if isinstance(member, dict):
+        return member.get("balances") or member.get("balance") or []
+    return getattr(member, "balances", None) or getattr(member, "balance", None) or []
+
+
+def _balance_money(balance: Any) -> Money:
+    if isinstance(balance, dict):
+        return Money.parse(balance.get("amount"), balance.get("currency_code"))
+    return Money.parse(balance.amount, balance.currency_code)
+
+
+def balance_currencies(group: dict[str, Any]) -> set[str]:
+    """Return the currency codes of a group's non-zero member balances."""
+    return {
+        money.currency
+        for member in group_members(group)
+        for money in map(_balance_money, _member_balances(member))
+        if money.currency and money
+    }
+
+
+def settlement_plan(
+    group: dict[str, Any],
+    exact_max_members: int = const.EXACT_SETTLEMENT_MAX_MEMBERS,
+    currency: str | None = None,
+    rates: RateTable | None = None,
+) -> dict[str, Any]:
+    """Build a per-currency settle-up plan from a converted ``get_group``.
+
+    Given a ``currency`` code, every balance is converted to it with
+    ``rates`` (required when other currencies are present) and the plan
+    has a single currency.
+
+    Payments are ordered largest first within each currency.  If rounding
+    leaves a currency's balances a few cents off zero, the difference is
+    taken off the largest balance on the heavier side and reported as
+    ``unbalanced``.
+    """
+    target = currency.strip().upper() if currency else None
+    names: dict[int, str] = {}
+    by_currency: dict[str, dict[int, int]] = {}
+    for member in group_members(group):
+        member_id = member.get("id") if isinstance(member, dict) else member.id
+        if member_id is None:
+            continue
+        member_id = int(member_id)
+        names[member_id] = member_full_name(member)
+        for balance in _member_balances(member):
+            money = _balance_money(balance)
+            code, cents = money.currency, money.cents
+            if code and cents and target is not None and code != target:
+                if rates is None:
+                    raise ValueError(f"Exchange rates are needed to convert {code}")
+                cents = rates.convert_cents(cents, code, target)
+                code = target
+            if code and cents:
+                balances = by_currency.setdefault(code, {})
+                balances[member_id] = balances.get(member_id, 0) + cents
+
+    currencies: dict[str, Any] = {}
+    for code in sorted(by_currency):
+        balances = by_currency[code]
+        residual = sum(balances.values())
+        if residual:
+            heavier = max(
+                (m for m, c in balances.items() if (c > 0) == (residual > 0)),
+                key=lambda m: (abs(balances[m]), -m),
+            )
+            balances[heavier] -= residual
+        transfers, method = settle(balances, exact_max_members)
+        transfers.sort(key=lambda t: (-t[2], t[0], t[1]))
+        currencies[code] = {
+            "method": method,
+            "transfers": len(transfers),
+            "unbalanced": format_cents(residual, code) if residual else None,
+            "payments": [
+                {
+                    "from": payer,
+                    "from_name": names.get(payer),
+                    "to": payee,
+                    "to_name": names.get(payee),
+                    "amount": format_cents(cents, code),
+                }
+                for payer, payee, cents in transfers
+            ],
+        }
+    return {
+        "group_id": group.get("id"),
+        "group_name": group.get("name"),
+        "simplify_by_default": group.get("simplify_by_default"),
+        "currency": target,
+        "currencies": currencies,
+    }
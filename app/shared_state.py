@@ -0,0 +1,441 @@
+"""Response cache and request coalescing shared by server processes.
+
+A single server process keeps its response cache and single-flight group
+in memory, so several processes (uvicorn workers, containers) would each
+fetch and cache the same data, and a write on one would leave the others
+serving stale reads.  With ``SPLITWISE_SHARED_STATE_URL`` set, cacheable
+reads go through a shared backend instead:
+
+* responses are stored per tenant and method, so a read fetched by one
+  process is served to all of them, and a write drops the affected
+  methods everywhere at once;
+* a miss takes a short-lived lock for that read, so only one process
+  calls Splitwise while the others wait for its result;
+* every method has a version that invalidation increments before the
+  cached responses are dropped.  A response is stored only if the
+  version it was fetched under is still current, so a read that was in
+  flight on one process while another process wrote never caches what
+  it fetched before the write.
+
+Two backends are available: ``memory://`` keeps everything in the
+current process (a single worker, and tests) and ``redis://`` (or
+``rediss://``, ``unix://``) uses any Redis-compatible server through the
+optional ``redis`` package.  The shared tier is an optimization: when
+the backend is unreachable, reads fall back to calling Splitwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .cache import normalize_kwargs
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger("splitwise_mcp")
+
+# Delete a lock only while it still holds our token
+_UNLOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Store a value only while the method version is still the expected one
+_SET_IF_VERSION_SCRIPT = """
+if (redis.call("get", KEYS[2]) or "0") ~= ARGV[3] then
+    return 0
+end
+redis.call("hset", KEYS[1], ARGV[1], ARGV[2])
+redis.call("expire", KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class MemoryBackend:
+    """Shared state kept in the current process.
+
+    Parameters
+    ----------
+    clock: callable
+        Wall-clock time source, injectable for tests.
+    """
+
+    name = "memory"
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._buckets: dict[str, dict[str, tuple[float, str]]] = {}
+        self._locks: dict[str, tuple[str, float]] = {}
+        self._versions: dict[str, int] = {}
+
+    async def get(self, bucket: str, field: str) -> str | None:
+        """Return the live value of ``field`` in ``bucket``, if any."""
+        entry = self._buckets.get(bucket, {}).get(field)
+        if entry is None or entry[0] <= self._clock():
+            return None
+        return entry[1]
+
+    async def set(self, bucket: str, field: str, value: str, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds."""
+        self._buckets.setdefault(bucket, {})[field] = (self._clock() + ttl, value)
+
+    async def set_if_version(
+        self,
+        bucket: str,
+        field: str,
+        value: str,
+        ttl: float,
+        version_key: str,
+        version: int,
+    ) -> bool:
+        """Store ``value`` only while ``version_key`` is still ``version``."""
+        if self._versions.get(version_key, 0) != version:
+            return False
+        await self.set(bucket, field, value, ttl)
+        return True
+
+    async def delete(self, *buckets: str) -> int:
+        """Drop whole buckets; return how many existed."""
+        return sum(self._buckets.pop(bucket, None) is not None for bucket in buckets)
+
+    async def version(self, name: str) -> int:
+        """Return the current value of the version counter ``name``."""
+        return self._versions.get(name, 0)
+
+    async def bump(self, *names: str) -> None:
+        """Increment the version counters ``names``."""
+        for name in names:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    async def try_lock(self, name: str, ttl: float) -> str | None:
+        """Take the lock ``name`` for ``ttl`` seconds; return its token."""
+        held = self._locks.get(name)
+        now = self._clock()
+        if held is not None and held[1] > now:
+            return None
+        token = uuid.uuid4().hex
+        self._locks[name] = (token, now + ttl)
+        return token
+
+    async def unlock(self, name: str, token: str) -> None:
+        """Release the lock ``name`` if ``token`` still holds it."""
+        held = self._locks.get(name)
+        if held is not None and held[0] == token:
+            del self._locks[name]
+
+    async def aclose(self) -> None:
+        """Drop everything."""
+        self._buckets.clear()
+        self._locks.clear()
+        self._versions.clear()
+
+
+class RedisBackend:
+    """Shared state in a Redis-compatible server.
+
+    Each bucket is a hash with one field per call; a value carries its own
+    expiry time, and the hash expires with its newest value.  Dropping a
+    method's cached reads is a single ``DEL``; version counters are plain
+    ``INCR`` keys, checked by a script when a value is stored.
+
+    Parameters
+    ----------
+    url: str
+        Server URL, e.g. ``redis://localhost:6379/0``.
+    client: object
+        ``redis.asyncio`` compatible client, injectable for tests.
+    clock: callable
+        Wall-clock time source, injectable for tests.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str | None = None,
+        client: Any = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError(
+                    f"A redis:// {const.ENV_SHARED_STATE_URL} needs the redis "
+                    f"package (pip install redis)"
+                )
+            client = aioredis.from_url(url, decode_responses=True)
+        self._redis = client
+        self._clock = clock
+
+    async def get(self, bucket: str, field: str) -> str | None:
+        """Return the live value of ``field`` in ``bucket``, if any."""
+        raw = await self._redis.hget(bucket, field)
+        if raw is None:
+            return None
+        expires_at, _, value = raw.partition(":")
+        if float(expires_at) <= self._clock():
+            return None
+        return value
+
+    async def set(self, bucket: str, field: str, value: str, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds."""
+        await self._redis.hset(bucket, field, f"{self._clock() + ttl:.3f}:{value}")
+        await self._redis.expire(bucket, math.ceil(ttl))
+
+    async def set_if_version(
+        self,
+        bucket: str,
+        field: str,
+        value: str,
+        ttl: float,
+        version_key: str,
+        version: int,
+    ) -> bool:
+        """Store ``value`` only while ``version_key`` is still ``version``."""
+        stored = await self._redis.eval(
+            _SET_IF_VERSION_SCRIPT,
+            2,
+            bucket,
+            version_key,
+            field,
+            f"{self._clock() + ttl:.3f}:{value}",
+            str(version),
+            math.ceil(ttl),
+        )
+        return bool(stored)
+
+    async def delete(self, *buckets: str) -> int:
+        """Drop whole buckets; return how many existed."""
+        return int(await self._redis.delete(*buckets)) if buckets else 0
+
+    async def version(self, name: str) -> int:
+        """Return the current value of the version counter ``name``."""
+        return int(await self._redis.get(name) or 0)
+
+    async def bump(self, *names: str) -> None:
+        """Increment the version counters ``names``."""
+        for name in names:
+            await self._redis.incr(name)
+
+    async def try_lock(self, name: str, ttl: float) -> str | None:
+        """Take the lock ``name`` for ``ttl`` seconds; return its token."""
+        token = uuid.uuid4().hex
+        taken = await self._redis.set(name, token, nx=True, px=int(ttl * 1000))
+        return token if taken else None
+
+    async def unlock(self, name: str, token: str) -> None:
+        """Release the lock ``name`` if ``token`` still holds it."""
+        await self._redis.eval(_UNLOCK_SCRIPT, 1, name, token)
+
+    async def aclose(self) -> None:
+        """Close the server connections."""
+        await self._redis.aclose()
+
+
+Backend = MemoryBackend | RedisBackend
+
+
+def backend_from_url(url: str) -> Backend:
+    """Create the backend named by a ``SPLITWISE_SHARED_STATE_URL`` value."""
+    scheme = url.partition("://")[0].lower()
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBackend(url)
+    raise ValueError(
+        f"Unsupported {const.ENV_SHARED_STATE_URL} scheme '{scheme}': "
+        f"use memory://, redis://, rediss:// or unix://"
+    )
+
+
+_backend: Backend | None = None
+
+
+def shared_backend() -> Backend | None:
+    """Return the process-wide backend, or None when none is configured."""
+    global _backend
+    url = os.environ.get(const.ENV_SHARED_STATE_URL)
+    if not url:
+        return None
+    if _backend is None:
+        _backend = backend_from_url(url)
+        logger.info(f"SHARED STATE: using {_backend.name} backend")
+    return _backend
+
+
+class SharedCache:
+    """One tenant's view of the shared backend.
+
+    Parameters
+    ----------
+    backend: MemoryBackend or RedisBackend
+        Where cached responses and locks live.
+    tenant: str
+        Tenant identifier (see `app.client_pool.tenant_key`); tenants
+        never see each other's data.
+    lock_ttl: float
+        Seconds one process may fetch a read for everyone before the
+        others give up waiting and fetch it themselves.
+    poll_interval: float
+        Seconds between checks for a result another process is fetching.
+    """
+
+    def __init__(
+        self,
+        backend: Backend,
+        tenant: str,
+        lock_ttl: float = const.SHARED_LOCK_TTL,
+        poll_interval: float = const.SHARED_LOCK_POLL_INTERVAL,
+    ) -> None:
+        self.backend = backend
+        self.tenant = tenant
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._errors = 0
+        self._stale_writes = 0
+
+    def _bucket(self, method_name: str) -> str:
+        return f"{const.SHARED_STATE_PREFIX}:{self.tenant}:{method_name}"
+
+    def _version_key(self, method_name: str) -> str:
+        return f"{const.SHARED_STATE_PREFIX}:version:{self.tenant}:{method_name}"
+
+    async def version(self, method_name: str) -> int | None:
+        """Return a method's invalidation version, or None if unavailable.
+
+        Read it before fetching a response and pass it to `set_json`.
+        """
+        return await self._safely(self.backend.version(self._version_key(method_name)))
+
+    async def _safely(self, op: Awaitable[Any], default: Any = None) -> Any:
+        try:
+            return await op
+        except Exception as exc:
+            self._errors += 1
+            logger.warning(f"SHARED STATE: {self.backend.name} backend failed: {exc}")
+            return default
+
+    async def get_json(self, method_name: str, kwargs: dict[str, Any]) -> str | None:
+        """Return the shared JSON response of a read, or None."""
+        return await self._safely(
+            self.backend.get(self._bucket(method_name), normalize_kwargs(kwargs))
+        )
+
+    async def set_json(
+        self,
+        method_name: str,
+        kwargs: dict[str, Any],
+        payload: str,
+        ttl: float,
+        version: int | None = None,
+    ) -> None:
+        """Share the JSON response of a read for ``ttl`` seconds.
+
+        With ``version`` the response is dropped when the method was
+        invalidated (by any process) since that version was read.
+        """
+        bucket, field = self._bucket(method_name), normalize_kwargs(kwargs)
+        if version is None:
+            await self._safely(self.backend.set(bucket, field, payload, ttl))
+            return
+        stored = await self._safely(
+            self.backend.set_if_version(
+                bucket, field, payload, ttl, self._version_key(method_name), version
+            ),
+            True,
+        )
+        if not stored:
+            # Fetched before a write invalidated the method
+            self._stale_writes += 1
+
+    async def invalidate(self, *method_names: str) -> int:
+        """Drop every shared response of the given methods."""
+        if not method_names:
+            return 0
+        # Bump first, so reads already in flight cannot store afterwards
+        await self._safely(
+            self.backend.bump(*(self._version_key(name) for name in method_names))
+        )
+        buckets = [self._bucket(name) for name in method_names]
+        return await self._safely(self.backend.delete(*buckets), 0)
+
+    async def fetch_json(
+        self,
+        method_name: str,
+        kwargs: dict[str, Any],
+        ttl: float,
+        fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Return a read from the shared cache, fetching it once if missing.
+
+        On a miss one process takes the read's lock and runs ``fetch``;
+        the others poll for its result until the lock is released or
+        expires, and run ``fetch`` themselves only if none appears.
+        """
+        field = normalize_kwargs(kwargs)
+        lock = f"{const.SHARED_STATE_PREFIX}:lock:{self.tenant}:{method_name}:{field}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        waited = False
+        while True:
+            payload = await self.get_json(method_name, kwargs)
+            if payload is not None:
+                self._hits += 1
+                self._coalesced += waited
+                return payload
+            # Proceed without the lock when the backend is unreachable
+            token = await self._safely(self.backend.try_lock(lock, self.lock_ttl), "")
+            if token is not None or loop.time() >= deadline:
+                break
+            waited = True
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            if token:
+                # The result may have landed just before we took the lock
+                payload = await self.get_json(method_name, kwargs)
+                if payload is not None:
+                    self._hits += 1
+                    return payload
+            self._misses += 1
+            version = await self.version(method_name)
+            payload = await fetch()
+            await self.set_json(method_name, kwargs, payload, ttl, version)
+            return payload
+        finally:
+            if token:
+                await self._safely(self.backend.unlock(lock, token))
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit, miss and coalescing counters."""
+        return {
+            "backend": self.backend.name,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "errors": self._errors,
+            "stale_writes": self._stale_writes,
+        }
+
+
+def shared_cache_for(tenant: str) -> SharedCache | None:
+    """Return a tenant's shared cache when a backend is configured."""
+    backend = shared_backend()
+    return SharedCache(backend, tenant) if backend is not None else None
@@ -0,0 +1,83 @@
+"""Request coalescing for concurrent identical Splitwise calls.
+
+When several MCP sessions ask for the same data at the same time only
+the first caller (the "leader") performs the upstream call; every other
+caller with the same key awaits the leader's result.  Results are shared
+between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+T = TypeVar("T")
+
+
+def _consume_exception(future: asyncio.Future[Any]) -> None:
+    # Mark the exception as retrieved when no follower awaited it.
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share the same key."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._calls = 0
+        self._executions = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` unless an identical call is already in flight.
+
+        Parameters
+        ----------
+        key: Hashable
+            Identity of the call, e.g. ``(method_name, normalized_kwargs)``.
+        fn: Callable
+            Zero-argument coroutine factory performing the actual work.
+        """
+        self._calls += 1
+        while (pending := self._inflight.get(key)) is not None:
+            self._coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only a cancelled leader is retried; our own cancellation
+                # propagates as usual.
+                task = asyncio.current_task()
+                if not pending.cancelled() or (task and task.cancelling()):
+                    raise
+                self._coalesced -= 1
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        self._executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> dict[str, int]:
+        """Return call, execution and coalescing counters."""
+        return {
+            "calls": self._calls,
+            "executions": self._executions,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._inflight),
+        }
@@ -4,18 +4,80 @@ This class encapsulates initialisation of the Splitwise client and
 provides helper methods for the MCP service.  It also exposes a
 generic `call_method` which delegates to the underlying SDK methods
 based on a mapping from snake_case names to the library's camelCase
-method names.  See the README for details.
+method names.  Responses of read-only methods are served from a bounded
+in-process cache (see :mod:`app.cache`) and write methods invalidate the
+cached reads they affect.  `acall_mapped_method` is the async
+counterpart used by the MCP layer: reads go through a pooled async HTTP
+transport (see :mod:`app.async_client`) and everything else runs the
+SDK off the event loop; `iter_expenses` streams every page of an expense
+listing and `acall_mapped_method_json` encodes responses straight to
+JSON (see :mod:`app.serialization`).  When enabled, expense reads are
+answered from a local replica kept current by delta syncs (see
+:mod:`app.expense_sync`).  Exchange rates used to restate amounts in a
+reporting currency are cached by a `CurrencyEngine` (see
+:mod:`app.currency`).
+See the README for details.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 import os
-from typing import Any, ClassVar
+import time
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from splitwise import Splitwise
 
 from . import constants as const
-from .utils import object_to_dict
+from .async_client import AsyncSplitwiseHTTP
+from .batch import IdempotencyStore
+from .cache import ResponseCache
+from .currency import CurrencyEngine, RateTable, parse_static_rates
+from .executor import BoundedExecutor
+from .expense_sync import ExpenseStore, ExpenseSync
+from .group_index import GroupIndex
+from .member_index import MemberIndexCache
+from .rate_limit import RateLimitScheduler
+from .search_index import SearchIndex
+from .serialization import project, to_json
+from .utils import env_bool, env_float, env_int, object_to_dict
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
+    from .serialization import FieldSpec
+    from .shared_state import SharedCache
+
+    WriteListener = Callable[[str, dict[str, Any], Any], None]
+
+logger = logging.getLogger("splitwise_mcp")
+
+# Read methods whose responses change whenever an expense is written
+# (expense listings themselves plus group/friend balances).
+_EXPENSE_DEPENDENTS = (
+    const.METHOD_LIST_EXPENSES,
+    const.METHOD_GET_EXPENSE,
+    const.METHOD_LIST_GROUPS,
+    const.METHOD_GET_GROUP,
+    const.METHOD_LIST_FRIENDS,
+    const.METHOD_GET_FRIEND,
+    const.METHOD_LIST_NOTIFICATIONS,
+)
+_GROUP_DEPENDENTS = (
+    const.METHOD_LIST_GROUPS,
+    const.METHOD_GET_GROUP,
+    const.METHOD_LIST_EXPENSES,
+    const.METHOD_LIST_NOTIFICATIONS,
+)
+_FRIEND_DEPENDENTS = (
+    const.METHOD_LIST_FRIENDS,
+    const.METHOD_GET_FRIEND,
+    const.METHOD_LIST_EXPENSES,
+    const.METHOD_LIST_NOTIFICATIONS,
+)
 
 
 class SplitwiseClient:
@@ -41,6 +103,7 @@ class SplitwiseClient:
         const.METHOD_LIST_CURRENCIES: "getCurrencies",
         const.METHOD_GET_EXCHANGE_RATES: "getExchangeRates",
         const.METHOD_LIST_NOTIFICATIONS: "getNotifications",
+        const.METHOD_GET_COMMENTS: "getComments",
         # POST methods (actions with side effects)
         const.METHOD_CREATE_EXPENSE: "createExpense",
         const.METHOD_CREATE_GROUP: "createGroup",
@@ -59,11 +122,55 @@ class SplitwiseClient:
         const.METHOD_DELETE_COMMENT: "deleteComment",
     }
 
+    # Cache TTLs (seconds) for read-only methods.  Methods missing from
+    # this mapping are never cached.
+    CACHE_TTLS: ClassVar[dict[str, float]] = {
+        const.METHOD_GET_CURRENT_USER: 300.0,
+        const.METHOD_LIST_GROUPS: 60.0,
+        const.METHOD_GET_GROUP: 60.0,
+        const.METHOD_LIST_EXPENSES: 15.0,
+        const.METHOD_GET_EXPENSE: 30.0,
+        const.METHOD_LIST_FRIENDS: 60.0,
+        const.METHOD_GET_FRIEND: 60.0,
+        const.METHOD_LIST_CATEGORIES: 86400.0,
+        const.METHOD_LIST_CURRENCIES: 86400.0,
+        const.METHOD_GET_EXCHANGE_RATES: 3600.0,
+        const.METHOD_LIST_NOTIFICATIONS: 15.0,
+        const.METHOD_GET_COMMENTS: 30.0,
+    }
+
+    # Cached read methods invalidated by each write method.
+    CACHE_INVALIDATIONS: ClassVar[dict[str, tuple[str, ...]]] = {
+        const.METHOD_CREATE_EXPENSE: _EXPENSE_DEPENDENTS,
+        const.METHOD_UPDATE_EXPENSE: _EXPENSE_DEPENDENTS,
+        const.METHOD_DELETE_EXPENSE: _EXPENSE_DEPENDENTS,
+        const.METHOD_UNDELETE_EXPENSE: _EXPENSE_DEPENDENTS,
+        const.METHOD_CREATE_GROUP: _GROUP_DEPENDENTS,
+        const.METHOD_DELETE_GROUP: _GROUP_DEPENDENTS,
+        const.METHOD_UNDELETE_GROUP: _GROUP_DEPENDENTS,
+        const.METHOD_ADD_USER_TO_GROUP: _GROUP_DEPENDENTS,
+        const.METHOD_REMOVE_USER_FROM_GROUP: _GROUP_DEPENDENTS,
+        const.METHOD_CREATE_FRIEND: _FRIEND_DEPENDENTS,
+        const.METHOD_CREATE_FRIENDS: _FRIEND_DEPENDENTS,
+        const.METHOD_DELETE_FRIEND: _FRIEND_DEPENDENTS,
+        const.METHOD_UPDATE_USER: (
+            const.METHOD_GET_CURRENT_USER,
+            *_GROUP_DEPENDENTS,
+            *_FRIEND_DEPENDENTS,
+        ),
+        const.METHOD_CREATE_COMMENT: (const.METHOD_GET_COMMENTS,),
+        const.METHOD_DELETE_COMMENT: (const.METHOD_GET_COMMENTS,),
+    }
+
     def __init__(
         self,
         api_key: str | None = None,
         consumer_key: str | None = None,
         consumer_secret: str | None = None,
+        cache: ResponseCache | None = None,
+        http: AsyncSplitwiseHTTP | None = None,
+        expense_sync_path: str | None = None,
+        shared: SharedCache | None = None,
     ) -> None:
         # Get credentials from parameters or environment
         consumer_key = consumer_key or os.environ.get(const.ENV_SPLITWISE_CONSUMER_KEY)
@@ -90,10 +197,99 @@ class SplitwiseClient:
                 f"or {const.ENV_SPLITWISE_API_KEY} environment variables must be set"
             )
 
+        # A shared cache replaces the per-process one, so that a write made
+        # through any server process is seen by all of them at once
+        self.shared = shared
+        if cache is None and shared is None and env_bool(const.ENV_CACHE_ENABLED, True):
+            cache = ResponseCache(
+                max_entries=env_int(
+                    const.ENV_CACHE_MAX_ENTRIES, const.DEFAULT_CACHE_MAX_ENTRIES
+                ),
+                max_bytes=env_int(
+                    const.ENV_CACHE_MAX_BYTES, const.DEFAULT_CACHE_MAX_BYTES
+                ),
+            )
+        self._cache = cache
+
+        # The native async transport only supports bearer-token auth.
+        if http is None and api_key and env_bool(const.ENV_ASYNC_HTTP_ENABLED, True):
+            http2 = os.environ.get(const.ENV_HTTP2_ENABLED)
+            http = AsyncSplitwiseHTTP(
+                api_key=api_key,
+                base_url=os.environ.get(
+                    const.ENV_SPLITWISE_BASE_URL, const.DEFAULT_SPLITWISE_BASE_URL
+                ),
+                max_connections=env_int(
+                    const.ENV_HTTP_MAX_CONNECTIONS, const.DEFAULT_HTTP_MAX_CONNECTIONS
+                ),
+                max_keepalive_connections=env_int(
+                    const.ENV_HTTP_MAX_KEEPALIVE, const.DEFAULT_HTTP_MAX_KEEPALIVE
+                ),
+                http2=None
+                if http2 is None
+                else env_bool(const.ENV_HTTP2_ENABLED, False),
+            )
+        self._http = http
+        # Request budget for this credential, shared by every upstream call
+        self.rate_limiter = RateLimitScheduler(
+            rate=env_float(const.ENV_RATE_LIMIT, const.DEFAULT_RATE_LIMIT),
+            burst=env_int(const.ENV_RATE_LIMIT_BURST, const.DEFAULT_RATE_LIMIT_BURST),
+        )
+        # Blocking SDK calls run here, with a bounded queue
+        self.sdk_executor = BoundedExecutor(
+            max_workers=env_int(
+                const.ENV_SDK_MAX_WORKERS, const.DEFAULT_SDK_MAX_WORKERS
+            ),
+            max_queue=env_int(const.ENV_SDK_MAX_QUEUE, const.DEFAULT_SDK_MAX_QUEUE),
+        )
+
+        # Callbacks notified after every successful write method
+        self._write_listeners: list[WriteListener] = []
+        self.search_index: SearchIndex | None = None
+        if env_bool(const.ENV_SEARCH_INDEX_ENABLED, True):
+            self.search_index = SearchIndex()
+            self.add_write_listener(self.search_index.apply_write)
+        self.group_index = GroupIndex()
+        self.group_index_max_age = env_float(
+            const.ENV_GROUP_INDEX_MAX_AGE, const.DEFAULT_GROUP_INDEX_MAX_AGE
+        )
+        self.add_write_listener(self.group_index.apply_write)
+        self.member_indexes = MemberIndexCache()
+        # Outcomes of batch writes, keyed by idempotency key
+        self.idempotency = IdempotencyStore(shared=shared)
+        self.currency_engine = CurrencyEngine(
+            ttl=env_float(const.ENV_EXCHANGE_RATE_TTL, const.DEFAULT_EXCHANGE_RATE_TTL),
+            static_rates=parse_static_rates(os.environ.get(const.ENV_EXCHANGE_RATES)),
+            url=os.environ.get(const.ENV_EXCHANGE_RATES_URL) or None,
+        )
+        self.expense_sync: ExpenseSync | None = None
+        if env_bool(const.ENV_EXPENSE_SYNC_ENABLED, False):
+            self.expense_sync = ExpenseSync(
+                self,
+                ExpenseStore(
+                    expense_sync_path
+                    or os.environ.get(
+                        const.ENV_EXPENSE_SYNC_PATH, const.DEFAULT_EXPENSE_SYNC_PATH
+                    )
+                ),
+                max_staleness=env_float(
+                    const.ENV_EXPENSE_SYNC_MAX_STALENESS,
+                    const.DEFAULT_EXPENSE_SYNC_MAX_STALENESS,
+                ),
+            )
+            self.add_write_listener(self.expense_sync.apply_write)
+            if self.search_index is not None:
+                # The index follows the replica's deltas instead of refetching
+                self.expense_sync.add_change_listener(self.search_index.apply_expenses)
+
     @property
     def raw_client(self) -> Splitwise:
         return self._client
 
+    @property
+    def cache(self) -> ResponseCache | None:
+        return self._cache
+
     def call_mapped_method(self, method_name: str, **kwargs: Any) -> Any:
         """Call a Splitwise method given an MCP snake_case name.
 
@@ -108,17 +304,302 @@ class SplitwiseClient:
         -------
         Any
             The result of the SDK call, automatically converted to dict/list
-            using object_to_dict for JSON serialization.
+            using object_to_dict for JSON serialization.  Read methods listed
+            in ``CACHE_TTLS`` may be answered from the response cache, and
+            expense reads from a fresh expense replica.
+        """
+        func = self._resolve_sdk_method(method_name)
+
+        hit, cached = self._cache_lookup(method_name, kwargs)
+        if hit:
+            return cached
+        if self.expense_sync is not None:
+            hit, replicated = self.expense_sync.serve(method_name, kwargs)
+            if hit:
+                return replicated
+
+        generation = self._cache_generation(method_name)
+        # Automatically convert SDK objects to dicts for JSON serialization
+        result = self.convert(func(**kwargs))
+        self._record_result(method_name, kwargs, result, generation)
+        return result
+
+    async def acall_mapped_method(
+        self, method_name: str, fields: FieldSpec | None = None, **kwargs: Any
+    ) -> Any:
+        """Async variant of `call_mapped_method`.
+
+        Read methods supported by the async HTTP transport are fetched over
+        the shared connection pool without a thread hop; all other methods
+        run the synchronous SDK in a worker thread.  ``fields`` (see
+        `app.serialization.parse_fields`) restricts a read to the selected
+        attributes; the projection is applied while converting the SDK
+        objects, so unselected subtrees are never materialized, and
+        projected responses are cached per selection.
+        """
+        if method_name not in self.METHOD_MAP:
+            raise AttributeError(f"Unsupported method '{method_name}'")
+
+        projected = fields is not None and bool(self.CACHE_TTLS.get(method_name))
+        if projected:
+            hit, cached = self._cache_lookup(method_name, {**kwargs, "fields": fields})
+            if hit:
+                return cached
+        hit, cached = self._cache_lookup(method_name, kwargs)
+        if hit:
+            return cached if fields is None else project(cached, fields)
+        if self.expense_sync is not None:
+            hit, replicated = await self.expense_sync.aserve(method_name, kwargs)
+            if hit:
+                return replicated if fields is None else project(replicated, fields)
+        if self.shared is not None and self.CACHE_TTLS.get(method_name):
+            payload = await self._shared_fetch_json(method_name, kwargs)
+            result = await self._decode(payload)
+            return result if fields is None else project(result, fields)
+
+        generation = self._cache_generation(method_name)
+        if projected:
+            result = await self.afetch(method_name, fields=fields, **kwargs)
+            self._record_result(
+                method_name, {**kwargs, "fields": fields}, result, generation
+            )
+            return result
+        result = await self.afetch(method_name, **kwargs)
+        self._record_result(method_name, kwargs, result, generation)
+        if self.shared is not None and method_name in self.CACHE_INVALIDATIONS:
+            # Other server processes drop these reads too
+            await self.shared.invalidate(*self.CACHE_INVALIDATIONS[method_name])
+        return result if fields is None else project(result, fields)
+
+    async def iter_expenses(
+        self,
+        page_size: int = const.DEFAULT_EXPENSE_PAGE_SIZE,
+        min_page_size: int = const.MIN_EXPENSE_PAGE_SIZE,
+        max_page_size: int = const.MAX_EXPENSE_PAGE_SIZE,
+        **filters: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield converted expenses across every page of ``list_expenses``.
+
+        Parameters
+        ----------
+        page_size: int
+            Size of the first page.  Later pages double while a page takes
+            under half of ``EXPENSE_PAGE_TARGET_SECONDS`` to fetch and halve
+            when it takes longer, within ``min_page_size``/``max_page_size``.
+        filters: dict
+            ``list_expenses`` filters; ``offset`` sets the starting point and
+            ``limit`` is managed by the paginator.
+
+        The next page is requested as soon as the current one arrives, so
+        it downloads while the caller consumes the current page.  At most
+        two pages are held in memory regardless of history size.
+        """
+        offset = filters.pop("offset", None) or 0
+        filters.pop("limit", None)
+
+        async def fetch(offset: int, limit: int) -> tuple[list[Any], int, float]:
+            started = time.perf_counter()
+            page = await self.acall_mapped_method(
+                const.METHOD_LIST_EXPENSES, limit=limit, offset=offset, **filters
+            )
+            return page or [], limit, time.perf_counter() - started
+
+        size = page_size
+        pending: asyncio.Task[tuple[list[Any], int, float]] | None = (
+            asyncio.create_task(fetch(offset, size))
+        )
+        try:
+            while pending is not None:
+                page, requested, elapsed = await pending
+                pending = None
+                if len(page) >= requested:
+                    # A full page: more may follow, so prefetch the next one
+                    offset += len(page)
+                    if elapsed < const.EXPENSE_PAGE_TARGET_SECONDS / 2:
+                        size = min(size * 2, max_page_size)
+                    elif elapsed > const.EXPENSE_PAGE_TARGET_SECONDS:
+                        size = max(size // 2, min_page_size)
+                    pending = asyncio.create_task(fetch(offset, size))
+                for expense in page:
+                    yield expense
+                # Release the consumed page before waiting on the next one
+                del page
+        finally:
+            if pending is not None:
+                pending.cancel()
+                with suppress(asyncio.CancelledError):
+                    await pending
+
+    async def acall_mapped_method_json(
+        self, method_name: str, fields: FieldSpec | None = None, **kwargs: Any
+    ) -> str:
+        """Like `acall_mapped_method` but return the response as JSON text.
+
+        Cached reads are returned as the stored JSON string and fresh reads
+        are encoded straight from the SDK objects, so no intermediate dict
+        tree is built.  ``fields`` (see `app.serialization.parse_fields`)
+        projects the response down to the selected attributes; projected
+        responses are encoded once and cached per selection.
         """
+        ttl = self.CACHE_TTLS.get(method_name)
+        if not ttl:
+            return to_json(
+                await self.acall_mapped_method(method_name, **kwargs), fields
+            )
+        if method_name not in self.METHOD_MAP:
+            raise AttributeError(f"Unsupported method '{method_name}'")
+
+        key = kwargs if fields is None else {**kwargs, "fields": fields}
+        if self._cache:
+            hit, payload = self._cache.get_json(method_name, key)
+            if hit:
+                return payload
+        if self.expense_sync is not None:
+            hit, replicated = await self.expense_sync.aserve(method_name, kwargs)
+            if hit:
+                return to_json(replicated, fields)
+        if self.shared is not None:
+            payload = await self._shared_fetch_json(method_name, kwargs)
+            if fields is None:
+                return payload
+            return to_json(await self._decode(payload), fields)
+
+        generation = self._cache_generation(method_name)
+        raw = await self._afetch_raw(method_name, **kwargs)
+        payload = await asyncio.to_thread(to_json, raw, fields)
+        if self._cache:
+            self._cache.set_json(method_name, key, payload, ttl, generation)
+        return payload
+
+    async def afetch(
+        self, method_name: str, fields: FieldSpec | None = None, **kwargs: Any
+    ) -> Any:
+        """Call Splitwise directly, bypassing the cache and expense replica.
+
+        ``fields`` converts only the selected attributes of the response.
+        """
+
+        def convert(obj: Any) -> Any:
+            return self.convert(obj) if fields is None else project(obj, fields)
+
+        if self._http is not None and self._http.supports(method_name):
+            raw = await self.rate_limiter.call(
+                method_name, lambda: self._http.call(method_name, **kwargs)
+            )
+            if isinstance(raw, list) and len(raw) >= const.OFFLOAD_MIN_ITEMS:
+                return await asyncio.to_thread(convert, raw)
+            return convert(raw)
+        func = self._resolve_sdk_method(method_name)
+        return await self.rate_limiter.call(
+            method_name,
+            lambda: self.sdk_executor.run(
+                lambda: convert(func(**kwargs)), label=method_name
+            ),
+        )
+
+    async def _afetch_raw(self, method_name: str, **kwargs: Any) -> Any:
+        """Like `afetch` but return the unconverted SDK objects."""
+        if self._http is not None and self._http.supports(method_name):
+            return await self.rate_limiter.call(
+                method_name, lambda: self._http.call(method_name, **kwargs)
+            )
+        func = self._resolve_sdk_method(method_name)
+        return await self.rate_limiter.call(
+            method_name,
+            lambda: self.sdk_executor.run(lambda: func(**kwargs), label=method_name),
+        )
+
+    async def _shared_fetch_json(self, method_name: str, kwargs: dict[str, Any]) -> str:
+        """Serve a cacheable read through the shared cache."""
+
+        async def fetch() -> str:
+            raw = await self._afetch_raw(method_name, **kwargs)
+            return await asyncio.to_thread(to_json, raw)
+
+        return await self.shared.fetch_json(
+            method_name, kwargs, self.CACHE_TTLS[method_name], fetch
+        )
+
+    @staticmethod
+    async def _decode(payload: str) -> Any:
+        if len(payload) >= const.OFFLOAD_MIN_BYTES:
+            return await asyncio.to_thread(json.loads, payload)
+        return json.loads(payload)
+
+    async def aclose(self) -> None:
+        """Release pooled HTTP connections and stop background syncing."""
+        if self._http is not None:
+            await self._http.aclose()
+        if self.expense_sync is not None:
+            await self.expense_sync.aclose()
+        self.sdk_executor.shutdown()
+
+    def _resolve_sdk_method(self, method_name: str) -> Any:
         sdk_name = self.METHOD_MAP.get(method_name)
         if not sdk_name:
             raise AttributeError(f"Unsupported method '{method_name}'")
         func = getattr(self._client, sdk_name, None)
         if not func:
             raise AttributeError(f"Splitwise SDK has no method '{sdk_name}'")
-        result = func(**kwargs)
-        # Automatically convert SDK objects to dicts for JSON serialization
-        return self.convert(result)
+        return func
+
+    def _cache_lookup(
+        self, method_name: str, kwargs: dict[str, Any]
+    ) -> tuple[bool, Any]:
+        if self._cache and self.CACHE_TTLS.get(method_name):
+            return self._cache.get(method_name, kwargs)
+        return False, None
+
+    def _cache_generation(self, method_name: str) -> int | None:
+        # Taken before a fetch so a write landing meanwhile voids the result
+        return self._cache.generation(method_name) if self._cache else None
+
+    def _record_result(
+        self,
+        method_name: str,
+        kwargs: dict[str, Any],
+        result: Any,
+        generation: int | None = None,
+    ) -> None:
+        ttl = self.CACHE_TTLS.get(method_name)
+        if ttl:
+            if self._cache:
+                self._cache.set(method_name, kwargs, result, ttl, generation)
+            return
+        self.invalidate_for_write(method_name)
+        for listener in self._write_listeners:
+            try:
+                listener(method_name, kwargs, result)
+            except Exception as exc:
+                logger.error(f"Write listener failed for {method_name}: {exc}")
+
+    def add_write_listener(self, listener: WriteListener) -> None:
+        """Register a callback run after every successful write method.
+
+        The callback receives the method name, its kwargs and the converted
+        response.  Exceptions raised by listeners are logged and ignored.
+        """
+        self._write_listeners.append(listener)
+
+    def invalidate_for_write(self, method_name: str) -> None:
+        """Drop cached reads affected by the given write method."""
+        affected = self.CACHE_INVALIDATIONS.get(method_name)
+        if self._cache and affected:
+            self._cache.invalidate(*affected)
+
+    def stats(self) -> dict[str, Any]:
+        """Return runtime counters for diagnostics and tuning."""
+        return {
+            "cache": self._cache.stats() if self._cache else None,
+            "shared_cache": self.shared.stats() if self.shared else None,
+            "expense_sync": self.expense_sync.stats() if self.expense_sync else None,
+            "group_index": self.group_index.stats(),
+            "member_indexes": self.member_indexes.stats(),
+            "currency": self.currency_engine.stats(),
+            "idempotency": self.idempotency.stats(),
+            "sdk_executor": self.sdk_executor.stats(),
+            "rate_limit": self.rate_limiter.stats(),
+        }
 
     # Specific helper methods
 
@@ -132,32 +613,75 @@ class SplitwiseClient:
             return me.get("id")
         return None
 
-    def get_group_by_name(self, name: str) -> Any:
-        """Return a group object by name (case sensitive match).
+    def get_group_by_name(self, name: str) -> dict[str, Any] | None:
+        """Return the converted group with this name, or None.
 
-        Returns None if no group matches.
+        Matching is exact, then case- and Unicode-insensitive; never fuzzy.
+        Answered from the group index, which is rebuilt from an SDK group
+        listing when it is missing or stale.  Async callers should use
+        `aget_group_by_name`.
         """
-        groups = self._client.getGroups()
-        for group in groups:
-            if getattr(group, "name", None) == name:
-                return group
-        return None
+        index = self.group_index
+        if not index.ready or index.needs_refresh(self.group_index_max_age):
+            index.rebuild(self.convert(self._client.getGroups()) or [])
+        return index.lookup(name, fuzzy=False)
 
-    def get_user_from_group(self, group: Any, participant_name: str) -> Any:
-        """Find a user within a group by matching first or full name."""
-        # The group object returned by Splitwise SDK may have a
-        # `members` attribute.  Each member likely has `first_name`
-        # and `last_name`.  We attempt to match either the first
-        # name or the full name (first + space + last).
-        members = getattr(group, "members", []) or getattr(group, "members_list", [])
-        for member in members:
-            full = f"{getattr(member, 'first_name', '')} {getattr(member, 'last_name', '')}".strip()
-            if (
-                participant_name == getattr(member, "first_name", None)
-                or participant_name == full
-            ):
-                return member
-        return None
+    async def aget_group_by_name(
+        self, name: str, fuzzy: bool = True
+    ) -> dict[str, Any] | None:
+        """Resolve a group name through the group index.
+
+        Matching is exact, then case- and Unicode-insensitive, then, with
+        ``fuzzy``, the most similar name (see
+        `app.group_index.GroupIndex.lookup`); write paths pass
+        ``fuzzy=False`` so that a typo never selects another group.  The
+        first call builds the index; afterwards stale indexes are refreshed
+        in the background and a miss triggers an immediate refresh at most
+        every ``GROUP_INDEX_MISS_REFRESH_SECONDS``, to pick up groups
+        created elsewhere.  Returns the converted group or None.
+        """
+        index = self.group_index
+        if not index.ready:
+            await index.refresh(self)
+        elif index.needs_refresh(self.group_index_max_age):
+            index.schedule_refresh(self)
+        group = index.lookup(name, fuzzy)
+        if group is None and index.age > const.GROUP_INDEX_MISS_REFRESH_SECONDS:
+            await index.refresh(self)
+            group = index.lookup(name, fuzzy)
+        return group
+
+    def get_user_from_group(
+        self, group: Any, participant_name: str, fuzzy: bool = False
+    ) -> Any:
+        """Find a user within a group by name, email or id.
+
+        Exact first or full names match first, then ids, emails and
+        case/Unicode-insensitive names; with ``fuzzy``, the closest similar
+        name is accepted as a last resort (see
+        `app.member_index.MemberIndex.find`).  The member index is built
+        once per group version and reused across calls.  ``group`` may be
+        an SDK object or a converted dict.
+        """
+        return self.member_indexes.for_group(group).find(participant_name, fuzzy)
+
+    async def afind_group_member(
+        self, group_id: int, participant_name: str, fuzzy: bool = False
+    ) -> dict[str, Any] | None:
+        """Resolve a participant of a group by id through the cached reads.
+
+        The group is fetched with ``get_group`` (served from the response
+        cache between writes), so resolving many participants of one group
+        costs a single upstream call.
+        """
+        group = await self.acall_mapped_method(const.METHOD_GET_GROUP, id=group_id)
+        if not group:
+            return None
+        return self.get_user_from_group(group, participant_name, fuzzy)
+
+    async def aexchange_rates(self) -> RateTable:
+        """Return the exchange rate table, reusing it until its TTL expires."""
+        return await self.currency_engine.rates()
 
     def convert(self, obj: Any) -> Any:
         """Convert Splitwise SDK objects to serialisable Python data."""
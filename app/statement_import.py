@@ -0,0 +1,519 @@
+"""Import bank and card statements (CSV or OFX) as Splitwise expenses.
+
+Statements are read as a stream: CSV rows go through `csv.reader` and
+OFX files are tokenized in fixed-size chunks, so memory does not grow
+with the file.  Each charge becomes a ``create_expense`` spec for one
+group; the group and participant names are resolved through the group
+and member indexes.  Rows that already exist in the group's expense
+history (same date, amount and description) are skipped.  The history
+is indexed one month at a time, as rows reach that month, from
+`SplitwiseClient.iter_expenses`, which reads from the expense replica
+when it is enabled.  New expenses are submitted in batches through
+`app.batch.create_expenses` with idempotency keys derived from the file
+position, so re-running an interrupted import does not duplicate them.
+
+Run ``python -m app.statement_import --help`` for the command line.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import html
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from . import constants as const
+from .batch import create_expenses
+from .member_index import name_key
+from .money import Money, format_cents, normalize_currency, to_cents
+from .utils import parse_timestamp
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterator
+    from typing import TextIO
+
+    from .splitwise_client import SplitwiseClient
+
+logger = logging.getLogger("splitwise_mcp")
+
+FORMATS = ("csv", "ofx")
+
+# Header names recognized for each CSV column role, compared case-insensitively
+CSV_HEADERS: dict[str, tuple[str, ...]] = {
+    "date": ("date", "transaction date", "posted date", "posting date", "booking date"),
+    "description": ("description", "payee", "merchant", "name", "memo", "details"),
+    "amount": ("amount", "transaction amount", "value"),
+    "debit": ("debit", "withdrawal", "money out", "paid out"),
+    "credit": ("credit", "deposit", "money in", "paid in"),
+    "currency": ("currency", "currency code"),
+    "reference": ("reference", "id", "transaction id", "fitid"),
+}
+
+_OFX_TOKEN = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+@dataclass(frozen=True, slots=True)
+class StatementRow:
+    """One transaction read from a statement.
+
+    ``amount`` is negative for money leaving the account.
+    """
+
+    line: int
+    date: date | None
+    description: str
+    amount: Money
+    reference: str | None = None
+
+
+def detect_format(path: str | None = None, head: str = "") -> str:
+    """Guess the statement format from a file suffix or its first bytes."""
+    suffix = Path(path).suffix.lower() if path else ""
+    if suffix in (".ofx", ".qfx"):
+        return "ofx"
+    if suffix == ".csv":
+        return "csv"
+    text = head.lstrip().upper()
+    if text.startswith("OFXHEADER") or "<OFX>" in text:
+        return "ofx"
+    return "csv"
+
+
+def parse_amount(text: str, currency: str | None = None) -> int:
+    """Parse a statement amount such as ``-1,234.50``, ``12,50`` or ``(3.00)``.
+
+    A comma is a decimal separator when it is the last separator and is
+    followed by exactly two digits; otherwise it groups thousands.
+    Currency symbols are ignored and parentheses mean a negative amount.
+    Returns minor units of ``currency``.
+    """
+    value = re.sub(r"[^0-9.,()+-]", "", text)
+    negative = value.startswith("(") and value.endswith(")")
+    value = value.strip("()")
+    comma, dot = value.rfind(","), value.rfind(".")
+    if comma > dot and len(value) - comma - 1 == 2:
+        value = value.replace(".", "").replace(",", ".")
+    else:
+        value = value.replace(",", "")
+    cents = to_cents(value, currency)
+    return -abs(cents) if negative else cents
+
+
+def _parse_date(value: str, date_format: str | None) -> date | None:
+    value = value.strip()
+    if not value:
+        return None
+    if date_format:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            return None
+    parsed = parse_timestamp(value)
+    return parsed.date() if parsed else None
+
+
+def _find_columns(header: list[str], columns: dict[str, str] | None) -> dict[str, int]:
+    names = [name.strip().casefold() for name in header]
+    found: dict[str, int] = {}
+    for role, candidates in CSV_HEADERS.items():
+        wanted = (columns or {}).get(role)
+        options = (wanted.casefold(),) if wanted else candidates
+        for option in options:
+            if option in names:
+                found[role] = names.index(option)
+                break
+        else:
+            if wanted:
+                raise ValueError(f"Column '{wanted}' not found in the CSV header")
+    if "date" not in found or "description" not in found:
+        raise ValueError("CSV needs date and description columns")
+    if "amount" not in found and "debit" not in found:
+        raise ValueError("CSV needs an amount or debit column")
+    return found
+
+
+def iter_csv_rows(
+    stream: TextIO,
+    columns: dict[str, str] | None = None,
+    date_format: str | None = None,
+    currency_code: str | None = None,
+) -> Iterator[StatementRow]:
+    """Yield the rows of a CSV statement.
+
+    Columns are located by header name (see ``CSV_HEADERS``); ``columns``
+    maps roles (date, description, amount, debit, credit, currency,
+    reference) to the statement's own header names.  Separate debit and
+    credit columns are combined into a signed amount.
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    found = _find_columns(header, columns)
+
+    def cell(row: list[str], role: str) -> str:
+        index = found.get(role)
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    for row in reader:
+        if not any(field.strip() for field in row):
+            continue
+        currency = normalize_currency(cell(row, "currency") or currency_code)
+        if "amount" in found:
+            cents = parse_amount(cell(row, "amount"), currency)
+        else:
+            debit = parse_amount(cell(row, "debit"), currency)
+            credit = parse_amount(cell(row, "credit"), currency)
+            cents = abs(credit) - abs(debit)
+        yield StatementRow(
+            line=reader.line_num,
+            date=_parse_date(cell(row, "date"), date_format),
+            description=cell(row, "description"),
+            amount=Money(cents, currency),
+            reference=cell(row, "reference") or None,
+        )
+
+
+def _ofx_tokens(stream: TextIO) -> Iterator[tuple[bool, str, str]]:
+    """Yield ``(closing, tag, text)`` for each OFX tag, reading in chunks."""
+    buffer = ""
+    while True:
+        chunk = stream.read(const.IMPORT_READ_CHUNK)
+        buffer += chunk
+        end = 0
+        for match in _OFX_TOKEN.finditer(buffer):
+            # The text after the last tag may continue in the next chunk
+            if chunk and match.end() == len(buffer):
+                break
+            yield (
+                match.group(1) == "/",
+                match.group(2).upper(),
+                html.unescape(match.group(3).strip()),
+            )
+            end = match.end()
+        buffer = buffer[end:]
+        if not chunk:
+            return
+
+
+def iter_ofx_rows(
+    stream: TextIO, currency_code: str | None = None
+) -> Iterator[StatementRow]:
+    """Yield the transactions of an OFX (or QFX) statement.
+
+    Both SGML (OFX 1.x, unclosed leaf tags) and XML (OFX 2.x) files are
+    accepted.  The statement's ``CURDEF`` is used as the currency unless
+    ``currency_code`` overrides it.
+    """
+    currency = currency_code
+    fields: dict[str, str] | None = None
+    index = 0
+    for closing, tag, text in _ofx_tokens(stream):
+        if tag == "CURDEF" and not closing and currency_code is None:
+            currency = text or currency
+        elif tag == "STMTTRN":
+            if not closing:
+                fields = {}
+                continue
+            if fields is not None:
+                index += 1
+                yield StatementRow(
+                    line=index,
+                    date=_parse_date(fields.get("DTPOSTED", "")[:8], "%Y%m%d"),
+                    description=fields.get("NAME") or fields.get("MEMO") or "",
+                    amount=Money(
+                        parse_amount(fields.get("TRNAMT", ""), currency),
+                        normalize_currency(currency),
+                    ),
+                    reference=fields.get("FITID") or None,
+                )
+            fields = None
+        elif fields is not None and not closing and text:
+            fields[tag] = text
+
+
+def fingerprint(day: str, cents: int, description: str) -> int:
+    """Return a compact identity for an expense's date, amount and text."""
+    digest = hashlib.blake2b(
+        f"{day[:10]}|{abs(cents)}|{name_key(description)}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HistoryIndex:
+    """Counts of existing expense fingerprints in one group.
+
+    A month of history is loaded the first time a row dated in it is
+    checked.  Each existing expense matches at most one statement row, so
+    two identical charges on the same day are both imported when only
+    one is already recorded.
+    """
+
+    def __init__(self, client: SplitwiseClient, group_id: int) -> None:
+        self._client = client
+        self._group_id = group_id
+        self._counts: dict[int, int] = {}
+        self._months: set[tuple[int, int]] = set()
+        self.loaded = 0
+
+    async def _load(self, year: int, month: int) -> None:
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        async for expense in self._client.iter_expenses(
+            group_id=self._group_id,
+            dated_after=start.isoformat(),
+            dated_before=end.isoformat(),
+        ):
+            if expense.get("deleted_at") or expense.get("payment"):
+                continue
+            key = fingerprint(
+                str(expense.get("date") or ""),
+                to_cents(expense.get("cost"), expense.get("currency_code")),
+                str(expense.get("description") or ""),
+            )
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self.loaded += 1
+
+    async def claim(self, row: StatementRow) -> bool:
+        """Return True, consuming the match, when the row already exists."""
+        if row.date is None:
+            return False
+        month = (row.date.year, row.date.month)
+        if month not in self._months:
+            self._months.add(month)
+            await self._load(*month)
+        key = fingerprint(row.date.isoformat(), row.amount.cents, row.description)
+        count = self._counts.get(key, 0)
+        if not count:
+            return False
+        self._counts[key] = count - 1
+        return True
+
+
+def _split_users(
+    cents: int, paid_by: str, split_with: list[str], currency: str | None = None
+) -> list[dict[str, Any]]:
+    """Return users entries: ``paid_by`` pays, ``split_with`` share evenly."""
+    share, remainder = divmod(cents, len(split_with))
+    owed = {
+        name: share + (1 if position < remainder else 0)
+        for position, name in enumerate(split_with)
+    }
+    names = list(dict.fromkeys([paid_by, *split_with]))
+    return [
+        {
+            "name": name,
+            "paid_share": format_cents(cents if name == paid_by else 0, currency),
+            "owed_share": format_cents(owed.get(name, 0), currency),
+        }
+        for name in names
+    ]
+
+
+async def _rows(
+    stream: TextIO,
+    fmt: str,
+    columns: dict[str, str] | None,
+    date_format: str | None,
+    currency_code: str | None,
+) -> AsyncIterator[StatementRow]:
+    rows = (
+        iter_ofx_rows(stream, currency_code)
+        if fmt == "ofx"
+        else iter_csv_rows(stream, columns, date_format, currency_code)
+    )
+    while True:
+        # Reading and parsing run off the event loop, one batch at a time
+        batch = await asyncio.to_thread(
+            list, islice(rows, const.DEFAULT_IMPORT_BATCH_SIZE)
+        )
+        if not batch:
+            return
+        for row in batch:
+            yield row
+
+
+async def import_statement(
+    client: SplitwiseClient,
+    stream: TextIO,
+    group_name: str,
+    fmt: str = "csv",
+    paid_by: str | None = None,
+    split_with: list[str] | None = None,
+    currency_code: str | None = None,
+    charges: str = "negative",
+    columns: dict[str, str] | None = None,
+    date_format: str | None = None,
+    batch_size: int = const.DEFAULT_IMPORT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """Import the charges of a statement into a group.
+
+    ``charges`` says whether money spent appears as negative (the usual
+    bank convention) or positive amounts; rows of the other sign, such
+    as refunds and card payments, are skipped.  Without ``paid_by`` the
+    cost is split equally in the group and paid by the current user;
+    otherwise ``paid_by`` pays and ``split_with`` (default: ``paid_by``
+    alone) share the cost evenly.  Returns counts per outcome (created,
+    existing, duplicate, skipped, invalid, failed or, for ``dry_run``,
+    valid) and the first errors with their line numbers.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(FORMATS)}")
+    if charges not in ("negative", "positive"):
+        raise ValueError("charges must be 'negative' or 'positive'")
+    if split_with and not paid_by:
+        raise ValueError("paid_by is required with split_with")
+    # Never import into a merely similar group ("Flat 2023" for "Flat 2024")
+    group = await client.aget_group_by_name(group_name, fuzzy=False)
+    if not group:
+        raise ValueError(f"Group '{group_name}' not found")
+    group_id = group["id"]
+
+    history = HistoryIndex(client, group_id)
+    counts: dict[str, int] = {}
+    errors: list[dict[str, Any]] = []
+    batch: list[dict[str, Any]] = []
+    lines: list[int] = []
+
+    def record(status: str, line: int, error: str | None = None) -> None:
+        counts[status] = counts.get(status, 0) + 1
+        if error is not None and len(errors) < const.MAX_IMPORT_ERRORS:
+            errors.append({"line": line, "status": status, "error": error})
+
+    async def flush() -> None:
+        result = await create_expenses(
+            client, batch, const.DEFAULT_BATCH_CONCURRENCY, dry_run
+        )
+        for line, item in zip(lines, result["results"], strict=True):
+            record(item["status"], line, item.get("error"))
+        batch.clear()
+        lines.clear()
+
+    sign = -1 if charges == "negative" else 1
+    async for row in _rows(stream, fmt, columns, date_format, currency_code):
+        if row.date is None:
+            record("invalid", row.line, "Missing or unreadable date")
+            continue
+        if row.amount.cents * sign <= 0:
+            record("skipped", row.line)
+            continue
+        amount = row.amount if sign > 0 else -row.amount
+        if await history.claim(row):
+            record("existing", row.line)
+            continue
+        key = fingerprint(row.date.isoformat(), amount.cents, row.description)
+        spec: dict[str, Any] = {
+            "cost": str(amount),
+            "description": row.description,
+            "currency_code": amount.currency or "USD",
+            "group_id": group_id,
+            "date": row.date.isoformat(),
+            "idempotency_key": f"import:{group_id}:{row.line}:{key:x}",
+        }
+        if paid_by:
+            spec["users"] = _split_users(
+                amount.cents, paid_by, split_with or [paid_by], amount.currency
+            )
+        batch.append(spec)
+        lines.append(row.line)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    logger.info(
+        f"Imported statement into group {group_id}: {counts} "
+        f"({history.loaded} existing expenses indexed)"
+    )
+    return {
+        "group_id": group_id,
+        "format": fmt,
+        "dry_run": dry_run,
+        "counts": counts,
+        "errors": errors,
+    }
+
+
+def open_statement(path: str) -> TextIO:
+    """Open a statement file for streaming (BOM-tolerant UTF-8)."""
+    return Path(path).open(newline="", encoding="utf-8-sig")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point: import one statement file."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.statement_import",
+        description="Import a CSV or OFX statement as Splitwise expenses.",
+    )
+    parser.add_argument("path", help="statement file (.csv, .ofx or .qfx)")
+    parser.add_argument("--group", required=True, help="Splitwise group name")
+    parser.add_argument("--format", choices=FORMATS, help="override format detection")
+    parser.add_argument("--paid-by", help="member who paid every charge")
+    parser.add_argument(
+        "--split-with", action="append", help="member sharing the cost (repeatable)"
+    )
+    parser.add_argument("--currency", help="currency of the statement amounts")
+    parser.add_argument(
+        "--charges",
+        choices=("negative", "positive"),
+        default="negative",
+        help="sign of money spent in the statement (default: negative)",
+    )
+    parser.add_argument("--date-format", help="strptime format of the date column")
+    parser.add_argument(
+        "--column",
+        action="append",
+        default=[],
+        metavar="ROLE=HEADER",
+        help="map a column role (date, description, amount, ...) to a header",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="validate only")
+    args = parser.parse_args(argv)
+
+    columns = dict(item.split("=", 1) for item in args.column) or None
+
+    async def run() -> dict[str, Any]:
+        from .splitwise_client import SplitwiseClient
+
+        client = SplitwiseClient()
+        try:
+            with open_statement(args.path) as stream:
+                fmt = args.format or detect_format(args.path)
+                return await import_statement(
+                    client,
+                    stream,
+                    args.group,
+                    fmt,
+                    paid_by=args.paid_by,
+                    split_with=args.split_with,
+                    currency_code=args.currency,
+                    charges=args.charges,
+                    columns=columns,
+                    date_format=args.date_format,
+                    dry_run=args.dry_run,
+                )
+        finally:
+            await client.aclose()
+
+    try:
+        result = asyncio.run(run())
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    print(json.dumps(result, indent=2))
+    return 1 if {"invalid", "failed"} & result["counts"].keys() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
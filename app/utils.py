@@ -1,10 +1,137 @@
-"""Utility functions for object conversion and date handling."""
+"""Utility functions for object conversion, date handling and settings."""
 
 from __future__ import annotations
 
-from datetime import datetime
+import os
+from collections.abc import Callable
+from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    return default
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment."""
+    value = os.environ.get(name)
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment."""
+    value = os.environ.get(name)
+    try:
+        return float(value) if value is not None else default
+    except ValueError:
+        return default
+
+
+# Registry of per-type converters used by `object_to_dict`.  Each entry is
+# ``(converter, is_callable)``; callable values are skipped when they
+# appear as object attributes.
+_Converter = Callable[[Any], Any]
+_CONVERTERS: dict[type, tuple[_Converter, bool]] = {}
+# Bound on cached types and attribute layouts so dynamically created
+# classes (e.g. ``unittest.mock`` objects) cannot grow the caches forever.
+_MAX_CONVERTERS = 1024
+_MAX_LAYOUTS = 64
+
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+
+def _convert_sequence(obj: Any) -> list[Any]:
+    converters = _CONVERTERS
+    result = []
+    for item in obj:
+        converter = (converters.get(type(item)) or _register(item))[0]
+        result.append(item if converter is _identity else converter(item))
+    return result
+
+
+def _convert_mapping(obj: dict[Any, Any]) -> dict[Any, Any]:
+    converters = _CONVERTERS
+    result = {}
+    for key, value in obj.items():
+        converter = (converters.get(type(value)) or _register(value))[0]
+        result[key] = value if converter is _identity else converter(value)
+    return result
+
+
+def _convert_datetime(obj: datetime) -> str:
+    return obj.isoformat()
+
+
+def _object_converter() -> _Converter:
+    """Build a converter for one class of objects with ``__dict__``.
+
+    The public attribute names of every ``__dict__`` layout seen for the
+    class are computed once and reused for later instances.
+    """
+    layouts: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+    def convert(obj: Any) -> dict[str, Any]:
+        attrs = obj.__dict__
+        layout = tuple(attrs)
+        names = layouts.get(layout)
+        if names is None:
+            # Skip private or protected attributes
+            names = tuple(name for name in layout if not name.startswith("_"))
+            if len(layouts) < _MAX_LAYOUTS:
+                layouts[layout] = names
+        converters = _CONVERTERS
+        result: dict[str, Any] = {}
+        for name in names:
+            value = attrs[name]
+            converter, is_callable = converters.get(type(value)) or _register(value)
+            if converter is _identity:
+                result[name] = value
+            elif not is_callable:
+                result[name] = converter(value)
+        return result
+
+    return convert
+
+
+def _register(obj: Any) -> tuple[_Converter, bool]:
+    """Build, cache and return the converter entry for ``type(obj)``."""
+    cls = type(obj)
+    converter: _Converter
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        converter = _identity
+    elif isinstance(obj, (list, tuple, set)):
+        converter = _convert_sequence
+    elif isinstance(obj, dict):
+        converter = _convert_mapping
+    elif isinstance(obj, datetime):
+        converter = _convert_datetime
+    elif hasattr(obj, "__dict__"):
+        converter = _object_converter()
+    else:
+        converter = str
+    entry = (converter, callable(obj))
+    if len(_CONVERTERS) < _MAX_CONVERTERS:
+        _CONVERTERS[cls] = entry
+    return entry
+
 
 def object_to_dict(obj: Any) -> Any:
     """Recursively convert Splitwise objects into JSON-serialisable dicts.
@@ -17,37 +144,70 @@ def object_to_dict(obj: Any) -> Any:
     The implementation ignores attributes starting with an underscore
     and callable attributes.  If an attribute cannot be serialised, it
     falls back to `str(value)`.
+
+    Conversion is dispatched on the exact type of each value through a
+    registry of converters built on first sight of a type, so the
+    type checks and attribute filtering are not repeated per object.
     """
-    # Primitives remain unchanged
-    if obj is None or isinstance(obj, (str, int, float, bool)):
-        return obj
+    entry = _CONVERTERS.get(type(obj)) or _register(obj)
+    return entry[0](obj)
 
-    # Lists/tuples
-    if isinstance(obj, (list, tuple, set)):
-        return [object_to_dict(item) for item in obj]
 
-    # Dictionaries
-    if isinstance(obj, dict):
-        return {k: object_to_dict(v) for k, v in obj.items()}
+def public_attributes(obj: Any) -> dict[str, Any]:
+    """Return an object's public, non-callable attributes (not converted)."""
+    return {
+        name: value
+        for name, value in obj.__dict__.items()
+        if not name.startswith("_") and not callable(value)
+    }
 
-    # Datetime
-    if isinstance(obj, datetime):
-        return obj.isoformat()
 
-    # Objects with __dict__
-    if hasattr(obj, "__dict__"):
-        result: dict[str, Any] = {}
-        for attr, value in obj.__dict__.items():
-            # Skip private or protected attributes
-            if attr.startswith("_"):
-                continue
-            if callable(value):
-                continue
-            result[attr] = object_to_dict(value)
-        return result
+def written_objects(result: Any) -> list[dict[str, Any]]:
+    """Return the objects carried by a converted write-method response.
 
-    # Fallback to string representation
-    return str(obj)
+    Write methods return either the object itself or an ``(object,
+    errors)`` pair, which converts to a two-element list.
+    """
+    if isinstance(result, dict):
+        return [result] if "id" in result else []
+    if isinstance(result, list):
+        return [item for item in result if isinstance(item, dict) and "id" in item]
+    return []
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(value: str) -> datetime | None:
+    try:
+        # Fast path: Splitwise sends fixed ISO-8601 timestamps ("...Z")
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            from dateutil import parser as date_parser  # type: ignore
+
+            parsed = date_parser.parse(value)
+        except (ValueError, OverflowError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(UTC).replace(tzinfo=None)
+    return parsed
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    """Parse a timestamp into a naive UTC datetime, or None.
+
+    ISO-8601 strings go through `datetime.fromisoformat`; anything else
+    falls back to `dateutil`.  Aware values are converted to UTC rather
+    than having their offset dropped, and naive values are taken to be
+    UTC.  Parsed strings are memoized, so expenses listed again by later
+    calls are not re-parsed.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return value.astimezone(UTC).replace(tzinfo=None)
+        return value
+    if not isinstance(value, str) or not value:
+        return None
+    return _parse_timestamp(value)
 
 
 def month_range(month: str) -> tuple[datetime, datetime]:
@@ -66,3 +226,29 @@ def month_range(month: str) -> tuple[datetime, datetime]:
     else:
         end = start.replace(month=start.month + 1)
     return start, end
+
+
+def period_range(start: str, end: str) -> tuple[date, date]:
+    """Parse an inclusive report range of ``YYYY-MM-DD`` dates.
+
+    ``YYYY-MM`` is accepted too and means the first day of that month for
+    ``start`` and the last day for ``end``.  Raises ValueError for invalid
+    dates or when ``end`` precedes ``start``.
+    """
+    first = _parse_period_bound(start, last=False)
+    last = _parse_period_bound(end, last=True)
+    if last < first:
+        raise ValueError("End date must not be before start date")
+    return first, last
+
+
+def _parse_period_bound(value: str, last: bool) -> date:
+    try:
+        if len(value) == 7:
+            month_start, month_end = month_range(value)
+            return (
+                (month_end - timedelta(days=1)).date() if last else month_start.date()
+            )
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise ValueError("Dates must be in 'YYYY-MM-DD' or 'YYYY-MM' format") from exc
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Microbenchmark for app.utils.object_to_dict.
+
+Builds realistic pages of Splitwise SDK `Expense` objects (nested users
+with pictures, repayments, category and receipt) and compares the
+registry-based converter against the previous reflective implementation,
+checking that both produce identical output.
+
+Usage:
+    python scripts/benchmark_object_to_dict.py [--expenses 1000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from splitwise.expense import Expense  # noqa: E402
+
+from app.utils import object_to_dict  # noqa: E402
+
+
+def legacy_object_to_dict(obj: Any) -> Any:
+    """The original implementation, kept as the reference."""
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, (list, tuple, set)):
+        return [legacy_object_to_dict(item) for item in obj]
+    if isinstance(obj, dict):
+        return {k: legacy_object_to_dict(v) for k, v in obj.items()}
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "__dict__"):
+        result: dict[str, Any] = {}
+        for attr, value in obj.__dict__.items():
+            if attr.startswith("_"):
+                continue
+            if callable(value):
+                continue
+            result[attr] = legacy_object_to_dict(value)
+        return result
+    return str(obj)
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {
+        "id": user_id,
+        "first_name": f"User{user_id}",
+        "last_name": "Example",
+        "email": f"user{user_id}@example.com",
+        "registration_status": "confirmed",
+        "picture": {
+            "small": f"https://example.com/{user_id}/small.png",
+            "medium": f"https://example.com/{user_id}/medium.png",
+            "large": f"https://example.com/{user_id}/large.png",
+        },
+    }
+
+
+def make_expense(expense_id: int, members: int = 4) -> Expense:
+    """Build an SDK expense shaped like a real API response."""
+    users = [
+        {
+            "user": _user(user_id),
+            "user_id": user_id,
+            "paid_share": "40.0" if user_id == 1 else "0.0",
+            "owed_share": f"{40.0 / members:.2f}",
+            "net_balance": "30.0" if user_id == 1 else "-10.0",
+        }
+        for user_id in range(1, members + 1)
+    ]
+    return Expense(
+        {
+            "id": expense_id,
+            "group_id": 10,
+            "description": f"Expense {expense_id}",
+            "repeats": False,
+            "repeat_interval": "never",
+            "email_reminder": False,
+            "email_reminder_in_advance": -1,
+            "next_repeat": None,
+            "details": "Shared dinner with friends",
+            "comments_count": 0,
+            "payment": False,
+            "creation_method": "equal",
+            "transaction_method": "offline",
+            "transaction_confirmed": False,
+            "cost": "40.0",
+            "currency_code": "EUR",
+            "created_by": _user(1),
+            "date": "2025-10-15T10:00:00Z",
+            "created_at": "2025-10-15T10:00:00Z",
+            "updated_at": "2025-10-15T10:00:00Z",
+            "deleted_at": None,
+            "receipt": {"original": None, "large": None},
+            "category": {
+                "id": 13,
+                "name": "Dining out",
+                "subcategories": [],
+            },
+            "updated_by": None,
+            "deleted_by": None,
+            "repayments": [
+                {"from": user_id, "to": 1, "amount": "10.0"}
+                for user_id in range(2, members + 1)
+            ],
+            "users": users,
+        }
+    )
+
+
+def _best_of(func: Any, payload: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = [make_expense(i, args.members) for i in range(args.expenses)]
+
+    if object_to_dict(page) != legacy_object_to_dict(page):
+        print("❌ Output differs from the reference implementation")
+        return 1
+
+    legacy = _best_of(legacy_object_to_dict, page, args.repeat)
+    current = _best_of(object_to_dict, page, args.repeat)
+
+    print(f"Page of {args.expenses} expenses with {args.members} members each")
+    print(f"  legacy object_to_dict:   {legacy * 1000:8.2f} ms")
+    print(f"  registry object_to_dict: {current * 1000:8.2f} ms")
+    print(f"  speedup:                 {legacy / current:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
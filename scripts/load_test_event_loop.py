@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Load test: latency of unrelated sessions while name lookups run.
+
+Runs an in-process `SplitwiseClient` against a fake Splitwise API
+(``httpx.MockTransport`` with a fixed network latency).  A set of
+"session" tasks repeatedly fetch the current user, as unrelated MCP
+sessions would, and their p50/p99/max latency is measured twice: alone,
+and while other tasks keep resolving group names against a large group
+listing (each lookup rebuilds the group index, as a cold or missed
+lookup does).  With the event loop kept free the two rows stay close;
+``--inline`` parses and converts responses on the loop again, the way
+the server did before, to show the difference.  The loop monitor runs
+throughout and reports the stalls it saw.
+
+Usage:
+    python scripts/load_test_event_loop.py [--groups 1000] [--sessions 20]
+        [--lookups 2] [--duration 5] [--latency 0.02] [--inline]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import constants as const  # noqa: E402
+from app.async_client import AsyncSplitwiseHTTP  # noqa: E402
+from app.loop_monitor import LoopMonitor  # noqa: E402
+from app.splitwise_client import SplitwiseClient  # noqa: E402
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {
+        "id": user_id,
+        "first_name": f"User{user_id}",
+        "last_name": "Example",
+        "email": f"user{user_id}@example.com",
+        "picture": {"small": "", "medium": "", "large": ""},
+    }
+
+
+def build_groups(count: int, members: int) -> str:
+    groups = [
+        {
+            "id": group_id,
+            "name": f"Group {group_id}",
+            "group_type": "trip",
+            "updated_at": "2025-10-16T00:00:00Z",
+            "created_at": "2025-01-01T00:00:00Z",
+            "simplify_by_default": False,
+            "members": [
+                {**_user(group_id * 10 + i), "balance": []} for i in range(members)
+            ],
+            "original_debts": [],
+            "simplified_debts": [],
+        }
+        for group_id in range(1, count + 1)
+    ]
+    return json.dumps({"groups": groups})
+
+
+def make_transport(groups_body: str, latency: float) -> httpx.MockTransport:
+    current = {
+        **_user(1),
+        "default_currency": "USD",
+        "locale": "en",
+        "date_format": "MM/DD/YYYY",
+        "default_group_id": None,
+    }
+    user_body = json.dumps({"user": current})
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        if request.url.path.endswith("get_groups"):
+            return httpx.Response(200, text=groups_body)
+        return httpx.Response(200, text=user_body)
+
+    return httpx.MockTransport(handler)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def session(client: SplitwiseClient, until: float, out: list[float]) -> None:
+    while time.perf_counter() < until:
+        started = time.perf_counter()
+        await client.acall_mapped_method(const.METHOD_GET_CURRENT_USER)
+        out.append((time.perf_counter() - started) * 1000)
+
+
+async def lookups(client: SplitwiseClient, groups: int, until: float) -> int:
+    done = 0
+    while time.perf_counter() < until:
+        await client.group_index.refresh(client)
+        await client.aget_group_by_name(f"group {done % groups + 1}")
+        done += 1
+    return done
+
+
+async def phase(
+    client: SplitwiseClient, args: argparse.Namespace, with_lookups: bool
+) -> tuple[list[float], int]:
+    until = time.perf_counter() + args.duration
+    samples: list[float] = []
+    sessions = [session(client, until, samples) for _ in range(args.sessions)]
+    workers = (
+        [lookups(client, args.groups, until) for _ in range(args.lookups)]
+        if with_lookups
+        else []
+    )
+    results = await asyncio.gather(*sessions, *workers)
+    return samples, sum(results[args.sessions :])
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.inline:
+        # Parse and convert every response on the event loop
+        const.OFFLOAD_MIN_BYTES = const.OFFLOAD_MIN_ITEMS = sys.maxsize
+    os.environ[const.ENV_CACHE_ENABLED] = "false"
+    os.environ[const.ENV_SEARCH_INDEX_ENABLED] = "false"
+    transport = make_transport(build_groups(args.groups, args.members), args.latency)
+    client = SplitwiseClient(
+        api_key="load-test", http=AsyncSplitwiseHTTP("load-test", transport=transport)
+    )
+    monitor = LoopMonitor(args.threshold)
+    monitor.start()
+    try:
+        print(
+            f"{'phase':<14}{'calls':>8}{'p50 ms':>10}{'p99 ms':>10}"
+            f"{'max ms':>10}{'lookups':>9}"
+        )
+        for label, with_lookups in (("idle", False), ("with lookups", True)):
+            samples, done = await phase(client, args, with_lookups)
+            print(
+                f"{label:<14}{len(samples):>8}"
+                f"{statistics.median(samples):>10.1f}"
+                f"{percentile(samples, 99):>10.1f}"
+                f"{max(samples):>10.1f}{done:>9}"
+            )
+    finally:
+        await monitor.stop()
+        await client.aclose()
+    stats = monitor.stats()
+    print(
+        f"loop stalls over {stats['threshold_ms']:.0f} ms: {stats['blocks']} "
+        f"(max {stats['max_block_ms']} ms)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument(
+        "--threshold", type=float, default=const.DEFAULT_LOOP_BLOCK_THRESHOLD
+    )
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        help="parse responses on the event loop (the previous behaviour)",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """Test configuration and fixtures."""
 
+import json
 from unittest.mock import Mock, patch
+from urllib.parse import parse_qs
 
+import httpx
 import pytest
+import requests
 
 from app.splitwise_client import SplitwiseClient
 
@@ -69,3 +73,147 @@ def sample_expenses():
             "category": {"name": "Transportation"},
         },
     ]
+
+
+def expense_json(expense_id, description, cost, date, **extra):
+    """Return an expense as the Splitwise API serializes it."""
+    return {
+        "id": expense_id,
+        "group_id": None,
+        "description": description,
+        "repeats": False,
+        "repeat_interval": "never",
+        "email_reminder": False,
+        "email_reminder_in_advance": -1,
+        "next_repeat": None,
+        "details": None,
+        "comments_count": 0,
+        "payment": False,
+        "creation_method": "equal",
+        "transaction_method": "offline",
+        "transaction_confirmed": False,
+        "cost": cost,
+        "currency_code": "USD",
+        "created_by": {"id": 1, "first_name": "Test", "last_name": "User"},
+        "date": date,
+        "created_at": "2025-10-15T00:00:00Z",
+        "updated_at": "2025-10-15T00:00:00Z",
+        "deleted_at": None,
+        "receipt": {"original": None, "large": None},
+        "category": {"id": 18, "name": "General"},
+        "updated_by": None,
+        "deleted_by": None,
+        "repayments": [],
+        "users": [],
+        **extra,
+    }
+
+
+def group_json(group_id, name, members):
+    """Return a group as the Splitwise API serializes it."""
+    return {
+        "id": group_id,
+        "name": name,
+        "updated_at": "2025-10-01T10:00:00Z",
+        "created_at": "2025-09-01T10:00:00Z",
+        "simplify_by_default": False,
+        "original_debts": [],
+        "simplified_debts": [],
+        "members": [
+            {"id": member_id, "first_name": first_name, "last_name": "", "balance": []}
+            for member_id, first_name in members
+        ],
+    }
+
+
+class FakeSplitwiseAPI:
+    """In-memory Splitwise API for the SDK and the async HTTP transport.
+
+    `send` answers the SDK's ``create_expense`` POSTs at the ``requests``
+    layer: each form is recorded and stored as a new expense, or rejected
+    with ``errors`` when set.  `handler` serves ``groups`` and
+    ``expenses`` to `app.async_client.AsyncSplitwiseHTTP` through an
+    ``httpx.MockTransport``.
+    """
+
+    def __init__(self):
+        self.forms = []
+        self.errors = None
+        self.groups = []
+        self.expenses = []
+
+    def _created(self, form):
+        users = []
+        position = 0
+        while f"users__{position}__user_id" in form:
+            prefix = f"users__{position}__"
+            user_id = int(form[f"{prefix}user_id"])
+            users.append(
+                {
+                    "user": {"id": user_id, "first_name": "", "last_name": ""},
+                    "user_id": user_id,
+                    "paid_share": form[f"{prefix}paid_share"],
+                    "owed_share": form[f"{prefix}owed_share"],
+                    "net_balance": "0",
+                }
+            )
+            position += 1
+        return expense_json(
+            900 + len(self.forms),
+            form["description"],
+            form["cost"],
+            form.get("date", "2025-10-15T00:00:00Z"),
+            group_id=int(form["group_id"]) if "group_id" in form else None,
+            currency_code=form["currency_code"],
+            details=form.get("details"),
+            category={"id": int(form.get("category_id", 18)), "name": "General"},
+            users=users,
+        )
+
+    def send(self, request, **kwargs):
+        form = {key: values[0] for key, values in parse_qs(request.body).items()}
+        self.forms.append(form)
+        if self.errors:
+            body = {"expenses": [], "errors": self.errors}
+        else:
+            expense = self._created(form)
+            self.expenses.append(expense)
+            body = {"expenses": [expense], "errors": {}}
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(body).encode()
+        return response
+
+    def handler(self, request):
+        endpoint, _, item = request.url.path.rpartition("/api/v3.0/")[2].partition("/")
+        params = request.url.params
+        if endpoint == "get_groups":
+            return httpx.Response(200, json={"groups": self.groups})
+        if endpoint == "get_group":
+            group = next(g for g in self.groups if g["id"] == int(item))
+            return httpx.Response(200, json={"group": group})
+        if endpoint == "get_expenses":
+            matches = [
+                expense
+                for expense in self.expenses
+                if (
+                    "group_id" not in params
+                    or expense["group_id"] == int(params["group_id"])
+                )
+                and expense["date"][:10] >= params.get("dated_after", "")
+                and expense["date"][:10] < params.get("dated_before", "9999")
+            ]
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 20))
+            return httpx.Response(
+                200, json={"expenses": matches[offset : offset + limit]}
+            )
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def splitwise_api():
+    """Serve the SDK's HTTP requests from a `FakeSplitwiseAPI`."""
+    api = FakeSplitwiseAPI()
+    with patch.object(requests.Session, "send", api.send):
+        yield api
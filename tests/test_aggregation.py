@@ -0,0 +1,164 @@
+"""Tests for app.aggregation module."""
+
+import pytest
+
+from app.aggregation import (
+    MISSING,
+    ExpenseColumns,
+    bucket_label,
+    category_label,
+    epoch_day,
+    to_cents,
+)
+
+EXPENSES = [
+    {
+        "id": 1,
+        "group_id": 5,
+        "cost": "30.00",
+        "date": "2025-10-15T10:00:00Z",
+        "category": {"id": 12, "name": "Groceries"},
+        "users": [
+            {"user_id": 1, "paid_share": "30.0", "owed_share": "15.0"},
+            {"user_id": 2, "paid_share": "0.0", "owed_share": "15.0"},
+        ],
+    },
+    {
+        "id": 2,
+        "group_id": 5,
+        "cost": "10.005",
+        "date": "2025-11-01T00:00:00Z",
+        "category": {"name": "Dining out"},
+        "users": [
+            {"id": 2, "paid_share": "10.01", "owed_share": "5.0"},
+            {"id": 1, "paid_share": "0", "owed_share": "5.01"},
+        ],
+    },
+    {
+        "id": 3,
+        "group_id": 6,
+        "amount": "5",
+        "created_at": "2025-10-31T23:00:00Z",
+        "category_id": 12,
+    },
+]
+
+
+@pytest.fixture
+def columns():
+    return ExpenseColumns.from_expenses(EXPENSES)
+
+
+class TestParsing:
+    """Test per-value parsing helpers."""
+
+    def test_to_cents(self):
+        """Test fixed-point conversion of costs."""
+        assert to_cents("12.34") == 1234
+        assert to_cents(" 0.005 ") == 1
+        assert to_cents(7) == 700
+        assert to_cents(2.675) == 268
+        assert to_cents("-1.5") == -150
+        for invalid in (None, "", "abc", "nan", True):
+            assert to_cents(invalid) == 0
+
+    def test_epoch_day(self):
+        """Test date strings become days since the epoch."""
+        assert epoch_day("1970-01-02T05:00:00Z") == 1
+        assert epoch_day("2025-13-01") == MISSING
+        assert epoch_day(None) == MISSING
+
+    def test_category_label(self):
+        """Test category names, ids and the unknown fallback."""
+        assert category_label({"category": {"name_en": "Rent"}}) == "Rent"
+        assert category_label({"category_id": 3}) == "3"
+        assert category_label({"category": {}}) == "Unknown"
+
+
+class TestExpenseColumns:
+    """Test columnar rollups."""
+
+    def test_totals(self, columns):
+        """Test total, category and share rollups in cents."""
+        assert len(columns) == 3
+        assert columns.total() == 4501
+        assert columns.category_totals() == {
+            "Groceries": 3000,
+            "Dining out": 1001,
+            "12": 500,
+        }
+        assert columns.category_counts() == {"Groceries": 1, "Dining out": 1, "12": 1}
+        assert columns.category_shares()["Groceries"] == pytest.approx(3000 / 4501)
+
+    def test_month_group_and_member_totals(self, columns):
+        """Test per-month, per-group, per-member and per-payer rollups."""
+        assert columns.month_totals() == {"2025-10": 3500, "2025-11": 1001}
+        assert columns.group_totals() == {5: 4001, 6: 500}
+        assert columns.member_totals() == {
+            1: {"paid": 3000, "owed": 2001, "net": 999},
+            2: {"paid": 1001, "owed": 2000, "net": -999},
+        }
+        assert columns.payer_totals() == {1: 3000, 2: 1001}
+
+    def test_select(self, columns):
+        """Test date and group selection carries shares along."""
+        october = columns.select(epoch_day("2025-10-01"), epoch_day("2025-11-01"))
+        assert october.total() == 3500
+        assert october.member_totals()[2] == {"paid": 0, "owed": 1500, "net": -1500}
+
+        group = columns.select(group_ids=[5]).select(start_day=epoch_day("2025-11-01"))
+        assert group.total() == 1001
+        assert list(group.share_row) == [0, 0]
+        assert group.payer_totals() == {2: 1001}
+
+    def test_empty(self):
+        """Test rollups over no rows."""
+        columns = ExpenseColumns()
+
+        assert columns.total() == 0
+        assert columns.category_totals() == {}
+        assert columns.member_totals() == {}
+
+
+class TestTimeseries:
+    """Test single-pass bucketing."""
+
+    def test_bucket_labels(self):
+        """Test labels for each granularity."""
+        day = epoch_day("2025-12-29")
+
+        assert bucket_label(day, "day") == "2025-12-29"
+        assert bucket_label(day, "week") == "2026-W01"
+        assert bucket_label(day, "month") == "2025-12"
+        assert bucket_label(day, "quarter") == "2025-Q4"
+        with pytest.raises(ValueError):
+            bucket_label(day, "year")
+
+    def test_weekly_series(self, columns):
+        """Test that rows outside the range are skipped and gaps kept."""
+        series = columns.timeseries(
+            epoch_day("2025-10-13"), epoch_day("2025-11-03"), "week"
+        )
+
+        assert series["buckets"] == ["2025-W42", "2025-W43", "2025-W44"]
+        assert series["totals"] == [3000, 0, 1501]
+        assert series["counts"] == [1, 0, 2]
+        assert series["categories"] == {
+            "Groceries": [3000, 0, 0],
+            "Dining out": [0, 0, 1001],
+            "12": [0, 0, 500],
+        }
+        assert series["members"] == {
+            1: {"paid": [3000, 0, 0], "owed": [1500, 0, 501]},
+            2: {"paid": [0, 0, 1001], "owed": [1500, 0, 500]},
+        }
+
+    def test_rows_outside_range_skipped(self, columns):
+        """Test that rows before or after the range are not bucketed."""
+        series = columns.timeseries(
+            epoch_day("2025-10-20"), epoch_day("2025-10-31"), "day"
+        )
+
+        assert len(series["buckets"]) == 11
+        assert sum(series["totals"]) == 0
+        assert series["members"] == {}
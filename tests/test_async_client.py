@@ -0,0 +1,189 @@
+"""Tests for app.async_client module against a fake Splitwise server."""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+from splitwise.exception import SplitwiseNotFoundException
+from splitwise.group import Group
+
+from app.async_client import AsyncSplitwiseHTTP
+from app.splitwise_client import SplitwiseClient
+from app.utils import object_to_dict
+
+GROUP_DATA = {
+    "id": 5,
+    "name": "Trip",
+    "updated_at": "2025-10-01T10:00:00Z",
+    "created_at": "2025-09-01T10:00:00Z",
+    "simplify_by_default": False,
+    "original_debts": [],
+    "simplified_debts": [],
+    "members": [],
+}
+
+COMMENT_DATA = {
+    "id": 8,
+    "content": "Paid in cash",
+    "comment_type": "User",
+    "relation_type": "ExpenseComment",
+    "relation_id": 40,
+    "created_at": "2025-10-01T10:00:00Z",
+    "deleted_at": None,
+    "user": {"id": 1, "first_name": "Ana", "last_name": "Lee"},
+}
+
+
+class FakeSplitwiseServer:
+    """In-process fake of the Splitwise REST API."""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path.removeprefix("/api/v3.0/")
+        if path == "get_groups":
+            return httpx.Response(200, json={"groups": [GROUP_DATA]})
+        if path == "get_group/5":
+            return httpx.Response(200, json={"group": GROUP_DATA})
+        if path == "get_expenses":
+            return httpx.Response(200, json={"expenses": []})
+        if path == "get_comments":
+            return httpx.Response(200, json={"comments": [COMMENT_DATA]})
+        if path == "get_categories":
+            return httpx.Response(200, json={"categories": [{"id": 1, "name": "Food"}]})
+        return httpx.Response(404, json={"errors": {"base": ["Not found"]}})
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handler)
+
+
+@pytest.fixture
+def fake_server():
+    return FakeSplitwiseServer()
+
+
+@pytest.fixture
+def http(fake_server):
+    return AsyncSplitwiseHTTP(
+        api_key="test_key", http2=False, transport=fake_server.transport()
+    )
+
+
+class TestAsyncSplitwiseHTTP:
+    """Test the native async transport."""
+
+    @pytest.mark.asyncio
+    async def test_list_groups_matches_sdk_models(self, http, fake_server):
+        """Test that responses are parsed into SDK model objects."""
+        groups = await http.call("list_groups")
+
+        assert object_to_dict(groups) == object_to_dict([Group(GROUP_DATA)])
+        request = fake_server.requests[0]
+        assert request.headers["Authorization"] == "Bearer test_key"
+
+    @pytest.mark.asyncio
+    async def test_path_parameter(self, http, fake_server):
+        """Test that id arguments are appended to the path."""
+        group = await http.call("get_group", id=5)
+
+        assert group.name == "Trip"
+        assert fake_server.requests[0].url.path == "/api/v3.0/get_group/5"
+
+    @pytest.mark.asyncio
+    async def test_query_parameters(self, http, fake_server):
+        """Test that kwargs become query parameters, booleans lowercased."""
+        await http.call(
+            "list_expenses", group_id=5, limit=10, visible=True, offset=None
+        )
+
+        params = dict(fake_server.requests[0].url.params)
+        assert params == {"group_id": "5", "limit": "10", "visible": "true"}
+
+    @pytest.mark.asyncio
+    async def test_not_found_raises_sdk_exception(self, http):
+        """Test that HTTP errors map to SDK exceptions."""
+        with pytest.raises(SplitwiseNotFoundException):
+            await http.call("get_expense", id=999)
+
+    @pytest.mark.asyncio
+    async def test_connection_pool_reused(self, http):
+        """Test that a single pooled client serves all calls."""
+        await http.call("list_categories")
+        pooled = http._client
+        await http.call("list_groups")
+
+        assert http._client is pooled
+        await http.aclose()
+        assert http._client is None
+
+    def test_supports_only_read_methods(self, http):
+        """Test that write methods are left to the SDK."""
+        assert http.supports("list_groups")
+        assert not http.supports("create_expense")
+
+    @pytest.mark.asyncio
+    async def test_unsupported_method(self, http):
+        """Test that unsupported methods raise AttributeError."""
+        with pytest.raises(AttributeError, match="Unsupported async method"):
+            await http.call("create_expense")
+
+
+class TestAcallMappedMethod:
+    """Test SplitwiseClient.acall_mapped_method."""
+
+    @pytest.fixture
+    def client(self, http):
+        with patch("app.splitwise_client.Splitwise"):
+            return SplitwiseClient(api_key="test_key", http=http)
+
+    @pytest.mark.asyncio
+    async def test_reads_use_async_transport(self, client, fake_server):
+        """Test that reads bypass the SDK and are cached."""
+        first = await client.acall_mapped_method("list_categories")
+        second = await client.acall_mapped_method("list_categories")
+
+        assert first == second == [{"id": 1, "name": "Food", "subcategories": []}]
+        assert len(fake_server.requests) == 1
+        client.raw_client.getCategories.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_comments_read_by_expense(self, client, fake_server):
+        """Test that get_comments is served by the async transport and cached."""
+        comments = await client.acall_mapped_method("get_comments", expense_id=40)
+        await client.acall_mapped_method("get_comments", expense_id=40)
+
+        assert [comment["content"] for comment in comments] == ["Paid in cash"]
+        assert dict(fake_server.requests[0].url.params) == {"expense_id": "40"}
+        assert len(fake_server.requests) == 1
+        client.raw_client.getComments.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_writes_use_sdk(self, client, fake_server):
+        """Test that writes run the SDK and invalidate cached reads."""
+        client.raw_client.deleteExpense.return_value = {"success": True}
+        await client.acall_mapped_method("list_groups")
+
+        result = await client.acall_mapped_method("delete_expense", id=1)
+        await client.acall_mapped_method("list_groups")
+
+        assert result == {"success": True}
+        client.raw_client.deleteExpense.assert_called_once_with(id=1)
+        assert len(fake_server.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_unsupported_method(self, client):
+        """Test that unknown methods are rejected."""
+        with pytest.raises(AttributeError, match="Unsupported method 'nope'"):
+            await client.acall_mapped_method("nope")
+
+    def test_oauth_client_has_no_async_transport(self):
+        """Test that OAuth credentials fall back to the SDK path."""
+        with (
+            patch("app.splitwise_client.Splitwise"),
+            patch.dict("os.environ", {}, clear=True),
+        ):
+            client = SplitwiseClient(consumer_key="key", consumer_secret="secret")
+
+        assert client._http is None
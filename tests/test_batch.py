@@ -0,0 +1,308 @@
+"""Tests for app.batch module."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from splitwise.exception import SplitwiseException
+
+from app.batch import IdempotencyStore, create_expenses, validate_expense_spec
+from app.shared_state import MemoryBackend, SharedCache
+from app.splitwise_client import SplitwiseClient
+
+
+def make_client(create=None):
+    client = Mock()
+    client.idempotency = IdempotencyStore()
+    client.afind_group_member = AsyncMock(
+        side_effect=lambda group_id, name, fuzzy: {"ana": {"id": 7}}.get(name.lower())
+    )
+    ids = iter(range(100, 200))
+    client.acall_mapped_method = AsyncMock(
+        side_effect=create or (lambda method, expense: {"id": next(ids)})
+    )
+    return client
+
+
+class TestValidateExpenseSpec:
+    """Test local validation of expense specs."""
+
+    @pytest.mark.asyncio
+    async def test_shares_and_names(self):
+        """Test that named participants resolve and shares are flattened."""
+        params = await validate_expense_spec(
+            make_client(),
+            {
+                "cost": "10",
+                "description": " Lunch ",
+                "currency_code": "eur",
+                "group_id": "3",
+                "users": [
+                    {"name": "Ana", "paid_share": "10", "owed_share": "5.00"},
+                    {"user_id": 8, "paid_share": 0, "owed_share": "5"},
+                ],
+            },
+        )
+
+        assert params == {
+            "cost": "10.00",
+            "description": "Lunch",
+            "currency_code": "EUR",
+            "group_id": 3,
+            "users__0__user_id": 7,
+            "users__0__paid_share": "10.00",
+            "users__0__owed_share": "5.00",
+            "users__1__user_id": 8,
+            "users__1__paid_share": "0.00",
+            "users__1__owed_share": "5.00",
+        }
+
+    @pytest.mark.asyncio
+    async def test_zero_decimal_currency_shares(self):
+        """Test that yen shares are validated and sent in whole yen."""
+        params = await validate_expense_spec(
+            make_client(),
+            {
+                "cost": "1000",
+                "currency_code": "jpy",
+                "description": "Ramen",
+                "users": [
+                    {"user_id": 1, "paid_share": "1000", "owed_share": "333"},
+                    {"user_id": 2, "paid_share": "0", "owed_share": "667"},
+                ],
+            },
+        )
+
+        assert params["cost"] == "1000"
+        assert params["users__0__owed_share"] == "333"
+        assert params["users__1__owed_share"] == "667"
+
+    @pytest.mark.asyncio
+    async def test_invalid_specs(self):
+        """Test the errors reported for invalid specs."""
+        client = make_client()
+        cases = [
+            ({"cost": "0", "description": "x", "group_id": 1}, "positive"),
+            ({"cost": "5", "group_id": 1}, "description"),
+            ({"cost": "5", "description": "x"}, "group_id or users"),
+            (
+                {
+                    "cost": "5",
+                    "description": "x",
+                    "group_id": 1,
+                    "users": [{"name": "Bob", "paid_share": "5", "owed_share": "5"}],
+                },
+                "not in the group",
+            ),
+            (
+                {
+                    "cost": "5",
+                    "description": "x",
+                    "users": [{"user_id": 1, "paid_share": "5", "owed_share": "4"}],
+                },
+                "owed shares add up to 4.00, not 5.00",
+            ),
+            (
+                {
+                    "cost": "1000",
+                    "currency_code": "JPY",
+                    "description": "x",
+                    "users": [
+                        {"user_id": 1, "paid_share": "1000", "owed_share": "999"}
+                    ],
+                },
+                "owed shares add up to 999, not 1000",
+            ),
+        ]
+        for spec, message in cases:
+            with pytest.raises(ValueError, match=message):
+                await validate_expense_spec(client, spec)
+
+
+class TestCreateExpenses:
+    """Test batch submission."""
+
+    SPECS = [
+        {"cost": "1", "description": "a", "group_id": 1},
+        {"cost": "-1", "description": "b", "group_id": 1},
+        {"cost": "1", "description": "a", "group_id": 1},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_and_order(self):
+        """Test that invalid items are skipped and results keep input order."""
+        client = make_client()
+
+        result = await create_expenses(client, self.SPECS)
+
+        assert result["counts"] == {"created": 2, "invalid": 1}
+        assert [item["status"] for item in result["results"]] == [
+            "created",
+            "invalid",
+            "created",
+        ]
+        assert client.acall_mapped_method.await_count == 2
+        assert client.acall_mapped_method.await_args.kwargs["expense"].split_equally
+
+    @pytest.mark.asyncio
+    async def test_retry_does_not_duplicate(self):
+        """Test that resubmitting a batch replays the created expenses."""
+        client = make_client()
+
+        first = await create_expenses(client, self.SPECS)
+        second = await create_expenses(client, self.SPECS)
+
+        assert second["counts"] == {"duplicate": 2, "invalid": 1}
+        assert [item.get("id") for item in second["results"]] == [
+            item.get("id") for item in first["results"]
+        ]
+        assert client.acall_mapped_method.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_subset_and_reordered_resubmission_replayed(self):
+        """Test that derived keys follow content, not position in the batch."""
+        client = make_client()
+        specs = [
+            {"cost": "1", "description": "a", "group_id": 1},
+            {"cost": "2", "description": "b", "group_id": 1},
+            {"cost": "1", "description": "a", "group_id": 1},
+        ]
+        first = await create_expenses(client, specs)
+        ids = [item["id"] for item in first["results"]]
+
+        single = await create_expenses(client, [specs[1]])
+        reordered = await create_expenses(client, specs[::-1])
+
+        assert len(set(ids)) == 3
+        assert single["results"][0]["status"] == "duplicate"
+        assert single["results"][0]["id"] == ids[1]
+        assert reordered["counts"] == {"duplicate": 3}
+        assert sorted(item["id"] for item in reordered["results"]) == sorted(ids)
+        assert client.acall_mapped_method.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_outcomes_shared_between_workers(self):
+        """Test that a retry reaching another worker replays the expense."""
+        backend = MemoryBackend()
+        workers = [make_client() for _ in range(2)]
+        for client in workers:
+            client.idempotency = IdempotencyStore(shared=SharedCache(backend, "tenant"))
+
+        first = await create_expenses(workers[0], self.SPECS)
+        second = await create_expenses(workers[1], self.SPECS)
+
+        assert second["counts"] == {"duplicate": 2, "invalid": 1}
+        assert [item.get("id") for item in second["results"]] == [
+            item.get("id") for item in first["results"]
+        ]
+        assert workers[1].acall_mapped_method.await_count == 0
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self):
+        """Test that no more than the allowed number of writes overlap."""
+        active = peak = 0
+
+        async def create(method, expense):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"id": expense.getDescription()}
+
+        specs = [{"cost": "1", "description": str(i), "group_id": 1} for i in range(10)]
+        result = await create_expenses(make_client(create), specs, concurrency=3)
+
+        assert result["counts"] == {"created": 10}
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_retried_and_errors_reported(self):
+        """Test 429 retries and upstream errors reported per item."""
+        limited = SplitwiseException(
+            "Unknown error happened",
+            response=httpx.Response(429, headers={"Retry-After": "0"}),
+        )
+        create = AsyncMock(
+            side_effect=[limited, {"id": 5}, [None, {"base": ["Invalid"]}]]
+        )
+        client = make_client(create)
+        specs = [{"cost": "1", "description": "a", "group_id": 1}] * 2
+
+        with patch("app.batch.const.BATCH_RETRY_BASE_DELAY", 0):
+            result = await create_expenses(client, specs, concurrency=1)
+
+        assert result["results"][0]["id"] == 5
+        assert result["results"][1]["status"] == "failed"
+        assert "Invalid" in result["results"][1]["error"]
+        assert client.idempotency.stats()["keys"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dry_run(self):
+        """Test that a dry run validates without creating anything."""
+        client = make_client()
+
+        result = await create_expenses(client, self.SPECS[:1], dry_run=True)
+
+        assert result["results"][0]["status"] == "valid"
+        assert result["results"][0]["params"]["cost"] == "1.00"
+        client.acall_mapped_method.assert_not_awaited()
+
+
+class TestSubmitThroughSDK:
+    """Test batch creation through SplitwiseClient and the Splitwise SDK."""
+
+    @pytest.fixture
+    def client(self):
+        with patch.dict(
+            os.environ, {"SPLITWISE_ASYNC_HTTP": "false", "SPLITWISE_API_KEY": "key"}
+        ):
+            client = SplitwiseClient()
+        client.afind_group_member = AsyncMock(return_value={"id": 7})
+        return client
+
+    @pytest.mark.asyncio
+    async def test_expenses_posted_with_shares(self, client, splitwise_api):
+        """Test that the SDK receives Expense objects and posts every share."""
+        specs = [
+            {"cost": "12", "description": "Taxi", "group_id": 3, "category_id": 15},
+            {
+                "cost": "10",
+                "description": "Lunch",
+                "group_id": 3,
+                "users": [
+                    {"name": "Ana", "paid_share": "10", "owed_share": "4"},
+                    {"user_id": 8, "paid_share": "0", "owed_share": "6"},
+                ],
+            },
+        ]
+
+        result = await create_expenses(client, specs, concurrency=1)
+
+        assert result["counts"] == {"created": 2}
+        assert [item["id"] for item in result["results"]] == [901, 902]
+        taxi, lunch = splitwise_api.forms
+        assert taxi["split_equally"] == "true"
+        assert taxi["category_id"] == "15"
+        assert taxi["group_id"] == "3"
+        assert "users" not in taxi
+        assert lunch["users__0__user_id"] == "7"
+        assert lunch["users__0__paid_share"] == "10.00"
+        assert lunch["users__1__user_id"] == "8"
+        assert lunch["users__1__owed_share"] == "6.00"
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_upstream_errors_reported(self, client, splitwise_api):
+        """Test that errors returned by Splitwise fail the item."""
+        splitwise_api.errors = {"base": ["Invalid group"]}
+
+        result = await create_expenses(
+            client, [{"cost": "1", "description": "a", "group_id": 1}]
+        )
+
+        assert result["results"][0]["status"] == "failed"
+        assert "Invalid group" in result["results"][0]["error"]
+        await client.aclose()
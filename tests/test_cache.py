@@ -0,0 +1,143 @@
+"""Tests for app.cache module."""
+
+from app.cache import ResponseCache, normalize_kwargs
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNormalizeKwargs:
+    """Test cache key normalization."""
+
+    def test_order_independent(self):
+        """Test that keyword order does not change the key."""
+        assert normalize_kwargs({"a": 1, "b": 2}) == normalize_kwargs({"b": 2, "a": 1})
+
+    def test_empty(self):
+        """Test that empty kwargs produce an empty key."""
+        assert normalize_kwargs({}) == ""
+
+
+class TestResponseCache:
+    """Test ResponseCache behaviour."""
+
+    def test_miss_then_hit(self):
+        """Test that a stored value is returned on the next lookup."""
+        cache = ResponseCache()
+
+        assert cache.get("list_groups", {}) == (False, None)
+        cache.set("list_groups", {}, [{"id": 1}], ttl=60)
+
+        assert cache.get("list_groups", {}) == (True, [{"id": 1}])
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["by_method"]["list_groups"] == {"hits": 1, "misses": 1}
+
+    def test_returns_copy(self):
+        """Test that callers cannot mutate the cached value."""
+        cache = ResponseCache()
+        cache.set("get_group", {"id": 1}, {"name": "Trip"}, ttl=60)
+
+        _, value = cache.get("get_group", {"id": 1})
+        value["name"] = "Changed"
+
+        assert cache.get("get_group", {"id": 1}) == (True, {"name": "Trip"})
+
+    def test_kwargs_are_part_of_key(self):
+        """Test that different arguments are cached separately."""
+        cache = ResponseCache()
+        cache.set("get_group", {"id": 1}, {"id": 1}, ttl=60)
+
+        assert cache.get("get_group", {"id": 2}) == (False, None)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after their TTL."""
+        clock = FakeClock()
+        cache = ResponseCache(clock=clock)
+        cache.set("list_expenses", {}, [], ttl=10)
+
+        clock.now = 9.9
+        assert cache.get("list_expenses", {})[0] is True
+        clock.now = 10.0
+        assert cache.get("list_expenses", {})[0] is False
+        assert cache.stats()["entries"] == 0
+
+    def test_zero_ttl_not_stored(self):
+        """Test that a non-positive TTL disables caching."""
+        cache = ResponseCache()
+        cache.set("list_expenses", {}, [], ttl=0)
+
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_by_entries(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("m", {"k": 1}, 1, ttl=60)
+        cache.set("m", {"k": 2}, 2, ttl=60)
+        cache.get("m", {"k": 1})  # Touch k=1 so k=2 becomes the oldest
+        cache.set("m", {"k": 3}, 3, ttl=60)
+
+        assert cache.get("m", {"k": 1})[0] is True
+        assert cache.get("m", {"k": 2})[0] is False
+        assert cache.get("m", {"k": 3})[0] is True
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        """Test that the byte limit is enforced."""
+        cache = ResponseCache(max_bytes=15)
+        cache.set("m", {"k": 1}, "a" * 8, ttl=60)
+        cache.set("m", {"k": 2}, "b" * 8, ttl=60)
+
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["bytes"] <= 15
+        assert cache.get("m", {"k": 2})[0] is True
+
+    def test_oversized_value_skipped(self):
+        """Test that a value larger than max_bytes is not cached."""
+        cache = ResponseCache(max_bytes=5)
+        cache.set("m", {}, "x" * 100, ttl=60)
+
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate(self):
+        """Test invalidation by method name."""
+        cache = ResponseCache()
+        cache.set("list_expenses", {"limit": 1}, [], ttl=60)
+        cache.set("list_expenses", {"limit": 2}, [], ttl=60)
+        cache.set("list_categories", {}, [], ttl=60)
+
+        removed = cache.invalidate("list_expenses")
+
+        assert removed == 2
+        assert cache.get("list_categories", {})[0] is True
+        assert cache.stats()["invalidations"] == 2
+
+    def test_response_fetched_before_invalidation_not_stored(self):
+        """Test that a set with an outdated generation is dropped."""
+        cache = ResponseCache()
+        generation = cache.generation("list_expenses")
+
+        cache.invalidate("list_expenses")
+        cache.set("list_expenses", {}, [{"id": 1}], ttl=60, generation=generation)
+
+        assert cache.get("list_expenses", {})[0] is False
+        assert cache.stats()["stale_writes"] == 1
+        fresh = cache.generation("list_expenses")
+        cache.set("list_expenses", {}, [{"id": 2}], ttl=60, generation=fresh)
+        assert cache.get("list_expenses", {}) == (True, [{"id": 2}])
+
+    def test_size_counted_in_utf8_bytes(self):
+        """Test that non-ASCII payloads are accounted by encoded size."""
+        cache = ResponseCache()
+        cache.set_json("m", {}, '"€€"', ttl=60)
+
+        assert cache.stats()["bytes"] == len('"€€"'.encode())
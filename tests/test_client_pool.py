@@ -0,0 +1,216 @@
+"""Tests for app.client_pool module."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.client_pool import ClientPool, tenant_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Session:
+    """Stand-in for an MCP server session."""
+
+
+def fake_factory(credentials, tenant):
+    client = Mock(tenant=tenant, credentials=credentials)
+    client.aclose = AsyncMock()
+    return client
+
+
+class TestClientPool:
+    """Test tenant lookup and eviction."""
+
+    @pytest.mark.asyncio
+    async def test_clients_shared_per_credential(self):
+        """Test one client per credential and none shared across them."""
+        pool = ClientPool(factory=fake_factory)
+
+        first = pool.get({"api_key": "a"})
+        again = pool.get({"api_key": "a"})
+        other = pool.get({"api_key": "b"})
+
+        assert first is again
+        assert other is not first
+        assert first.tenant == tenant_key({"api_key": "a"})
+        assert "a" not in first.tenant
+        assert pool.stats()["tenants"] == 2
+        assert pool.stats()["hits"] == 1
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_evicted_and_closed(self):
+        """Test that a full pool closes its least recently used client."""
+        pool = ClientPool(factory=fake_factory, max_clients=2)
+        a = pool.get({"api_key": "a"})
+        b = pool.get({"api_key": "b"})
+        pool.get({"api_key": "a"})
+
+        pool.get({"api_key": "c"})
+        await asyncio.sleep(0.01)
+
+        b.aclose.assert_awaited_once()
+        a.aclose.assert_not_awaited()
+        assert pool.stats()["evicted"] == 1
+        assert pool.get({"api_key": "b"}) is not b
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_idle_clients_swept(self):
+        """Test that clients unused for the idle TTL are closed."""
+        clock = Clock()
+        pool = ClientPool(factory=fake_factory, idle_ttl=60, clock=clock)
+        idle = pool.get({"api_key": "a"})
+        clock.now += 50
+        busy = pool.get({"api_key": "b"})
+        clock.now += 20
+
+        assert pool.sweep() == 1
+        await asyncio.sleep(0.01)
+
+        idle.aclose.assert_awaited_once()
+        busy.aclose.assert_not_awaited()
+        assert len(pool) == 1
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_evicted_client_closed_after_its_requests(self):
+        """Test that a retired client is closed only once no request holds it."""
+        pool = ClientPool({"api_key": "a"}, factory=fake_factory, max_clients=1)
+        leased = asyncio.Event()
+        finish = asyncio.Event()
+
+        async def request():
+            client = pool.client_for(Session())
+            pool.client_for(Session())
+            leased.set()
+            await finish.wait()
+            return client
+
+        task = asyncio.create_task(request())
+        await leased.wait()
+        assert pool.stats()["leases"] == 1
+
+        pool.get({"api_key": "b"})
+        await asyncio.sleep(0.01)
+        busy = next(iter(pool._leases))
+        busy.aclose.assert_not_awaited()
+        assert pool.stats()["closing"] == 1
+
+        finish.set()
+        assert await task is busy
+        await asyncio.sleep(0.01)
+        busy.aclose.assert_awaited_once()
+        assert pool.stats()["leases"] == 0
+        await pool.aclose()
+
+
+class TestSessionCredentials:
+    """Test per-session credential resolution."""
+
+    @pytest.mark.asyncio
+    async def test_header_credentials_bound_to_session(self):
+        """Test that a session keeps the key it sent once."""
+        pool = ClientPool({"api_key": "env"}, allow_headers=True, factory=fake_factory)
+        session = Session()
+
+        mine = pool.client_for(session, "user-key")
+
+        assert mine.credentials == {"api_key": "user-key"}
+        assert pool.client_for(session) is mine
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_header_required_unless_fallback_enabled(self):
+        """Test that sessions without a key only get the env account on opt-in."""
+        strict = ClientPool(
+            {"api_key": "env"}, allow_headers=True, factory=fake_factory
+        )
+        lenient = ClientPool(
+            {"api_key": "env"},
+            allow_headers=True,
+            env_fallback=True,
+            factory=fake_factory,
+        )
+
+        with pytest.raises(ValueError, match="X-Splitwise-Api-Key"):
+            strict.client_for(Session())
+        assert strict.fallback_credentials is None
+        assert lenient.client_for(Session()).credentials == {"api_key": "env"}
+        await lenient.aclose()
+
+    def test_fallback_read_from_environment(self):
+        """Test that the env fallback is off unless configured."""
+        env = {"SPLITWISE_API_KEY": "env", "SPLITWISE_MULTI_TENANT": "true"}
+        with patch.dict("os.environ", env, clear=True):
+            assert ClientPool.from_env().fallback_credentials is None
+        env["SPLITWISE_TENANT_ENV_FALLBACK"] = "true"
+        with patch.dict("os.environ", env, clear=True):
+            assert ClientPool.from_env().fallback_credentials == {"api_key": "env"}
+
+    @pytest.mark.asyncio
+    async def test_headers_ignored_unless_enabled(self):
+        """Test that single-tenant pools always use the environment key."""
+        pool = ClientPool({"api_key": "env"}, factory=fake_factory)
+
+        client = pool.client_for(Session(), "user-key")
+
+        assert client.credentials == {"api_key": "env"}
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_missing_credentials(self):
+        """Test the error for a session without any credentials."""
+        pool = ClientPool(allow_headers=True, factory=fake_factory)
+
+        with pytest.raises(ValueError, match="X-Splitwise-Api-Key"):
+            pool.client_for(Session())
+
+    @pytest.mark.asyncio
+    async def test_tool_context_resolution(self):
+        """Test that tools pick the client from the request header."""
+        from app.main import _client
+
+        pool = ClientPool(allow_headers=True, factory=fake_factory)
+        ctx = Mock()
+        ctx.request_context.lifespan_context = {"pool": pool}
+        ctx.request_context.request.headers = {"X-Splitwise-Api-Key": "k1"}
+
+        assert _client(ctx).credentials == {"api_key": "k1"}
+        ctx.request_context.request = None
+        assert _client(ctx).credentials == {"api_key": "k1"}
+        await pool.aclose()
+
+
+class TestTenantIsolation:
+    """Test that real clients of different tenants share no state."""
+
+    @pytest.mark.asyncio
+    async def test_separate_caches_and_budgets(self, tmp_path):
+        """Test distinct caches, rate limiters and replica files."""
+        env = {
+            "SPLITWISE_EXPENSE_SYNC": "true",
+            "SPLITWISE_EXPENSE_SYNC_PATH": str(tmp_path / "replica.db"),
+        }
+        with patch("app.splitwise_client.Splitwise"), patch.dict("os.environ", env):
+            pool = ClientPool()
+            a = pool.get({"api_key": "a"})
+            b = pool.get({"api_key": "b"})
+            a.expense_sync._task.cancel()
+            b.expense_sync._task.cancel()
+
+        assert a.cache is not b.cache
+        assert a.rate_limiter is not b.rate_limiter
+        assert a.idempotency is not b.idempotency
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+            f"replica-{tenant_key({'api_key': key})}.db" for key in ("a", "b")
+        )
+        await pool.aclose()
@@ -0,0 +1,245 @@
+"""Tests for app.currency module."""
+
+import asyncio
+import os
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+
+from app.aggregation import ExpenseColumns
+from app.currency import (
+    CurrencyEngine,
+    ExchangeRatesUnavailableError,
+    RateTable,
+    parse_rates,
+    parse_static_rates,
+)
+from app.custom_methods import period_report
+from app.settlement import settlement_plan
+from app.splitwise_client import SplitwiseClient
+
+RATES = {"base": "USD", "rates": {"EUR": "0.8", "JPY": "150", "GBP": "0.75"}}
+
+
+def table():
+    return RateTable(*parse_rates(RATES))
+
+
+class TestRateTable:
+    """Test exact conversions between currencies."""
+
+    def test_convert_cents(self):
+        """Test conversions through the base currency with half-up rounding."""
+        rates = table()
+
+        assert rates.convert_cents(1000, "USD", "EUR") == 800
+        assert rates.convert_cents(800, "eur", "USD") == 1000
+        assert rates.convert_cents(1, "EUR", "GBP") == 1  # 0.9375 rounds up
+        assert rates.convert_cents(-1, "EUR", "GBP") == -1
+        assert rates.convert_cents(123, "JPY", "JPY") == 123
+
+    def test_minor_unit_digits_converted(self):
+        """Test that conversions account for zero- and three-digit currencies."""
+        rates = RateTable("USD", {"JPY": Decimal("150"), "KWD": Decimal("0.3")})
+
+        # 1500 yen are 10.00 dollars, which are 3.000 dinars
+        assert rates.convert_cents(1500, "JPY", "USD") == 1000
+        assert rates.convert_cents(1000, "USD", "JPY") == 1500
+        assert rates.convert_cents(1500, "JPY", "KWD") == 3000
+
+    def test_unknown_currency(self):
+        """Test that a missing rate is reported."""
+        with pytest.raises(ValueError, match="No exchange rate for CHF"):
+            table().convert_cents(100, "CHF", "USD")
+
+    def test_convert_column_matches_single(self):
+        """Test that batch conversion equals converting row by row."""
+        rates = table()
+        labels = ["EUR", None, "JPY", "USD"]
+        cents = [199, 250, 15000, -333, 1, 7]
+        codes = [0, 1, 2, 3, 0, 2]
+
+        converted = rates.convert_column(cents, codes, labels, "GBP")
+
+        assert list(converted) == [
+            rates.convert_cents(199, "EUR", "GBP"),
+            250,
+            rates.convert_cents(15000, "JPY", "GBP"),
+            rates.convert_cents(-333, "USD", "GBP"),
+            rates.convert_cents(1, "EUR", "GBP"),
+            rates.convert_cents(7, "JPY", "GBP"),
+        ]
+
+
+class TestParseRates:
+    """Test rate table formats."""
+
+    def test_formats(self):
+        """Test mappings, record lists and a default base."""
+        assert parse_rates(RATES)[1]["EUR"] == Decimal("0.8")
+        assert parse_rates({"eur": 0.5}) == ("USD", {"EUR": Decimal("0.5")})
+        assert parse_rates([{"currency_code": "GBP", "rate": "0.75"}], "EUR") == (
+            "EUR",
+            {"GBP": Decimal("0.75")},
+        )
+        assert parse_rates({"base_code": "EUR", "rates": {"USD": 1.1}})[0] == "EUR"
+
+    def test_invalid(self):
+        """Test that zero, negative and non-numeric rates are rejected."""
+        for rates in ({"EUR": 0}, {"EUR": "-1"}, {"EUR": "x"}, "EUR"):
+            with pytest.raises(ValueError):
+                parse_rates(rates)
+        assert parse_static_rates("not json") is None
+
+
+class TestCurrencyEngine:
+    """Test rate table caching."""
+
+    @pytest.mark.asyncio
+    async def test_cached_until_ttl(self):
+        """Test that concurrent and repeated calls share one fetch of the URL."""
+        now = [0.0]
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=RATES)
+
+        engine = CurrencyEngine(
+            ttl=60,
+            url="https://rates.example/latest",
+            clock=lambda: now[0],
+            transport=httpx.MockTransport(handler),
+        )
+
+        first, second = await asyncio.gather(engine.rates(), engine.rates())
+        now[0] = 59
+        assert await engine.rates() is first is second
+        assert len(requests) == 1
+        assert str(requests[0].url) == "https://rates.example/latest"
+        assert first.convert_cents(100, "USD", "EUR") == 80
+
+        now[0] = 61
+        assert await engine.rates() is not first
+        assert engine.stats()["fetches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_raises(self):
+        """Test that an error response from the rates URL is raised."""
+        engine = CurrencyEngine(
+            url="https://rates.example/latest",
+            transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await engine.rates()
+        assert engine.fresh() is None
+
+    @pytest.mark.asyncio
+    async def test_static_rates_never_fetch(self):
+        """Test that a configured table is used without fetching."""
+        engine = CurrencyEngine(
+            static_rates=parse_static_rates('{"EUR": "0.5"}'),
+            url="https://rates.example/latest",
+            transport=httpx.MockTransport(Mock(side_effect=AssertionError)),
+        )
+
+        assert (await engine.rates()).convert_cents(100, "USD", "EUR") == 50
+
+    @pytest.mark.asyncio
+    async def test_unconfigured_source_explains_setup(self):
+        """Test that a client without a rate source names the settings."""
+        with (
+            patch("app.splitwise_client.Splitwise"),
+            patch.dict(os.environ, {}, clear=True),
+        ):
+            client = SplitwiseClient(api_key="key", http=AsyncMock())
+
+        with pytest.raises(ExchangeRatesUnavailableError, match="EXCHANGE_RATES_URL"):
+            await client.aexchange_rates()
+        client.raw_client.getExchangeRates.assert_not_called()
+
+
+class TestConvertedReports:
+    """Test reports and plans in a reporting currency."""
+
+    def test_columns_converted(self):
+        """Test that expense and share amounts are converted together."""
+        columns = ExpenseColumns.from_expenses(
+            [
+                {
+                    "cost": "10.0",
+                    "currency_code": "EUR",
+                    "users": [{"user_id": 1, "paid_share": "10.0", "owed_share": "5"}],
+                },
+                {"cost": "3.0", "currency_code": "USD"},
+                {"cost": "1.0"},
+            ]
+        )
+
+        converted = columns.converted(table(), "usd")
+
+        assert columns.currencies() == ["EUR", "USD"]
+        assert list(converted.cents) == [1250, 300, 100]
+        assert converted.member_totals()[1] == {"paid": 1250, "owed": 625, "net": 625}
+        assert list(columns.cents) == [1000, 300, 100]
+
+    @pytest.mark.asyncio
+    async def test_period_report_in_currency(self):
+        """Test that a report converts once and reuses the rate table."""
+
+        async def stream(**filters):
+            for expense in (
+                {"date": "2025-01-02", "cost": "8.0", "currency_code": "EUR"},
+                {"date": "2025-01-03", "cost": "5.0", "currency_code": "USD"},
+            ):
+                yield expense
+
+        client = Mock()
+        client.iter_expenses = stream
+        client.aexchange_rates = AsyncMock(return_value=table())
+
+        result = await period_report(client, "2025-01", "2025-01", currency="usd")
+        unconverted = await period_report(client, "2025-01", "2025-01")
+
+        assert result["currency"] == "USD"
+        assert result["totals"] == [15.0]
+        assert unconverted["currency"] is None
+        assert unconverted["totals"] == [13.0]
+        client.aexchange_rates.assert_awaited_once()
+
+    def test_settlement_in_one_currency(self):
+        """Test that multi-currency balances settle in a single currency."""
+        group = {
+            "id": 1,
+            "members": [
+                {
+                    "id": 1,
+                    "first_name": "Ana",
+                    "balances": [
+                        {"currency_code": "EUR", "amount": "8.0"},
+                        {"currency_code": "USD", "amount": "-5.0"},
+                    ],
+                },
+                {
+                    "id": 2,
+                    "first_name": "Bo",
+                    "balances": [
+                        {"currency_code": "EUR", "amount": "-8.0"},
+                        {"currency_code": "USD", "amount": "5.0"},
+                    ],
+                },
+            ],
+        }
+
+        plan = settlement_plan(group, currency="USD", rates=table())
+        in_yen = settlement_plan(group, currency="JPY", rates=table())
+
+        assert plan["currency"] == "USD"
+        assert list(plan["currencies"]) == ["USD"]
+        assert plan["currencies"]["USD"]["payments"][0]["amount"] == "5.00"
+        assert in_yen["currencies"]["JPY"]["payments"][0]["amount"] == "750"
+        with pytest.raises(ValueError, match="Exchange rates"):
+            settlement_plan(group, currency="USD")
@@ -1,10 +1,37 @@
 """Tests for app.custom_methods module."""
 
-from unittest.mock import Mock, patch
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from app.custom_methods import expenses_by_month, monthly_report
+from app.custom_methods import expenses_by_month, monthly_report, period_report
+
+
+def fake_stream(expenses):
+    """Return a fake `iter_expenses` yielding the given expenses."""
+    calls = []
+
+    async def stream(**filters):
+        calls.append(filters)
+        for expense in expenses:
+            yield expense
+
+    stream.calls = calls
+    return stream
+
+
+@contextmanager
+def patch_month_stream():
+    """Patch iter_expenses_by_month to stream the mock's return_value."""
+    mock = Mock(return_value=[])
+
+    async def stream(*args, **kwargs):
+        for expense in mock(*args, **kwargs):
+            yield expense
+
+    with patch("app.custom_methods.iter_expenses_by_month", stream):
+        yield mock
 
 
 class TestExpensesByMonth:
@@ -43,9 +70,8 @@ class TestExpensesByMonth:
         ]
 
         mock_client = Mock()
-        mock_client.get_group_by_name.return_value = mock_group
-        mock_client.call_mapped_method.return_value = expenses_data
-        mock_client.convert.return_value = expenses_data
+        mock_client.aget_group_by_name = AsyncMock(return_value=mock_group)
+        mock_client.iter_expenses = fake_stream(expenses_data)
 
         result = await expenses_by_month(mock_client, "Test Group", "2025-10")
 
@@ -54,17 +80,15 @@ class TestExpensesByMonth:
         assert result[0]["id"] == 1
         assert result[0]["description"] == "Groceries"
 
-        # Verify API was called with correct parameters
-        mock_client.call_mapped_method.assert_called_once()
-        call_args = mock_client.call_mapped_method.call_args
-        assert call_args[0][0] == "list_expenses"  # method name
-        assert call_args[1]["group_id"] == 1
+        # Verify the paginator was called with correct filters
+        assert len(mock_client.iter_expenses.calls) == 1
+        assert mock_client.iter_expenses.calls[0]["group_id"] == 1
 
     @pytest.mark.asyncio
     async def test_expenses_by_month_group_not_found(self):
         """Test when group is not found."""
         mock_client = Mock()
-        mock_client.get_group_by_name.return_value = None
+        mock_client.aget_group_by_name = AsyncMock(return_value=None)
 
         with pytest.raises(ValueError, match="Group 'Nonexistent Group' not found"):
             await expenses_by_month(mock_client, "Nonexistent Group", "2025-10")
@@ -75,7 +99,7 @@ class TestExpensesByMonth:
         mock_group = Mock()
         mock_group.id = None
         mock_client = Mock()
-        mock_client.get_group_by_name.return_value = mock_group
+        mock_client.aget_group_by_name = AsyncMock(return_value=mock_group)
 
         with pytest.raises(ValueError, match="Group 'Test Group' does not have an ID"):
             await expenses_by_month(mock_client, "Test Group", "2025-10")
@@ -87,9 +111,8 @@ class TestExpensesByMonth:
         mock_group.id = 1
 
         mock_client = Mock()
-        mock_client.get_group_by_name.return_value = mock_group
-        mock_client.call_mapped_method.return_value = []
-        mock_client.convert.return_value = []
+        mock_client.aget_group_by_name = AsyncMock(return_value=mock_group)
+        mock_client.iter_expenses = fake_stream([])
 
         result = await expenses_by_month(mock_client, "Test Group", "2025-10")
 
@@ -101,7 +124,7 @@ class TestExpensesByMonth:
         mock_group = Mock()
         mock_group.id = 1
         mock_client = Mock()
-        mock_client.get_group_by_name.return_value = mock_group
+        mock_client.aget_group_by_name = AsyncMock(return_value=mock_group)
 
         expenses_data = [
             {
@@ -118,8 +141,7 @@ class TestExpensesByMonth:
             },
         ]
 
-        mock_client.call_mapped_method.return_value = expenses_data
-        mock_client.convert.return_value = expenses_data
+        mock_client.iter_expenses = fake_stream(expenses_data)
 
         result = await expenses_by_month(mock_client, "Test Group", "2025-10")
 
@@ -132,9 +154,9 @@ class TestMonthlyReport:
     @pytest.mark.asyncio
     async def test_monthly_report_success(self, mock_splitwise_client):
         """Test successful monthly report generation."""
-        # Mock expenses_by_month to return test data
-        with patch("app.custom_methods.expenses_by_month") as mock_expenses_by_month:
-            mock_expenses_by_month.return_value = [
+        # Stream test data instead of fetching the month
+        with patch_month_stream() as mock_month_stream:
+            mock_month_stream.return_value = [
                 {"cost": "100.0", "category": {"name": "Food"}},
                 {"cost": "50.0", "category": {"name": "Transportation"}},
                 {
@@ -154,11 +176,30 @@ class TestMonthlyReport:
             assert len(result["recommendations"]) == 1
             assert "Food" in result["recommendations"][0]
 
+    @pytest.mark.asyncio
+    async def test_monthly_report_skips_deleted_and_payments(
+        self, mock_splitwise_client
+    ):
+        """Test that only spending counts, as in period_report."""
+        with patch_month_stream() as mock_month_stream:
+            mock_month_stream.return_value = [
+                {"cost": "100.0", "category": {"name": "Food"}},
+                {"cost": "40.0", "category": {"name": "Food"}, "deleted_at": "x"},
+                {"cost": "60.0", "payment": True},
+            ]
+
+            result = await monthly_report(
+                mock_splitwise_client, "Test Group", "2025-10"
+            )
+
+            assert result["total"] == 100.0
+            assert result["summary"] == {"Food": 100.0}
+
     @pytest.mark.asyncio
     async def test_monthly_report_no_expenses(self, mock_splitwise_client):
         """Test monthly report with no expenses."""
-        with patch("app.custom_methods.expenses_by_month") as mock_expenses_by_month:
-            mock_expenses_by_month.return_value = []
+        with patch_month_stream() as mock_month_stream:
+            mock_month_stream.return_value = []
 
             result = await monthly_report(
                 mock_splitwise_client, "Test Group", "2025-10"
@@ -172,8 +213,8 @@ class TestMonthlyReport:
     @pytest.mark.asyncio
     async def test_monthly_report_various_category_formats(self, mock_splitwise_client):
         """Test handling different category formats."""
-        with patch("app.custom_methods.expenses_by_month") as mock_expenses_by_month:
-            mock_expenses_by_month.return_value = [
+        with patch_month_stream() as mock_month_stream:
+            mock_month_stream.return_value = [
                 {
                     "cost": "100.0",
                     "category": {"name": "Food"},  # Dict with name
@@ -204,8 +245,8 @@ class TestMonthlyReport:
     @pytest.mark.asyncio
     async def test_monthly_report_invalid_cost_handling(self, mock_splitwise_client):
         """Test handling invalid cost values."""
-        with patch("app.custom_methods.expenses_by_month") as mock_expenses_by_month:
-            mock_expenses_by_month.return_value = [
+        with patch_month_stream() as mock_month_stream:
+            mock_month_stream.return_value = [
                 {"cost": "100.0", "category": {"name": "Food"}},
                 {
                     "cost": "invalid",  # Invalid cost
@@ -229,8 +270,8 @@ class TestMonthlyReport:
     @pytest.mark.asyncio
     async def test_monthly_report_no_high_categories(self, mock_splitwise_client):
         """Test report with no categories exceeding 50%."""
-        with patch("app.custom_methods.expenses_by_month") as mock_expenses_by_month:
-            mock_expenses_by_month.return_value = [
+        with patch_month_stream() as mock_month_stream:
+            mock_month_stream.return_value = [
                 {"cost": "40.0", "category": {"name": "Food"}},
                 {"cost": "30.0", "category": {"name": "Transportation"}},
                 {"cost": "30.0", "category": {"name": "Entertainment"}},
@@ -242,3 +283,87 @@ class TestMonthlyReport:
 
             assert result["total"] == 100.0
             assert len(result["recommendations"]) == 0  # No category exceeds 50%
+
+
+class TestPeriodReport:
+    """Test period_report function."""
+
+    EXPENSES = [
+        {
+            "group_id": 1,
+            "date": "2025-01-10T10:00:00Z",
+            "cost": "30.0",
+            "category": {"name": "Food"},
+            "users": [
+                {
+                    "user": {"id": 7, "first_name": "Ana", "last_name": "Lee"},
+                    "user_id": 7,
+                    "paid_share": "30.0",
+                    "owed_share": "15.0",
+                },
+                {"user_id": 8, "paid_share": "0.0", "owed_share": "15.0"},
+            ],
+        },
+        {
+            "group_id": 1,
+            "date": "2025-03-31T23:00:00Z",
+            "cost": "12.5",
+            "category": {"name": "Travel"},
+        },
+        {"group_id": 1, "date": "2025-02-01", "cost": "9.0", "payment": True},
+        {"group_id": 1, "date": "2025-02-01", "cost": "9.0", "deleted_at": "x"},
+        {"group_id": 2, "date": "2025-02-01", "cost": "9.0"},
+        {"group_id": 1, "date": "2025-04-01", "cost": "1.0"},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_monthly_series_single_fetch(self):
+        """Test that one streamed fetch is bucketed per month."""
+        client = Mock()
+        client.aget_group_by_name = AsyncMock(return_value={"id": 1})
+        client.iter_expenses = fake_stream(self.EXPENSES)
+
+        result = await period_report(client, "2025-01", "2025-03", "month", "Trip")
+
+        assert client.iter_expenses.calls == [
+            {
+                "dated_after": "2025-01-01",
+                "dated_before": "2025-04-01",
+                "group_id": 1,
+            }
+        ]
+        assert result["buckets"] == ["2025-01", "2025-02", "2025-03"]
+        assert result["totals"] == [30.0, 0.0, 12.5]
+        assert result["counts"] == [1, 0, 1]
+        assert result["total"] == 42.5
+        assert result["categories"] == {
+            "Food": [30.0, 0.0, 0.0],
+            "Travel": [0.0, 0.0, 12.5],
+        }
+        assert result["members"]["7"]["name"] == "Ana Lee"
+        assert result["members"]["7"]["paid"] == [30.0, 0.0, 0.0]
+        assert result["members"]["8"]["owed_total"] == 15.0
+
+    @pytest.mark.asyncio
+    async def test_quarter_all_groups(self):
+        """Test quarterly buckets across every group."""
+        client = Mock()
+        client.iter_expenses = fake_stream(self.EXPENSES)
+
+        result = await period_report(client, "2025-01-01", "2025-06-30", "quarter")
+
+        assert result["buckets"] == ["2025-Q1", "2025-Q2"]
+        assert result["totals"] == [51.5, 1.0]
+        assert "group_id" not in client.iter_expenses.calls[0]
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self):
+        """Test granularity, range and bucket-count validation."""
+        client = Mock()
+
+        with pytest.raises(ValueError, match="Granularity"):
+            await period_report(client, "2025-01", "2025-02", "year")
+        with pytest.raises(ValueError, match="before start"):
+            await period_report(client, "2025-02", "2025-01")
+        with pytest.raises(ValueError, match="coarser"):
+            await period_report(client, "2020-01-01", "2025-01-01", "day")
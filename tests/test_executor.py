@@ -0,0 +1,77 @@
+"""Tests for app.executor module."""
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from app.executor import BoundedExecutor, ExecutorSaturatedError
+from app.rate_limit import retry_after_seconds
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class TestBoundedExecutor:
+    """Test admission control and timing."""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_with_context(self):
+        """Test that calls run off the loop thread and see context variables."""
+        executor = BoundedExecutor(max_workers=2, max_queue=2)
+        request_id.set("abc")
+
+        name, seen = await executor.run(
+            lambda: (threading.current_thread().name, request_id.get())
+        )
+
+        assert name.startswith("splitwise-sdk")
+        assert seen == "abc"
+        stats = executor.stats()
+        assert stats["completed"] == 1
+        assert stats["queued"] == 0
+        assert stats["queue_wait_p50_ms"] is not None
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_saturated(self):
+        """Test that calls beyond workers plus queue fail fast with a hint."""
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        release = threading.Event()
+        calls = [
+            asyncio.create_task(executor.run(lambda: release.wait(5))) for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(ExecutorSaturatedError) as info:
+            await executor.run(lambda: None)
+
+        assert info.value.retry_after > 0
+        assert retry_after_seconds(info.value) == pytest.approx(info.value.retry_after)
+        stats = executor.stats()
+        assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 1, 1)
+
+        release.set()
+        await asyncio.gather(*calls)
+        assert executor.stats()["queue_wait_max_ms"] > 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_call_frees_its_slot(self):
+        """Test that cancelling a waiting call releases its queue slot."""
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        release = threading.Event()
+        running = asyncio.create_task(executor.run(lambda: release.wait(5)))
+        queued = asyncio.create_task(executor.run(lambda: "never"))
+        await asyncio.sleep(0.05)
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await asyncio.sleep(0)
+
+        assert executor.stats()["queued"] == 0
+        release.set()
+        await running
+        assert await executor.run(lambda: "ok") == "ok"
+        executor.shutdown()
@@ -0,0 +1,265 @@
+"""Tests for app.expense_sync module."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.expense_sync import ExpenseStore, ExpenseSync, normalize_timestamp
+from app.splitwise_client import SplitwiseClient
+
+
+def make_expense(expense_id, group_id=1, date="2025-10-15T10:00:00Z", **extra):
+    return {
+        "id": expense_id,
+        "group_id": group_id,
+        "description": f"Expense {expense_id}",
+        "cost": "10.0",
+        "date": date,
+        "updated_at": "2025-10-16T00:00:00Z",
+        "deleted_at": None,
+        "users": [{"id": 5}, {"id": 6}],
+        **extra,
+    }
+
+
+class FakeUpstream:
+    """Serves list_expenses pages, honouring updated_after and offset."""
+
+    def __init__(self, expenses):
+        self.expenses = list(expenses)
+        self.calls = []
+
+    async def afetch(self, method_name, **kwargs):
+        self.calls.append(kwargs)
+        matches = [
+            expense
+            for expense in self.expenses
+            if (
+                kwargs.get("group_id") is None
+                or expense["group_id"] == kwargs["group_id"]
+            )
+            and (
+                "updated_after" not in kwargs
+                or normalize_timestamp(expense["updated_at"])
+                > normalize_timestamp(kwargs["updated_after"])
+            )
+        ]
+        offset = kwargs.get("offset", 0)
+        return matches[offset : offset + kwargs["limit"]]
+
+
+class Clock:
+    def __init__(self, now=1_770_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def upstream():
+    return FakeUpstream([make_expense(i, group_id=1 + i % 2) for i in range(1, 6)])
+
+
+@pytest.fixture
+def sync(upstream, clock):
+    return ExpenseSync(
+        upstream, ExpenseStore(), max_staleness=60, page_size=2, clock=clock
+    )
+
+
+class TestExpenseStore:
+    """Test replica queries."""
+
+    @pytest.fixture
+    def store(self):
+        store = ExpenseStore()
+        store.upsert(
+            [
+                make_expense(1, date="2025-09-30T23:00:00Z"),
+                make_expense(2, date="2025-10-02T10:00:00Z"),
+                make_expense(3, group_id=2, date="2025-10-03T10:00:00Z"),
+                make_expense(
+                    4, date="2025-10-04T10:00:00Z", deleted_at="2025-10-05T00:00:00Z"
+                ),
+                make_expense(5, date="2025-10-05T10:00:00Z", users=[{"id": 9}]),
+            ]
+        )
+        return store
+
+    def test_filters_and_order(self, store):
+        """Test group/date filters and newest-first ordering."""
+        result = store.query(
+            group_id=1,
+            dated_after="2025-10-01T00:00:00",
+            dated_before="2025-11-01T00:00:00",
+        )
+
+        assert [expense["id"] for expense in result] == [5, 4, 2]
+
+    def test_visible_excludes_deleted(self, store):
+        """Test that visible=True hides deleted expenses."""
+        ids = [expense["id"] for expense in store.query(group_id=1, visible=True)]
+
+        assert 4 not in ids
+
+    def test_friend_filter(self, store):
+        """Test filtering by a participating user."""
+        assert [expense["id"] for expense in store.query(friend_id=9)] == [5]
+
+    def test_limit_and_offset(self, store):
+        """Test paging, with limit 0 returning everything."""
+        assert [e["id"] for e in store.query(limit=2, offset=1)] == [4, 3]
+        assert len(store.query(limit=0)) == 5
+
+    def test_get(self, store):
+        """Test lookups by id."""
+        assert store.get(3)["group_id"] == 2
+        assert store.get(99) is None
+
+    def test_watermarks_persist(self, tmp_path):
+        """Test that a file-backed replica survives reopening."""
+        path = str(tmp_path / "replica.db")
+        store = ExpenseStore(path)
+        store.upsert([make_expense(1)])
+        store.set_watermark("all", "2025-10-16T00:00:00", 123.0)
+        store.close()
+
+        reopened = ExpenseStore(path)
+
+        assert reopened.watermark("all") == ("2025-10-16T00:00:00", 123.0)
+        assert reopened.get(1)["id"] == 1
+
+
+class TestExpenseSync:
+    """Test delta syncing and serving."""
+
+    @pytest.mark.asyncio
+    async def test_initial_pull_then_deltas(self, sync, upstream, clock):
+        """Test a paged full pull followed by an updated_after poll."""
+        assert await sync.refresh() == 5
+        assert "updated_after" not in upstream.calls[0]
+        assert len(upstream.calls) == 3
+
+        upstream.expenses.append(
+            make_expense(1, updated_at="2025-10-20T00:00:00Z", deleted_at="x")
+        )
+        upstream.calls.clear()
+        clock.now += 3600
+
+        assert await sync.refresh() == 1
+        assert upstream.calls[0]["updated_after"] == "2025-10-16T00:00:00Z"
+        assert sync.store.get(1)["deleted_at"] == "x"
+        assert 1 not in [e["id"] for e in sync.store.query(visible=True)]
+
+    @pytest.mark.asyncio
+    async def test_watermark_lags_sync_start(self, sync, clock):
+        """Test that the watermark stays behind the sync start time."""
+        clock.now = 1_760_572_830.0  # 2025-10-16T00:00:30Z
+
+        await sync.refresh()
+
+        assert sync.store.watermark("all")[0] == "2025-10-15T23:59:30"
+
+    @pytest.mark.asyncio
+    async def test_group_watermark(self, sync, upstream, clock):
+        """Test that a group is caught up from the account-wide watermark."""
+        await sync.refresh()
+        clock.now += 3600
+        upstream.calls.clear()
+
+        await sync.refresh(group_id=2)
+
+        assert upstream.calls[0]["group_id"] == 2
+        assert upstream.calls[0]["updated_after"] == "2025-10-16T00:00:00Z"
+        assert sync.is_fresh(group_id=2)
+        assert not sync.is_fresh()
+
+    @pytest.mark.asyncio
+    async def test_serve_respects_staleness(self, sync, clock):
+        """Test that reads are served only while the replica is fresh."""
+        assert sync.serve("list_expenses", {"group_id": 1}) == (False, None)
+
+        await sync.refresh()
+        hit, result = sync.serve("list_expenses", {"group_id": 1, "limit": 0})
+        assert hit
+        assert {expense["group_id"] for expense in result} == {1}
+
+        clock.now += 61
+        assert sync.serve("get_expense", {"id": 1}) == (False, None)
+
+    def test_unsupported_filters_go_upstream(self, sync):
+        """Test that unknown filters are never answered locally."""
+        assert not sync.can_serve("list_expenses", {"category_id": 3})
+        assert not sync.can_serve("list_groups", {})
+
+    @pytest.mark.asyncio
+    async def test_aserve_catches_up_stale_scope(self, sync, upstream, clock):
+        """Test that a stale read triggers a delta sync before answering."""
+        await sync.refresh()
+        clock.now += 3600
+        upstream.calls.clear()
+
+        with patch.object(sync, "start"):
+            hit, expense = await sync.aserve("get_expense", {"id": 2})
+
+        assert hit
+        assert expense["id"] == 2
+        assert upstream.calls[0]["updated_after"] == "2025-10-16T00:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_aserve_without_baseline_goes_upstream(self, sync, upstream):
+        """Test that reads never wait for the initial full pull."""
+        with patch.object(sync, "start") as start:
+            assert await sync.aserve("list_expenses", {}) == (False, None)
+
+        start.assert_called_once()
+        assert upstream.calls == []
+
+    @pytest.mark.asyncio
+    async def test_apply_write(self, sync):
+        """Test that local writes reach the replica."""
+        await sync.refresh()
+
+        sync.apply_write("create_expense", {}, [make_expense(42), None])
+        assert sync.store.get(42)["id"] == 42
+
+        sync.apply_write("delete_expense", {"id": 42}, {"success": True})
+        assert not sync.is_fresh()
+
+
+class TestClientIntegration:
+    """Test replica routing in SplitwiseClient."""
+
+    @pytest.fixture
+    def client(self):
+        with (
+            patch("app.splitwise_client.Splitwise") as mock_splitwise,
+            patch.dict(
+                "os.environ",
+                {"SPLITWISE_EXPENSE_SYNC": "true", "SPLITWISE_CACHE_ENABLED": "false"},
+            ),
+        ):
+            mock_splitwise.return_value = Mock()
+            return SplitwiseClient(api_key="test_key", http=AsyncMock())
+
+    @pytest.mark.asyncio
+    async def test_reads_served_from_fresh_replica(self, client):
+        """Test that fresh replica data answers sync and async reads."""
+        client.afetch = AsyncMock(return_value=[make_expense(1)])
+        await client.expense_sync.refresh()
+        client.afetch.reset_mock()
+
+        assert client.call_mapped_method("get_expense", id=1)["id"] == 1
+        listed = await client.acall_mapped_method("list_expenses", group_id=1)
+
+        assert [expense["id"] for expense in listed] == [1]
+        client.raw_client.getExpense.assert_not_called()
+        client.afetch.assert_not_called()
+        assert client.stats()["expense_sync"]["served"] == 2
+        await client.aclose()
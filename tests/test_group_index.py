@@ -0,0 +1,130 @@
+"""Tests for app.group_index module."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.group_index import GroupIndex, normalize_name
+from app.splitwise_client import SplitwiseClient
+
+GROUPS = [
+    {"id": 0, "name": "Non-group expenses"},
+    {"id": 1, "name": "Lisbon  Trip"},
+    {"id": 2, "name": "Flatmates"},
+    {"id": 3, "name": "ＣＡＦÉ Club"},
+]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def index(clock):
+    index = GroupIndex(clock=clock)
+    index.rebuild(GROUPS)
+    return index
+
+
+class TestGroupIndex:
+    """Test GroupIndex lookups and maintenance."""
+
+    def test_normalize_name(self):
+        """Test that keys are NFKC-normalized, case-folded and collapsed."""
+        assert normalize_name("  ＣＡＦÉ   Club ") == "café club"
+
+    def test_exact_and_normalized_lookup(self, index):
+        """Test exact, case-insensitive and Unicode-normalized matches."""
+        assert index.lookup("Flatmates")["id"] == 2
+        assert index.lookup("lisbon trip")["id"] == 1
+        assert index.lookup("café club")["id"] == 3
+        assert index.lookup("Non-group expenses")["id"] == 0
+
+    def test_exact_name_wins_collision(self, clock):
+        """Test that an exact name beats an earlier normalized match."""
+        index = GroupIndex(clock=clock)
+        index.rebuild([{"id": 1, "name": "trip"}, {"id": 2, "name": "Trip"}])
+
+        assert index.lookup("Trip")["id"] == 2
+        assert index.lookup("TRIP")["id"] == 1
+
+    def test_fuzzy_fallback(self, index):
+        """Test that close misspellings resolve and distant names do not."""
+        assert index.lookup("Flatmate")["id"] == 2
+        assert index.lookup("Flatmate", fuzzy=False) is None
+        assert index.lookup("Berlin") is None
+        assert index.stats()["fuzzy_hits"] == 1
+        assert index.stats()["misses"] == 2
+
+    def test_apply_write(self, index):
+        """Test that create_group and delete_group update the index."""
+        index.apply_write("create_group", {}, [{"id": 9, "name": "Ski"}, None])
+        index.apply_write("delete_group", {"id": 2}, {"success": True})
+
+        assert index.lookup("ski")["id"] == 9
+        assert index.lookup("Flatmates", fuzzy=False) is None
+
+    def test_needs_refresh(self, index, clock):
+        """Test staleness by age and after undelete_group."""
+        assert not index.needs_refresh(300)
+        clock.now += 301
+        assert index.needs_refresh(300)
+        index.rebuild(GROUPS)
+        index.apply_write("undelete_group", {"id": 5}, True)
+        assert index.needs_refresh(300)
+        assert GroupIndex().needs_refresh(300)
+
+
+class TestAgetGroupByName:
+    """Test SplitwiseClient.aget_group_by_name."""
+
+    @pytest.fixture
+    def client(self, clock):
+        with patch("app.splitwise_client.Splitwise"):
+            client = SplitwiseClient(api_key="test_key", http=Mock())
+        client.group_index = GroupIndex(clock=clock)
+        client.afetch = AsyncMock(return_value=GROUPS)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_first_call_builds_then_lookups_are_local(self, client):
+        """Test that only the first resolution reaches Splitwise."""
+        assert (await client.aget_group_by_name("flatmates"))["id"] == 2
+        assert (await client.aget_group_by_name("Lisbon Trip"))["id"] == 1
+
+        client.afetch.assert_awaited_once_with("list_groups")
+
+    @pytest.mark.asyncio
+    async def test_miss_refreshes_at_most_once_per_interval(self, client, clock):
+        """Test that a miss picks up groups created elsewhere, rate limited."""
+        await client.aget_group_by_name("Flatmates")
+        client.afetch.return_value = [*GROUPS, {"id": 7, "name": "Berlin"}]
+
+        assert await client.aget_group_by_name("Berlin") is None
+        clock.now += 11
+        assert (await client.aget_group_by_name("Berlin"))["id"] == 7
+        assert client.afetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_exact_lookup_rejects_similar_names(self, client):
+        """Test that fuzzy=False still normalizes but never guesses."""
+        assert (await client.aget_group_by_name("flatmates", fuzzy=False))["id"] == 2
+        assert await client.aget_group_by_name("Flatmate", fuzzy=False) is None
+        assert (await client.aget_group_by_name("Flatmate"))["id"] == 2
+
+    @pytest.mark.asyncio
+    async def test_sync_lookup_uses_fresh_index(self, client):
+        """Test that get_group_by_name skips the SDK once the index is fresh."""
+        await client.aget_group_by_name("Flatmates")
+
+        assert client.get_group_by_name("Flatmates")["id"] == 2
+        client.raw_client.getGroups.assert_not_called()
@@ -0,0 +1,135 @@
+"""Tests for app.http_workers module."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.http_workers import (
+    SessionAffinityMiddleware,
+    _split_rate_limit,
+    main,
+    nginx_routing,
+    parse_node,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestSessionAffinity:
+    """Test session ID tagging for routing by the reverse proxy."""
+
+    @pytest.mark.asyncio
+    async def test_session_ids_tagged_and_stripped(self):
+        """Test that outgoing IDs get the worker prefix and incoming lose it."""
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen.update(scope["headers"])
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"mcp-session-id", b"abc123"),
+                    ],
+                }
+            )
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = SessionAffinityMiddleware(app, worker_id=3)
+        scope = {
+            "type": "http",
+            "headers": [(b"mcp-session-id", b"3.abc123"), (b"accept", b"*/*")],
+        }
+        await middleware(scope, None, send)
+
+        assert seen[b"mcp-session-id"] == b"abc123"
+        assert seen[b"accept"] == b"*/*"
+        assert scope["headers"][0] == (b"mcp-session-id", b"3.abc123")
+        assert dict(sent[0]["headers"])[b"mcp-session-id"] == b"3.abc123"
+
+    @pytest.mark.asyncio
+    async def test_untagged_ids_and_other_scopes_pass_through(self):
+        """Test that IDs without a worker prefix and non-HTTP scopes are kept."""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope)
+
+        middleware = SessionAffinityMiddleware(app, worker_id=0)
+        lifespan = {"type": "lifespan"}
+        await middleware(lifespan, None, None)
+        await middleware(
+            {"type": "http", "headers": [(b"mcp-session-id", b"abc.def")]}, None, None
+        )
+
+        assert seen[0] is lifespan
+        assert seen[1]["headers"] == [(b"mcp-session-id", b"abc.def")]
+
+
+class TestRateLimitSplit:
+    """Test that workers share one credential's request budget."""
+
+    def test_default_budget_split_between_workers(self):
+        """Test that unset rate limits are divided by the worker count."""
+        with patch.dict(os.environ, {}, clear=True):
+            _split_rate_limit(4)
+            assert float(os.environ["SPLITWISE_RATE_LIMIT"]) == 2.5
+            assert os.environ["SPLITWISE_RATE_LIMIT_BURST"] == "5"
+
+        with patch.dict(os.environ, {"SPLITWISE_RATE_LIMIT": "8"}, clear=True):
+            _split_rate_limit(4)
+            assert os.environ["SPLITWISE_RATE_LIMIT"] == "8"
+
+
+class TestNginxRouting:
+    """Test the generated nginx upstreams and session map."""
+
+    def test_routes_offset_and_multi_digit_ids(self):
+        """Test that every worker ID of every node gets its own map entry."""
+        routing = nginx_routing([("a", 8000, 2, 9), ("b", 9000, 2, 11)])
+
+        assert "    server a:8000;\n    server a:8001;\n    server b:9000;" in routing
+        assert "upstream mcp_worker_10 { server a:8001; }" in routing
+        assert "upstream mcp_worker_12 { server b:9001; }" in routing
+        assert '    "~^9\\." mcp_worker_9;' in routing
+        assert '    "~^12\\." mcp_worker_12;' in routing
+        assert "mcp_worker_0" not in routing
+
+    def test_overlapping_worker_ids_rejected(self):
+        """Test that nodes with overlapping ID ranges are refused."""
+        with pytest.raises(ValueError, match="Worker ID 3"):
+            nginx_routing([("a", 8000, 4, 0), ("b", 8000, 4, 3)])
+
+    def test_parse_node(self):
+        """Test node descriptions with and without an offset."""
+        assert parse_node("mcp:8000:4") == ("mcp", 8000, 4, 0)
+        assert parse_node("mcp:8000:4:8") == ("mcp", 8000, 4, 8)
+        with pytest.raises(ValueError):
+            parse_node("mcp:8000")
+        with pytest.raises(ValueError):
+            parse_node("mcp:8000:0")
+
+    def test_main_reads_node_from_environment(self, capsys):
+        """Test that without --node the current node's settings are used."""
+        env = {"MCP_PORT": "7000", "MCP_WORKERS": "2", "MCP_WORKER_OFFSET": "4"}
+        with patch.dict(os.environ, env, clear=True):
+            assert main(["--host", "mcp"]) == 0
+
+        assert capsys.readouterr().out == nginx_routing([("mcp", 7000, 2, 4)])
+
+    def test_bundled_config_matches_docker_compose(self):
+        """Test that mcp_routing.conf is the routing of the compose workers."""
+        bundled = (ROOT / "mcp_routing.conf").read_text()
+
+        assert bundled == nginx_routing([("splitwise-mcp", 8000, 4, 0)])
+        assert (
+            "include /etc/nginx/mcp_routing.conf;" in (ROOT / "nginx.conf").read_text()
+        )
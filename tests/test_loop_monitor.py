@@ -0,0 +1,47 @@
+"""Tests for app.loop_monitor module."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.loop_monitor import LoopMonitor
+
+
+def blocking_handler(seconds):
+    time.sleep(seconds)
+
+
+class TestLoopMonitor:
+    """Test stall detection."""
+
+    @pytest.mark.asyncio
+    async def test_reports_blocking_call_with_stack(self):
+        """Test that a synchronous sleep on the loop is counted and located."""
+        monitor = LoopMonitor(threshold=0.05, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.03)
+
+        blocking_handler(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["blocks"] == 1
+        assert stats["max_block_ms"] >= 150
+        assert "blocking_handler" in stats["last_stack"]
+        assert stats["running"] is False
+
+    @pytest.mark.asyncio
+    async def test_awaiting_is_not_a_stall(self):
+        """Test that a busy but cooperative loop reports nothing."""
+        monitor = LoopMonitor(threshold=0.05, interval=0.01)
+        monitor.start()
+
+        await asyncio.gather(*(asyncio.sleep(0.01 * i) for i in range(20)))
+        await asyncio.to_thread(time.sleep, 0.1)
+        await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["blocks"] == 0
+        assert stats["last_stack"] is None
@@ -4,7 +4,8 @@ These tests validate that the new pure MCP server works correctly
 without any FastAPI dependencies.
 """
 
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -199,6 +200,7 @@ class TestChatGPTConnectorTools:
     def mock_context(self):
         """Create a mock MCP context."""
         mock_client = Mock()
+        mock_client.search_index = None
         context = Mock()
         context.request_context.lifespan_context = {"client": mock_client}
         return context, mock_client
@@ -238,15 +240,16 @@ class TestChatGPTConnectorTools:
             {"id": 201, "first_name": "John", "last_name": "Doe"},
         ]
 
-        mock_client.convert.side_effect = [mock_groups, mock_expenses, mock_friends]
-
-        with (
-            patch("app.main.asyncio.to_thread") as mock_to_thread,
-            patch("app.main.log_operation"),
-        ):
-            # Configure mock to return data when called
-            mock_to_thread.side_effect = [mock_groups, mock_expenses, mock_friends]
+        responses = {
+            "list_groups": mock_groups,
+            "list_expenses": mock_expenses,
+            "list_friends": mock_friends,
+        }
+        mock_client.acall_mapped_method = AsyncMock(
+            side_effect=lambda method_name, **kwargs: responses[method_name]
+        )
 
+        with patch("app.main.log_operation"):
             result = await search("test", context)
 
             # Verify the result format matches ChatGPT requirements
@@ -277,14 +280,9 @@ class TestChatGPTConnectorTools:
             "members": [{"id": 1, "name": "User 1"}],
         }
 
-        mock_client.convert.return_value = mock_group_data
-
-        with (
-            patch("app.main.asyncio.to_thread") as mock_to_thread,
-            patch("app.main.log_operation"),
-        ):
-            mock_to_thread.return_value = mock_group_data
+        mock_client.acall_mapped_method = AsyncMock(return_value=mock_group_data)
 
+        with patch("app.main.log_operation"):
             result = await fetch("group_1", context)
 
             # Verify the result format matches ChatGPT requirements
@@ -332,14 +330,9 @@ class TestChatGPTConnectorTools:
         ]
 
         for test_id, mock_data in test_cases:
-            mock_client.convert.return_value = mock_data
-
-            with (
-                patch("app.main.asyncio.to_thread") as mock_to_thread,
-                patch("app.main.log_operation"),
-            ):
-                mock_to_thread.return_value = mock_data
+            mock_client.acall_mapped_method = AsyncMock(return_value=mock_data)
 
+            with patch("app.main.log_operation"):
                 result = await fetch(test_id, context)
 
                 # All results should have the required structure
@@ -349,3 +342,123 @@ class TestChatGPTConnectorTools:
                 assert "url" in result
                 assert "metadata" in result
                 assert result["id"] == test_id
+
+
+class TestSearchFanOut:
+    """Test concurrent fan-out in the search tool."""
+
+    @pytest.fixture
+    def mock_context(self):
+        """Create a mock MCP context."""
+        mock_client = Mock()
+        mock_client.search_index = None
+        context = Mock()
+        context.request_context.lifespan_context = {"client": mock_client}
+        return context, mock_client
+
+    @staticmethod
+    def _responder(responses, delays=None, errors=None):
+        delays = delays or {}
+        errors = errors or {}
+
+        async def acall_mapped_method(method_name, **kwargs):
+            await asyncio.sleep(delays.get(method_name, 0))
+            if method_name in errors:
+                raise errors[method_name]
+            return responses[method_name]
+
+        return acall_mapped_method
+
+    @pytest.mark.asyncio
+    async def test_slow_source_times_out_with_partial_results(self, mock_context):
+        """Test that a slow source does not block the other sources."""
+        from app.main import search
+
+        context, mock_client = mock_context
+        mock_client.acall_mapped_method = self._responder(
+            {
+                "list_groups": [{"id": 1, "name": "Trip"}],
+                "list_expenses": [{"id": 2, "description": "Trip fuel"}],
+                "list_friends": [],
+            },
+            delays={"list_expenses": 5},
+        )
+
+        with patch.dict("os.environ", {"SPLITWISE_SEARCH_SOURCE_TIMEOUT": "0.05"}):
+            result = await search("trip", context)
+
+        assert [item["id"] for item in result["results"]] == ["group_1"]
+
+    @pytest.mark.asyncio
+    async def test_failed_source_returns_partial_results(self, mock_context):
+        """Test that one failing source still returns the others."""
+        from app.main import search
+
+        context, mock_client = mock_context
+        mock_client.acall_mapped_method = self._responder(
+            {
+                "list_groups": [],
+                "list_friends": [{"id": 3, "first_name": "Trip", "last_name": "Pal"}],
+            },
+            errors={"list_expenses": RuntimeError("boom")},
+        )
+
+        result = await search("trip", context)
+
+        assert [item["id"] for item in result["results"]] == ["friend_3"]
+
+    @pytest.mark.asyncio
+    async def test_all_sources_failing_raises(self, mock_context):
+        """Test that search raises when no source succeeds."""
+        from app.main import search
+
+        context, mock_client = mock_context
+        error = RuntimeError("down")
+        mock_client.acall_mapped_method = self._responder(
+            {},
+            errors={
+                "list_groups": error,
+                "list_expenses": error,
+                "list_friends": error,
+            },
+        )
+
+        with (
+            patch("app.main.log_operation"),
+            pytest.raises(RuntimeError, match="down"),
+        ):
+            await search("trip", context)
+
+    @pytest.mark.asyncio
+    async def test_stops_when_enough_matches(self, mock_context):
+        """Test that pending sources are cancelled once 10 matches exist."""
+        from app.main import search
+
+        context, mock_client = mock_context
+        groups = [{"id": i, "name": f"Trip {i}"} for i in range(12)]
+        mock_client.acall_mapped_method = self._responder(
+            {"list_groups": groups, "list_expenses": [], "list_friends": []},
+            delays={"list_expenses": 5, "list_friends": 5},
+        )
+
+        result = await asyncio.wait_for(search("trip", context), timeout=1)
+
+        assert len(result["results"]) == 10
+        assert all(item["id"].startswith("group_") for item in result["results"])
+
+    @pytest.mark.asyncio
+    async def test_ready_index_serves_search(self, mock_context):
+        """Test that a built search index answers without listing calls."""
+        from app.main import search
+        from app.search_index import SearchIndex
+
+        context, mock_client = mock_context
+        index = SearchIndex()
+        index.rebuild(groups=[{"id": 1, "name": "Trip"}], expenses=[], friends=[])
+        mock_client.search_index = index
+        mock_client.acall_mapped_method = AsyncMock()
+
+        result = await search("tri", context)
+
+        assert [item["id"] for item in result["results"]] == ["group_1"]
+        mock_client.acall_mapped_method.assert_not_called()
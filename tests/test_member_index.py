@@ -0,0 +1,103 @@
+"""Tests for app.member_index module."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.member_index import MemberIndex, MemberIndexCache
+from app.splitwise_client import SplitwiseClient
+
+MEMBERS = [
+    {"id": 1, "first_name": "John", "last_name": "Doe", "email": "john@x.io"},
+    {"id": 2, "first_name": "Jane", "last_name": "Smith", "email": "Jane@X.io"},
+    {"id": 3, "first_name": "José", "last_name": "Núñez", "email": None},
+    {"id": 4, "first_name": "John", "last_name": "Smith", "email": "js@x.io"},
+]
+
+
+def group(updated_at="2025-10-01T00:00:00Z", members=MEMBERS):
+    return {"id": 9, "updated_at": updated_at, "members": list(members)}
+
+
+class TestMemberIndex:
+    """Test MemberIndex lookups."""
+
+    @pytest.fixture
+    def index(self):
+        return MemberIndex(MEMBERS)
+
+    def test_exact_names_keep_member_order(self, index):
+        """Test that exact first and full names match the first member."""
+        assert index.find("John")["id"] == 1
+        assert index.find("John Smith")["id"] == 4
+
+    def test_id_email_and_normalized_names(self, index):
+        """Test id, case-insensitive email and normalized name lookups."""
+        assert index.find("3")["id"] == 3
+        assert index.find("jane@x.io")["id"] == 2
+        assert index.find("  jane   SMITH ")["id"] == 2
+        assert index.find("JOSÉ")["id"] == 3
+        assert index.find("Jose Nunez", fuzzy=False)["id"] == 3
+
+    def test_ranked_fuzzy_matches(self, index):
+        """Test that misspellings resolve to the closest member."""
+        assert index.find("Jon Smith")["id"] == 4
+        assert index.find("Josw")["id"] == 3
+        assert [m["id"] for m, _ in index.rank("Jon Smth")] == [4, 2]
+        assert index.find("Jon Smith", fuzzy=False) is None
+        assert index.find("Bob") is None
+
+    def test_sdk_objects(self):
+        """Test members given as SDK-like objects."""
+        member = Mock(first_name="Ada", last_name="Lovelace", email=None, id=5)
+
+        assert MemberIndex([member]).find("ada lovelace") is member
+
+
+class TestMemberIndexCache:
+    """Test per-group index reuse."""
+
+    def test_reused_until_group_changes(self):
+        """Test that an index is rebuilt only for a new group version."""
+        cache = MemberIndexCache()
+
+        first = cache.for_group(group())
+        assert cache.for_group(group()) is first
+        assert cache.for_group(group("2025-10-02T00:00:00Z")) is not first
+        assert cache.stats() == {"groups": 1, "hits": 1, "builds": 2}
+
+    def test_rebuilt_when_members_change_in_place(self):
+        """Test that a renamed or swapped member invalidates the index."""
+        cache = MemberIndexCache()
+        cache.for_group(group())
+        renamed = [{**MEMBERS[0], "first_name": "Johnny"}, *MEMBERS[1:]]
+        swapped = [*MEMBERS[:3], {**MEMBERS[3], "id": 5}]
+
+        assert cache.for_group(group(members=renamed)).find("Johnny")["id"] == 1
+        assert cache.for_group(group(members=swapped)).find("5")["id"] == 5
+        assert cache.stats()["builds"] == 3
+
+    def test_bounded(self):
+        """Test that least recently used groups are evicted."""
+        cache = MemberIndexCache(max_groups=2)
+        for group_id in (1, 2, 3):
+            cache.for_group({"id": group_id, "members": MEMBERS})
+
+        assert cache.stats()["groups"] == 2
+
+
+class TestAfindGroupMember:
+    """Test SplitwiseClient.afind_group_member."""
+
+    @pytest.mark.asyncio
+    async def test_resolves_through_cached_group(self):
+        """Test that participants resolve against the get_group read."""
+        with patch("app.splitwise_client.Splitwise"):
+            client = SplitwiseClient(api_key="test_key", http=Mock())
+        client.acall_mapped_method = AsyncMock(return_value=group())
+
+        assert (await client.afind_group_member(9, "jane"))["id"] == 2
+        assert await client.afind_group_member(9, "Jon Doe") is None
+        assert (await client.afind_group_member(9, "Jon Doe", fuzzy=True))["id"] == 1
+        client.acall_mapped_method.assert_awaited_with("get_group", id=9)
+        assert client.member_indexes.stats()["builds"] == 1
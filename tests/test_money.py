@@ -0,0 +1,81 @@
+"""Tests for app.money module."""
+
+from decimal import Decimal
+
+import pytest
+
+from app.currency import RateTable
+from app.money import (
+    Money,
+    expense_money,
+    format_cents,
+    from_cents,
+    minor_exponent,
+    to_cents,
+)
+
+
+class TestMoney:
+    """Test exact money amounts."""
+
+    def test_parse_and_format(self):
+        """Test parsing strings once into cents with a currency."""
+        money = Money.parse(" 12.345 ", "eur")
+
+        assert money == Money(1235, "EUR")
+        assert str(money) == "12.35"
+        assert money.amount == Decimal("12.35")
+        assert money.to_float() == 12.35
+        assert str(Money(-5)) == "-0.05"
+        assert format_cents(-1205) == "-12.05"
+        assert Money.parse("oops") == Money(0)
+
+    def test_minor_units_follow_currency(self):
+        """Test zero- and three-digit currencies are neither rounded nor inflated."""
+        assert minor_exponent("jpy") == 0
+        assert minor_exponent("KWD") == 3
+        assert minor_exponent(None) == minor_exponent("EUR") == 2
+
+        assert Money.parse("1200", "JPY") == Money(1200, "JPY")
+        assert str(Money.parse("1200.4", "JPY")) == "1200"
+        assert Money.parse("1.235", "KWD") == Money(1235, "KWD")
+        assert str(Money(1235, "KWD")) == "1.235"
+        assert Money(1235, "KWD").amount == Decimal("1.235")
+        assert to_cents(3, "BHD") == 3000
+        assert from_cents(1200, "KRW") == 1200.0
+        assert format_cents(-5, "JOD") == "-0.005"
+
+        # Amounts without a currency have two decimals
+        assert Money.parse("1.50", "KWD") + Money.parse("2") == Money(3500, "KWD")
+        assert Money(1000, "JPY") - Money(50) == Money(999, "JPY")
+
+    def test_exact_sums(self):
+        """Test that sums are exact and order-independent."""
+        amounts = [Money.parse("0.1", "USD")] * 10 + [Money.parse("0.2")] * 5
+
+        assert sum(amounts) == Money(200, "USD")
+        assert sum(reversed(amounts)) == Money(200, "USD")
+        assert sum(amounts) - Money(50) == Money(150, "USD")
+        assert -Money(3, "USD") == Money(-3, "USD")
+        assert not Money(0, "USD")
+
+    def test_currency_mismatch(self):
+        """Test that different currencies are not added together."""
+        with pytest.raises(ValueError, match="EUR and USD"):
+            Money(1, "EUR") + Money(1, "USD")
+
+    def test_expense_money(self):
+        """Test reading cost and currency from an expense."""
+        assert expense_money({"cost": "4.50", "currency_code": "GBP"}) == Money(
+            450, "GBP"
+        )
+        assert expense_money({"amount": 3}) == Money(300)
+        assert to_cents(True) == 0
+
+    def test_convert(self):
+        """Test converting amounts through a rate table."""
+        rates = RateTable("USD", {"EUR": Decimal("0.8")})
+
+        assert rates.convert(Money(1000, "USD"), "eur") == Money(800, "EUR")
+        assert rates.convert(Money(1000), "EUR") == Money(1000, "EUR")
+        assert rates.convert(Money(1000), "JPY") == Money(10, "JPY")
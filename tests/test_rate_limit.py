@@ -0,0 +1,165 @@
+"""Tests for app.rate_limit module."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from splitwise.exception import SplitwiseException
+
+from app.executor import ExecutorSaturatedError
+from app.rate_limit import (
+    LANE_BACKGROUND,
+    LANE_INTERACTIVE,
+    LANE_WRITE,
+    RateLimitScheduler,
+    background_lane,
+    retry_after_seconds,
+)
+
+
+def upstream_error(status, retry_after=None):
+    headers = {"Retry-After": retry_after} if retry_after else {}
+    return SplitwiseException(
+        "Unknown error happened", response=httpx.Response(status, headers=headers)
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff():
+    with patch("app.rate_limit.const.RATE_LIMIT_BACKOFF_BASE", 0.01):
+        yield
+
+
+class TestScheduler:
+    """Test the token bucket and its lanes."""
+
+    @pytest.mark.asyncio
+    async def test_lanes_served_by_priority(self):
+        """Test that waiting calls are granted interactive, write, background."""
+        scheduler = RateLimitScheduler(rate=50, burst=1)
+        await scheduler.acquire()
+        order = []
+
+        async def wait(lane):
+            await scheduler.acquire(lane)
+            order.append(lane)
+
+        tasks = [
+            asyncio.create_task(wait(lane))
+            for lane in (LANE_BACKGROUND, LANE_WRITE, LANE_INTERACTIVE)
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["waiting"] == {
+            "interactive": 1,
+            "write": 1,
+            "background": 1,
+        }
+        await asyncio.gather(*tasks)
+
+        assert order == [LANE_INTERACTIVE, LANE_WRITE, LANE_BACKGROUND]
+        assert scheduler.stats()["throttled"] == 3
+
+    @pytest.mark.asyncio
+    async def test_lane_for_method_and_context(self):
+        """Test lane selection by method and background context."""
+        scheduler = RateLimitScheduler()
+
+        assert scheduler.lane_for("list_groups") == LANE_INTERACTIVE
+        assert scheduler.lane_for("create_expense") == LANE_WRITE
+        with background_lane():
+            assert scheduler.lane_for("list_expenses") == LANE_BACKGROUND
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_rate(self):
+        """Test that a zero rate never waits."""
+        scheduler = RateLimitScheduler(rate=0, burst=1)
+
+        for _ in range(5):
+            await asyncio.wait_for(scheduler.acquire(), 0.1)
+        assert scheduler.stats() == {"enabled": False}
+
+
+class TestCall:
+    """Test 429 handling and retries."""
+
+    @pytest.mark.asyncio
+    async def test_read_retried_after_429_and_bucket_paused(self):
+        """Test that a rate-limited read pauses the bucket and is retried."""
+        scheduler = RateLimitScheduler(rate=100, burst=5)
+        fn = AsyncMock(side_effect=[upstream_error(429, "0.05"), ["groups"]])
+
+        started = asyncio.get_running_loop().time()
+        result = await scheduler.call("list_groups", fn)
+
+        assert result == ["groups"]
+        assert asyncio.get_running_loop().time() - started >= 0.05
+        assert scheduler.stats()["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_write_not_retried(self):
+        """Test that a rate-limited write surfaces the error."""
+        scheduler = RateLimitScheduler(rate=100, burst=5)
+        fn = AsyncMock(side_effect=upstream_error(429, "2"))
+
+        with pytest.raises(SplitwiseException):
+            await scheduler.call("create_expense", fn)
+
+        assert fn.await_count == 1
+        stats = scheduler.stats()
+        assert stats["paused_for"] > 1
+        assert stats["tokens"] == 0
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_retried_with_limit(self):
+        """Test backoff retries for server errors, up to the retry limit."""
+        scheduler = RateLimitScheduler(rate=100, burst=10)
+        fn = AsyncMock(side_effect=[upstream_error(503), {"id": 1}])
+
+        assert await scheduler.call("get_group", fn) == {"id": 1}
+
+        fn = AsyncMock(side_effect=upstream_error(502))
+        with (
+            patch("app.rate_limit.const.RATE_LIMIT_MAX_RETRIES", 2),
+            pytest.raises(SplitwiseException),
+        ):
+            await scheduler.call("get_group", fn)
+        assert fn.await_count == 3
+
+        fn = AsyncMock(side_effect=upstream_error(400))
+        with pytest.raises(SplitwiseException):
+            await scheduler.call("get_group", fn)
+        assert fn.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_saturated_executor_not_retried(self):
+        """Test that a full local executor fails fast without pausing the bucket."""
+        scheduler = RateLimitScheduler(rate=100, burst=5)
+        fn = AsyncMock(side_effect=ExecutorSaturatedError(64, 1.0))
+
+        with pytest.raises(ExecutorSaturatedError):
+            await scheduler.call("list_groups", fn)
+
+        assert fn.await_count == 1
+        stats = scheduler.stats()
+        assert stats["retries"] == 0
+        assert stats["paused_for"] == 0
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After parsing from SDK errors."""
+        assert retry_after_seconds(upstream_error(429, "3")) == 3.0
+        assert retry_after_seconds(upstream_error(429, "soon")) == 0.0
+        assert retry_after_seconds(upstream_error(500)) is None
+
+    def test_status_read_from_sdk_attributes(self):
+        """Test the SDK's tuple status and headers without a response object."""
+        exc = upstream_error(429, "4")
+        # The SDK wraps the status in a tuple and keeps no response object
+        assert exc.http_status == (429,)
+        assert not hasattr(exc, "response")
+        assert retry_after_seconds(exc) == 4.0
+
+        exc.http_status = 429
+        assert retry_after_seconds(exc) == 4.0
+        exc.http_status = None
+        assert retry_after_seconds(exc) is None
@@ -0,0 +1,204 @@
+"""Tests for app.search_index module."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.search_index import SearchIndex, tokenize
+from app.splitwise_client import SplitwiseClient
+
+
+@pytest.fixture
+def index():
+    """Index with a few groups, expenses and friends."""
+    index = SearchIndex()
+    index.rebuild(
+        groups=[{"id": 1, "name": "Lisbon Trip"}, {"id": 2, "name": "Flatmates"}],
+        expenses=[
+            {"id": 10, "description": "Dinner at Café Lisboa", "cost": "40.00"},
+            {"id": 11, "description": "Groceries", "details": "weekly dinner stuff"},
+            {"id": 12, "description": "Old dinner", "deleted_at": "2025-01-01"},
+        ],
+        friends=[{"id": 20, "first_name": "Ana", "last_name": "Lisboa"}],
+    )
+    return index
+
+
+class TestTokenize:
+    """Test tokenization."""
+
+    def test_casefold_and_normalize(self):
+        """Test that tokens are case-folded and NFKC-normalized."""
+        assert tokenize("Café ＴＲＩＰ Straße") == ["café", "trip", "strasse"]
+
+
+class TestSearchIndex:
+    """Test SearchIndex queries and maintenance."""
+
+    def test_exact_match(self, index):
+        """Test exact term matching."""
+        results = index.search("groceries")
+
+        assert [r["id"] for r in results] == ["expense_11"]
+        assert results[0]["url"] == "splitwise://expense/11"
+
+    def test_prefix_match(self, index):
+        """Test that partial words match as prefixes."""
+        assert [r["id"] for r in index.search("flat")] == ["group_2"]
+
+    def test_substring_match(self, index):
+        """Test that infix substrings match through trigrams."""
+        assert [r["id"] for r in index.search("mates")] == ["group_2"]
+
+    def test_notes_are_indexed(self, index):
+        """Test that expense details are searchable."""
+        ids = [r["id"] for r in index.search("dinner")]
+
+        assert set(ids) == {"expense_10", "expense_11"}
+
+    def test_deleted_expenses_skipped(self, index):
+        """Test that deleted expenses are not indexed."""
+        assert "expense_12" not in [r["id"] for r in index.search("old")]
+
+    def test_all_tokens_required(self, index):
+        """Test AND semantics across query tokens."""
+        assert [r["id"] for r in index.search("dinner lisboa")] == ["expense_10"]
+
+    def test_exact_ranks_above_prefix(self, index):
+        """Test that exact matches outrank prefix matches."""
+        index.add_group({"id": 3, "name": "Lisbo"})
+
+        assert index.search("lisbo")[0]["id"] == "group_3"
+
+    def test_limit(self, index):
+        """Test that results are capped at the limit."""
+        assert len(index.search("lisbo", limit=1)) == 1
+
+    def test_empty_query(self, index):
+        """Test that queries without tokens return nothing."""
+        assert index.search("  !! ") == []
+
+    def test_apply_write_create_and_delete(self, index):
+        """Test incremental maintenance from write results."""
+        index.apply_write(
+            "create_expense",
+            {},
+            [{"id": 30, "description": "Museum tickets", "cost": "12"}, None],
+        )
+        assert [r["id"] for r in index.search("museum")] == ["expense_30"]
+
+        index.apply_write("delete_expense", {"id": 30}, {"success": True})
+        assert index.search("museum") == []
+
+    def test_apply_write_marks_stale(self, index):
+        """Test that writes without a usable result force a rebuild."""
+        assert not index.needs_refresh(max_age=3600)
+
+        index.apply_write("undelete_expense", {"id": 12}, {"success": True})
+
+        assert index.needs_refresh(max_age=3600)
+
+    def test_needs_refresh_before_build(self):
+        """Test that an unbuilt index is not ready."""
+        index = SearchIndex()
+
+        assert not index.ready
+        assert index.needs_refresh(max_age=3600)
+
+    @pytest.mark.asyncio
+    async def test_refresh_pages_through_expenses(self):
+        """Test that a rebuild fetches the whole expense history."""
+        index = SearchIndex()
+        client = Mock()
+
+        async def iter_expenses(**kwargs):
+            assert kwargs["visible"] is True
+            yield {"id": 1, "description": "First"}
+
+        client.acall_mapped_method = AsyncMock(return_value=[])
+        client.iter_expenses = iter_expenses
+        client.expense_sync = None
+
+        await index._refresh(client)
+
+        assert index.ready
+        assert [r["id"] for r in index.search("first")] == ["expense_1"]
+
+    @pytest.mark.asyncio
+    async def test_later_refresh_fetches_only_changes(self):
+        """Test that refreshes after the first fetch updated expenses only."""
+        index = SearchIndex()
+        client = Mock(expense_sync=None)
+        calls = []
+        pages = [
+            [{"id": 1, "description": "First"}, {"id": 2, "description": "Second"}],
+            [
+                {"id": 1, "description": "First", "deleted_at": "2025-10-20"},
+                {"id": 3, "description": "Third"},
+            ],
+        ]
+
+        async def iter_expenses(**kwargs):
+            calls.append(kwargs)
+            for expense in pages[len(calls) - 1]:
+                yield expense
+
+        client.iter_expenses = iter_expenses
+        client.acall_mapped_method = AsyncMock(
+            side_effect=[[{"id": 7, "name": "Trip"}], [], [], []]
+        )
+
+        await index._refresh(client)
+        await index._refresh(client)
+
+        assert calls[0]["visible"] is True
+        assert "visible" not in calls[1]
+        assert calls[1]["updated_after"].endswith("Z")
+        assert index.search("first") == []
+        assert [r["id"] for r in index.search("second")] == ["expense_2"]
+        assert [r["id"] for r in index.search("third")] == ["expense_3"]
+        assert index.search("trip") == []
+
+
+class TestReplicaIndexing:
+    """Test building the index from the expense replica."""
+
+    @pytest.mark.asyncio
+    async def test_built_from_replica_and_follows_its_deltas(self, tmp_path):
+        """Test that the index reads the replica and applies its synced pages."""
+        with (
+            patch("app.splitwise_client.Splitwise"),
+            patch.dict(
+                "os.environ",
+                {"SPLITWISE_EXPENSE_SYNC": "true", "SPLITWISE_CACHE_ENABLED": "false"},
+            ),
+        ):
+            client = SplitwiseClient(
+                api_key="key",
+                http=AsyncMock(),
+                expense_sync_path=str(tmp_path / "replica.db"),
+            )
+        upstream = [
+            {"id": 1, "description": "Ferry tickets", "updated_at": "2025-10-01"},
+            {"id": 2, "description": "Museum", "updated_at": "2025-10-01"},
+        ]
+        client.afetch = AsyncMock(side_effect=[upstream, []])
+        client.acall_mapped_method = AsyncMock(return_value=[])
+        client.iter_expenses = Mock(side_effect=AssertionError("no full refetch"))
+        index = client.search_index
+
+        await index._refresh(client)
+
+        assert [r["id"] for r in index.search("ferry")] == ["expense_1"]
+
+        client.afetch = AsyncMock(
+            return_value=[
+                {"id": 2, "description": "Museum", "deleted_at": "2025-10-20"},
+                {"id": 3, "description": "Ferry back", "updated_at": "2025-10-20"},
+            ]
+        )
+        await client.expense_sync.refresh(force=True)
+
+        assert [r["id"] for r in index.search("ferry")] == ["expense_1", "expense_3"]
+        assert index.search("museum") == []
+        await client.aclose()
@@ -0,0 +1,249 @@
+"""Tests for app.serialization module."""
+
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from splitwise.group import Group
+
+from app.async_client import AsyncSplitwiseHTTP
+from app.serialization import orjson_available, parse_fields, project, to_json
+from app.splitwise_client import SplitwiseClient
+from app.utils import object_to_dict
+
+GROUP_DATA = {
+    "id": 5,
+    "name": "Trip",
+    "updated_at": "2025-10-01T10:00:00Z",
+    "created_at": "2025-09-01T10:00:00Z",
+    "simplify_by_default": False,
+    "original_debts": [],
+    "simplified_debts": [],
+    "members": [
+        {
+            "id": 3,
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "balance": [{"currency_code": "EUR", "amount": "5.0"}],
+        }
+    ],
+}
+
+BACKENDS = [
+    False,
+    pytest.param(
+        True,
+        marks=pytest.mark.skipif(not orjson_available(), reason="orjson not installed"),
+    ),
+]
+
+
+class Plain:
+    """Object with public, private and callable attributes."""
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class TestToJson:
+    """Test direct JSON encoding."""
+
+    @pytest.mark.parametrize("use_orjson", BACKENDS)
+    def test_matches_object_to_dict(self, use_orjson):
+        """Test that output equals encoding the converted dict tree."""
+        payload = [
+            Group(GROUP_DATA),
+            Plain(id=1, _secret="x", handler=len, when=datetime(2025, 1, 2)),
+            {1: {3}, "t": (1, 2)},
+        ]
+
+        expected = json.dumps(object_to_dict(payload), separators=(",", ":"))
+        assert to_json(payload, use_orjson=use_orjson) == expected
+
+    def test_backends_agree(self):
+        """Test that both backends produce byte-identical output."""
+        payload = [Group(GROUP_DATA), None, "ü", 1.5]
+
+        assert to_json(payload, use_orjson=False) == to_json(payload)
+
+    @pytest.mark.parametrize("use_orjson", BACKENDS)
+    def test_indented_output(self, use_orjson):
+        """Test that indent=2 matches the indented json.dumps output."""
+        payload = {"group": Group(GROUP_DATA), "name": "ü", "empty": []}
+
+        expected = json.dumps(object_to_dict(payload), indent=2, ensure_ascii=False)
+        assert to_json(payload, use_orjson=use_orjson, indent=2) == expected
+
+    def test_projection(self):
+        """Test that only selected fields are encoded."""
+        fields = parse_fields("id,members.first_name,missing")
+
+        assert json.loads(to_json([Group(GROUP_DATA)], fields)) == [
+            {"id": 5, "members": [{"first_name": "Ada"}]}
+        ]
+
+
+class TestParseFields:
+    """Test field selection parsing."""
+
+    def test_nested_paths(self):
+        """Test that dotted paths build a nested selection."""
+        assert parse_fields("id, users.first_name,users.id") == {
+            "id": None,
+            "users": {"first_name": None, "id": None},
+        }
+
+    def test_parent_selection_wins(self):
+        """Test that selecting a parent keeps its whole subtree."""
+        assert parse_fields(["users.id", "users"]) == {"users": None}
+        assert parse_fields(["users", "users.id"]) == {"users": None}
+
+    def test_empty_selection(self):
+        """Test that empty and malformed paths are ignored."""
+        assert parse_fields(None) is None
+        assert parse_fields("") is None
+        assert parse_fields(" ,a..b,.") is None
+
+    def test_project_dicts(self):
+        """Test projection of already converted data."""
+        data = [{"id": 1, "cost": "2.0", "users": [{"id": 3, "name": "A"}]}]
+
+        assert project(data, {"cost": None, "users": {"id": None}}) == [
+            {"cost": "2.0", "users": [{"id": 3}]}
+        ]
+
+
+class FakeSplitwiseServer:
+    """In-process fake of the Splitwise REST API."""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(200, json={"groups": [GROUP_DATA]})
+
+
+class TestAcallMappedMethodJson:
+    """Test SplitwiseClient.acall_mapped_method_json."""
+
+    @pytest.fixture
+    def fake_server(self):
+        return FakeSplitwiseServer()
+
+    @pytest.fixture
+    def client(self, fake_server):
+        http = AsyncSplitwiseHTTP(
+            api_key="test_key",
+            http2=False,
+            transport=httpx.MockTransport(fake_server.handler),
+        )
+        with patch("app.splitwise_client.Splitwise"):
+            return SplitwiseClient(api_key="test_key", http=http)
+
+    @pytest.mark.asyncio
+    async def test_cached_json_served_verbatim(self, client, fake_server):
+        """Test that the encoded response is cached and reused as text."""
+        first = await client.acall_mapped_method_json("list_groups")
+        second = await client.acall_mapped_method_json("list_groups")
+        converted = await client.acall_mapped_method("list_groups")
+
+        assert first == second
+        assert json.loads(first) == converted == object_to_dict([Group(GROUP_DATA)])
+        assert len(fake_server.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_projection_on_miss_and_hit(self, client, fake_server):
+        """Test that fields are applied to fresh and cached responses."""
+        fields = parse_fields("name,members.id")
+        expected = [{"name": "Trip", "members": [{"id": 3}]}]
+
+        with patch("app.splitwise_client.to_json", side_effect=to_json) as encode:
+            miss = await client.acall_mapped_method_json("list_groups", fields)
+            hit = await client.acall_mapped_method_json("list_groups", fields)
+
+        assert json.loads(miss) == expected
+        assert hit == miss
+        assert len(fake_server.requests) == 1
+        # Encoded once, already projected, and served verbatim afterwards
+        assert encode.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_use_converted_path(self, client):
+        """Test that write methods are encoded from the converted result."""
+        client.raw_client.deleteExpense.return_value = (True, None)
+
+        result = await client.acall_mapped_method_json("delete_expense", id=1)
+
+        assert json.loads(result) == [True, None]
+
+
+class TestFieldProjection:
+    """Test the ``fields`` selection on client reads and tools."""
+
+    @pytest.fixture
+    def fake_server(self):
+        return FakeSplitwiseServer()
+
+    @pytest.fixture
+    def client(self, fake_server):
+        http = AsyncSplitwiseHTTP(
+            api_key="test_key",
+            http2=False,
+            transport=httpx.MockTransport(fake_server.handler),
+        )
+        with patch("app.splitwise_client.Splitwise"):
+            return SplitwiseClient(api_key="test_key", http=http)
+
+    @pytest.mark.asyncio
+    async def test_projected_reads_cached_per_selection(self, client, fake_server):
+        """Test that each selection is fetched once and cached separately."""
+        names = parse_fields("name")
+        ids = parse_fields("members.id")
+
+        assert await client.acall_mapped_method("list_groups", names) == [
+            {"name": "Trip"}
+        ]
+        assert await client.acall_mapped_method("list_groups", fields=names) == [
+            {"name": "Trip"}
+        ]
+        assert await client.acall_mapped_method("list_groups", fields=ids) == [
+            {"members": [{"id": 3}]}
+        ]
+        assert len(fake_server.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_full_cached_response_projected(self, client, fake_server):
+        """Test that a cached full response answers projected reads."""
+        await client.acall_mapped_method("list_groups")
+
+        result = await client.acall_mapped_method(
+            "list_groups", fields=parse_fields("id")
+        )
+
+        assert result == [{"id": 5}]
+        assert len(fake_server.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_tool_passes_parsed_fields(self):
+        """Test that list tools forward the parsed selection."""
+        from app.main import list_expenses
+
+        client = Mock()
+        client.acall_mapped_method = AsyncMock(return_value=[{"id": 1}])
+        ctx = Mock()
+        ctx.request_context.lifespan_context = {"client": client}
+
+        with patch("app.main.log_operation"):
+            result = await list_expenses(ctx, group_id=2, fields="id, cost")
+
+        assert result == {"expenses": [{"id": 1}]}
+        client.acall_mapped_method.assert_awaited_once_with(
+            "list_expenses",
+            limit=20,
+            offset=0,
+            group_id=2,
+            fields={"id": None, "cost": None},
+        )
@@ -0,0 +1,151 @@
+"""Tests for app.settlement module."""
+
+import random
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.settlement import settle, settlement_plan
+
+
+def apply(balances, transfers):
+    """Return balances after applying transfers."""
+    result = dict(balances)
+    for payer, payee, cents in transfers:
+        assert cents > 0
+        result[payer] += cents
+        result[payee] -= cents
+    return result
+
+
+class TestSettle:
+    """Test the settle-up solvers."""
+
+    def test_exact_finds_zero_sum_pairs(self):
+        """Test that independent pairs settle with one payment each."""
+        balances = {1: 500, 2: -500, 3: 700, 4: -300, 5: -400, 6: 0}
+
+        transfers, method = settle(balances)
+
+        assert method == "exact"
+        assert len(transfers) == 3
+        assert set(apply(balances, transfers).values()) == {0}
+
+    def test_exact_beats_greedy(self):
+        """Test a case where greedy matching needs an extra payment."""
+        balances = {1: 600, 2: 400, 3: -400, 4: -300, 5: -300}
+
+        exact, _ = settle(balances)
+        greedy, method = settle(balances, exact_max_members=0)
+
+        assert method == "greedy"
+        assert len(exact) == 3
+        assert len(greedy) == 4
+        assert set(apply(balances, greedy).values()) == {0}
+
+    def test_deterministic(self):
+        """Test that equal inputs in any order give the same plan."""
+        balances = {3: -100, 1: 100, 2: -100, 4: 100}
+        reordered = dict(reversed(list(balances.items())))
+
+        assert settle(balances) == settle(reordered)
+
+    def test_large_group_greedy_fast(self):
+        """Test hundreds of members settle in at most n - 1 payments."""
+        rng = random.Random(7)
+        balances = {member: rng.randint(-10_000, 10_000) for member in range(500)}
+        balances[0] -= sum(balances.values())
+
+        started = time.perf_counter()
+        transfers, method = settle(balances)
+
+        assert time.perf_counter() - started < 1
+        assert method == "greedy"
+        assert len(transfers) <= 499
+        assert set(apply(balances, transfers).values()) == {0}
+
+    def test_unbalanced_rejected(self):
+        """Test that balances must net to zero."""
+        with pytest.raises(ValueError):
+            settle({1: 5, 2: -4})
+
+
+class TestSettlementPlan:
+    """Test plans built from get_group responses."""
+
+    GROUP = {
+        "id": 9,
+        "name": "Trip",
+        "simplify_by_default": True,
+        "members": [
+            {
+                "id": 1,
+                "first_name": "Ana",
+                "last_name": "Lee",
+                "balances": [
+                    {"currency_code": "EUR", "amount": "30.0"},
+                    {"currency_code": "USD", "amount": "-10.0"},
+                ],
+            },
+            {
+                "id": 2,
+                "first_name": "Bo",
+                "last_name": None,
+                "balances": [{"currency_code": "EUR", "amount": "-20.0"}],
+            },
+            {
+                "id": 3,
+                "first_name": "Cy",
+                "last_name": "Ng",
+                "balance": [
+                    {"currency_code": "EUR", "amount": "-10.01"},
+                    {"currency_code": "USD", "amount": "10.0"},
+                ],
+            },
+        ],
+    }
+
+    def test_per_currency_payments(self):
+        """Test ordered payments per currency with names."""
+        plan = settlement_plan(self.GROUP)
+
+        assert plan["group_id"] == 9
+        assert list(plan["currencies"]) == ["EUR", "USD"]
+        eur = plan["currencies"]["EUR"]
+        assert eur["payments"] == [
+            {
+                "from": 2,
+                "from_name": "Bo",
+                "to": 1,
+                "to_name": "Ana Lee",
+                "amount": "19.99",
+            },
+            {
+                "from": 3,
+                "from_name": "Cy Ng",
+                "to": 1,
+                "to_name": "Ana Lee",
+                "amount": "10.01",
+            },
+        ]
+        assert eur["unbalanced"] == "-0.01"
+        assert plan["currencies"]["USD"]["payments"][0]["amount"] == "10.00"
+
+    @pytest.mark.asyncio
+    async def test_tool_resolves_group_name(self):
+        """Test the tool resolves names and reads the group once."""
+        from app.main import compute_settlement_plan
+
+        client = Mock()
+        client.aget_group_by_name = AsyncMock(return_value={"id": 9})
+        client.acall_mapped_method = AsyncMock(return_value=self.GROUP)
+        ctx = Mock()
+        ctx.request_context.lifespan_context = {"client": client}
+
+        with patch("app.main.log_operation"):
+            plan = await compute_settlement_plan(ctx, group_name="trip")
+
+        client.aget_group_by_name.assert_awaited_once_with("trip", fuzzy=False)
+        client.acall_mapped_method.assert_awaited_once_with("get_group", id=9)
+        assert plan["currencies"]["EUR"]["transfers"] == 2
@@ -0,0 +1,278 @@
+"""Tests for app.shared_state module."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.shared_state import (
+    _SET_IF_VERSION_SCRIPT,
+    MemoryBackend,
+    RedisBackend,
+    SharedCache,
+    backend_from_url,
+)
+from app.splitwise_client import SplitwiseClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """The subset of the redis.asyncio client used by RedisBackend."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.keys = {}
+        self.expiry = {}
+
+    async def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    async def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+    async def expire(self, name, seconds):
+        self.expiry[name] = seconds
+
+    async def delete(self, *names):
+        return sum(
+            self.hashes.pop(name, None) is not None
+            or self.keys.pop(name, None) is not None
+            for name in names
+        )
+
+    async def get(self, name):
+        return self.keys.get(name)
+
+    async def set(self, name, value, nx=False, px=None):
+        if nx and name in self.keys:
+            return None
+        self.keys[name] = value
+        return True
+
+    async def incr(self, name):
+        self.keys[name] = str(int(self.keys.get(name, 0)) + 1)
+        return int(self.keys[name])
+
+    async def eval(self, script, numkeys, *args):
+        if script == _SET_IF_VERSION_SCRIPT:
+            bucket, version_key, field, value, version, ttl = args
+            if self.keys.get(version_key, "0") != version:
+                return 0
+            await self.hset(bucket, field, value)
+            await self.expire(bucket, ttl)
+            return 1
+        name, token = args
+        if self.keys.get(name) == token:
+            del self.keys[name]
+            return 1
+        return 0
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    clock = FakeClock()
+    if request.param == "memory":
+        backend = MemoryBackend(clock=clock)
+    else:
+        backend = RedisBackend(client=FakeRedis(), clock=clock)
+    backend.clock = clock
+    return backend
+
+
+class TestBackends:
+    """Test the operations both backends provide."""
+
+    @pytest.mark.asyncio
+    async def test_values_expire_and_buckets_are_dropped(self, backend):
+        """Test that values expire after their TTL and delete drops buckets."""
+        await backend.set("b", "f", '{"a": 1}', 10)
+        assert await backend.get("b", "f") == '{"a": 1}'
+        assert await backend.get("b", "other") is None
+
+        backend.clock.now += 11
+        assert await backend.get("b", "f") is None
+
+        await backend.set("b", "f", "[]", 10)
+        assert await backend.delete("b", "missing") == 1
+        assert await backend.get("b", "f") is None
+
+    @pytest.mark.asyncio
+    async def test_lock_is_exclusive_until_released(self, backend):
+        """Test that a lock has one holder and only its token releases it."""
+        token = await backend.try_lock("lock", 30)
+
+        assert token
+        assert await backend.try_lock("lock", 30) is None
+        await backend.unlock("lock", "someone-else")
+        assert await backend.try_lock("lock", 30) is None
+        await backend.unlock("lock", token)
+        assert await backend.try_lock("lock", 30)
+
+    @pytest.mark.asyncio
+    async def test_versioned_set_rejected_after_bump(self, backend):
+        """Test that a value fetched under an old version is not stored."""
+        assert await backend.version("v") == 0
+        assert await backend.set_if_version("b", "f", "old", 10, "v", 0)
+
+        await backend.bump("v", "other")
+
+        assert await backend.version("v") == 1
+        assert not await backend.set_if_version("b", "g", "stale", 10, "v", 0)
+        assert await backend.get("b", "g") is None
+        assert await backend.set_if_version("b", "g", "fresh", 10, "v", 1)
+        assert await backend.get("b", "g") == "fresh"
+
+    def test_backend_from_url(self):
+        """Test backend selection by URL scheme."""
+        assert isinstance(backend_from_url("memory://"), MemoryBackend)
+        with pytest.raises(ValueError, match="Unsupported"):
+            backend_from_url("memcached://localhost")
+        with (
+            patch("app.shared_state.aioredis", None),
+            pytest.raises(RuntimeError, match="redis package"),
+        ):
+            backend_from_url("redis://localhost:6379/0")
+
+
+class TestSharedCache:
+    """Test cached reads and coalescing across processes."""
+
+    @pytest.mark.asyncio
+    async def test_one_process_fetches_for_all(self):
+        """Test that concurrent misses in two processes fetch only once."""
+        backend = MemoryBackend()
+        first = SharedCache(backend, "tenant", poll_interval=0.01)
+        second = SharedCache(backend, "tenant", poll_interval=0.01)
+        fetch = AsyncMock(return_value='[{"id": 1}]')
+
+        async def slow_fetch():
+            await asyncio.sleep(0.05)
+            return await fetch()
+
+        results = await asyncio.gather(
+            first.fetch_json("list_groups", {}, 60, slow_fetch),
+            second.fetch_json("list_groups", {}, 60, slow_fetch),
+        )
+
+        assert results == ['[{"id": 1}]', '[{"id": 1}]']
+        assert fetch.await_count == 1
+        assert second.stats()["coalesced"] == 1
+        assert await first.fetch_json("list_groups", {}, 60, fetch) == '[{"id": 1}]'
+        assert fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_lets_next_process_fetch(self):
+        """Test that a failing leader releases the lock for the others."""
+        backend = MemoryBackend()
+        leader = SharedCache(backend, "tenant", poll_interval=0.01)
+        follower = SharedCache(backend, "tenant", poll_interval=0.01)
+
+        async def failing():
+            await asyncio.sleep(0.03)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            leader.fetch_json("get_group", {"id": 1}, 60, failing),
+            follower.fetch_json(
+                "get_group", {"id": 1}, 60, AsyncMock(return_value="{}")
+            ),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] == "{}"
+
+    @pytest.mark.asyncio
+    async def test_tenants_isolated_and_invalidated(self):
+        """Test that tenants do not share entries and invalidation drops them."""
+        backend = MemoryBackend()
+        alice = SharedCache(backend, "alice")
+        bob = SharedCache(backend, "bob")
+        await alice.set_json("list_groups", {}, "[1]", 60)
+
+        assert await bob.get_json("list_groups", {}) is None
+        assert await alice.invalidate("list_groups", "list_friends") == 1
+        assert await alice.get_json("list_groups", {}) is None
+
+    @pytest.mark.asyncio
+    async def test_read_in_flight_during_invalidation_not_stored(self, backend):
+        """Test that a read fetched before another process's write is dropped."""
+        reader = SharedCache(backend, "tenant")
+        writer = SharedCache(backend, "tenant")
+
+        async def fetch_then_other_process_writes():
+            # The read got its response; the write lands before it is stored
+            await writer.invalidate("list_groups")
+            return "[1]"
+
+        payload = await reader.fetch_json(
+            "list_groups", {}, 60, fetch_then_other_process_writes
+        )
+
+        assert payload == "[1]"
+        assert await reader.get_json("list_groups", {}) is None
+        assert reader.stats()["stale_writes"] == 1
+        assert (
+            await reader.fetch_json(
+                "list_groups", {}, 60, AsyncMock(return_value="[2]")
+            )
+            == "[2]"
+        )
+        assert await writer.get_json("list_groups", {}) == "[2]"
+
+    @pytest.mark.asyncio
+    async def test_unreachable_backend_falls_back_to_fetch(self):
+        """Test that backend errors are counted and reads still succeed."""
+        backend = MemoryBackend()
+        for name in ("get", "set", "try_lock"):
+            setattr(backend, name, AsyncMock(side_effect=ConnectionError("down")))
+        shared = SharedCache(backend, "tenant")
+
+        payload = await shared.fetch_json(
+            "list_groups", {}, 60, AsyncMock(return_value="[]")
+        )
+
+        assert payload == "[]"
+        assert shared.stats()["errors"] == 3
+        assert shared.stats()["misses"] == 1
+
+
+class TestClientIntegration:
+    """Test SplitwiseClient reads and writes through the shared cache."""
+
+    @pytest.mark.asyncio
+    async def test_reads_shared_and_writes_invalidate(self):
+        """Test that one process's read serves another until a write."""
+        backend = MemoryBackend()
+        with (
+            patch("app.splitwise_client.Splitwise") as mock_splitwise,
+            patch.dict(os.environ, {"SPLITWISE_ASYNC_HTTP": "false"}),
+        ):
+            sdk = mock_splitwise.return_value
+            workers = [
+                SplitwiseClient(api_key="key", shared=SharedCache(backend, "t"))
+                for _ in range(2)
+            ]
+        sdk.getGroups.return_value = [{"id": 1}]
+        sdk.deleteExpense.return_value = {"success": True}
+
+        assert await workers[0].acall_mapped_method("list_groups") == [{"id": 1}]
+        assert await workers[1].acall_mapped_method_json("list_groups") == '[{"id":1}]'
+        assert sdk.getGroups.call_count == 1
+        assert workers[0].cache is None
+
+        await workers[1].acall_mapped_method("delete_expense", id=5)
+        await workers[0].acall_mapped_method("list_groups")
+
+        assert sdk.getGroups.call_count == 2
+        assert workers[0].stats()["shared_cache"]["misses"] == 2
+        for client in workers:
+            await client.aclose()
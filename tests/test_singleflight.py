@@ -0,0 +1,201 @@
+"""Tests for app.singleflight module."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test SingleFlight coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that identical in-flight calls run once."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert calls == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats() == {
+            "calls": 5,
+            "executions": 1,
+            "coalesced": 4,
+            "in_flight": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that distinct keys are not coalesced."""
+        flight = SingleFlight()
+
+        async def work(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2))
+        )
+
+        assert results == [1, 2]
+        assert flight.stats()["executions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_not_coalesced(self):
+        """Test that completed calls are not reused."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flight.do("key", work) == 1
+        assert await flight.do("key", work) == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_followers(self):
+        """Test that followers receive the leader's exception."""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            *(flight.do("key", failing) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        """Test that a follower retries when the leader is cancelled."""
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "ok"
+
+        leader = asyncio.create_task(flight.do("key", slow))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("key", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "ok"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+
+class TestCallClientCoalescing:
+    """Test single-flight integration in app.main."""
+
+    @pytest.mark.asyncio
+    async def test_read_calls_coalesced(self):
+        """Test that concurrent identical reads reach the client once."""
+        from app.main import _call_client
+
+        release = asyncio.Event()
+        client = Mock()
+        calls = 0
+
+        async def acall_mapped_method(method_name, **kwargs):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return [{"id": 1}]
+
+        client.acall_mapped_method = acall_mapped_method
+        ctx = Mock()
+        ctx.request_context.lifespan_context = {
+            "client": client,
+            "singleflight": SingleFlight(),
+        }
+
+        tasks = [
+            asyncio.create_task(_call_client(ctx, "list_groups")) for _ in range(4)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert results == [[{"id": 1}]] * 4
+
+    @pytest.mark.asyncio
+    async def test_write_calls_not_coalesced(self):
+        """Test that write methods are never coalesced."""
+        from app.main import _call_client
+
+        client = Mock()
+        client.acall_mapped_method = AsyncMock(return_value={"id": 2})
+        ctx = Mock()
+        ctx.request_context.lifespan_context = {
+            "client": client,
+            "singleflight": SingleFlight(),
+        }
+
+        await asyncio.gather(
+            _call_client(ctx, "create_expense", cost="1"),
+            _call_client(ctx, "create_expense", cost="1"),
+        )
+
+        assert client.acall_mapped_method.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reads_from_different_sessions_coalesced(self):
+        """Test that two MCP sessions share one single-flight group."""
+        from app.client_pool import ClientPool
+        from app.main import _call_client, mcp_lifespan
+
+        release = asyncio.Event()
+        calls = 0
+
+        async def acall_mapped_method(method_name, **kwargs):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return [{"id": 1}]
+
+        client = Mock()
+        client.acall_mapped_method = acall_mapped_method
+        pool = ClientPool({"api_key": "key"}, factory=lambda *_: client)
+
+        with patch("app.main.shared_pool", return_value=pool):
+            async with mcp_lifespan(None) as first, mcp_lifespan(None) as second:
+                contexts = []
+                for lifespan_context in (first, second):
+                    ctx = Mock()
+                    ctx.request_context.lifespan_context = lifespan_context
+                    ctx.request_context.request = None
+                    contexts.append(ctx)
+
+                tasks = [
+                    asyncio.create_task(_call_client(ctx, "list_groups"))
+                    for ctx in contexts
+                ]
+                await asyncio.sleep(0)
+                release.set()
+                results = await asyncio.gather(*tasks)
+
+        assert first["singleflight"] is second["singleflight"]
+        assert calls == 1
+        assert results == [[{"id": 1}]] * 2
+        await pool.aclose()
@@ -1,9 +1,14 @@
 """Tests for app.splitwise_client module."""
 
+import asyncio
 import os
+import threading
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
+import httpx
 import pytest
+from splitwise.exception import SplitwiseException
 
 from app.splitwise_client import SplitwiseClient
 
@@ -134,6 +139,186 @@ class TestMethodMapping:
             mock_splitwise_client.call_mapped_method("list_groups")
 
 
+class TestResponseCaching:
+    """Test response caching in call_mapped_method."""
+
+    def test_read_method_served_from_cache(self, mock_splitwise_client):
+        """Test that repeated reads hit the SDK only once."""
+        mock_splitwise_client._client.getCategories.return_value = [{"id": 1}]
+
+        first = mock_splitwise_client.call_mapped_method("list_categories")
+        second = mock_splitwise_client.call_mapped_method("list_categories")
+
+        mock_splitwise_client._client.getCategories.assert_called_once_with()
+        assert first == second == [{"id": 1}]
+        stats = mock_splitwise_client.stats()["cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_write_method_invalidates_reads(self, mock_splitwise_client):
+        """Test that writes drop affected cached reads."""
+        sdk = mock_splitwise_client._client
+        sdk.getExpenses.return_value = [{"id": 1}]
+        sdk.getCategories.return_value = [{"id": 9}]
+        sdk.deleteExpense.return_value = {"success": True}
+
+        mock_splitwise_client.call_mapped_method("list_expenses", limit=5)
+        mock_splitwise_client.call_mapped_method("list_categories")
+        mock_splitwise_client.call_mapped_method("delete_expense", id=1)
+        mock_splitwise_client.call_mapped_method("list_expenses", limit=5)
+        mock_splitwise_client.call_mapped_method("list_categories")
+
+        assert sdk.getExpenses.call_count == 2
+        assert sdk.getCategories.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_read_in_flight_during_write_not_cached(self, mock_splitwise_client):
+        """Test that a read started before a write does not cache old data."""
+        sdk = mock_splitwise_client._client
+        mock_splitwise_client._http = None
+        release = threading.Event()
+
+        def slow_read(**_kwargs):
+            release.wait(5)
+            return [{"id": 1}]
+
+        sdk.getExpenses.side_effect = slow_read
+        sdk.deleteExpense.return_value = {"success": True}
+
+        read = asyncio.create_task(
+            mock_splitwise_client.acall_mapped_method("list_expenses", limit=5)
+        )
+        await asyncio.sleep(0.05)
+        await mock_splitwise_client.acall_mapped_method("delete_expense", id=1)
+        release.set()
+        await read
+        await mock_splitwise_client.acall_mapped_method("list_expenses", limit=5)
+
+        assert sdk.getExpenses.call_count == 2
+        assert mock_splitwise_client.stats()["cache"]["stale_writes"] == 1
+
+    def test_write_methods_not_cached(self, mock_splitwise_client):
+        """Test that write methods always reach the SDK."""
+        sdk = mock_splitwise_client._client
+        sdk.createExpense.return_value = {"id": 2}
+
+        mock_splitwise_client.call_mapped_method("create_expense", cost="1")
+        mock_splitwise_client.call_mapped_method("create_expense", cost="1")
+
+        assert sdk.createExpense.call_count == 2
+
+    def test_cache_disabled_by_env(self):
+        """Test that SPLITWISE_CACHE_ENABLED=false disables the cache."""
+        with (
+            patch("app.splitwise_client.Splitwise") as mock_splitwise,
+            patch.dict(os.environ, {"SPLITWISE_CACHE_ENABLED": "false"}),
+        ):
+            client = SplitwiseClient(api_key="test_key")
+            mock_splitwise.return_value.getGroups.return_value = []
+
+            client.call_mapped_method("list_groups")
+            client.call_mapped_method("list_groups")
+
+            assert client.cache is None
+            assert mock_splitwise.return_value.getGroups.call_count == 2
+            assert client.stats()["cache"] is None
+
+
+class TestIterExpenses:
+    """Test the streaming expense paginator."""
+
+    @staticmethod
+    def _paged(client, total, delay=0.0):
+        calls = []
+
+        async def acall_mapped_method(method_name, limit, offset, **kwargs):
+            calls.append({"limit": limit, "offset": offset, **kwargs})
+            await asyncio.sleep(delay)
+            return [{"id": i} for i in range(offset, min(offset + limit, total))]
+
+        client.acall_mapped_method = acall_mapped_method
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_yields_every_page(self, mock_splitwise_client):
+        """Test that all pages are streamed in order with filters kept."""
+        calls = self._paged(mock_splitwise_client, total=250)
+
+        ids = [
+            expense["id"]
+            async for expense in mock_splitwise_client.iter_expenses(
+                page_size=100, group_id=7, limit=5
+            )
+        ]
+
+        assert ids == list(range(250))
+        assert all(call["group_id"] == 7 for call in calls)
+        assert calls[-1]["offset"] + calls[-1]["limit"] > 250
+
+    @pytest.mark.asyncio
+    async def test_page_size_adapts_to_latency(self, mock_splitwise_client):
+        """Test that fast pages grow and slow pages shrink."""
+        calls = self._paged(mock_splitwise_client, total=1000)
+        [e async for e in mock_splitwise_client.iter_expenses(page_size=50)]
+        assert [call["limit"] for call in calls[:3]] == [50, 100, 200]
+
+        calls = self._paged(mock_splitwise_client, total=100, delay=0.02)
+        with patch("app.splitwise_client.const.EXPENSE_PAGE_TARGET_SECONDS", 0.01):
+            [
+                e
+                async for e in mock_splitwise_client.iter_expenses(
+                    page_size=40, min_page_size=20
+                )
+            ]
+        assert [call["limit"] for call in calls[:3]] == [40, 20, 20]
+
+    @pytest.mark.asyncio
+    async def test_prefetches_next_page(self, mock_splitwise_client):
+        """Test that the next page is requested before the caller asks."""
+        calls = self._paged(mock_splitwise_client, total=30)
+        stream = mock_splitwise_client.iter_expenses(page_size=10)
+
+        assert (await anext(stream))["id"] == 0
+        await asyncio.sleep(0)
+
+        assert [call["offset"] for call in calls] == [0, 10]
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_early_exit_cancels_prefetch(self, mock_splitwise_client):
+        """Test that breaking out of the stream stops fetching."""
+        calls = self._paged(mock_splitwise_client, total=1000, delay=0.01)
+
+        async for expense in mock_splitwise_client.iter_expenses(page_size=10):
+            if expense["id"] == 3:
+                break
+        await asyncio.sleep(0.05)
+
+        assert len(calls) == 2
+
+
+class TestUpstreamScheduling:
+    """Test that upstream calls go through the rate limiter and executor."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_sdk_read_retried(self, mock_splitwise_client):
+        """Test a 429 from an SDK read is retried and budgets are reported."""
+        limited = SplitwiseException(
+            "Unknown error happened",
+            response=httpx.Response(429, headers={"Retry-After": "0"}),
+        )
+        mock_splitwise_client._http = None
+        mock_splitwise_client.raw_client.getGroups.side_effect = [limited, []]
+
+        with patch("app.rate_limit.const.RATE_LIMIT_BACKOFF_BASE", 0.01):
+            assert await mock_splitwise_client.afetch("list_groups") == []
+
+        stats = mock_splitwise_client.stats()
+        assert stats["rate_limit"]["retries"] == 1
+        assert stats["rate_limit"]["granted"]["interactive"] == 2
+        assert stats["sdk_executor"]["completed"] == 2
+
+
 class TestHelperMethods:
     """Test helper methods."""
 
@@ -166,27 +351,23 @@ class TestHelperMethods:
         assert user_id is None
 
     def test_get_group_by_name_found(self, mock_splitwise_client):
-        """Test finding group by name when group exists."""
-        mock_group1 = Mock()
-        mock_group1.name = "Group 1"
-        mock_group2 = Mock()
-        mock_group2.name = "Test Group"
-
+        """Test that the SDK listing is converted and matched without case."""
         mock_splitwise_client._client.getGroups.return_value = [
-            mock_group1,
-            mock_group2,
+            SimpleNamespace(id=1, name="Group 1"),
+            SimpleNamespace(id=2, name="Test Group"),
         ]
 
-        result = mock_splitwise_client.get_group_by_name("Test Group")
+        result = mock_splitwise_client.get_group_by_name("test group")
 
-        assert result == mock_group2
+        assert result == {"id": 2, "name": "Test Group"}
+        assert mock_splitwise_client.get_group_by_name("Test Group") == result
+        mock_splitwise_client._client.getGroups.assert_called_once()
 
     def test_get_group_by_name_not_found(self, mock_splitwise_client):
         """Test finding group by name when group doesn't exist."""
-        mock_group = Mock()
-        mock_group.name = "Different Group"
-
-        mock_splitwise_client._client.getGroups.return_value = [mock_group]
+        mock_splitwise_client._client.getGroups.return_value = [
+            SimpleNamespace(id=1, name="Different Group")
+        ]
 
         result = mock_splitwise_client.get_group_by_name("Nonexistent Group")
 
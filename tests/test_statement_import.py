@@ -0,0 +1,280 @@
+"""Tests for app.statement_import module."""
+
+import io
+import json
+from datetime import date
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+
+from app.async_client import AsyncSplitwiseHTTP
+from app.batch import IdempotencyStore
+from app.money import Money
+from app.splitwise_client import SplitwiseClient
+from app.statement_import import (
+    detect_format,
+    import_statement,
+    iter_csv_rows,
+    iter_ofx_rows,
+    main,
+    parse_amount,
+)
+from tests.conftest import expense_json, group_json
+
+CSV = """Date,Description,Amount,Currency
+2025-03-01,Coffee Shop,-4.50,eur
+2025-03-01,Coffee Shop,-4.50,eur
+2025-03-02,Refund,10.00,eur
+
+not-a-date,Broken,-1.00,eur
+2025-04-03,"Hotel, Paris","-1,200.00",eur
+"""
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>GBP
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250305120000[0:GMT]<TRNAMT>-12.30
+<FITID>A1<NAME>Fish &amp; Chips
+</STMTTRN>
+<STMTTRN>
+  <TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20250306</DTPOSTED>
+  <TRNAMT>5.00</TRNAMT><FITID>A2</FITID><MEMO>Cashback</MEMO>
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class ChunkedReader(io.StringIO):
+    """StringIO that never returns more than a few characters per read."""
+
+    def read(self, size=-1):
+        return super().read(7)
+
+
+class TestParsing:
+    """Test statement readers."""
+
+    def test_amounts(self):
+        """Test separators, symbols and parenthesized negatives."""
+        assert parse_amount("-1,234.50") == -123450
+        assert parse_amount("12,50 €") == 1250
+        assert parse_amount("1.234,50") == 123450
+        assert parse_amount("(3.00)") == -300
+        assert parse_amount("$7") == 700
+
+    def test_csv_rows(self):
+        """Test header detection and row values."""
+        rows = list(iter_csv_rows(io.StringIO(CSV)))
+
+        assert [row.line for row in rows] == [2, 3, 4, 6, 7]
+        assert rows[0].date == date(2025, 3, 1)
+        assert rows[0].amount == Money(-450, "EUR")
+        assert rows[3].date is None
+        assert rows[4].description == "Hotel, Paris"
+        assert rows[4].amount.cents == -120000
+
+    def test_csv_debit_credit_and_mapping(self):
+        """Test debit/credit columns and explicit column names."""
+        text = "Buchung;Text;Soll;Haben\n05.03.2025;Bahn;12,00;\n"
+        stream = io.StringIO(text.replace(";", ","))
+        columns = {"date": "Buchung", "description": "Text", "debit": "Soll"}
+
+        (row,) = iter_csv_rows(stream, columns, date_format="%d.%m.%Y")
+
+        assert row.date == date(2025, 3, 5)
+        assert row.amount.cents == -1200
+
+        with pytest.raises(ValueError, match="Column 'Betrag'"):
+            list(iter_csv_rows(io.StringIO(text), {"amount": "Betrag"}))
+
+    def test_ofx_rows_streamed_in_chunks(self):
+        """Test SGML and XML transactions split across tiny reads."""
+        rows = list(iter_ofx_rows(ChunkedReader(OFX)))
+
+        assert [(row.date, row.amount, row.reference) for row in rows] == [
+            (date(2025, 3, 5), Money(-1230, "GBP"), "A1"),
+            (date(2025, 3, 6), Money(500, "GBP"), "A2"),
+        ]
+        assert rows[0].description == "Fish & Chips"
+        assert rows[1].description == "Cashback"
+
+    def test_detect_format(self):
+        """Test format detection by suffix and content."""
+        assert detect_format("x.QFX") == "ofx"
+        assert detect_format(head=OFX[:40]) == "ofx"
+        assert detect_format(head=CSV[:40]) == "csv"
+
+
+def make_client(existing=()):
+    client = Mock()
+    client.idempotency = IdempotencyStore()
+    client.aget_group_by_name = AsyncMock(return_value={"id": 9})
+    client.afind_group_member = AsyncMock(
+        side_effect=lambda group_id, name, fuzzy: {"id": {"Ana": 1, "Bo": 2}[name]}
+    )
+    calls = []
+
+    def stream(**filters):
+        calls.append(filters)
+
+        async def gen():
+            for expense in existing:
+                if filters["dated_after"] <= expense["date"] < filters["dated_before"]:
+                    yield expense
+
+        return gen()
+
+    client.iter_expenses = Mock(side_effect=stream)
+    client.history_calls = calls
+    ids = iter(range(100, 200))
+    client.acall_mapped_method = AsyncMock(
+        side_effect=lambda method, expense: {"id": next(ids)}
+    )
+    return client
+
+
+class TestImportStatement:
+    """Test the import pipeline."""
+
+    EXISTING = [
+        {"date": "2025-03-01T00:00:00Z", "cost": "4.5", "description": "coffee shop"}
+    ]
+
+    @pytest.mark.asyncio
+    async def test_import_skips_existing_and_refunds(self):
+        """Test outcomes per row and month-by-month history loading."""
+        client = make_client(self.EXISTING)
+
+        result = await import_statement(client, io.StringIO(CSV), "Trip", batch_size=1)
+
+        assert result["counts"] == {
+            "existing": 1,
+            "created": 2,
+            "skipped": 1,
+            "invalid": 1,
+        }
+        assert result["errors"] == [
+            {"line": 6, "status": "invalid", "error": "Missing or unreadable date"}
+        ]
+        assert [call["dated_after"] for call in client.history_calls] == [
+            "2025-03-01",
+            "2025-04-01",
+        ]
+        expense = client.acall_mapped_method.await_args_list[0].kwargs["expense"]
+        assert expense.cost == "4.50"
+        assert expense.currency_code == "EUR"
+        assert expense.date == "2025-03-01"
+
+    @pytest.mark.asyncio
+    async def test_rerun_does_not_duplicate(self):
+        """Test that importing the same file twice creates nothing new."""
+        client = make_client()
+
+        await import_statement(client, io.StringIO(CSV), "Trip")
+        again = await import_statement(client, io.StringIO(CSV), "Trip")
+
+        assert again["counts"]["duplicate"] == 3
+        assert client.acall_mapped_method.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_paid_by_split(self):
+        """Test explicit payer and an uneven cent split."""
+        client = make_client()
+        text = "Date,Description,Amount\n2025-03-01,Taxi,10.01\n"
+
+        await import_statement(
+            client,
+            io.StringIO(text),
+            "Trip",
+            paid_by="Bo",
+            split_with=["Ana", "Bo"],
+            charges="positive",
+        )
+
+        payer, other = client.acall_mapped_method.await_args.kwargs["expense"].users
+        assert payer.id == 2
+        assert payer.paid_share == "10.01"
+        assert payer.owed_share == "5.00"
+        assert other.owed_share == "5.01"
+
+    def test_cli(self, tmp_path, capsys):
+        """Test the command line entry point."""
+        statement = tmp_path / "march.ofx"
+        statement.write_text(OFX)
+        client = make_client()
+        client.aclose = AsyncMock()
+
+        with patch("app.splitwise_client.SplitwiseClient", return_value=client):
+            code = main([str(statement), "--group", "Trip", "--dry-run"])
+
+        assert code == 0
+        output = json.loads(capsys.readouterr().out)
+        assert output["format"] == "ofx"
+        assert output["counts"] == {"valid": 1, "skipped": 1}
+        client.aclose.assert_awaited_once()
+
+
+class TestImportThroughClient:
+    """Test imports end to end through SplitwiseClient and the SDK."""
+
+    @pytest.fixture
+    def client(self, splitwise_api):
+        splitwise_api.groups = [group_json(9, "Trip", [(1, "Ana"), (2, "Bo")])]
+        splitwise_api.expenses = [
+            expense_json(50, "coffee shop", "4.5", "2025-03-01T00:00:00Z", group_id=9)
+        ]
+        http = AsyncSplitwiseHTTP(
+            api_key="key",
+            http2=False,
+            transport=httpx.MockTransport(splitwise_api.handler),
+        )
+        with patch.dict("os.environ", {"SPLITWISE_CACHE_ENABLED": "false"}):
+            return SplitwiseClient(api_key="key", http=http)
+
+    @pytest.mark.asyncio
+    async def test_statement_rows_created_upstream(self, client, splitwise_api):
+        """Test that new charges are posted with their shares, once."""
+        result = await import_statement(
+            client, io.StringIO(CSV), "Trip", paid_by="Bo", split_with=["Ana", "Bo"]
+        )
+
+        assert result["counts"] == {
+            "existing": 1,
+            "created": 2,
+            "skipped": 1,
+            "invalid": 1,
+        }
+        coffee, hotel = splitwise_api.forms
+        assert coffee["cost"] == "4.50"
+        assert coffee["currency_code"] == "EUR"
+        assert coffee["date"] == "2025-03-01"
+        assert coffee["group_id"] == "9"
+        assert coffee["users__0__user_id"] == "2"
+        assert coffee["users__0__paid_share"] == "4.50"
+        assert coffee["users__1__user_id"] == "1"
+        assert hotel["description"] == "Hotel, Paris"
+        assert hotel["cost"] == "1200.00"
+
+        # The created expenses are now part of the group's history
+        fresh = SplitwiseClient(api_key="key", http=client._http)
+        again = await import_statement(
+            fresh, io.StringIO(CSV), "Trip", paid_by="Bo", split_with=["Ana", "Bo"]
+        )
+
+        assert again["counts"]["existing"] == 3
+        assert len(splitwise_api.forms) == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_similar_group_name_rejected(self, client, splitwise_api):
+        """Test that a near-miss group name never imports into another group."""
+        splitwise_api.groups = [group_json(9, "Flat 2023", [(1, "Ana")])]
+
+        with pytest.raises(ValueError, match="Flat 2024"):
+            await import_statement(client, io.StringIO(CSV), "Flat 2024", paid_by="Ana")
+
+        assert splitwise_api.forms == []
+        await client.aclose()
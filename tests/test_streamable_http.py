@@ -180,3 +180,25 @@ class TestStreamableHTTPTransport:
             assert mock_mcp.settings.host == "0.0.0.0"
             assert mock_mcp.settings.port == 8000
             mock_mcp.run.assert_called_once_with(transport="streamable-http")
+
+    def test_multi_worker_mode(self):
+        """Test that MCP_WORKERS starts worker processes instead of one server."""
+        with (
+            patch.dict(
+                os.environ,
+                {
+                    "MCP_TRANSPORT": "streamable-http",
+                    "MCP_PORT": "9000",
+                    "MCP_WORKERS": "3",
+                    "MCP_WORKER_OFFSET": "6",
+                },
+            ),
+            patch("app.main.mcp") as mock_mcp,
+            patch("app.main.run_workers", return_value=0) as mock_run_workers,
+            pytest.raises(SystemExit) as exit_info,
+        ):
+            run_mcp_server()
+
+        mock_run_workers.assert_called_once_with(3, "0.0.0.0", 9000, 6)
+        mock_mcp.run.assert_not_called()
+        assert exit_info.value.code == 0
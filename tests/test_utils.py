@@ -0,0 +1,170 @@
+"""Tests for app.utils module."""
+
+from datetime import UTC, datetime, timedelta, timezone
+from unittest.mock import Mock
+
+from splitwise.expense import Expense
+
+from app.utils import object_to_dict, parse_timestamp
+
+
+class Plain:
+    """Object with public, private and callable attributes."""
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class Slotted:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return f"Slotted({self.value})"
+
+
+class TestObjectToDict:
+    """Test object_to_dict conversion."""
+
+    def test_primitives_and_containers(self):
+        """Test that primitives pass through and containers become lists."""
+        assert object_to_dict(None) is None
+        assert object_to_dict(True) is True
+        assert object_to_dict((1, "a", 2.5)) == [1, "a", 2.5]
+        assert object_to_dict({3}) == [3]
+        assert object_to_dict({1: datetime(2025, 1, 2)}) == {1: "2025-01-02T00:00:00"}
+
+    def test_objects_skip_private_and_callable(self):
+        """Test that private and callable attributes are dropped."""
+        obj = Plain(id=1, _secret="x", handler=len, child=Plain(name="n", _p=1))
+
+        assert object_to_dict(obj) == {"id": 1, "child": {"name": "n"}}
+
+    def test_layouts_per_instance(self):
+        """Test instances of one class with different attribute sets."""
+        first = Plain(a=1, b=2)
+        second = Plain(b=3, _c=4, d=print)
+        third = Plain(a=1, b=2)
+        third.a = Plain(x=None)
+
+        assert object_to_dict([first, second, third]) == [
+            {"a": 1, "b": 2},
+            {"b": 3},
+            {"a": {"x": None}, "b": 2},
+        ]
+
+    def test_key_order_preserved(self):
+        """Test that attribute order follows the instance dict."""
+        assert list(object_to_dict(Plain(z=1, a=2, m=3))) == ["z", "a", "m"]
+
+    def test_objects_without_dict_use_str(self):
+        """Test the string fallback for slotted objects."""
+        assert object_to_dict([Slotted(5)]) == ["Slotted(5)"]
+
+    def test_callable_top_level_object_converted(self):
+        """Test that callables are only skipped as attributes."""
+
+        def func():
+            pass
+
+        func.tag = "t"
+
+        assert object_to_dict(func) == {"tag": "t"}
+
+    def test_mock_objects(self):
+        """Test dynamically created classes such as mocks."""
+        mock = Mock(spec=["id"])
+        mock.id = 7
+
+        assert object_to_dict(mock)["id"] == 7
+
+    def test_sdk_expense(self):
+        """Test conversion of a nested SDK expense."""
+        expense = Expense(
+            {
+                "id": 1,
+                "group_id": 2,
+                "description": "Dinner",
+                "repeats": False,
+                "repeat_interval": "never",
+                "email_reminder": False,
+                "email_reminder_in_advance": -1,
+                "next_repeat": None,
+                "details": None,
+                "comments_count": 0,
+                "payment": False,
+                "creation_method": "equal",
+                "transaction_method": "offline",
+                "transaction_confirmed": False,
+                "cost": "10.0",
+                "currency_code": "EUR",
+                "created_by": {"id": 3, "first_name": "A", "last_name": "B"},
+                "date": "2025-10-15T10:00:00Z",
+                "created_at": "2025-10-15T10:00:00Z",
+                "updated_at": "2025-10-15T10:00:00Z",
+                "deleted_at": None,
+                "receipt": {"original": None, "large": None},
+                "category": {"id": 13, "name": "Dining out"},
+                "updated_by": None,
+                "deleted_by": None,
+                "repayments": [{"from": 4, "to": 3, "amount": "5.0"}],
+                "users": [
+                    {
+                        "user": {"id": 3, "first_name": "A", "last_name": "B"},
+                        "paid_share": "10.0",
+                        "owed_share": "5.0",
+                        "net_balance": "5.0",
+                    }
+                ],
+            }
+        )
+
+        result = object_to_dict(expense)
+
+        assert result["category"] == {
+            "id": 13,
+            "name": "Dining out",
+            "subcategories": [],
+        }
+        assert result["repayments"] == [
+            {"fromUser": 4, "toUser": 3, "amount": "5.0", "currency_code": None}
+        ]
+        assert result["users"][0] == {
+            "first_name": "A",
+            "last_name": "B",
+            "id": 3,
+            "email": None,
+            "registration_status": None,
+            "picture": None,
+            "paid_share": "10.0",
+            "owed_share": "5.0",
+            "net_balance": "5.0",
+        }
+
+
+class TestParseTimestamp:
+    """Test parse_timestamp normalization."""
+
+    def test_splitwise_format(self):
+        """Test the fixed ISO format Splitwise returns."""
+        assert parse_timestamp("2025-10-15T10:00:00Z") == datetime(2025, 10, 15, 10)
+
+    def test_offsets_converted_to_utc(self):
+        """Test that offsets are converted rather than dropped."""
+        assert parse_timestamp("2025-10-31T23:30:00-02:00") == datetime(
+            2025, 11, 1, 1, 30
+        )
+        aware = datetime(2025, 1, 1, 12, tzinfo=timezone(timedelta(hours=3)))
+        assert parse_timestamp(aware) == datetime(2025, 1, 1, 9)
+        assert parse_timestamp(datetime(2025, 1, 1, tzinfo=UTC)) == datetime(2025, 1, 1)
+
+    def test_dateutil_fallback(self):
+        """Test that non-ISO inputs fall back to dateutil."""
+        assert parse_timestamp("Oct 15 2025 10:00 UTC") == datetime(2025, 10, 15, 10)
+
+    def test_invalid(self):
+        """Test that unparseable values return None."""
+        for value in (None, "", "not a date", 42):
+            assert parse_timestamp(value) is None